@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+입찰 예측 전략 백테스트 엔진
+
+과거 입찰을 개찰일시(없으면 입찰번호 앞 연월) 순서로 기간별로 나눠, 모델 묶음의 예측 투찰률과
+투찰 규칙(전략)으로 정한 투찰금액이 실제 낙찰하한가/낙찰금액 대비 어떤 결과였는지 다시 계산한다.
+
+투찰 규칙 (WinningPriceSamples와 같은 형태):
+- 투찰금액 = round(기초금액 × (기준 투찰률 + 오프셋 × AVG_DIFF_RT))
+- 기준 투찰률: com(업체투찰률예측) 또는 plan(예가투찰률예측)
+- 판정은 결과1/결과2와 같음: 투찰금액 < 낙찰하한가 → 하한미달, 낙찰하한가 <= 투찰금액 < 낙찰금액 → 낙찰
+
+결과 (전략별):
+- 기간별 / 공고기관별 입찰수, 낙찰수, 낙찰률, 하한미달률, 평균여유율((투찰금액 - 낙찰하한가) / 기초금액, 낙찰 건),
+  낙찰금액합계, 기간 순서대로 누적 낙찰률
+- 전체 요약 (낙찰률 순)
+
+예측은 전체 입찰에 대해 한 번만 하고, 기간별 입찰 묶음을 프로세스 풀로 나눠 (전략 수 × 입찰 수) 배열로
+모든 전략을 한 번에 계산한다. 공고기관별 합계는 기간 안의 기관 one-hot 희소 행렬 곱으로 구한다.
+
+ex)
+python backtest_engine.py data/cst/result_cst_rslt_n.csv --bundle res/7.7 --offsets=-1:1:21 --workers 4
+python backtest_engine.py res/result-2501011230-1-8020.csv --bases com --offsets=-2:2:101 --period Q
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from model_bundle import ModelBundle, PREDICTION_COLUMNS
+
+
+# 기준 투찰률 (전략 기준 이름 → 예측 컬럼)
+BASE_RATES = {'com': '업체투찰률예측', 'plan': '예가투찰률예측'}
+
+# 예측 컬럼 다른 이름 (ML_C 내보내기)
+PREDICTION_ALIASES = {'업체투찰률예측': '업체투찰률_예측', '예가투찰률예측': '예가투찰률_예측',
+                      '참여업체수예측': '참여업체수_예측'}
+
+# 실제 결과 컬럼
+REQUIRED_COLUMNS = ['기초금액', '낙찰하한가', '낙찰금액']
+
+# 기간 단위
+PERIOD_FREQS = {'M': 'M', 'Q': 'Q', 'Y': 'Y'}
+
+# 합계 항목 (기간/기관별로 더한 뒤 비율 계산)
+SUM_FIELDS = ['입찰수', '낙찰수', '하한미달수', '여유율합계', '낙찰금액합계']
+
+DEFAULT_DIFF_RT = 0.01
+
+
+def bid_dates(frame):
+    """개찰일시, 없으면 입찰번호 앞 연월(YYYYMM)로 입찰 날짜 계산"""
+    if '개찰일시' in frame.columns:
+        dates = pd.to_datetime(frame['개찰일시'], errors='coerce')
+        if dates.notna().any():
+            return dates
+    if '입찰번호' in frame.columns:
+        # 같은 연월 접두어는 한 번만 변환
+        codes, prefixes = pd.factorize(frame['입찰번호'].astype(str).str[:6])
+        parsed = pd.to_datetime(pd.Index(prefixes), format='%Y%m', errors='coerce')
+        return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=frame.index)
+    raise KeyError("날짜를 정할 컬럼(개찰일시 또는 입찰번호)이 없습니다.")
+
+
+def parse_offsets(text):
+    """'-1:1:21'(시작:끝:개수) 또는 '-1,-0.5,0,0.5,1' 형식의 오프셋 목록"""
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return np.linspace(float(start), float(stop), int(count))
+    return np.array([float(v) for v in text.split(',') if v.strip()])
+
+
+def strategy_grid(bases, offsets, diffrt):
+    """기준 투찰률 × 오프셋 조합 전략표"""
+    rows = []
+    for base in bases:
+        if base not in BASE_RATES:
+            raise ValueError(f"알 수 없는 기준 투찰률: {base} (사용 가능: {', '.join(BASE_RATES)})")
+        for offset in offsets:
+            rows.append({'전략': f"{base}{offset:+.3f}", '기준': base, '오프셋': float(offset),
+                         '투찰률오프셋': float(offset) * diffrt})
+    return pd.DataFrame(rows)
+
+
+def evaluate_shard(shard):
+    """
+    기간 하나의 입찰을 전체 전략으로 평가 (프로세스 풀 작업 함수)
+
+    Args:
+        shard (dict): period, bssamt, floor, winning, base_rates (기준 수, 입찰 수), agency (입찰 수,) 전역 기관 번호,
+                      base_index (전략 수,), rate_offset (전략 수,)
+
+    Returns:
+        dict: period, totals {항목: (전략 수,)}, agency_codes, agencies {항목: (전략 수, 기간 내 기관 수)}
+    """
+    bssamt = shard['bssamt'][:, None]
+    floor = shard['floor'][:, None]
+    winning = shard['winning'][:, None]
+
+    # (입찰 수, 전략 수) 투찰금액 - 기관 합계 희소 곱이 연속 메모리를 읽도록 입찰을 행으로 둔다
+    rates = shard['base_rates'].T[:, shard['base_index']] + shard['rate_offset'][None, :]
+    bids = np.round(bssamt * rates)
+    # 낙찰금액이 없는 입찰(유찰 등)은 입찰수와 함께 하한미달수에서도 뺀다
+    valid = np.isfinite(bids) & np.isfinite(floor) & np.isfinite(winning)
+    below = (bids < floor) & valid
+    wins = (bids >= floor) & (bids < winning)
+
+    # 항목별 값을 (입찰 수, 항목 수, 전략 수) 한 배열에 바로 채움
+    n_bids, n_strategies = bids.shape
+    values = np.empty((n_bids, len(SUM_FIELDS), n_strategies), dtype=np.float64)
+    values[:, 0] = valid
+    values[:, 1] = wins
+    values[:, 2] = below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(bids - floor, bssamt, out=values[:, 3])
+    values[:, 3][~wins] = 0.0
+    np.multiply(bids, wins, out=values[:, 4])
+    values[:, 4][~wins] = 0.0
+
+    totals = dict(zip(SUM_FIELDS, values.sum(axis=0)))
+
+    # 기간 안의 기관 one-hot (기관 수, 입찰 수) 희소 행렬 곱으로 기관별 합계
+    agency_codes, local = np.unique(shard['agency'], return_inverse=True)
+    onehot = csr_matrix((np.ones(n_bids), (local, np.arange(n_bids))), shape=(len(agency_codes), n_bids))
+    summed = (onehot @ values.reshape(n_bids, -1)).reshape(len(agency_codes), len(SUM_FIELDS), n_strategies)
+    agencies = {name: summed[:, i].T for i, name in enumerate(SUM_FIELDS)}
+
+    return {'period': shard['period'], 'totals': totals, 'agency_codes': agency_codes, 'agencies': agencies}
+
+
+def _rates(table):
+    """합계 컬럼에서 낙찰률/하한미달률/평균여유율 계산"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['낙찰률'] = table['낙찰수'] / table['입찰수']
+        table['하한미달률'] = table['하한미달수'] / table['입찰수']
+        table['평균여유율'] = table['여유율합계'] / table['낙찰수']
+    return table.drop(columns=['여유율합계'])
+
+
+class BacktestEngine:
+    """과거 입찰을 기간 순서로 전략 격자 전체에 대해 평가하는 클래스"""
+
+    def __init__(self, bundle=None, bases=('com', 'plan'), offsets=np.linspace(-1.0, 1.0, 21),
+                 diffrt=DEFAULT_DIFF_RT, period='M', workers=None):
+        """
+        Args:
+            bundle (ModelBundle 또는 str): 예측에 쓸 모델 묶음 (None이면 입력의 예측 컬럼 사용)
+            bases (tuple): 기준 투찰률 (BASE_RATES 키)
+            offsets (array): AVG_DIFF_RT 배수 오프셋 목록
+            diffrt (float): AVG_DIFF_RT (평균 차이 비율)
+            period (str): 기간 단위 'M'(월), 'Q'(분기), 'Y'(연)
+            workers (int): 기간 묶음을 나눠 계산할 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스)
+        """
+        if period not in PERIOD_FREQS:
+            raise ValueError(f"기간 단위는 {', '.join(PERIOD_FREQS)} 중 하나여야 합니다.")
+        self.bundle = ModelBundle(bundle) if isinstance(bundle, str) else bundle
+        self.strategies = strategy_grid(bases, offsets, diffrt)
+        self.diffrt = diffrt
+        self.period = period
+        self.workers = workers or os.cpu_count() or 1
+        self.timings = {}
+
+    def predictions(self, frame):
+        """모델 묶음으로 예측하거나 입력의 예측 컬럼 사용"""
+        if self.bundle is not None:
+            return self.bundle.predict(frame)
+        columns = {}
+        for name in PREDICTION_COLUMNS:
+            source = name if name in frame.columns else PREDICTION_ALIASES[name]
+            if source in frame.columns:
+                columns[name] = pd.to_numeric(frame[source], errors='coerce')
+        needed = {BASE_RATES[b] for b in self.strategies['기준'].unique()}
+        if not needed <= set(columns):
+            raise KeyError(f"모델 묶음(--bundle)이 없으면 예측 컬럼이 필요합니다: {', '.join(sorted(needed))}")
+        return pd.DataFrame(columns, index=frame.index)
+
+    def shards(self, frame, predictions):
+        """기간 순서대로 기간별 입찰 배열 묶음 생성"""
+        dates = bid_dates(frame)
+        keep = dates.notna().to_numpy()
+        ordinals, labels = pd.factorize(dates[keep].dt.to_period(PERIOD_FREQS[self.period]), sort=True)
+        labels = labels.astype(str)
+        agency_names = frame['공고기관명'] if '공고기관명' in frame.columns else pd.Series('-', index=frame.index)
+        agency_codes, self.agency_names = pd.factorize(agency_names[keep].fillna('-').astype(str))
+
+        def numeric(name, source):
+            return pd.to_numeric(source[name], errors='coerce').to_numpy(dtype=np.float64)[keep]
+
+        bssamt = numeric('기초금액', frame)
+        floor = numeric('낙찰하한가', frame)
+        winning = numeric('낙찰금액', frame)
+        bases = list(BASE_RATES)
+        base_rates = np.vstack([numeric(BASE_RATES[b], predictions) if BASE_RATES[b] in predictions.columns
+                                else np.full(len(bssamt), np.nan) for b in bases])
+        base_index = np.array([bases.index(b) for b in self.strategies['기준']])
+        rate_offset = self.strategies['투찰률오프셋'].to_numpy(dtype=np.float64)
+
+        order = np.argsort(ordinals, kind='stable')
+        boundaries = np.flatnonzero(np.diff(ordinals[order])) + 1
+        for idx in np.split(order, boundaries):
+            if len(idx) == 0:
+                continue
+            yield {
+                'period': labels[ordinals[idx[0]]],
+                'bssamt': bssamt[idx], 'floor': floor[idx], 'winning': winning[idx],
+                'base_rates': base_rates[:, idx], 'agency': agency_codes[idx],
+                'base_index': base_index, 'rate_offset': rate_offset,
+            }
+
+    def run(self, frame):
+        """
+        백테스트 실행
+
+        Returns:
+            dict: summary(전략별 전체), periods(기간 × 전략), agencies(공고기관 × 전략) DataFrame
+        """
+        missing = [name for name in REQUIRED_COLUMNS if name not in frame.columns]
+        if missing:
+            raise KeyError(f"백테스트에 필요한 실제 결과 컬럼이 없습니다: {', '.join(missing)}")
+
+        started = time.perf_counter()
+        predictions = self.predictions(frame)
+        self.timings['predict_sec'] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        shards = list(self.shards(frame, predictions))
+        if self.workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as pool:
+                results = list(pool.map(evaluate_shard, shards))
+        else:
+            results = [evaluate_shard(shard) for shard in shards]
+        self.timings['evaluate_sec'] = round(time.perf_counter() - started, 3)
+        self.timings['bids'] = int(sum(len(s['bssamt']) for s in shards))
+        self.timings['periods'] = len(shards)
+        self.timings['strategies'] = len(self.strategies)
+        return self._tables(results)
+
+    def _tables(self, results):
+        strategies = self.strategies
+        n_strategies = len(strategies)
+
+        # 기간 × 전략 (기간 순서대로 누적 낙찰률 포함)
+        period_frames = []
+        for r in results:
+            table = strategies[['전략', '기준', '오프셋']].copy()
+            table.insert(0, '기간', r['period'])
+            for name in SUM_FIELDS:
+                table[name] = r['totals'][name]
+            period_frames.append(table)
+        periods = pd.concat(period_frames, ignore_index=True) if period_frames else pd.DataFrame()
+        if len(periods):
+            cumulative = periods.groupby('전략', sort=False)[['입찰수', '낙찰수']].cumsum()
+            periods['누적낙찰률'] = cumulative['낙찰수'] / cumulative['입찰수'].where(cumulative['입찰수'] > 0)
+            periods = _rates(periods)
+
+        # 공고기관 × 전략 (기간별 기관 합계를 전역 기관 번호로 누적)
+        n_agencies = len(self.agency_names)
+        sums = {name: np.zeros((n_strategies, n_agencies)) for name in SUM_FIELDS}
+        for r in results:
+            for name in SUM_FIELDS:
+                sums[name][:, r['agency_codes']] += r['agencies'][name]
+        agencies = pd.DataFrame({
+            '공고기관명': np.tile(np.asarray(self.agency_names, dtype=object), n_strategies),
+            '전략': np.repeat(strategies['전략'].to_numpy(), n_agencies),
+            **{name: sums[name].ravel() for name in SUM_FIELDS},
+        })
+        agencies = _rates(agencies[agencies['입찰수'] > 0].reset_index(drop=True))
+
+        # 전략별 전체 요약
+        summary = strategies[['전략', '기준', '오프셋', '투찰률오프셋']].copy()
+        for name in SUM_FIELDS:
+            summary[name] = sum(r['totals'][name] for r in results) if results else 0.0
+        summary = _rates(summary).sort_values(['낙찰률', '평균여유율'], ascending=False).reset_index(drop=True)
+        return {'summary': summary, 'periods': periods, 'agencies': agencies}
+
+    def save(self, tables, output_dir, meta=None):
+        """결과 표를 CSV로, 설정/요약/소요 시간을 JSON으로 저장"""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for name, table in tables.items():
+            paths.append(os.path.join(output_dir, f'{name}.csv'))
+            table.to_csv(paths[-1], index=False, encoding='utf-8-sig', float_format='%.8f')
+        report = {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'bundle': getattr(self.bundle, 'directory', None),
+            'period': self.period,
+            'diffrt': self.diffrt,
+            'workers': self.workers,
+            'timings': self.timings,
+            'meta': meta or {},
+            'top_strategies': tables['summary'].head(10).to_dict(orient='records'),
+        }
+        paths.append(os.path.join(output_dir, 'backtest.json'))
+        with open(paths[-1], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        return paths
+
+
+def _config_diffrt(config_path):
+    """예측 서버 설정(res/config.csv)의 AVG_DIFF_RT (읽을 수 없으면 None)"""
+    try:
+        return float(pd.read_csv(config_path)['AVG_DIFF_RT'].iloc[0])
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='입찰 예측 전략 백테스트')
+    parser.add_argument('input', nargs='+', help='과거 입찰 CSV/parquet (학습 CSV 또는 예측 결과 테이블)')
+    parser.add_argument('--bundle', default=None, help='모델 묶음 디렉토리 (없으면 입력의 예측 컬럼 사용)')
+    parser.add_argument('--bases', default='com,plan', help='기준 투찰률 (com, plan)')
+    parser.add_argument('--offsets', default='-1:1:21', help="AVG_DIFF_RT 배수 오프셋 ('시작:끝:개수' 또는 쉼표 목록, 음수로 시작하면 --offsets=-1:1:21)")
+    parser.add_argument('--diffrt', type=float, default=None, help='AVG_DIFF_RT (기본: res/config.csv 값)')
+    parser.add_argument('--period', default='M', choices=list(PERIOD_FREQS), help='기간 단위')
+    parser.add_argument('--start', default=None, help='시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end', default=None, help='종료일 (YYYY-MM-DD, 포함)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--output', default=None, help='결과 폴더 (기본: res/backtest/backtest_<일시>)')
+    args = parser.parse_args(argv)
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    diffrt = args.diffrt
+    if diffrt is None:
+        diffrt = _config_diffrt(os.path.join(base_dir, 'res', 'config.csv'))
+        if diffrt is None:
+            diffrt = DEFAULT_DIFF_RT
+            print(f"⚠️  res/config.csv의 AVG_DIFF_RT를 읽을 수 없어 {diffrt}를 사용합니다.")
+
+    started = time.perf_counter()
+    frames = [pd.read_parquet(p) if p.endswith('.parquet') else pd.read_csv(p, encoding='utf-8-sig', low_memory=False)
+              for p in args.input]
+    frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    if args.start or args.end:
+        dates = bid_dates(frame)
+        mask = pd.Series(True, index=frame.index)
+        if args.start:
+            mask &= dates >= pd.Timestamp(args.start)
+        if args.end:
+            mask &= dates <= pd.Timestamp(args.end)
+        frame = frame[mask.to_numpy()]
+    load_sec = time.perf_counter() - started
+
+    engine = BacktestEngine(args.bundle, [b.strip() for b in args.bases.split(',') if b.strip()],
+                            parse_offsets(args.offsets), diffrt, args.period, args.workers)
+    engine.timings['load_sec'] = round(load_sec, 3)
+    print(f"📊 입찰 {len(frame):,}건 × 전략 {len(engine.strategies)}개 백테스트 (기간 단위 {args.period}, "
+          f"프로세스 {engine.workers}개)")
+    tables = engine.run(frame)
+
+    output = args.output or os.path.join(base_dir, 'res', 'backtest',
+                                         f"backtest_{datetime.now().strftime('%y%m%d%H%M%S')}")
+    paths = engine.save(tables, output, {'input': args.input, 'start': args.start, 'end': args.end})
+
+    print(f"⏱️  예측 {engine.timings['predict_sec']:.2f}초, 평가 {engine.timings['evaluate_sec']:.2f}초 "
+          f"(기간 {engine.timings['periods']}개)")
+    print(tables['summary'].head(10).to_string(index=False))
+    for path in paths:
+        print(f"💾 저장: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite 연결 프로파일 쓰기/읽기 벤치마크 (ml_c.db)
+
+dac/ml_c.db가 있으면 임시 폴더에 복사해서, 없으면 setup/prediction_result.sql로 새로 만들어
+프로파일마다 같은 작업을 실행한다. 원본 DB는 변경하지 않는다.
+
+- 단건 저장: API 저장처럼 INSERT 1건마다 커밋
+- 배치 저장: executeMany + 배치 단위 커밋
+- 단건 조회: 기본키 selectOne
+- 페이지 조회: 예측일시 역순 첫 페이지 (IX_ML_C_예측일시)
+
+ex)
+python benchmark_sqlite_profile.py                  # 기본 20000건, legacy/default 비교
+python benchmark_sqlite_profile.py 100000 res/benchmark_sqlite.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac'))
+from DatabaseManager import Connection, ConnectionAttribute, SQLITE_PROFILES
+
+
+DAC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac')
+SETUP_SQL = "file://" + os.path.join(DAC_DIR, "setup", "prediction_result.sql")
+
+INSERT_SQL = """INSERT OR REPLACE INTO ML_C (입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액, 예측_URL,
+    업체투찰률_예측, 예가투찰률_예측, 참여업체수_예측, 예측일시, 모델버전)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+POINT_SQL = "SELECT * FROM ML_C WHERE 입찰번호 = ? AND 입찰차수 = ?"
+PAGE_SQL = "SELECT * FROM ML_C ORDER BY 예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC LIMIT 100"
+
+
+def make_rows(count, prefix, seed=42):
+    """벤치마크용 예측 결과 행 생성 (같은 seed면 같은 데이터)"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        rows.append((
+            f"{prefix}{i:09d}", '0',
+            rng.uniform(-3, 3), rng.choice([87.745, 86.745, 89.745]), rng.uniform(1e7, 1e10),
+            'benchmark', rng.uniform(0.85, 0.95), rng.uniform(0.98, 1.02), rng.randint(1, 500),
+            (base + timedelta(seconds=i * 7)).strftime('%Y-%m-%d %H:%M:%S'), 'benchmark',
+        ))
+    return rows
+
+
+def open_database(work_dir, profile):
+    """
+    임시 폴더에 ml_c.db 준비 후 프로파일을 적용해 연결
+
+    ConnectionAttribute는 경로를 '\\'로 이어 붙이므로 POSIX에서는 work_dir 안이 아니라
+    옆에 'bench_sqlite_xxx\\ml_c.db' 파일이 생긴다. 실제로 만든 파일 경로를 함께 반환해 정리한다.
+
+    Returns:
+        tuple: (연결, db 파일 경로)
+    """
+    attr = ConnectionAttribute.build('ml_c', 'ml_c.db', work_dir, SETUP_SQL, profile=profile)
+    db_file = attr.getConnectionString()
+    source = os.path.join(DAC_DIR, 'ml_c.db')
+    if os.path.exists(source):
+        shutil.copyfile(source, db_file)
+    else:
+        open(db_file, 'a').close()
+
+    con = Connection.of(attr)
+    con.createIfNotExists()
+    return con, db_file
+
+
+def remove_database(db_file):
+    """벤치마크 db 파일과 WAL/저널 파일 삭제"""
+    for path in (db_file, db_file + '-wal', db_file + '-shm', db_file + '-journal'):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def timed(fn, count):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    return {'count': count, 'elapsed_sec': round(elapsed, 4), 'per_sec': round(count / max(elapsed, 1e-9), 1)}
+
+
+def run_profile(profile, rows, single_rows, reads, pages):
+    """프로파일 하나로 저장/조회 작업 실행"""
+    work_dir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    con, db_file = open_database(work_dir, profile)
+    cmd = con.command()
+    result = {}
+    try:
+        single = make_rows(single_rows, 'S', seed=7)
+
+        def single_insert():
+            for row in single:
+                cmd.insert(INSERT_SQL, row)
+
+        def bulk_insert(batch_size=5000):
+            for start in range(0, len(rows), batch_size):
+                cmd.executeMany(INSERT_SQL, rows[start:start + batch_size])
+                cmd.comit()
+
+        rng = random.Random(1)
+        keys = [rows[rng.randrange(len(rows))][:2] for _ in range(reads)]
+
+        def point_read():
+            for key in keys:
+                cmd.selectOne(POINT_SQL, key)
+
+        def page_read():
+            for _ in range(pages):
+                cmd.select(PAGE_SQL, ())
+
+        result['single_insert'] = timed(single_insert, len(single))
+        result['bulk_insert'] = timed(bulk_insert, len(rows))
+        result['point_read'] = timed(point_read, len(keys))
+        result['page_read'] = timed(page_read, pages)
+        result['journal_mode'] = con.getConnection().execute("PRAGMA journal_mode").fetchone()[0]
+        result['synchronous'] = con.getConnection().execute("PRAGMA synchronous").fetchone()[0]
+    finally:
+        con.disconnect()
+        remove_database(db_file)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return result
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    single_rows = min(row_count, 2000)
+
+    rows = make_rows(row_count, 'B')
+    report = {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'rows': row_count,
+        'profiles': {},
+    }
+
+    print("="*80)
+    print(f"SQLite 연결 프로파일 벤치마크 (배치 {row_count:,}건, 단건 {single_rows:,}건)")
+    print("="*80)
+    for profile in SQLITE_PROFILES:
+        report['profiles'][profile] = run_profile(profile, rows, single_rows, reads=20000, pages=500)
+
+    stages = ['single_insert', 'bulk_insert', 'point_read', 'page_read']
+    print(f"{'작업':<15}" + "".join(f"{p + ' (건/초)':>22}" for p in report['profiles']))
+    print("-"*80)
+    for stage in stages:
+        print(f"{stage:<15}" + "".join(f"{r[stage]['per_sec']:>22,.1f}" for r in report['profiles'].values()))
+
+    if 'legacy' in report['profiles'] and 'default' in report['profiles']:
+        legacy, tuned = report['profiles']['legacy'], report['profiles']['default']
+        report['speedup'] = {s: round(tuned[s]['per_sec'] / max(legacy[s]['per_sec'], 1e-9), 2) for s in stages}
+        print("-"*80)
+        print("default / legacy: " + ", ".join(f"{s} x{v}" for s, v in report['speedup'].items()))
+
+    if output_path:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
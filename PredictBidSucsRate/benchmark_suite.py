@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+입찰 예측 파이프라인 벤치마크
+
+synthetic_bid_data로 만든 합성 입찰 데이터(seed 고정)로 학습/예측 파이프라인의 단계별 시간을 잰다.
+결과는 res/benchmark/benchmark_<일시>_<커밋>.json으로 저장하고, --compare로 이전 결과와 비교하면
+느려진 단계를 표시한다.
+
+측정 단계 (크기마다):
+- csv_write / csv_load       : 학습 CSV 저장 / pd.read_csv
+- tokenize                   : KiwiTokenizer.nn_only (키워드, 공고기관명, 공사지역)
+- tfidf_fit / tfidf_score    : KiwiVectorizer 학습 / 점수 계산
+- feature_engineering        : AdvancedFeatureEngineering (상호작용, 비율, 카테고리, 통계)
+- scaling                    : StandardScaler fit_transform
+- train_<모델> / predict_<모델> : 각 학습 스크립트의 setupModels() 모델 3개 학습 / 전체 행 배치 예측
+- db_bulk_write              : PredictionResultManager 배치 저장 (임시 ml_c.db)
+- api_predict                : 실행 중인 예측 서버의 /api/predict 처리량 (--api 지정 시)
+
+필요한 패키지가 없는 단계(kiwipiepy, catboost 등)는 skipped로 기록하고 다음 단계를 계속한다.
+
+ex)
+python benchmark_suite.py                                   # 10k, 100k, 1m / mlp, rf, gb
+python benchmark_suite.py --sizes 10k --families mlp,rf
+python benchmark_suite.py --sizes 100k --api http://localhost:5000 --compare res/benchmark/이전결과.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic_bid_data import write_bid_csv
+from train_scripts import TRAIN_SCRIPTS, load_script, setup_models
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 예측 대상 (모델 1, 2, 3)
+TARGET_COLUMNS = ['업체투찰률', '예가투찰률', '참여업체수']
+
+# 느려짐으로 표시할 비율 (이전 결과 대비 소요 시간)
+REGRESSION_RATIO = 1.2
+
+
+def parse_size(text):
+    """'10k', '1m', '5000' 형식의 행 수 변환"""
+    text = text.strip().lower()
+    units = {'k': 1000, 'm': 1000000}
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def git_commit():
+    """현재 커밋 해시 (git이 없으면 None)"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+class BenchmarkSuite:
+    """합성 데이터 크기별로 파이프라인 단계 시간을 측정하는 클래스"""
+
+    def __init__(self, sizes, families=('mlp', 'rf', 'gb'), bid_type='cst', seed=42,
+                 max_train_rows=50000, api_url=None, api_requests=2000, api_concurrency=8, work_dir=None):
+        """
+        Args:
+            sizes (list): 측정할 행 수 목록
+            families (list): 학습/예측을 측정할 모델 계열 (TRAIN_SCRIPTS 키)
+            bid_type (str): 합성 데이터 입찰 유형 (cst면 공사입찰 전용 컬럼 포함)
+            seed (int): 합성 데이터 seed
+            max_train_rows (int): 모델 학습에 쓸 최대 행 수 (None이면 전체, 예측은 항상 전체 행)
+            api_url (str): 예측 서버 주소 (None이면 api_predict 단계 건너뜀)
+            api_requests (int): /api/predict 요청 수
+            api_concurrency (int): 동시 요청 수
+            work_dir (str): CSV/DB 임시 폴더 (None이면 임시 폴더를 만들고 끝나면 삭제)
+        """
+        self.sizes = sizes
+        self.families = list(families)
+        self.bid_type = bid_type
+        self.seed = seed
+        self.max_train_rows = max_train_rows
+        self.api_url = api_url
+        self.api_requests = api_requests
+        self.api_concurrency = api_concurrency
+        self.work_dir = work_dir
+
+    def run(self):
+        """모든 크기에 대해 벤치마크 실행 후 결과 dict 반환"""
+        import sklearn
+
+        own_dir = self.work_dir is None
+        work_dir = self.work_dir or tempfile.mkdtemp(prefix='bench_bid_')
+        os.makedirs(work_dir, exist_ok=True)
+
+        report = {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'sklearn': sklearn.__version__,
+            },
+            'settings': {
+                'bid_type': self.bid_type,
+                'seed': self.seed,
+                'families': self.families,
+                'max_train_rows': self.max_train_rows,
+                'api_url': self.api_url,
+            },
+            'sizes': {},
+        }
+
+        try:
+            for rows in self.sizes:
+                print("="*80)
+                print(f"⏱️  벤치마크: {rows:,}건")
+                print("="*80)
+                report['sizes'][str(rows)] = self.run_size(rows, work_dir)
+        finally:
+            if own_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        return report
+
+    def run_size(self, rows, work_dir):
+        """행 수 하나에 대해 전체 단계 측정"""
+        results = {}
+        csv_path = os.path.join(work_dir, f"bid_{rows}.csv")
+
+        self._stage(results, 'csv_write', rows,
+                    lambda: write_bid_csv(csv_path, rows, self.bid_type, self.seed))
+        data = self._stage(results, 'csv_load', rows, lambda: pd.read_csv(csv_path))
+        if data is None:
+            return results
+
+        # ===== 텍스트 → TF-IDF 점수 =====
+        text_columns = ['키워드', '공고기관명', '공사지역']
+        score_columns = ['키워드점수', '공고기관점수', '공사지역점수']
+        lines = self._stage(results, 'tokenize', rows * len(text_columns), lambda: self._tokenize(data, text_columns))
+        if lines is not None:
+            vectorizer = self._stage(results, 'tfidf_fit', rows * len(text_columns), lambda: self._tfidf_fit(lines))
+            if vectorizer is not None:
+                scores = self._stage(results, 'tfidf_score', rows * len(text_columns),
+                                     lambda: [vectorizer.scores(l) for l in lines])
+                if scores is not None:
+                    for name, values in zip(score_columns, scores):
+                        data[name] = values
+
+        # ===== 특성 엔지니어링 / 정규화 =====
+        features = self._stage(results, 'feature_engineering', rows, lambda: self._feature_engineering(data))
+        if features is None:
+            return results
+        x = self._stage(results, 'scaling', rows, lambda: self._scale(features))
+        if x is None:
+            return results
+        y = [data[name].to_numpy(dtype=np.float64) for name in TARGET_COLUMNS]
+
+        # ===== 모델 계열별 학습 / 배치 예측 =====
+        train_rows = rows if not self.max_train_rows else min(rows, self.max_train_rows)
+        predictions = None
+        for family in self.families:
+            models = self._stage(results, f'train_{family}', train_rows,
+                                 lambda: self._train(family, x[:train_rows], [t[:train_rows] for t in y]))
+            if models is None:
+                continue
+            predicted = self._stage(results, f'predict_{family}', rows,
+                                    lambda: [model.predict(x) for model in models])
+            if predictions is None and predicted is not None:
+                predictions = predicted
+
+        # ===== DB 저장 / API =====
+        if predictions is not None:
+            self._stage(results, 'db_bulk_write', rows, lambda: self._db_bulk_write(data, predictions, work_dir))
+        if self.api_url:
+            self._stage(results, 'api_predict', self.api_requests, lambda: self._api_predict(data, results))
+
+        return results
+
+    def _stage(self, results, name, count, fn):
+        """단계 하나 실행 (시간, 초당 처리 건수 기록). 패키지가 없으면 skipped, 실패하면 error"""
+        started = time.perf_counter()
+        try:
+            value = fn()
+        except ImportError as e:
+            results[name] = {'skipped': str(e)}
+            print(f"⚠️  {name}: 건너뜀 ({e})")
+            return None
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+            print(f"❌ {name}: 실패 ({e})")
+            return None
+
+        elapsed = time.perf_counter() - started
+        entry = results.setdefault(name, {})
+        entry.update({
+            'sec': round(elapsed, 4),
+            'count': int(count),
+            'per_sec': round(count / max(elapsed, 1e-9), 1),
+        })
+        print(f"✅ {name}: {elapsed:.3f}초 ({entry['per_sec']:,.1f}건/초)")
+        return value
+
+    def _tokenize(self, data, columns):
+        train = load_script(TRAIN_SCRIPTS['mlp'])
+        tokenizer = train.KiwiTokenizer(None)
+        return [tokenizer.nn_only(np.squeeze(data[name].tolist())) for name in columns]
+
+    def _tfidf_fit(self, lines):
+        train = load_script(TRAIN_SCRIPTS['mlp'])
+        vectorizer = train.KiwiVectorizer()
+        all_text = [text for part in lines for text in part if text.strip() != '']
+        vectorizer.fit(all_text or ['기본키워드'])
+        return vectorizer
+
+    def _feature_engineering(self, data):
+        """학습 스크립트와 같은 순서로 코드 해시 변환 후 특성 생성"""
+        from advanced_feature_engineering import AdvancedFeatureEngineering
+
+        dataset_x = data.copy()
+        for name in ['면허제한코드', '공고기관코드']:
+            dataset_x[name] = dataset_x[name].astype(str).apply(lambda x: hash(x) % 1000000 if x != 'nan' else 0)
+
+        feature_eng = AdvancedFeatureEngineering()
+        dataset_x = feature_eng.create_interaction_features(dataset_x)
+        dataset_x = feature_eng.create_ratio_features(dataset_x)
+        dataset_x = feature_eng.create_categorical_features(dataset_x)
+        dataset_x = feature_eng.create_statistical_features(dataset_x)
+        return dataset_x
+
+    def _scale(self, features):
+        """학습 스크립트의 선택 컬럼(_get_selected_column_indices)과 같은 컬럼을 정규화"""
+        from sklearn.preprocessing import StandardScaler
+
+        columns = ['기초금액', '낙찰하한률', '참여업체수', '면허제한코드', '공고기관점수', '공사지역점수', '키워드점수']
+        if self.bid_type == 'cst':
+            columns = columns[:3] + ['간접비', '순공사원가'] + columns[3:]
+        return StandardScaler().fit_transform(features[columns].to_numpy(dtype=np.float64))
+
+    def _train(self, family, x, y):
+        models = setup_models(load_script(TRAIN_SCRIPTS[family]))
+        for model, target in zip(models, y):
+            model.fit(x, target)
+        return models
+
+    def _db_bulk_write(self, data, predictions, work_dir):
+        sys.path.append(os.path.join(BASE_DIR, 'dac'))
+        from DatabaseManager import ConnectionAttribute
+        from PredictionResultManager import PredictionResultManager
+
+        db_dir = os.path.join(work_dir, 'db')
+        os.makedirs(db_dir, exist_ok=True)
+        db_file = ConnectionAttribute.build('ml_c', 'ml_c.db', db_dir, '').getConnectionString()
+        if os.path.exists(db_file):
+            os.remove(db_file)
+        open(db_file, 'a').close()
+
+        result_df = data.copy()
+        result_df['업체투찰률_예측'] = predictions[0]
+        result_df['예가투찰률_예측'] = predictions[1]
+        result_df['참여업체수_예측'] = np.round(predictions[2]).astype(np.int64)
+        result_df['예측_URL'] = 'benchmark'
+        result_df['입찰번호'] = result_df['입찰번호'].astype(str) + '-' + result_df.index.astype(str)
+
+        manager = PredictionResultManager(db_dir=db_dir)
+        try:
+            return manager.save_prediction_with_options(result_df, model_version='benchmark', insert_mode='REPLACE')
+        finally:
+            manager.connection.disconnect()
+
+    def _api_predict(self, data, results):
+        """예측 서버에 /api/predict 요청을 동시에 보내 처리량과 지연 시간 측정"""
+        import urllib.parse
+        import urllib.request
+
+        sample = data.sample(n=min(self.api_requests, len(data)), replace=len(data) < self.api_requests,
+                             random_state=self.seed)
+        urls = []
+        for row in sample.itertuples(index=False):
+            params = {
+                'bssamt': int(row.기초금액), 'lowerrt': row.낙찰하한률, 'companycnt': int(row.참여업체수),
+                'a': row.A계산여부, 'orgamt': row.순공사원가적용여부,
+                'limitlic': str(row.면허제한코드).split(',')[0], 'instt': row.공고기관명,
+                'area': row.공사지역, 'keyword': row.키워드, 'bidno': f"BENCH-{row.입찰번호}",
+            }
+            urls.append(self.api_url.rstrip('/') + '/api/predict?' + urllib.parse.urlencode(params))
+
+        def call(url):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except Exception:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        with ThreadPoolExecutor(max_workers=self.api_concurrency) as pool:
+            timings = list(pool.map(call, urls))
+
+        latencies = np.array([t for t, _ in timings]) * 1000
+        results['api_predict'] = {
+            'concurrency': self.api_concurrency,
+            'errors': sum(1 for _, ok in timings if not ok),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        }
+        return len(urls)
+
+
+def compare_reports(current, baseline, ratio=REGRESSION_RATIO):
+    """
+    이전 결과와 단계별 소요 시간 비교
+
+    Returns:
+        list: (크기, 단계, 이전 초, 현재 초, 비율, 느려짐 여부) 목록
+    """
+    rows = []
+    for size, stages in current['sizes'].items():
+        old_stages = baseline.get('sizes', {}).get(size, {})
+        for name, entry in stages.items():
+            old = old_stages.get(name, {})
+            if 'sec' not in entry or 'sec' not in old:
+                continue
+            change = entry['sec'] / max(old['sec'], 1e-9)
+            rows.append((size, name, old['sec'], entry['sec'], round(change, 3), change > ratio))
+    return rows
+
+
+def print_report(report):
+    print("="*80)
+    print(f"벤치마크 결과 (커밋 {report['commit']}, CPU {report['environment']['cpu_count']}개)")
+    print("="*80)
+    for size, stages in report['sizes'].items():
+        print(f"[{int(size):,}건]")
+        for name, entry in stages.items():
+            if 'sec' in entry:
+                print(f"  {name:<22}{entry['sec']:>12.3f}초{entry['per_sec']:>16,.1f}건/초")
+            else:
+                print(f"  {name:<22}{entry.get('skipped') and '건너뜀' or '실패'}: {entry.get('skipped') or entry.get('error')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="입찰 예측 파이프라인 벤치마크")
+    parser.add_argument('--sizes', default='10k,100k,1m', help="행 수 목록 (예: 10k,100k,1m)")
+    parser.add_argument('--families', default='mlp,rf,gb', help="모델 계열 (mlp, rf, gb, cb)")
+    parser.add_argument('--bid-type', default='cst', help="합성 데이터 입찰 유형 (cst, mtrl, gdns)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-train-rows', type=int, default=50000, help="학습에 쓸 최대 행 수 (0이면 전체)")
+    parser.add_argument('--api', default=None, help="예측 서버 주소 (예: http://localhost:5000)")
+    parser.add_argument('--api-requests', type=int, default=2000)
+    parser.add_argument('--api-concurrency', type=int, default=8)
+    parser.add_argument('--output', default=None, help="결과 JSON 경로 (기본 res/benchmark/benchmark_<일시>_<커밋>.json)")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    families = [f.strip() for f in args.families.split(',') if f.strip()]
+    unknown = [f for f in families if f not in TRAIN_SCRIPTS]
+    if unknown:
+        parser.error(f"알 수 없는 모델 계열: {unknown} (사용 가능: {list(TRAIN_SCRIPTS)})")
+
+    suite = BenchmarkSuite(
+        sizes=[parse_size(s) for s in args.sizes.split(',') if s.strip()],
+        families=families,
+        bid_type=args.bid_type,
+        seed=args.seed,
+        max_train_rows=args.max_train_rows or None,
+        api_url=args.api,
+        api_requests=args.api_requests,
+        api_concurrency=args.api_concurrency,
+    )
+    report = suite.run()
+    print_report(report)
+
+    output = args.output or os.path.join(
+        BASE_DIR, 'res', 'benchmark',
+        f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['compare'] = {'baseline': args.compare, 'commit': baseline.get('commit'), 'stages': []}
+        print("="*80)
+        print(f"이전 결과와 비교: {args.compare} (커밋 {baseline.get('commit')})")
+        for size, name, old, new, change, slower in compare_reports(report, baseline):
+            report['compare']['stages'].append({'size': size, 'stage': name, 'baseline_sec': old,
+                                                'sec': new, 'ratio': change, 'regression': slower})
+            mark = "⚠️ 느려짐" if slower else ""
+            print(f"  [{int(size):,}] {name:<22}{old:>10.3f}초 → {new:>10.3f}초  x{change:<6} {mark}")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
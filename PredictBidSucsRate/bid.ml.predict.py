@@ -18,6 +18,10 @@ import pandas as pd  # 데이터 분석을 위한 라이브러리 (엑셀과 비
 import sklearn  # 머신러닝 라이브러리
 import random as rnd  # 랜덤 숫자 생성
 import numpy as np  # 수치 계산을 위한 라이브러리 (행렬, 배열 연산)
+import sys  # 모듈 검색 경로 설정
+import atexit  # 서버 종료 시 남은 예측 결과 저장
+import uuid  # 입찰번호가 없는 요청의 저장 키 생성
+import time  # 시뮬레이션 소요 시간 측정
 
 # 한국어 자연어 처리를 위한 라이브러리
 from kiwipiepy import Kiwi  # 한국어 형태소 분석기 (단어를 쪼개는 도구)
@@ -38,6 +42,10 @@ from flask import Flask, jsonify, g, request  # Flask: 웹 서버 만들기, jso
 
 # 고급 특성 엔지니어링
 from advanced_feature_engineering import AdvancedFeatureEngineering
+from reserve_price_simulator import ReservePriceSimulator
+from bid_price_optimizer import BidPriceOptimizer
+from multi_output_model import MULTI_MODEL_FILE
+from model_bundle import FAMILY_FILES, load_model_file, model_version
 
 
 class KiwiTokenizer():
@@ -415,6 +423,7 @@ class BidPricePredict():
     - 모델1: 업체 투찰률 예측 (업체들이 얼마나 낮은 가격으로 입찰할지)
     - 모델2: 예가 투찰률 예측 (예정가 대비 얼마나 낮은 가격으로 입찰할지)  
     - 모델3: 참여 업체 수 예측 (몇 개 업체가 참여할지)
+    - (MODEL_MODE=MULTI) 위 세 값을 한 번에 예측하는 다중 출력 모델 1개
     """
     
     def __init__(self):
@@ -448,34 +457,138 @@ class BidPricePredict():
         if debg=="Y":  # 설정에서 디버그 모드가 Y이면
             self.debug_mode = True
         
+        # 예측 결과 저장 설정 (NONE: 저장 안함, SQLITE: dac/ml_c.db, SQLSERVER: DB_* 설정 사용)
+        self.persist_mode = str(self.configValue("PERSIST_MODE", "NONE")).upper()
+        self.persist_writer = None
+        
         
         # 주석처리된 파일 경로들 (개발 시 사용)
         #self.krdic_path = os.path.join(self.data_dir, '표준국어대사전.NNP.csv')
         #self.tokenizer_path = os.path.join(self.data_dir, 'mlpregr.tokenizer.v0.1.1.npz')
         #self.vectorizer_path = os.path.join(self.data_dir, 'mlpregr.vectorizer.v0.1.1.npz')        
         
+        # 모델 계열 (MODEL_FAMILY: MLP, RF, GB, CB - 각 학습 스크립트가 res에 저장한 파일 사용)
+        self.model_family = str(self.configValue("MODEL_FAMILY", "MLP")).lower()
+        self.model_files = FAMILY_FILES[self.model_family]
+        
+        # RF/GB 트리 모델은 평탄화 파일(<모델 파일>.flat)이 있으면 memmap으로 불러옴 (FLAT_TREES: Y/N)
+        self.flat_trees = str(self.configValue("FLAT_TREES", "Y")).upper() == "Y"
+        
         # 학습된 모델 파일들의 경로 설정
-        self.model_path1 = os.path.join(self.save_dir, 'mlpregr.model1.v0.1.1.npz')  # 업체 투찰률 예측 모델
-        self.model_path2 = os.path.join(self.save_dir, 'mlpregr.model2.v0.1.1.npz')  # 예가 투찰률 예측 모델
-        self.model_path3 = os.path.join(self.save_dir, 'mlpregr.model3.v0.1.1.npz')  # 참여 업체 수 예측 모델
-        self.scaler_path = os.path.join(self.save_dir, 'x_fited_scaler.v2.npz')  # 데이터 정규화 도구
-        
-        # 학습된 모델들을 메모리로 불러오기
-        self.model1 = joblib.load(self.model_path1)  # 투찰률예측모델(업체투찰률)
-        self.model2 = joblib.load(self.model_path2)  # 투찰률예측모델(예가투찰하한률)
-        self.model3 = joblib.load(self.model_path3)  # 참여업체예측모델
+        self.model_path1 = os.path.join(self.save_dir, self.model_files['model1'])  # 업체 투찰률 예측 모델
+        self.model_path2 = os.path.join(self.save_dir, self.model_files['model2'])  # 예가 투찰률 예측 모델
+        self.model_path3 = os.path.join(self.save_dir, self.model_files['model3'])  # 참여 업체 수 예측 모델
+        self.scaler_path = os.path.join(self.save_dir, self.model_files['scaler'])  # 데이터 정규화 도구
+        
+        self.multi_model_path = os.path.join(self.save_dir, MULTI_MODEL_FILE)  # 다중 출력 모델 (세 대상을 한 파일로)
+        
+        # 학습된 모델들을 메모리로 불러오기 (MODEL_MODE: SEPARATE - 모델 3개, MULTI - 다중 출력 모델 1개)
+        self.model_mode = str(self.configValue("MODEL_MODE", "SEPARATE")).upper()
+        self.multi_model = None
+        if self.model_mode == "MULTI":
+            self.multi_model = joblib.load(self.multi_model_path)  # 업체투찰률, 예가투찰률, 참여업체수를 한 번에 예측
+        else:
+            self.model1 = load_model_file(self.model_path1, self.flat_trees)  # 투찰률예측모델(업체투찰률)
+            self.model2 = load_model_file(self.model_path2, self.flat_trees)  # 투찰률예측모델(예가투찰하한률)
+            self.model3 = load_model_file(self.model_path3, self.flat_trees)  # 참여업체예측모델
         self.scaler = joblib.load(self.scaler_path)  # 데이터 정규화 도구
         
+        # 예측 결과 저장 시 모델버전 컬럼 값 (불러온 모델 파일의 계열/버전, 예: rf.v0.1.1, mlp.multi.v0.1.1)
+        if self.model_mode == "MULTI":
+            self.model_version = model_version(f"{self.model_family}.multi", self.multi_model_path)
+        else:
+            self.model_version = model_version(self.model_family, self.model_path1)
+        
         # 텍스트 처리 도구들 초기화
-        self.tokenizer = KiwiTokenizer('mlpregr.tokenizer.v0.1.1.npz')  # 한국어 형태소 분석기
+        self.tokenizer = KiwiTokenizer(self.model_files['tokenizer'])  # 한국어 형태소 분석기
         #self.tokenizer.loadDictonary('표준국어대사전.NNP.csv')  # 표준국어대사전 로드 (주석처리)
         
         self.vectorizer = KiwiVectorizer()  # 텍스트를 숫자로 변환하는 도구
-        self.vectorizer.load('mlpregr.vectorizer.v0.1.1.npz')  # 학습된 단어사전 불러오기
+        self.vectorizer.load(self.model_files['vectorizer'])  # 학습된 단어사전 불러오기
         
         # 고급 특성 엔지니어링 도구 초기화
         self.feature_eng = AdvancedFeatureEngineering()
         
+        # 예정금액 추첨 시뮬레이터 (추첨 표본은 서버 시작 시 한 번만 생성)
+        self.simulator = ReservePriceSimulator(
+            draws=int(self.configValue("SIM_DRAWS", 1000000)),
+            prelim_count=int(self.configValue("SIM_PRELIM_COUNT", 15)),
+            pick_count=int(self.configValue("SIM_PICK_COUNT", 4)),
+            prelim_range=float(self.configValue("SIM_PRELIM_RANGE", 0.02)),
+            seed=int(self.configValue("SIM_SEED", 42)),
+            stratified=str(self.configValue("SIM_STRATIFIED", "N")).upper() == "Y",
+        )
+        
+        # 투찰금액 최적화 (시뮬레이터의 추첨 표본 공유)
+        self.optimizer = BidPriceOptimizer(
+            self.simulator,
+            grid=int(self.configValue("OPT_GRID", 1000)),
+            nodes=int(self.configValue("OPT_NODES", 16)),
+        )
+        self.cost_rate = float(self.configValue("OPT_COST_RT", 0.0))  # 기초금액 대비 원가율
+        
+    
+    def configValue(self, name, default):
+        """
+        설정 파일에서 값을 읽는 함수 (컬럼이 없거나 비어 있으면 기본값)
+        
+        Args:
+            name (str): 설정 컬럼명
+            default: 기본값
+        """
+        if name not in self.config.columns or pd.isna(self.config[name].iloc[0]):
+            return default
+        return self.config[name].iloc[0]
+    
+    def startPersistWriter(self):
+        """
+        예측 결과 비동기 저장 스레드 시작
+        
+        설명:
+        - 요청 스레드는 결과를 큐에 넣기만 하고, 백그라운드 스레드가 모아서 ML_C 테이블에 저장
+        - 큐가 가득 차면 PERSIST_PUT_TIMEOUT(초)까지만 기다린 뒤 버림 (요청 지연 방지)
+        """
+        if self.persist_mode not in ("SQLITE", "SQLSERVER"):
+            return None
+        
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac'))
+        from AsyncPredictionWriter import AsyncPredictionWriter
+        
+        if self.persist_mode == "SQLSERVER":
+            db_config = {
+                'host': str(self.configValue("DB_HOST", "localhost")),
+                'port': int(self.configValue("DB_PORT", 1433)),
+                'database': str(self.configValue("DB_NAME", "")),
+                'username': str(self.configValue("DB_USER", "")),
+                'password': str(self.configValue("DB_PASSWORD", "")),
+            }
+            
+            def sink_factory():
+                from SqlServerPredictionManager import SqlServerPredictionManager
+                return SqlServerPredictionManager(**db_config)
+        else:
+            def sink_factory():
+                from PredictionResultManager import PredictionResultManager
+                return PredictionResultManager(dedicated=True)
+        
+        self.persist_writer = AsyncPredictionWriter(
+            sink_factory,
+            insert_mode="REPLACE",
+            model_version=self.model_version,
+            max_queue_size=int(self.configValue("PERSIST_QUEUE_SIZE", 10000)),
+            batch_size=int(self.configValue("PERSIST_BATCH_SIZE", 500)),
+            flush_interval=float(self.configValue("PERSIST_FLUSH_SEC", 2.0)),
+            put_timeout=float(self.configValue("PERSIST_PUT_TIMEOUT", 0.0)),
+        ).start()
+        atexit.register(self.persist_writer.close)
+        print(f"예측 결과 비동기 저장 사용: {self.persist_mode} (모델버전: {self.model_version})")
+        return self.persist_writer
+    
+    def persistPrediction(self, record):
+        """예측 결과 1건을 저장 큐에 넣는 함수 (저장 미사용이면 무시)"""
+        if self.persist_writer is None:
+            return False
+        return self.persist_writer.submit(record)
     
     ###########################################################
     # 예측 관련 함수들
@@ -593,6 +706,11 @@ class BidPricePredict():
         x_test = self.scaler.transform(x_test_data).tolist()
         #print(x_test)  # 디버깅용 출력 (주석처리)
     
+        # 다중 출력 모델이면 한 번의 예측으로 세 값을 함께 얻음
+        if self.multi_model is not None:
+            predrts = self.multi_model.predict(x_test)[0]
+            return [ float(predrts[0]), float(predrts[1]), float(predrts[2]) ]
+        
         # 3개의 머신러닝 모델로 예측 수행
         predrt1 = self.model1.predict(x_test)  # 업체투찰률예측 (업체들이 얼마나 낮은 가격으로 입찰할지)
         predrt2 = self.model2.predict(x_test)  # 예가투찰률예측 (예정가 대비 얼마나 낮은 가격으로 입찰할지)
@@ -604,11 +722,84 @@ class BidPricePredict():
         
         # 예측 결과를 리스트로 반환 (float 타입으로 변환)
         return [ float(predrt1[0]), float(predrt2[0]), float(predrt3[0]) ]
-    
+
+    def PredictFromValues(self, values):
+        """
+        요청 값(dict)으로 투찰률을 예측하는 함수 (/api/simulate, /api/simulate/batch 공용)
+
+        Args:
+            values (dict): /api/predict와 같은 키 (bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword)
+                           comlowrt/planlowrt가 있으면 모델 예측 대신 그 값을 사용
+
+        Returns:
+            dict: comlowrt, planlowrt, companycnt (예측값)
+        """
+        if values.get('comlowrt') not in (None, ''):
+            planlowrt = values.get('planlowrt')
+            return {
+                'comlowrt': float(values['comlowrt']),
+                'planlowrt': float(planlowrt) if planlowrt not in (None, '') else None,
+                'companycnt': float(values.get('companycnt', 0) or 0),
+            }
+
+        insttpt = self.convertScore(values.get('instt', 0))
+        areapt = self.convertScore(values.get('area', 0))
+        keywordpt = self.convertScore(values.get('keyword', 0))
+        predrts = self.PredictWinningPriceOfBidding([
+            values.get('bssamt', 0), values.get('lowerrt', 0), values.get('companycnt', 0),
+            values.get('a', 0), values.get('orgamt', 0), values.get('limitlic', 0),
+            insttpt, areapt, keywordpt])
+        return {'comlowrt': predrts[0], 'planlowrt': predrts[1], 'companycnt': predrts[2]}
+
+    def SimulateReservePrice(self, bssamt, lowerrt, comlowrt, planlowrt=None, bid_amount=None, a_amount=0):
+        """
+        예측 투찰률과 복수예비가격 추첨 시뮬레이션으로 낙찰 확률을 계산하는 함수
+
+        Args:
+            bssamt (int): 기초금액
+            lowerrt (float): 낙찰하한률
+            comlowrt (float): 업체투찰률예측 (경쟁 업체 최저 투찰률의 중심)
+            planlowrt (float): 예가투찰률예측 (예정금액 중심 = 예가투찰률 / 낙찰하한률 × 기초금액)
+            bid_amount (float): 평가할 투찰금액 (없으면 업체투찰률예측 기반 낙찰가)
+            a_amount (float): A값 금액
+
+        Returns:
+            dict: 낙찰 확률, 낙찰하한가 통과 확률, 예정금액/낙찰하한가/경쟁 투찰금액 분위수
+
+        설명:
+        - 경쟁 업체 투찰률의 흩어짐은 평균 차이 비율(AVG_DIFF_RT)을 표준편차로 사용
+        """
+        return self.simulator.simulate(float(bssamt), float(lowerrt), comlowrt, planlowrt,
+                                       diffrt=self.avg_diffrt, bid_amount=bid_amount, a_amount=a_amount)
+
+    def OptimizeBidPrice(self, bssamt, lowerrt, comlowrt, planlowrt=None, companycnt=None, cost_rate=None,
+                         a_amount=0, curve_points=0):
+        """
+        낙찰하한가 ~ 기초금액 사이 투찰금액 후보 중 기대값이 가장 큰 금액을 찾는 함수
+
+        Args:
+            bssamt (int): 기초금액
+            lowerrt (float): 낙찰하한률
+            comlowrt (float): 업체투찰률예측 (경쟁 업체 투찰률 중심)
+            planlowrt (float): 예가투찰률예측
+            companycnt (float): 참여업체수예측 (경쟁 업체 수 = 참여업체수 - 1)
+            cost_rate (float): 기초금액 대비 원가율 (없으면 설정의 OPT_COST_RT)
+            a_amount (float): A값 금액
+            curve_points (int): 금액별 낙찰 확률/기대값 곡선 점 수 (0이면 생략)
+
+        Returns:
+            dict: 최적 투찰금액/투찰률, 낙찰 확률, 기대값
+        """
+        return self.optimizer.optimize(float(bssamt), float(lowerrt), comlowrt, planlowrt, companycnt,
+                                       diffrt=self.avg_diffrt,
+                                       cost_rate=self.cost_rate if cost_rate is None else cost_rate,
+                                       a_amount=a_amount, curve_points=curve_points)
+
 
 # ===== Flask 웹 서버 설정 =====
 app = Flask(__name__)  # Flask 애플리케이션 생성
 app.ml = BidPricePredict()  # 머신러닝 예측 객체를 앱에 연결
+app.ml.startPersistWriter()  # 예측 결과 비동기 저장 (설정의 PERSIST_MODE)
 
 
 
@@ -642,8 +833,13 @@ def ApiList():
     Returns:
         JSON: 사용 가능한 API 메서드들의 리스트
     """
-    return jsonify({'methods':[ "predict(bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword)"
+    return jsonify({'methods':[ "predict(bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword, bidno, bidseq)"
                                 ,"score(keyword)"
+                                ,"simulate(bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword, bidamt, aamt)"
+                                ,"simulate/batch(bids) [POST]"
+                                ,"optimize(bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword, costrt, aamt, curve)"
+                                ,"optimize/batch(bids) [POST]"
+                                ,"persist/stats()"
                                ] })
 
 
@@ -677,6 +873,8 @@ def Predict():
         - instt: 공고기관명
         - area: 공사지역
         - keyword: 키워드
+        - bidno: 입찰번호 (선택, 예측 결과 저장 키)
+        - bidseq: 입찰차수 (선택, 기본값 0)
     
     URL 예시: /api/predict?bssamt=100000000&lowerrt=0.87&companycnt=5&a=1&orgamt=0&limitlic=6000&instt=서울시청&area=서울시&keyword=건물 신축공사
     
@@ -726,6 +924,27 @@ def Predict():
     diffrt = app.ml.avg_diffrt  # 평균 차이 비율
     prices = app.ml.WinningPriceSamples(bssamt, diffrt, comlowrt) + app.ml.WinningPriceSamples(bssamt, diffrt, planlowrt)
     
+    # 예측 결과 저장 (큐에 넣기만 하고 DB 저장은 백그라운드 스레드가 처리)
+    app.ml.persistPrediction({
+        '입찰번호': request.args.get('bidno') or 'API-' + uuid.uuid4().hex[:16],
+        '입찰차수': request.args.get('bidseq', '0'),
+        '낙찰하한률': float(lowerrt),
+        '기초금액': float(bssamt),
+        'A계산여부': str(a),
+        '순공사원가적용여부': str(orgamt),
+        '면허제한코드': str(limitlic),
+        '공고기관명': str(instt),
+        '공고기관점수': insttpt,
+        '공사지역': str(area),
+        '공사지역점수': areapt,
+        '키워드': str(keyword),
+        '키워드점수': keywordpt,
+        '예측_URL': request.full_path,
+        '업체투찰률_예측': comlowrt,
+        '예가투찰률_예측': planlowrt,
+        '참여업체수_예측': int(round(compcnt)),
+    })
+    
     # 결과를 JSON으로 반환
     return jsonify({
         'planLowerRatio':planlowrt,           # 예가 투찰률
@@ -739,6 +958,215 @@ def Predict():
 
 
 
+def _optional_float(value):
+    """요청 값을 float로 변환 (비어 있으면 None)"""
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def _batch_bid_error(bids, optional_keys):
+    """
+    배치 요청의 입찰 목록 확인 (문제가 있으면 입찰 위치를 포함한 오류 메시지, 없으면 None)
+
+    - 입찰은 dict, bssamt(기초금액)와 lowerrt(낙찰하한율)는 0보다 큰 숫자
+    - optional_keys의 값은 비어 있거나 숫자
+    """
+    if not isinstance(bids, list):
+        return '입찰 목록(bids)은 배열이어야 합니다.'
+    for index, values in enumerate(bids):
+        if not isinstance(values, dict):
+            return f'bids[{index}]: 입찰 정보는 객체여야 합니다.'
+        for key in ('bssamt', 'lowerrt'):
+            try:
+                number = float(values.get(key))
+            except (TypeError, ValueError):
+                return f'bids[{index}]: {key}는 숫자여야 합니다 ({values.get(key)!r}).'
+            if not np.isfinite(number) or number <= 0:
+                return f'bids[{index}]: {key}는 0보다 커야 합니다 ({values.get(key)!r}).'
+        for key in optional_keys:
+            try:
+                _optional_float(values.get(key))
+            except (TypeError, ValueError):
+                return f'bids[{index}]: {key}는 숫자여야 합니다 ({values.get(key)!r}).'
+    return None
+
+
+@app.route('/api/simulate')
+def Simulate():
+    """
+    예측 투찰률과 예정금액 추첨 시뮬레이션으로 낙찰 확률과 금액 분위수를 계산하는 엔드포인트
+
+    URL 파라미터:
+        - /api/predict와 같은 입찰 정보 (bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword)
+        - bidamt: 평가할 투찰금액 (선택, 기본값은 업체 투찰률 기반 낙찰가)
+        - aamt: A값 금액 (선택, 기본값 0)
+        - comlowrt, planlowrt: 투찰률을 직접 지정하면 모델 예측 생략 (선택)
+
+    URL 예시: /api/simulate?bssamt=100000000&lowerrt=0.87745&companycnt=5&a=1&orgamt=0&limitlic=6000&instt=서울시청&area=서울시&keyword=건물 신축공사&bidamt=87900000
+
+    Returns:
+        JSON: 예측 투찰률, 낙찰 확률, 예정금액/낙찰하한가/경쟁 투찰금액 분위수
+    """
+    values = request.args.to_dict()
+    predrts = app.ml.PredictFromValues(values)
+    simulation = app.ml.SimulateReservePrice(values.get('bssamt', 0), values.get('lowerrt', 0),
+                                             predrts['comlowrt'], predrts['planlowrt'],
+                                             bid_amount=_optional_float(values.get('bidamt')),
+                                             a_amount=_optional_float(values.get('aamt')) or 0)
+    return jsonify({
+        'planLowerRatio': predrts['planlowrt'],   # 예가 투찰률
+        'comLowerRatio': predrts['comlowrt'],     # 업체 투찰률
+        'avgDiffRatio': app.ml.avg_diffrt,        # 평균 차이 비율 (경쟁 투찰률 표준편차)
+        'companyCount': predrts['companycnt'],    # 예측된 참여 업체 수
+        'simulation': simulation,                 # 낙찰 확률과 분위수
+    })
+
+
+@app.route('/api/simulate/batch', methods=['POST'])
+def SimulateBatch():
+    """
+    여러 입찰을 한 번에 시뮬레이션하는 엔드포인트
+
+    요청 본문 (JSON): {"bids": [{/api/simulate와 같은 키}, ...]} 또는 입찰 목록
+
+    설명:
+    - 투찰률 예측은 입찰마다 수행하고, 시뮬레이션은 전체 입찰을 배열 연산 한 번으로 계산
+
+    Returns:
+        JSON: 입찰 순서대로 예측 투찰률과 시뮬레이션 결과 목록
+    """
+    body = request.get_json(force=True, silent=True) or {}
+    bids = body.get('bids', []) if isinstance(body, dict) else body
+    if not bids:
+        return jsonify({'error': '시뮬레이션할 입찰 목록(bids)이 없습니다.'}), 400
+    error = _batch_bid_error(bids, ('bidamt', 'aamt'))
+    if error:
+        return jsonify({'error': error}), 400
+
+    predictions = [app.ml.PredictFromValues(values) for values in bids]
+    started = time.perf_counter()
+    arrays = app.ml.simulator.simulate_arrays(
+        [float(values['bssamt']) for values in bids],
+        [float(values['lowerrt']) for values in bids],
+        [p['comlowrt'] for p in predictions],
+        [np.nan if p['planlowrt'] is None else p['planlowrt'] for p in predictions],
+        diffrt=app.ml.avg_diffrt,
+        bid_amount=[_optional_float(values.get('bidamt')) or np.nan for values in bids],
+        a_amount=[_optional_float(values.get('aamt')) or 0 for values in bids],
+    )
+    simulations = app.ml.simulator.responses(arrays)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    results = []
+    for values, p, simulation in zip(bids, predictions, simulations):
+        results.append({
+            'bidno': values.get('bidno'),
+            'planLowerRatio': p['planlowrt'],
+            'comLowerRatio': p['comlowrt'],
+            'companyCount': p['companycnt'],
+            'simulation': simulation,
+        })
+    return jsonify({'draws': app.ml.simulator.draws, 'avgDiffRatio': app.ml.avg_diffrt,
+                    'elapsedMs': elapsed_ms, 'results': results})
+
+
+@app.route('/api/optimize')
+def Optimize():
+    """
+    기대값이 가장 큰 투찰금액을 찾는 엔드포인트
+
+    URL 파라미터:
+        - /api/predict와 같은 입찰 정보 (bssamt, lowerrt, companycnt, a, orgamt, limitlic, instt, area, keyword)
+        - costrt: 기초금액 대비 원가율 (선택, 기본값은 설정의 OPT_COST_RT)
+        - aamt: A값 금액 (선택, 기본값 0)
+        - curve: 금액별 낙찰 확률/기대값 곡선 점 수 (선택, 기본값 0)
+        - comlowrt, planlowrt: 투찰률을 직접 지정하면 모델 예측 생략 (선택)
+
+    URL 예시: /api/optimize?bssamt=100000000&lowerrt=0.87745&companycnt=5&a=1&orgamt=0&limitlic=6000&instt=서울시청&area=서울시&keyword=건물 신축공사&costrt=0.8
+
+    Returns:
+        JSON: 예측 투찰률, 참여업체수, 최적 투찰금액과 낙찰 확률/기대값
+    """
+    values = request.args.to_dict()
+    predrts = app.ml.PredictFromValues(values)
+    optimization = app.ml.OptimizeBidPrice(values.get('bssamt', 0), values.get('lowerrt', 0),
+                                           predrts['comlowrt'], predrts['planlowrt'], predrts['companycnt'],
+                                           cost_rate=_optional_float(values.get('costrt')),
+                                           a_amount=_optional_float(values.get('aamt')) or 0,
+                                           curve_points=int(values.get('curve', 0) or 0))
+    return jsonify({
+        'planLowerRatio': predrts['planlowrt'],   # 예가 투찰률
+        'comLowerRatio': predrts['comlowrt'],     # 업체 투찰률
+        'avgDiffRatio': app.ml.avg_diffrt,        # 평균 차이 비율 (경쟁 투찰률 표준편차)
+        'companyCount': predrts['companycnt'],    # 예측된 참여 업체 수
+        'optimization': optimization,             # 최적 투찰금액
+    })
+
+
+@app.route('/api/optimize/batch', methods=['POST'])
+def OptimizeBatch():
+    """
+    여러 입찰의 최적 투찰금액을 한 번에 찾는 엔드포인트
+
+    요청 본문 (JSON): {"bids": [{/api/optimize와 같은 키}, ...]} 또는 입찰 목록
+
+    설명:
+    - 투찰률 예측은 입찰마다 수행하고, 전체 입찰 × 투찰금액 후보를 배열 연산으로 한 번에 계산
+
+    Returns:
+        JSON: 입찰 순서대로 예측 투찰률과 최적 투찰금액 목록
+    """
+    body = request.get_json(force=True, silent=True) or {}
+    bids = body.get('bids', []) if isinstance(body, dict) else body
+    if not bids:
+        return jsonify({'error': '최적화할 입찰 목록(bids)이 없습니다.'}), 400
+    error = _batch_bid_error(bids, ('costrt', 'aamt'))
+    if error:
+        return jsonify({'error': error}), 400
+
+    predictions = [app.ml.PredictFromValues(values) for values in bids]
+    started = time.perf_counter()
+    arrays = app.ml.optimizer.optimize_arrays(
+        [float(values['bssamt']) for values in bids],
+        [float(values['lowerrt']) for values in bids],
+        [p['comlowrt'] for p in predictions],
+        [np.nan if p['planlowrt'] is None else p['planlowrt'] for p in predictions],
+        [p['companycnt'] or np.nan for p in predictions],
+        diffrt=app.ml.avg_diffrt,
+        cost_rate=[app.ml.cost_rate if _optional_float(values.get('costrt')) is None
+                   else float(values['costrt']) for values in bids],
+        a_amount=[_optional_float(values.get('aamt')) or 0 for values in bids],
+    )
+    optimizations = app.ml.optimizer.responses(arrays)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    results = []
+    for values, p, optimization in zip(bids, predictions, optimizations):
+        results.append({
+            'bidno': values.get('bidno'),
+            'planLowerRatio': p['planlowrt'],
+            'comLowerRatio': p['comlowrt'],
+            'companyCount': p['companycnt'],
+            'optimization': optimization,
+        })
+    return jsonify({'gridPoints': app.ml.optimizer.grid, 'avgDiffRatio': app.ml.avg_diffrt,
+                    'elapsedMs': elapsed_ms, 'results': results})
+
+
+@app.route('/api/persist/stats')
+def PersistStats():
+    """
+    예측 결과 비동기 저장 상태를 반환하는 엔드포인트
+    
+    Returns:
+        JSON: 저장 모드와 큐/저장/버림/실패 건수
+    """
+    writer = app.ml.persist_writer
+    return jsonify({'mode': app.ml.persist_mode, 'stats': writer.stats() if writer else None})
+
+
+
 if __name__ == "__main__":
     """
     메인 실행 부분
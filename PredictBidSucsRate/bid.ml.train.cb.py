@@ -37,6 +37,18 @@ from kiwipiepy import Kiwi  # 한국어 형태소 분석기 (단어를 쪼개는
 from sklearn.feature_extraction.text import TfidfVectorizer  # 텍스트를 숫자로 변환
 from scipy.sparse import csr_matrix  # 메모리 효율적인 행렬 저장 방식
 
+# 예측 결과 테이블 (결과1/결과2 배열 계산)
+from result_table import build_result_dataframe
+
+# 예측 결과 엑셀 저장 (xlsxwriter로 결과와 통계를 한 번에 기록)
+from result_workbook import write_result_workbook, XLSXWRITER_AVAILABLE
+
+# 하이퍼파라미터 탐색 결과 적용 (res/best_params.json)
+from hyperparameter_search import apply_best_params
+
+# 양자화(binned) 데이터셋 캐시 (CatBoost Pool)
+from binned_dataset import BinnedDatasetCache, source_fingerprint
+
 # 머신러닝 모델과 전처리 도구들
 from catboost import CatBoostRegressor  # CatBoost 회귀 모델
 from sklearn.preprocessing import StandardScaler  # 데이터를 정규화하는 도구 (0~1 사이로 맞춤)
@@ -249,6 +261,7 @@ class BidLowerMarginRateTrain():
         self.cur_dir = os.getcwd()  # 현재 작업 디렉토리
         self.data_dir = self.cur_dir+'\\data\\'  # 데이터 폴더 (입찰 데이터가 있는 곳)
         self.save_dir = self.cur_dir+'\\res\\'  # 결과 저장 폴더 (모델 파일들이 저장될 곳)
+        self.binned_cache = None  # 양자화 데이터셋 캐시 (Main에서 설정, None이면 model.fit)
         
         # 결과 엑셀 파일 경로 설정 (나중에 데이터 크기와 테스트 비율에 따라 생성)
         self.excel_file_nm = None  # 결과 엑셀 파일명 (나중에 설정)
@@ -359,9 +372,6 @@ class BidLowerMarginRateTrain():
 
     
     def make_result_dataframe2(self, xx_test, result1, result2, result3):
-        df_rst = pd.DataFrame(columns = self.result_columns)
-        df_rst.astype(self.result_columns_type)        
-        
         selected_cols = ['입찰번호', '입찰차수', 
                          '기초금액', '낙찰하한률', '참여업체수', '간접비', '순공사원가', 
                          '면허제한코드', '공고기관코드', 
@@ -376,62 +386,8 @@ class BidLowerMarginRateTrain():
         
         print("예측결과값 입력 시작")
         
-        for i, v in enumerate(selected_cols):
-            df_rst[v] = df_test[v]
-                
-        df_rst["업체투찰률예측"] = result1
-        df_rst["예가투찰률예측"] = result2
-        df_rst["참여업체수예측"] = result3
-        
-        # 예가투찰률 예측값으로부터 예정금액 역산 계산
-        # 예가투찰률 = (예정금액 / 기초금액) * 낙찰하한률
-        # 따라서 예정금액 = (예가투찰률 * 기초금액) / 낙찰하한률
-        df_rst["예정금액예측"] = (df_rst["예가투찰률예측"] * df_rst["기초금액"]) / df_rst["낙찰하한률"]
-        
-        # ===== 새로운 컬럼들 계산 =====
-        # 낙찰금액(업체투찰률) 예측 = 업체투찰률예측 * 기초금액
-        df_rst["낙찰금액(업체투찰률) 예측"] = df_rst["업체투찰률예측"] * df_rst["기초금액"]
-        
-        # A값여부: 업체투찰률예측이 0.8 이상이면 'O', 아니면 빈 문자열
-        df_rst["A값여부"] = df_rst["업체투찰률예측"].apply(lambda x: 'O' if x >= 0.8 else '')
-        
-        # 결과1: 낙찰금액(업체투찰률) 예측이 낙찰하한가보다 작으면 "낙찰하한선미달", 
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result1(row):
-            predicted_amount = row["낙찰금액(업체투찰률) 예측"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과1"] = df_rst.apply(calculate_result1, axis=1)
-        
-        # 예정금액(예가투찰률) 예측 = 예가투찰률예측 / 낙찰하한률 * 기초금액
-        df_rst["예정금액(예가투찰률) 예측"] = (df_rst["예가투찰률예측"] / df_rst["낙찰하한률"]) * df_rst["기초금액"]
-        
-        # 예정금액*낙찰하한율 = 예정금액(예가투찰률) 예측 * 낙찰하한률
-        df_rst["예정금액*낙찰하한율"] = df_rst["예정금액(예가투찰률) 예측"] * df_rst["낙찰하한률"]
-        
-        # 결과2: 예정금액*낙찰하한율이 낙찰하한가보다 작으면 "낙찰하한선미달",
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result2(row):
-            predicted_amount = row["예정금액*낙찰하한율"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과2"] = df_rst.apply(calculate_result2, axis=1)
+        # 결과1/결과2/A값여부는 행마다 apply하지 않고 배열 비교(np.select)로 한 번에 계산 (result_table.py)
+        df_rst = build_result_dataframe(df_test, self.result_columns, result1, result2, result3)
         
         print("예측결과테이블 작성완료")
          
@@ -750,9 +706,10 @@ class BidLowerMarginRateTrain():
         model3 = LinearRegression()  # 선형 회귀 모델
         '''
         
-        return [model1, model2, model3]
+        # res/best_params.json에 탐색 결과가 있으면 적용 (hyperparameter_search.py)
+        return apply_best_params([model1, model2, model3], 'cb', getattr(self, 'save_dir', None))
     
-    def trainnng(self, model, x_trainset, y_trainset):
+    def trainnng(self, model, x_trainset, y_trainset, name='model'):
         """
         머신러닝 모델을 훈련시키는 함수
         
@@ -760,6 +717,10 @@ class BidLowerMarginRateTrain():
             model: 훈련시킬 CatBoostRegressor 모델
             x_trainset (list): 훈련용 입력 데이터
             y_trainset (list): 훈련용 출력 데이터
+            name (str): 모델 이름 (양자화 캐시 프로파일 단계 이름)
+            
+        Returns:
+            학습된 모델
             
         설명:
         - 모델이 입력 데이터를 보고 출력 데이터를 예측하도록 학습
@@ -775,10 +736,15 @@ class BidLowerMarginRateTrain():
         print(y_trainset[:50])
         
         # ===== 모델 훈련 실행 =====
-        model.fit(x_trainset, y_trainset)  # 모델이 데이터를 학습
+        if self.binned_cache is not None:
+            # 양자화 데이터셋을 대상 3개와 재실행에 재사용
+            model = self.binned_cache.fit(model, x_trainset, y_trainset, name)
+        else:
+            model.fit(x_trainset, y_trainset)  # 모델이 데이터를 학습
 
         print("-"*80)
         print("CatBoostRegressor 모델로 학습을 완료하였습니다. ")
+        return model
         
     def saveModel(self, model, filename):
         """
@@ -872,8 +838,9 @@ class BidLowerMarginRateTrain():
             
         설명:
         - 예측 결과를 엑셀 파일로 저장하여 분석할 수 있도록 함
-        - openpyxl이 없으면 CSV 파일로 저장
-        - 결과1, 결과2 통계를 마지막에 추가
+        - xlsxwriter가 있으면 결과 행과 결과1, 결과2 통계를 한 번에 기록 (constant_memory)
+        - 결과가 result_workbook.EXCEL_ROW_LIMIT행을 넘으면 CSV 파일로 저장
+        - xlsxwriter가 없으면 to_excel로 저장 후 통계 추가 (openpyxl도 없으면 CSV 파일로 저장)
         """
         print("="*80)
         print("예측 결과를 엑셀 파일로 저장 중...")
@@ -882,6 +849,16 @@ class BidLowerMarginRateTrain():
         print(f"데이터 열 수: {len(df_result.columns)}")
         
         try:
+            if XLSXWRITER_AVAILABLE:
+                # 결과 행 → 통계 순서로 한 번에 기록 (파일을 다시 열지 않음)
+                saved_dir = write_result_workbook(df_result, xls_dir, getattr(self, 'bid_type_name', None))
+                print("="*80)
+                print("✅ 예측데이타를 저장하였습니다.")
+                print(f"📁 저장된 파일: {saved_dir}")
+                print(f"📊 데이터 크기: {len(df_result)}행 x {len(df_result.columns)}열")
+                print("="*80)
+                return
+            
             # 엑셀 파일로 저장 시도
             df_result.to_excel(
                            xls_dir,  # 저장할 파일 경로
@@ -1060,6 +1037,14 @@ def Main():
     # ===== 1단계: 훈련 객체 생성 =====
     trainer = BidLowerMarginRateTrain()
     
+    # 양자화(binned) 데이터셋은 한 번 만들어 모델 3개와 다음 실행에서 재사용 (학습 X 기준)
+    # 재실행에서 같은 X가 나오도록 원본 파일별 분할 seed를 저장해 두고 데이터를 나누기 전에 적용
+    trainer.binned_cache = BinnedDatasetCache(os.path.join(trainer.save_dir, 'cache', 'binned'),
+                                              source=source_fingerprint(trainer.data_dir + 'bid_250921_30.csv'))
+    trainer.rnd_num = trainer.binned_cache.split_seed(trainer.rnd_num)
+    if 'PYTHONHASHSEED' not in os.environ:
+        print("⚠️  PYTHONHASHSEED가 없어 코드 해시 값이 실행마다 달라지므로 양자화 캐시를 다시 만듭니다.")
+    
     # ===== 2단계: 데이터 로드 및 전처리 =====
     x_train, x_test, y_train, y_test = trainer.loadTrainsetFromFile('bid_250921_30.csv')  # CSV 파일에서 데이터 로드
     x_trainset, x_testset = trainer.preprocessingXset(x_train, x_test, 'cb_scaler.v2.npz')  # 입력 데이터 정규화
@@ -1071,7 +1056,7 @@ def Main():
     
     # ===== 4단계: 각 모델 훈련 및 저장 =====
     for i, model in enumerate(models):
-        trainer.trainnng(model, x_trainset, y_trainset[i])  # 모델 훈련
+        model = trainer.trainnng(model, x_trainset, y_trainset[i], f'model{i+1}')  # 모델 훈련
         trainer.saveModel(model, f'cb.model{i+1}.v0.1.1.cbm')  # 모델 저장 (CatBoost .cbm)
         result = trainer.predict(model, x_testset)  # 테스트 데이터로 예측
         print(f"모델{i+1} 예측 결과 (처음 50개):")
@@ -1089,6 +1074,11 @@ def Main():
     print("💾 엑셀 파일로 결과 저장 중...")
     trainer.saveResultToXls(df_result, trainer.xlxs_dir)  # 엑셀 파일로 결과 저장
     
+    # 양자화 데이터셋 생성/학습 단계별 시간과 최대 메모리 (결과 엑셀 옆 .profile.json/.csv)
+    trainer.binned_cache.profiler.print_summary()
+    trainer.binned_cache.profiler.save(trainer.xlxs_dir)
+    trainer.binned_cache.profiler.close()
+    
     trainer.close()  # 훈련 과정 마무리
 
     
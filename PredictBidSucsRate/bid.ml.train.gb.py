@@ -8,7 +8,8 @@ Created on Mon Dec  2 10:14:33 2024
 이 파일의 목적:
 - 조달청 입찰 데이터를 사용하여 머신러닝 모델을 훈련시키는 스크립트
 - 3개의 그래디언트 부스팅 모델을 훈련 (업체투찰률, 예가투찰률, 참여업체수 예측)
-- XGBoost, LightGBM, GradientBoostingRegressor 지원
+- XGBoost, LightGBM, HistGradientBoostingRegressor 지원
+- 양자화(binned) 데이터셋을 한 번 만들어 대상 3개와 재실행에 재사용 (res/cache/binned, 분할 seed 저장, PYTHONHASHSEED 고정 필요)
 - 훈련된 모델과 전처리 도구들을 파일로 저장
 - 텍스트 데이터를 TF-IDF 방식으로 벡터화하여 숫자로 변환
 """
@@ -38,8 +39,23 @@ from kiwipiepy import Kiwi  # 한국어 형태소 분석기 (단어를 쪼개는
 from sklearn.feature_extraction.text import TfidfVectorizer  # 텍스트를 숫자로 변환
 from scipy.sparse import csr_matrix  # 메모리 효율적인 행렬 저장 방식
 
+# 예측 결과 테이블 (결과1/결과2 배열 계산)
+from result_table import build_result_dataframe
+
+# 예측 결과 엑셀 저장 (xlsxwriter로 결과와 통계를 한 번에 기록)
+from result_workbook import write_result_workbook, XLSXWRITER_AVAILABLE
+
+# 하이퍼파라미터 탐색 결과 적용 (res/best_params.json)
+from hyperparameter_search import apply_best_params
+
+# 트리 평탄화 파일 (예측 서버에서 memmap으로 빠르게 로드)
+from flat_trees import export_if_supported
+
+# 양자화(binned) 데이터셋 캐시 (XGBoost QuantileDMatrix/DMatrix, LightGBM Dataset)
+from binned_dataset import BinnedDatasetCache, source_fingerprint
+
 # 머신러닝 모델과 전처리 도구들
-from sklearn.ensemble import GradientBoostingRegressor  # 그래디언트 부스팅 회귀 모델
+from sklearn.ensemble import HistGradientBoostingRegressor  # 히스토그램(bin) 기반 그래디언트 부스팅 회귀 모델
 from sklearn.preprocessing import StandardScaler  # 데이터를 정규화하는 도구 (0~1 사이로 맞춤)
 
 # 고성능 그래디언트 부스팅 라이브러리들
@@ -270,7 +286,7 @@ class BidLowerMarginRateTrain():
     3. 3개의 그래디언트 부스팅 모델을 훈련
        - 모델1: 업체 투찰률 예측 (XGBoost)
        - 모델2: 예가 투찰률 예측 (LightGBM)  
-       - 모델3: 참여 업체 수 예측 (GradientBoostingRegressor)
+       - 모델3: 참여 업체 수 예측 (HistGradientBoostingRegressor)
     4. 훈련된 모델과 전처리 도구들을 파일로 저장
     5. 예측 결과를 엑셀 파일로 출력
     
@@ -292,6 +308,7 @@ class BidLowerMarginRateTrain():
         self.cur_dir = os.getcwd()  # 현재 작업 디렉토리
         self.data_dir = self.cur_dir+'\\data\\'  # 데이터 폴더 (입찰 데이터가 있는 곳)
         self.save_dir = self.cur_dir+'\\res\\'  # 결과 저장 폴더 (모델 파일들이 저장될 곳)
+        self.binned_cache = None  # 양자화 데이터셋 캐시 (Main에서 설정, None이면 model.fit)
         
         # 결과 엑셀 파일 경로 설정 (나중에 데이터 크기와 테스트 비율에 따라 생성)
         self.excel_file_nm = None  # 결과 엑셀 파일명 (나중에 설정)
@@ -410,9 +427,6 @@ class BidLowerMarginRateTrain():
 
     
     def make_result_dataframe2(self, xx_test, result1, result2, result3):
-        df_rst = pd.DataFrame(columns = self.result_columns)
-        df_rst.astype(self.result_columns_type)        
-        
         selected_cols = ['입찰번호', '입찰차수', 
                          '기초금액', '낙찰하한률', '참여업체수', '간접비', '순공사원가', 
                          '면허제한코드', '공고기관코드', 
@@ -427,62 +441,8 @@ class BidLowerMarginRateTrain():
         
         print("예측결과값 입력 시작")
         
-        for i, v in enumerate(selected_cols):
-            df_rst[v] = df_test[v]
-                
-        df_rst["업체투찰률예측"] = result1
-        df_rst["예가투찰률예측"] = result2
-        df_rst["참여업체수예측"] = result3
-        
-        # 예가투찰률 예측값으로부터 예정금액 역산 계산
-        # 예가투찰률 = (예정금액 / 기초금액) * 낙찰하한률
-        # 따라서 예정금액 = (예가투찰률 * 기초금액) / 낙찰하한률
-        df_rst["예정금액예측"] = (df_rst["예가투찰률예측"] * df_rst["기초금액"]) / df_rst["낙찰하한률"]
-        
-        # ===== 새로운 컬럼들 계산 =====
-        # 낙찰금액(업체투찰률) 예측 = 업체투찰률예측 * 기초금액
-        df_rst["낙찰금액(업체투찰률) 예측"] = df_rst["업체투찰률예측"] * df_rst["기초금액"]
-        
-        # A값여부: 업체투찰률예측이 0.8 이상이면 'O', 아니면 빈 문자열
-        df_rst["A값여부"] = df_rst["업체투찰률예측"].apply(lambda x: 'O' if x >= 0.8 else '')
-        
-        # 결과1: 낙찰금액(업체투찰률) 예측이 낙찰하한가보다 작으면 "낙찰하한선미달", 
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result1(row):
-            predicted_amount = row["낙찰금액(업체투찰률) 예측"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과1"] = df_rst.apply(calculate_result1, axis=1)
-        
-        # 예정금액(예가투찰률) 예측 = 예가투찰률예측 / 낙찰하한률 * 기초금액
-        df_rst["예정금액(예가투찰률) 예측"] = (df_rst["예가투찰률예측"] / df_rst["낙찰하한률"]) * df_rst["기초금액"]
-        
-        # 예정금액*낙찰하한율 = 예정금액(예가투찰률) 예측 * 낙찰하한률
-        df_rst["예정금액*낙찰하한율"] = df_rst["예정금액(예가투찰률) 예측"] * df_rst["낙찰하한률"]
-        
-        # 결과2: 예정금액*낙찰하한율이 낙찰하한가보다 작으면 "낙찰하한선미달",
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result2(row):
-            predicted_amount = row["예정금액*낙찰하한율"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과2"] = df_rst.apply(calculate_result2, axis=1)
+        # 결과1/결과2/A값여부는 행마다 apply하지 않고 배열 비교(np.select)로 한 번에 계산 (result_table.py)
+        df_rst = build_result_dataframe(df_test, self.result_columns, result1, result2, result3)
         
         print("예측결과테이블 작성완료")
          
@@ -754,7 +714,7 @@ class BidLowerMarginRateTrain():
         모델 설명:
         - model1: 업체 투찰률 예측 모델 (XGBoost)
         - model2: 예가 투찰률 예측 모델 (LightGBM)  
-        - model3: 참여 업체 수 예측 모델 (GradientBoostingRegressor)
+        - model3: 참여 업체 수 예측 모델 (HistGradientBoostingRegressor)
         
         그래디언트 부스팅 파라미터 설명:
         - n_estimators: 부스팅 단계 수 (더 많을수록 정확하지만 느림)
@@ -785,15 +745,15 @@ class BidLowerMarginRateTrain():
                                 )
             print("✅ XGBoost 모델1 설정 완료")
         else:
-            # XGBoost가 없으면 GradientBoostingRegressor 사용
-            model1 = GradientBoostingRegressor(
-                                n_estimators = 200,
+            # XGBoost가 없으면 HistGradientBoostingRegressor 사용 (subsample 옵션 없음)
+            model1 = HistGradientBoostingRegressor(
+                                max_iter = 200,
                                 max_depth = 6,
                                 learning_rate = 0.1,
-                                subsample = 0.8,
+                                early_stopping = False,
                                 random_state = 1
                                 )
-            print("⚠️  XGBoost 없음 - GradientBoostingRegressor 모델1 사용")
+            print("⚠️  XGBoost 없음 - HistGradientBoostingRegressor 모델1 사용")
         
         # 모델2: 예가 투찰률 예측 모델 (LightGBM)
         if LIGHTGBM_AVAILABLE:
@@ -809,30 +769,32 @@ class BidLowerMarginRateTrain():
                                 )
             print("✅ LightGBM 모델2 설정 완료")
         else:
-            # LightGBM이 없으면 GradientBoostingRegressor 사용
-            model2 = GradientBoostingRegressor(
-                                n_estimators = 200,
+            # LightGBM이 없으면 HistGradientBoostingRegressor 사용
+            model2 = HistGradientBoostingRegressor(
+                                max_iter = 200,
                                 max_depth = 6,
                                 learning_rate = 0.1,
-                                subsample = 0.8,
+                                early_stopping = False,
                                 random_state = 1
                                 )
-            print("⚠️  LightGBM 없음 - GradientBoostingRegressor 모델2 사용")
+            print("⚠️  LightGBM 없음 - HistGradientBoostingRegressor 모델2 사용")
         
-        # 모델3: 참여 업체 수 예측 모델 (GradientBoostingRegressor)
-        model3 = GradientBoostingRegressor(
-                            n_estimators = 300,        # 부스팅 단계 300개 (더 많음)
+        # 모델3: 참여 업체 수 예측 모델 (HistGradientBoostingRegressor)
+        # 특성 값을 255개 bin으로 한 번 양자화해 학습 (GradientBoostingRegressor보다 훨씬 빠름)
+        model3 = HistGradientBoostingRegressor(
+                            max_iter = 300,            # 부스팅 단계 300개 (더 많음)
                             max_depth = 8,             # 최대 깊이 8 (더 깊음)
                             learning_rate = 0.05,      # 학습률 0.05 (더 작음)
-                            subsample = 0.9,           # 90% 샘플 사용
+                            early_stopping = False,    # 단계 수 고정 (기존 설정과 같음)
                             random_state = 1,          # 랜덤 시드
                             verbose = 1                # 진행상황 출력
                             )
-        print("✅ GradientBoostingRegressor 모델3 설정 완료")
+        print("✅ HistGradientBoostingRegressor 모델3 설정 완료")
         
-        return [model1, model2, model3]
+        # res/best_params.json에 탐색 결과가 있으면 적용 (hyperparameter_search.py)
+        return apply_best_params([model1, model2, model3], 'gb', getattr(self, 'save_dir', None))
     
-    def trainnng(self, model, x_trainset, y_trainset):
+    def trainnng(self, model, x_trainset, y_trainset, name='model'):
         """
         머신러닝 모델을 훈련시키는 함수
         
@@ -840,6 +802,10 @@ class BidLowerMarginRateTrain():
             model: 훈련시킬 그래디언트 부스팅 모델
             x_trainset (list): 훈련용 입력 데이터
             y_trainset (list): 훈련용 출력 데이터
+            name (str): 모델 이름 (양자화 캐시 프로파일 단계 이름)
+            
+        Returns:
+            학습된 모델 (binned_cache가 있으면 XGBoost/LightGBM은 BoosterRegressor로 바뀜)
             
         설명:
         - 모델이 입력 데이터를 보고 출력 데이터를 예측하도록 학습
@@ -850,10 +816,15 @@ class BidLowerMarginRateTrain():
         print(y_trainset[:50])
         
         # ===== 모델 훈련 실행 =====
-        model.fit(x_trainset, y_trainset)  # 모델이 데이터를 학습
+        if self.binned_cache is not None:
+            # 양자화 데이터셋을 대상 3개와 재실행에 재사용
+            model = self.binned_cache.fit(model, x_trainset, y_trainset, name)
+        else:
+            model.fit(x_trainset, y_trainset)  # 모델이 데이터를 학습
 
         print("-"*80)
         print("그래디언트 부스팅 모델로 학습을 완료하였습니다. ")
+        return model
         
     def saveModel(self, model, filename):
         """
@@ -868,6 +839,7 @@ class BidLowerMarginRateTrain():
         - joblib을 사용하여 Python 객체를 효율적으로 저장
         """
         joblib.dump(model, self.save_dir+filename)  # 모델을 파일로 저장 (예: 'gb.model1.v0.0.1.npz')
+        export_if_supported(model, self.save_dir+filename)  # 평탄화 트리 (예: 'gb.model1.v0.0.1.npz.flat')
         
         print("-"*80)
         print("그래디언트 부스팅 모델을 저장하였습니다. ")        
@@ -945,8 +917,9 @@ class BidLowerMarginRateTrain():
             
         설명:
         - 예측 결과를 엑셀 파일로 저장하여 분석할 수 있도록 함
-        - openpyxl이 없으면 CSV 파일로 저장
-        - 결과1, 결과2 통계를 마지막에 추가
+        - xlsxwriter가 있으면 결과 행과 결과1, 결과2 통계를 한 번에 기록 (constant_memory)
+        - 결과가 result_workbook.EXCEL_ROW_LIMIT행을 넘으면 CSV 파일로 저장
+        - xlsxwriter가 없으면 to_excel로 저장 후 통계 추가 (openpyxl도 없으면 CSV 파일로 저장)
         """
         print("="*80)
         print("예측 결과를 엑셀 파일로 저장 중...")
@@ -955,6 +928,16 @@ class BidLowerMarginRateTrain():
         print(f"데이터 열 수: {len(df_result.columns)}")
         
         try:
+            if XLSXWRITER_AVAILABLE:
+                # 결과 행 → 통계 순서로 한 번에 기록 (파일을 다시 열지 않음)
+                saved_dir = write_result_workbook(df_result, xls_dir, getattr(self, 'bid_type_name', None))
+                print("="*80)
+                print("✅ 예측데이타를 저장하였습니다.")
+                print(f"📁 저장된 파일: {saved_dir}")
+                print(f"📊 데이터 크기: {len(df_result)}행 x {len(df_result.columns)}열")
+                print("="*80)
+                return
+            
             # 엑셀 파일로 저장 시도
             df_result.to_excel(
                            xls_dir,  # 저장할 파일 경로
@@ -1133,6 +1116,14 @@ def Main():
     # ===== 1단계: 훈련 객체 생성 =====
     trainer = BidLowerMarginRateTrain()
     
+    # 양자화(binned) 데이터셋은 한 번 만들어 모델 3개와 다음 실행에서 재사용 (학습 X 기준)
+    # 재실행에서 같은 X가 나오도록 원본 파일별 분할 seed를 저장해 두고 데이터를 나누기 전에 적용
+    trainer.binned_cache = BinnedDatasetCache(os.path.join(trainer.save_dir, 'cache', 'binned'),
+                                              source=source_fingerprint(trainer.data_dir + 'bid_250921_30.csv'))
+    trainer.rnd_num = trainer.binned_cache.split_seed(trainer.rnd_num)
+    if 'PYTHONHASHSEED' not in os.environ:
+        print("⚠️  PYTHONHASHSEED가 없어 코드 해시 값이 실행마다 달라지므로 양자화 캐시를 다시 만듭니다.")
+    
     # ===== 2단계: 데이터 로드 및 전처리 =====
     x_train, x_test, y_train, y_test = trainer.loadTrainsetFromFile('bid_250921_30.csv')  # CSV 파일에서 데이터 로드
     x_trainset, x_testset = trainer.preprocessingXset(x_train, x_test, 'gb_scaler.v2.npz')  # 입력 데이터 정규화
@@ -1144,7 +1135,7 @@ def Main():
     
     # ===== 4단계: 각 모델 훈련 및 저장 =====
     for i, model in enumerate(models):
-        trainer.trainnng(model, x_trainset, y_trainset[i])  # 모델 훈련
+        model = trainer.trainnng(model, x_trainset, y_trainset[i], f'model{i+1}')  # 모델 훈련
         trainer.saveModel(model, f'gb.model{i+1}.v0.1.1.npz')  # 모델 저장
         result = trainer.predict(model, x_testset)  # 테스트 데이터로 예측
         print(f"모델{i+1} 예측 결과 (처음 50개):")
@@ -1162,6 +1153,11 @@ def Main():
     print("💾 엑셀 파일로 결과 저장 중...")
     trainer.saveResultToXls(df_result, trainer.xlxs_dir)  # 엑셀 파일로 결과 저장
     
+    # 양자화 데이터셋 생성/학습 단계별 시간과 최대 메모리 (결과 엑셀 옆 .profile.json/.csv)
+    trainer.binned_cache.profiler.print_summary()
+    trainer.binned_cache.profiler.save(trainer.xlxs_dir)
+    trainer.binned_cache.profiler.close()
+    
     trainer.close()  # 훈련 과정 마무리
 
     
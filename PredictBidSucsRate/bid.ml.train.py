@@ -21,11 +21,16 @@ Created on Mon Dec  2 10:14:33 2024
 - python bid.ml.train.py cst       # 공사입찰 모드
 - python bid.ml.train.py mtrl          # 구매입찰 모드
 - python bid.ml.train.py gdns           # 용역입찰 모드
+- python bid.ml.train.py gdns --db      # SQL Server에서 학습 데이터 직접 조회 (CSV 불필요)
+- python bid.ml.train.py gdns --db --cache-max-age=86400  # 하루 지난 스냅샷은 다시 조회 (--refresh-cache: 항상 다시 조회)
+- python bid.ml.train.py gdns --profile-memory --cprofile  # 단계별 메모리(tracemalloc) + 가장 느린 단계 cProfile 저장
+  (단계별 시간/메모리는 항상 res/result-*.profile.json, .profile.csv로 저장)
 - python bid.ml.train.py test              # 모델 성능 테스트
 """
 
 # ===== 필요한 라이브러리들 import =====
 import os  # 파일 경로 조작을 위한 라이브러리
+import sys  # dac 모듈 경로 추가
 import joblib  # 머신러닝 모델을 파일로 저장/불러오기 위한 라이브러리
 import numpy as np  # 수치 계산을 위한 라이브러리 (행렬, 배열 연산)
 import random as rnd  # 랜덤 숫자 생성
@@ -59,6 +64,27 @@ from sklearn.model_selection import train_test_split  # 훈련 데이터와 테
 # 고급 특성 엔지니어링
 from advanced_feature_engineering import AdvancedFeatureEngineering
 
+# 단계별 시간/메모리 프로파일러
+from training_profiler import TrainingProfiler, profiled
+
+# 예측 결과 테이블 (결과1/결과2 배열 계산)
+from result_table import build_result_dataframe
+
+# 예측 결과 엑셀 저장 (xlsxwriter로 결과와 통계를 한 번에 기록)
+from result_workbook import write_result_workbook, XLSXWRITER_AVAILABLE
+
+# 세 대상을 한 번에 학습하는 다중 출력 모델 (--multi-output)
+from multi_output_model import MultiTargetMLP, MULTI_MODEL_FILE
+
+# 대용량 CSV 청크 단위 스트리밍 학습 (--stream)
+from streaming_trainer import StreamingMLPTrainer
+
+# 학습 체크포인트 (--resume, --time-budget)
+from training_checkpoint import TrainingCheckpointer
+
+# 하이퍼파라미터 탐색 결과 적용 (res/best_params.json)
+from hyperparameter_search import apply_best_params
+
 
 class KiwiTokenizer():
     """
@@ -250,7 +276,7 @@ class BidLowerMarginRateTrain():
     1. 데이터 로드 → 2. 텍스트 벡터화 → 3. 데이터 정규화 → 4. 모델 훈련 → 5. 모델 저장
     """
     
-    def __init__(self, bid_type='auto'):
+    def __init__(self, bid_type='auto', profile_memory=False, cprofile=False):
         """
         BidLowerMarginRateTrain 초기화 함수
         - 디렉토리 경로 설정
@@ -263,7 +289,15 @@ class BidLowerMarginRateTrain():
                 - 'mtrl': 구매입찰 (기본 컬럼들만)
                 - 'gdns': 용역입찰 (기본 컬럼들만)
                 - 'auto': 자동 감지 (데이터 로드 시 컬럼 존재 여부로 판단)
+            profile_memory (bool): tracemalloc으로 단계별 파이썬 할당 메모리 최댓값 측정
+            cprofile (bool): 가장 오래 걸린 단계의 cProfile 통계를 결과 파일 옆에 저장
         """
+        # 단계별 시간/메모리 프로파일러 (close()에서 result-*.profile.json/csv로 저장)
+        self.profiler = TrainingProfiler(trace_memory=profile_memory, cprofile=cprofile)
+        
+        # 학습 체크포인트 (None이면 model.fit 한 번으로 학습)
+        self.checkpointer = None
+        
         # 랜덤 번호 생성 (파일명에 사용)
         self.rnd_num = rnd.randint(100, 999)
         
@@ -681,9 +715,6 @@ class BidLowerMarginRateTrain():
 
     
     def make_result_dataframe2(self, xx_test, result1, result2, result3):
-        df_rst = pd.DataFrame(columns = self.result_columns)
-        df_rst.astype(self.result_columns_type)        
-        
         # 입찰 유형에 따라 동적으로 컬럼 선택
         selected_cols = self._get_result_selected_columns()
         
@@ -692,62 +723,8 @@ class BidLowerMarginRateTrain():
         
         print("예측결과값 입력 시작")
         
-        for i, v in enumerate(selected_cols):
-            df_rst[v] = df_test[v]
-                
-        df_rst["업체투찰률예측"] = result1
-        df_rst["예가투찰률예측"] = result2
-        df_rst["참여업체수예측"] = result3
-        
-        # 예가투찰률 예측값으로부터 예정금액 역산 계산
-        # 예가투찰률 = (예정금액 / 기초금액) * 낙찰하한률
-        # 따라서 예정금액 = (예가투찰률 * 기초금액) / 낙찰하한률
-        df_rst["예정금액예측"] = (df_rst["예가투찰률예측"] * df_rst["기초금액"]) / df_rst["낙찰하한률"]
-        
-        # ===== 새로운 컬럼들 계산 =====
-        # 낙찰금액(업체투찰률) 예측 = 업체투찰률예측 * 기초금액
-        df_rst["낙찰금액(업체투찰률) 예측"] = df_rst["업체투찰률예측"] * df_rst["기초금액"]
-        
-        # A값여부: 업체투찰률예측이 0.8 이상이면 'O', 아니면 빈 문자열
-        df_rst["A값여부"] = df_rst["업체투찰률예측"].apply(lambda x: 'O' if x >= 0.8 else '')
-        
-        # 결과1: 낙찰금액(업체투찰률) 예측이 낙찰하한가보다 작으면 "낙찰하한선미달", 
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result1(row):
-            predicted_amount = row["낙찰금액(업체투찰률) 예측"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과1"] = df_rst.apply(calculate_result1, axis=1)
-        
-        # 예정금액(예가투찰률) 예측 = 예가투찰률예측 / 낙찰하한률 * 기초금액
-        df_rst["예정금액(예가투찰률) 예측"] = (df_rst["예가투찰률예측"] / df_rst["낙찰하한률"]) * df_rst["기초금액"]
-        
-        # 예정금액*낙찰하한율 = 예정금액(예가투찰률) 예측 * 낙찰하한률
-        df_rst["예정금액*낙찰하한율"] = df_rst["예정금액(예가투찰률) 예측"] * df_rst["낙찰하한률"]
-        
-        # 결과2: 예정금액*낙찰하한율이 낙찰하한가보다 작으면 "낙찰하한선미달",
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result2(row):
-            predicted_amount = row["예정금액*낙찰하한율"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과2"] = df_rst.apply(calculate_result2, axis=1)
+        # 결과1/결과2/A값여부는 행마다 apply하지 않고 배열 비교(np.select)로 한 번에 계산 (result_table.py)
+        df_rst = build_result_dataframe(df_test, self.result_columns, result1, result2, result3)
         
         print("예측결과테이블 작성완료")
          
@@ -781,8 +758,55 @@ class BidLowerMarginRateTrain():
         print(f"입찰 유형: {self.bid_type_name}")
         
         # CSV 파일 읽기
-        data = pd.read_csv(self.data_dir+filename)
+        with self.profiler.stage('load') as stage:
+            data = pd.read_csv(self.data_dir+filename)
+            stage['rows'] = len(data)
         
+        return self.loadTrainset(data)
+    
+    def loadTrainsetFromDatabase(self, connection, query=None, cache_name=None, refresh=False, cache_max_age=None,
+                                 chunk_size=50000):
+        """
+        SQL Server에서 학습 데이터를 직접 조회해서 전처리하는 함수 (CSV 내보내기 단계 없음)
+        
+        Args:
+            connection: iter_query를 제공하는 연결 (SqlServerManager의 연결/연결 풀, SqliteStandInConnection)
+            query (str): 학습 데이터 조회 쿼리 (None이면 sql/조달청.학습데이터.sql의 T-SQL 쿼리)
+            cache_name (str): res/cache/<cache_name>.<쿼리 해시>.parquet 스냅샷 이름 (None이면 캐시 안함)
+            refresh (bool): 캐시가 있어도 DB에서 다시 조회
+            cache_max_age (float): 캐시 유효 기간 (초, None이면 기간 제한 없음)
+            chunk_size (int): fetchmany 단위 행 수
+            
+        Returns:
+            tuple: (x_train, x_test, y_train, y_test) - loadTrainsetFromFile과 같음
+        """
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac'))
+        from TrainingDataLoader import TrainingDataLoader, read_query_file, TRAINING_REQUIRED_COLUMNS
+        
+        print("학습 데이터를 DB에서 불러옵니다.")
+        print(f"입찰 유형: {self.bid_type_name}")
+        
+        loader = TrainingDataLoader(connection, chunk_size=chunk_size,
+                                    cache_dir=os.path.join(self.save_dir, 'cache'))
+        with self.profiler.stage('load') as stage:
+            # 공사입찰은 간접비/순공사원가도 입력 특성이므로 조회 결과에 있어야 함
+            required = TRAINING_REQUIRED_COLUMNS + (['간접비', '순공사원가'] if self.bid_type == 'cst' else [])
+            data = loader.load(query or read_query_file(), cache_name=cache_name, refresh=refresh,
+                               max_age=cache_max_age, required_columns=required)
+            stage['rows'] = len(data)
+        
+        return self.loadTrainset(data)
+    
+    def loadTrainset(self, data):
+        """
+        불러온 입찰 데이터를 전처리해서 훈련/테스트 데이터로 나누는 함수
+        
+        Args:
+            data (pandas.DataFrame): 원시 입찰 데이터 (CSV 또는 DB 조회 결과)
+            
+        Returns:
+            tuple: (x_train, x_test, y_train, y_test) - 훈련/테스트 데이터
+        """
         # 입찰 유형 자동 감지 (auto 모드인 경우)
         if self.bid_type == 'auto':
             self._detect_bid_type(data)
@@ -866,9 +890,10 @@ class BidLowerMarginRateTrain():
         print(f"공사지역 샘플 (처음 10개): {dataset_x['공사지역'].head(10).tolist()}")
         print(f"공사지역 NaN 개수: {dataset_x['공사지역'].isna().sum()}")
         
-        lines = self.tokenizer.nn_only(np.squeeze(dataset_x["키워드"].tolist()))      # 키워드 처리
-        lines2 = self.tokenizer.nn_only(np.squeeze(dataset_x["공고기관명"].tolist()))  # 공고기관명 처리
-        lines3 = self.tokenizer.nn_only(np.squeeze(dataset_x["공사지역"].tolist()))    # 공사지역 처리
+        with self.profiler.stage('tokenize', rows=len(dataset_x) * 3):
+            lines = self.tokenizer.nn_only(np.squeeze(dataset_x["키워드"].tolist()))      # 키워드 처리
+            lines2 = self.tokenizer.nn_only(np.squeeze(dataset_x["공고기관명"].tolist()))  # 공고기관명 처리
+            lines3 = self.tokenizer.nn_only(np.squeeze(dataset_x["공사지역"].tolist()))    # 공사지역 처리
         
         # 처리 결과 미리보기 (처음 10개)
         print("키워드 처리 결과:")
@@ -888,16 +913,17 @@ class BidLowerMarginRateTrain():
         non_empty_text = [text for text in all_text if text.strip() != '']
         print(f"비어있지 않은 텍스트 수: {len(non_empty_text)}")
         
-        if len(non_empty_text) > 0:
-            self.vectorizer.fit(non_empty_text)
-        else:
-            # 모든 텍스트가 비어있다면 기본값으로 학습
-            self.vectorizer.fit(['기본키워드'])
-        
-        # ===== 텍스트를 TF-IDF 점수로 변환 =====
-        pts = self.vectorizer.scores(lines)      # 키워드 점수 계산
-        pts2 = self.vectorizer.scores(lines2)    # 공고기관명 점수 계산
-        pts3 = self.vectorizer.scores(lines3)    # 공사지역 점수 계산
+        with self.profiler.stage('vectorize', rows=len(all_text)):
+            if len(non_empty_text) > 0:
+                self.vectorizer.fit(non_empty_text)
+            else:
+                # 모든 텍스트가 비어있다면 기본값으로 학습
+                self.vectorizer.fit(['기본키워드'])
+            
+            # ===== 텍스트를 TF-IDF 점수로 변환 =====
+            pts = self.vectorizer.scores(lines)      # 키워드 점수 계산
+            pts2 = self.vectorizer.scores(lines2)    # 공고기관명 점수 계산
+            pts3 = self.vectorizer.scores(lines3)    # 공사지역 점수 계산
         
         # 점수 결과 미리보기 (처음 10개)
         print("키워드 점수:")
@@ -917,20 +943,21 @@ class BidLowerMarginRateTrain():
         print("🔧 고급 특성 엔지니어링 적용 중...")
         print("="*80)
         
-        # 특성 엔지니어링 객체 생성
-        feature_eng = AdvancedFeatureEngineering()
-        
-        # 1. 상호작용 특성 생성
-        dataset_x = feature_eng.create_interaction_features(dataset_x)
-        
-        # 2. 비율 특성 생성
-        dataset_x = feature_eng.create_ratio_features(dataset_x)
-        
-        # 3. 카테고리 특성 생성
-        dataset_x = feature_eng.create_categorical_features(dataset_x)
-        
-        # 4. 통계 특성 생성
-        dataset_x = feature_eng.create_statistical_features(dataset_x)
+        with self.profiler.stage('feature_engineering', rows=len(dataset_x)):
+            # 특성 엔지니어링 객체 생성
+            feature_eng = AdvancedFeatureEngineering()
+            
+            # 1. 상호작용 특성 생성
+            dataset_x = feature_eng.create_interaction_features(dataset_x)
+            
+            # 2. 비율 특성 생성
+            dataset_x = feature_eng.create_ratio_features(dataset_x)
+            
+            # 3. 카테고리 특성 생성
+            dataset_x = feature_eng.create_categorical_features(dataset_x)
+            
+            # 4. 통계 특성 생성
+            dataset_x = feature_eng.create_statistical_features(dataset_x)
         
         print(f"✅ 특성 엔지니어링 완료: {dataset_x.shape[1]}개 특성")
         print(f"📊 추가된 특성들: {[col for col in dataset_x.columns if col not in self.cvs_columns]}")
@@ -955,29 +982,32 @@ class BidLowerMarginRateTrain():
         # 데이터 크기와 테스트 비율에 따라 파일명 생성
         self.excel_file_nm = self.generateExcelFileName(data_size, test_ratio)
         self.xlxs_dir = os.path.join(self.save_dir, self.excel_file_nm)
+        self.profiler.meta.update({'bid_type': self.bid_type, 'data_size': data_size, 'test_ratio': test_ratio})
         
         print(f"📁 생성된 엑셀 파일명: {self.excel_file_nm}")
         print(f"📂 저장 경로: {self.xlxs_dir}")
         
         # ===== 훈련 데이터와 테스트 데이터로 분할 =====
         # 데이터 크기에 따라 동적으로 설정된 비율로 분할
-        self.xx_train, self.xx_test, self.yy_train, self.yy_test = train_test_split(
-                                                            dataset_x.to_numpy(),  # 입력 데이터 (X)
-                                                            dataset_y.to_numpy(),  # 출력 데이터 (Y)
-                                                            test_size=test_ratio,  # 동적으로 설정된 테스트 데이터 비율
-                                                            random_state=self.rnd_num  # 랜덤 시드 (재현 가능한 결과)
-                                                            )
-        
-        # ===== 필요한 컬럼만 선택 =====
-        # 입찰 유형에 따라 동적으로 컬럼 인덱스 결정
-        selected_column_indices = self._get_selected_column_indices()
-        print(f"선택된 컬럼 인덱스: {selected_column_indices}")
-        
-        x_train = (self.arrayToDataFrame(self.xx_train, selected_column_indices)).to_numpy()
-        x_test = (self.arrayToDataFrame(self.xx_test, selected_column_indices)).to_numpy()
+        with self.profiler.stage('split', rows=data_size):
+            self.xx_train, self.xx_test, self.yy_train, self.yy_test = train_test_split(
+                                                                dataset_x.to_numpy(),  # 입력 데이터 (X)
+                                                                dataset_y.to_numpy(),  # 출력 데이터 (Y)
+                                                                test_size=test_ratio,  # 동적으로 설정된 테스트 데이터 비율
+                                                                random_state=self.rnd_num  # 랜덤 시드 (재현 가능한 결과)
+                                                                )
+            
+            # ===== 필요한 컬럼만 선택 =====
+            # 입찰 유형에 따라 동적으로 컬럼 인덱스 결정
+            selected_column_indices = self._get_selected_column_indices()
+            print(f"선택된 컬럼 인덱스: {selected_column_indices}")
+            
+            x_train = (self.arrayToDataFrame(self.xx_train, selected_column_indices)).to_numpy()
+            x_test = (self.arrayToDataFrame(self.xx_test, selected_column_indices)).to_numpy()
         
         return x_train, x_test, self.yy_train, self.yy_test
         
+    @profiled('scale', rows_arg=0)
     def preprocessingXset(self, x_train, x_test, scalerSaveName):
         """
         입력 데이터를 정규화하는 함수
@@ -1113,9 +1143,26 @@ class BidLowerMarginRateTrain():
         model3 = LinearRegression()  # 선형 회귀 모델
         '''
         
-        return [model1, model2, model3]
+        # res/best_params.json에 탐색 결과가 있으면 적용 (hyperparameter_search.py)
+        return apply_best_params([model1, model2, model3], 'mlp', getattr(self, 'save_dir', None))
+
+    def setupMultiOutputModel(self):
+        """
+        세 대상(업체투찰률, 예가투찰률, 참여업체수)을 한 번에 학습하는 다중 출력 모델 설정
+
+        Returns:
+            MultiTargetMLP: 은닉층을 공유하고 대상별로 출력을 정규화하는 모델 (MULTI_MODEL_FILE 하나로 저장)
+        """
+        print("="*80)
+        print("ML프로세스 시작... (다중 출력 모델)")
+        print("="*80)
+
+        self.t0 = time()  # 시작 시간 기록
+
+        return MultiTargetMLP(hidden_layer_sizes=(10, 64, 128, 64), alpha=1e-5, random_state=1,
+                              max_iter=100000, early_stopping=True, activation='relu')
     
-    def trainnng(self, model, x_trainset, y_trainset):
+    def trainnng(self, model, x_trainset, y_trainset, target=None):
         """
         머신러닝 모델을 훈련시키는 함수
         
@@ -1123,6 +1170,10 @@ class BidLowerMarginRateTrain():
             model: 훈련시킬 MLPRegressor 모델
             x_trainset (list): 훈련용 입력 데이터
             y_trainset (list): 훈련용 출력 데이터
+            target (str): 예측 대상 이름 (프로파일 단계명 fit_<대상>, 체크포인트 이름, None이면 fit)
+            
+        Returns:
+            bool: 학습 완료 여부 (체크포인트 사용 시 시간 예산을 넘기면 False, 모델에는 지금까지의 최고 가중치)
             
         설명:
         - 모델이 입력 데이터를 보고 출력 데이터를 예측하도록 학습
@@ -1138,10 +1189,17 @@ class BidLowerMarginRateTrain():
         print(y_trainset[:50])
         
         # ===== 모델 훈련 실행 =====
-        model.fit(x_trainset, y_trainset)  # 모델이 데이터를 학습
+        with self.profiler.stage(f"fit_{target}" if target else 'fit', rows=len(x_trainset)):
+            if self.checkpointer is None:
+                model.fit(x_trainset, y_trainset)  # 모델이 데이터를 학습
+                finished = True
+            else:
+                # epoch 단위로 학습하며 res/checkpoints에 주기적으로 저장
+                finished = self.checkpointer.fit(model, x_trainset, y_trainset, target or 'model')
 
         print("-"*80)
-        print("MLPRegressor 모델로 학습을 완료하였습니다. ")
+        print("MLPRegressor 모델로 학습을 완료하였습니다. " if finished else "MLPRegressor 모델 학습을 중단하였습니다. ")
+        return finished
         
     def saveModel(self, model, filename):
         """
@@ -1160,6 +1218,7 @@ class BidLowerMarginRateTrain():
         print("-"*80)
         print("MLPRegressor 모델을 저장하였습니다. ")        
         
+    @profiled('predict', rows_arg=1)
     def predict(self, model, x_testset):
         """
         훈련된 모델로 예측을 수행하는 함수
@@ -1181,6 +1240,7 @@ class BidLowerMarginRateTrain():
         
         return result
 
+    @profiled('merge_result')
     def mergeResultset(self, results):
         """
         예측 결과들을 하나의 데이터프레임으로 합치는 함수
@@ -1223,6 +1283,7 @@ class BidLowerMarginRateTrain():
         return df_result
     
     
+    @profiled('excel_write', rows_arg=0)
     def saveResultToXls(self, df_result, xls_dir):
         """
         예측 결과를 엑셀 파일로 저장하는 함수
@@ -1233,8 +1294,9 @@ class BidLowerMarginRateTrain():
             
         설명:
         - 예측 결과를 엑셀 파일로 저장하여 분석할 수 있도록 함
-        - openpyxl이 없으면 CSV 파일로 저장
-        - 결과1, 결과2 통계를 마지막에 추가
+        - xlsxwriter가 있으면 결과 행과 결과1, 결과2 통계를 한 번에 기록 (constant_memory)
+        - 결과가 result_workbook.EXCEL_ROW_LIMIT행을 넘으면 CSV 파일로 저장
+        - xlsxwriter가 없으면 to_excel로 저장 후 통계 추가 (openpyxl도 없으면 CSV 파일로 저장)
         """
         print("="*80)
         print("예측 결과를 엑셀 파일로 저장 중...")
@@ -1243,6 +1305,16 @@ class BidLowerMarginRateTrain():
         print(f"데이터 열 수: {len(df_result.columns)}")
         
         try:
+            if XLSXWRITER_AVAILABLE:
+                # 결과 행 → 통계 순서로 한 번에 기록 (파일을 다시 열지 않음)
+                saved_dir = write_result_workbook(df_result, xls_dir, getattr(self, 'bid_type_name', None))
+                print("="*80)
+                print("✅ 예측데이타를 저장하였습니다.")
+                print(f"📁 저장된 파일: {saved_dir}")
+                print(f"📊 데이터 크기: {len(df_result)}행 x {len(df_result.columns)}열")
+                print("="*80)
+                return
+            
             # 엑셀 파일로 저장 시도
             df_result.to_excel(
                            xls_dir,  # 저장할 파일 경로
@@ -1585,6 +1657,7 @@ class BidLowerMarginRateTrain():
         
         설명:
         - 전체 훈련 과정에 걸린 시간을 계산하여 출력
+        - 단계별 시간/메모리 프로파일을 결과 엑셀 파일 옆에 저장 (result-*.profile.json/csv)
         - 훈련 완료 메시지 출력
         """
         print("-"*80)
@@ -1592,6 +1665,16 @@ class BidLowerMarginRateTrain():
         # 전체 실행 시간 계산 및 출력
         print(f"⏱️  전체 실행 시간: {time() - self.t0:.3f}초")
         
+        # 단계별 프로파일 출력 및 저장
+        self.profiler.print_summary()
+        if self.xlxs_dir:
+            try:
+                for path in self.profiler.save(self.xlxs_dir):
+                    print(f"📈 프로파일 저장: {path}")
+            except Exception as e:
+                print(f"⚠️  프로파일 저장 실패: {e}")
+        self.profiler.close()
+        
         print("="*80)
         print("🎉 머신러닝 훈련 프로세스 완료!")
         if self.excel_file_nm:
@@ -1839,7 +1922,29 @@ def test_model_performance():
         traceback.print_exc()
 
 
-def Main(bid_type='auto'):
+def connectTrainingDatabase(config_path=None):
+    """
+    res/config.csv의 DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD로 SQL Server 연결 풀 반환
+    """
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac'))
+    from SqlServerManager import SqlServerManager
+    
+    config = pd.read_csv(config_path or os.path.join(os.getcwd(), 'res', 'config.csv'))
+    
+    def value(name, default):
+        if name not in config.columns or pd.isna(config[name].iloc[0]):
+            return default
+        return config[name].iloc[0]
+    
+    pool = SqlServerManager.get_instance().get_pool(
+        str(value("DB_HOST", "localhost")), int(value("DB_PORT", 1433)), str(value("DB_NAME", "")),
+        str(value("DB_USER", "")), str(value("DB_PASSWORD", "")))
+    if pool is None:
+        raise Exception("학습 데이터 DB에 연결할 수 없습니다.")
+    return pool
+
+def Main(bid_type='auto', use_db=False, profile_memory=False, cprofile=False, multi_output=False, stream=False,
+         resume=False, time_budget=None, refresh_cache=False, cache_max_age=None):
     """
     머신러닝 모델 훈련의 전체 과정을 실행하는 메인 함수
     
@@ -1849,6 +1954,15 @@ def Main(bid_type='auto'):
             - 'mtrl': 구매입찰  
             - 'gdns': 용역입찰
             - 'auto': 자동 감지 (기본값)
+        use_db (bool): True면 CSV 대신 SQL Server에서 학습 데이터를 직접 조회 (res/cache에 스냅샷 저장)
+        profile_memory (bool): 단계별 파이썬 할당 메모리 측정 (tracemalloc)
+        cprofile (bool): 가장 오래 걸린 단계의 cProfile 통계 저장
+        multi_output (bool): True면 모델 3개 대신 다중 출력 모델 1개로 학습 (mlpregr.multi.v0.1.1.npz)
+        stream (bool): True면 CSV를 청크 단위로 읽어 partial_fit으로 학습 (메모리 사용량이 데이터 크기와 무관)
+        resume (bool): res/checkpoints의 체크포인트에서 이어서 학습 (같은 학습/테스트 분할 사용)
+        time_budget (float): 학습 시간 예산 (초). 넘기면 지금까지의 최고 모델을 저장하고 종료
+        refresh_cache (bool): use_db일 때 res/cache 스냅샷이 있어도 DB에서 다시 조회
+        cache_max_age (float): use_db일 때 스냅샷 유효 기간 (초). 더 오래된 스냅샷은 다시 조회
     
     실행 과정:
     1. 훈련 객체 생성
@@ -1859,27 +1973,73 @@ def Main(bid_type='auto'):
     6. 엑셀 파일로 결과 출력
     """
     # ===== 1단계: 훈련 객체 생성 =====
-    trainer = BidLowerMarginRateTrain(bid_type=bid_type)
+    trainer = BidLowerMarginRateTrain(bid_type=bid_type, profile_memory=profile_memory, cprofile=cprofile)
+    
+    # 체크포인트 (--resume, --time-budget일 때만): 이어서 학습할 때 같은 학습/테스트 분할이 되도록 분할 seed도 저장
+    # 일반 실행은 model.fit 그대로 (epoch 학습은 검증 분할이 달라 fit과 다른 모델이 됨)
+    if resume or time_budget:
+        trainer.checkpointer = TrainingCheckpointer(os.path.join(trainer.save_dir, 'checkpoints'),
+                                                    resume=resume, time_budget=time_budget)
+        trainer.rnd_num = trainer.checkpointer.run_value('rnd_num', trainer.rnd_num)
+    
+    train_file = 'gdns/result_data_gdns_17_improved.csv'  # 학습 CSV (data 폴더 기준)
+    
+    if stream and use_db:
+        print("⚠️  --stream은 CSV 학습에서만 사용할 수 있습니다. 전체 데이터를 불러와 학습합니다.")
+    elif stream:
+        # ===== 대용량 데이터: 청크 단위 스트리밍 학습 (전체 데이터를 메모리에 올리지 않음) =====
+        streamer = StreamingMLPTrainer(trainer.tokenizer, trainer.vectorizer,
+                                       trainer.setupMultiOutputModel if multi_output else trainer.setupModels,
+                                       bid_type=trainer.bid_type, output_dir=trainer.save_dir,
+                                       work_dir=os.path.join(trainer.save_dir, 'cache'), profiler=trainer.profiler)
+        streamer.run(trainer.data_dir + train_file)
+        trainer.close()
+        return
     
     # ===== 2단계: 데이터 로드 및 전처리 =====
     # x_train, x_test, y_train, y_test = trainer.loadTrainsetFromFile('bid_250921_30_quick_improved.csv')  # CSV 파일에서 데이터 로드
-    x_train, x_test, y_train, y_test = trainer.loadTrainsetFromFile('gdns/result_data_gdns_17_improved.csv')  # CSV 파일에서 데이터 로드
+    if use_db:
+        x_train, x_test, y_train, y_test = trainer.loadTrainsetFromDatabase(
+            connectTrainingDatabase(), cache_name=f'trainset_{bid_type}',
+            refresh=refresh_cache, cache_max_age=cache_max_age)  # DB에서 직접 로드
+    else:
+        x_train, x_test, y_train, y_test = trainer.loadTrainsetFromFile(train_file)  # CSV 파일에서 데이터 로드
     x_trainset, x_testset = trainer.preprocessingXset(x_train, x_test, 'x_fited_scaler.v2.npz')  # 입력 데이터 정규화
     y_trainset, y_testset = trainer.preprocessingYset(y_train, y_test)  # 출력 데이터 분리
     
-    # ===== 3단계: 3개 모델 설정 =====
-    models = trainer.setupModels()  # [업체투찰률모델, 예가투찰률모델, 참여업체수모델]
-    results = []  # 예측 결과를 저장할 리스트
-    
-    # ===== 4단계: 각 모델 훈련 및 저장 =====
-    for i, model in enumerate(models):
-        trainer.trainnng(model, x_trainset, y_trainset[i])  # 모델 훈련
-        trainer.saveModel(model, f'mlpregr.model{i+1}.v0.1.1.npz')  # 모델 저장
-        result = trainer.predict(model, x_testset)  # 테스트 데이터로 예측
-        print(f"모델{i+1} 예측 결과 (처음 50개):")
-        print(result[:50])
+    target_names = ['업체투찰률', '예가투찰률', '참여업체수']
+    if multi_output:
+        # ===== 3/4단계: 다중 출력 모델 1개 설정, 훈련 및 저장 =====
+        multi_model = trainer.setupMultiOutputModel()
+        finished = trainer.trainnng(multi_model, x_trainset, np.column_stack(y_trainset), target='multi')  # 세 대상 한 번에 훈련
+        trainer.saveModel(multi_model, MULTI_MODEL_FILE)  # 모델 저장 (파일 1개)
+        if not finished:
+            trainer.close()  # 시간 예산 초과: 지금까지의 최고 모델만 저장 (--resume으로 이어서 학습)
+            return
+        predicted = trainer.predict(multi_model, x_testset)  # (행 수, 3) 예측
+        results = [predicted[:, i] for i in range(len(target_names))]
+        models = [multi_model.target(i) for i in range(len(target_names))]  # 성능 측정용 대상별 보기
+        for i, result in enumerate(results):
+            print(f"{target_names[i]} 예측 결과 (처음 50개):")
+            print(result[:50])
         print("="*80)
-        results.append(result)  # 예측 결과 저장
+    else:
+        # ===== 3단계: 3개 모델 설정 =====
+        models = trainer.setupModels()  # [업체투찰률모델, 예가투찰률모델, 참여업체수모델]
+        results = []  # 예측 결과를 저장할 리스트
+        
+        # ===== 4단계: 각 모델 훈련 및 저장 =====
+        for i, model in enumerate(models):
+            finished = trainer.trainnng(model, x_trainset, y_trainset[i], target=target_names[i])  # 모델 훈련
+            trainer.saveModel(model, f'mlpregr.model{i+1}.v0.1.1.npz')  # 모델 저장
+            if not finished:
+                trainer.close()  # 시간 예산 초과: 지금까지의 최고 모델만 저장 (--resume으로 이어서 학습)
+                return
+            result = trainer.predict(model, x_testset)  # 테스트 데이터로 예측
+            print(f"모델{i+1} 예측 결과 (처음 50개):")
+            print(result[:50])
+            print("="*80)
+            results.append(result)  # 예측 결과 저장
     
     # 훈련된 모델들을 trainer 객체에 저장 (성능 측정용)
     trainer.model1 = models[0]
@@ -1986,6 +2146,8 @@ def Main(bid_type='auto'):
         else:
             print("  현재 성능: 매우 나쁨 (R2 < 0)")
             print("  개선 목표: R2 > 0.3")
+    if trainer.checkpointer is not None:
+        trainer.checkpointer.clear()  # 전체 과정이 끝났으므로 체크포인트 삭제
     trainer.close()  # 훈련 과정 마무리
 
     
@@ -1997,7 +2159,6 @@ if __name__ == "__main__":
     - 이 파일이 직접 실행될 때만 머신러닝 훈련이 시작됨
     - 다른 파일에서 import할 때는 실행되지 않음
     """
-    import sys
     
     # 명령행 인수 확인
     if len(sys.argv) > 1 and sys.argv[1] == "test":
@@ -2005,14 +2166,30 @@ if __name__ == "__main__":
         print("모델 성능 테스트를 실행합니다...")
         test_model_performance()
     else:
-        # 입찰 유형 확인 및 훈련 실행
+        # 입찰 유형 확인 및 훈련 실행 (--db: SQL Server에서 학습 데이터 직접 조회,
+        # --profile-memory: 단계별 tracemalloc 측정, --cprofile: 가장 느린 단계 cProfile 저장,
+        # --multi-output: 세 대상을 다중 출력 모델 1개로 학습, --stream: CSV 청크 단위 스트리밍 학습,
+        # --resume: res/checkpoints에서 이어서 학습, --time-budget=<초>: 시간 예산을 넘기면 최고 모델 저장 후 종료,
+        # --refresh-cache: --db 스냅샷을 무시하고 다시 조회, --cache-max-age=<초>: 더 오래된 --db 스냅샷은 다시 조회)
+        flags = ['--db', '--profile-memory', '--cprofile', '--multi-output', '--stream', '--resume', '--refresh-cache']
+        budgets = [arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--time-budget=')]
+        time_budget = float(budgets[-1]) if budgets else None
+        max_ages = [arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--cache-max-age=')]
+        cache_max_age = float(max_ages[-1]) if max_ages else None
+        args = [arg for arg in sys.argv[1:] if arg not in flags
+                and not arg.startswith('--time-budget=') and not arg.startswith('--cache-max-age=')]
+        use_db = '--db' in sys.argv[1:]
         bid_type = 'auto'  # 기본값
-        if len(sys.argv) > 1:
-            bid_type = sys.argv[1]
+        if len(args) > 0:
+            bid_type = args[0]
             if bid_type not in ['cst', 'mtrl', 'gdns', 'auto']:
                 print(f"⚠️  잘못된 입찰 유형: {bid_type}")
                 print("사용 가능한 유형: cst, mtrl, gdns, auto")
                 bid_type = 'auto'
         
         print(f"모델 훈련을 실행합니다... (입찰 유형: {bid_type})")
-        Main(bid_type=bid_type)
\ No newline at end of file
+        Main(bid_type=bid_type, use_db=use_db,
+             profile_memory='--profile-memory' in sys.argv[1:], cprofile='--cprofile' in sys.argv[1:],
+             multi_output='--multi-output' in sys.argv[1:], stream='--stream' in sys.argv[1:],
+             resume='--resume' in sys.argv[1:], time_budget=time_budget,
+             refresh_cache='--refresh-cache' in sys.argv[1:], cache_max_age=cache_max_age)
\ No newline at end of file
@@ -37,6 +37,18 @@ from kiwipiepy import Kiwi  # 한국어 형태소 분석기 (단어를 쪼개는
 from sklearn.feature_extraction.text import TfidfVectorizer  # 텍스트를 숫자로 변환
 from scipy.sparse import csr_matrix  # 메모리 효율적인 행렬 저장 방식
 
+# 예측 결과 테이블 (결과1/결과2 배열 계산)
+from result_table import build_result_dataframe
+
+# 예측 결과 엑셀 저장 (xlsxwriter로 결과와 통계를 한 번에 기록)
+from result_workbook import write_result_workbook, XLSXWRITER_AVAILABLE
+
+# 하이퍼파라미터 탐색 결과 적용 (res/best_params.json)
+from hyperparameter_search import apply_best_params
+
+# 트리 평탄화 파일 (예측 서버에서 memmap으로 빠르게 로드)
+from flat_trees import export_if_supported
+
 # 머신러닝 모델과 전처리 도구들
 from sklearn.ensemble import RandomForestRegressor  # 랜덤 포레스트 회귀 모델 (여러 의사결정나무의 앙상블)
 from sklearn.preprocessing import StandardScaler  # 데이터를 정규화하는 도구 (0~1 사이로 맞춤)
@@ -359,9 +371,6 @@ class BidLowerMarginRateTrain():
 
     
     def make_result_dataframe2(self, xx_test, result1, result2, result3):
-        df_rst = pd.DataFrame(columns = self.result_columns)
-        df_rst.astype(self.result_columns_type)        
-        
         selected_cols = ['입찰번호', '입찰차수', 
                          '기초금액', '낙찰하한률', '참여업체수', '간접비', '순공사원가', 
                          '면허제한코드', '공고기관코드', 
@@ -376,62 +385,8 @@ class BidLowerMarginRateTrain():
         
         print("예측결과값 입력 시작")
         
-        for i, v in enumerate(selected_cols):
-            df_rst[v] = df_test[v]
-                
-        df_rst["업체투찰률예측"] = result1
-        df_rst["예가투찰률예측"] = result2
-        df_rst["참여업체수예측"] = result3
-        
-        # 예가투찰률 예측값으로부터 예정금액 역산 계산
-        # 예가투찰률 = (예정금액 / 기초금액) * 낙찰하한률
-        # 따라서 예정금액 = (예가투찰률 * 기초금액) / 낙찰하한률
-        df_rst["예정금액예측"] = (df_rst["예가투찰률예측"] * df_rst["기초금액"]) / df_rst["낙찰하한률"]
-        
-        # ===== 새로운 컬럼들 계산 =====
-        # 낙찰금액(업체투찰률) 예측 = 업체투찰률예측 * 기초금액
-        df_rst["낙찰금액(업체투찰률) 예측"] = df_rst["업체투찰률예측"] * df_rst["기초금액"]
-        
-        # A값여부: 업체투찰률예측이 0.8 이상이면 'O', 아니면 빈 문자열
-        df_rst["A값여부"] = df_rst["업체투찰률예측"].apply(lambda x: 'O' if x >= 0.8 else '')
-        
-        # 결과1: 낙찰금액(업체투찰률) 예측이 낙찰하한가보다 작으면 "낙찰하한선미달", 
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result1(row):
-            predicted_amount = row["낙찰금액(업체투찰률) 예측"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과1"] = df_rst.apply(calculate_result1, axis=1)
-        
-        # 예정금액(예가투찰률) 예측 = 예가투찰률예측 / 낙찰하한률 * 기초금액
-        df_rst["예정금액(예가투찰률) 예측"] = (df_rst["예가투찰률예측"] / df_rst["낙찰하한률"]) * df_rst["기초금액"]
-        
-        # 예정금액*낙찰하한율 = 예정금액(예가투찰률) 예측 * 낙찰하한률
-        df_rst["예정금액*낙찰하한율"] = df_rst["예정금액(예가투찰률) 예측"] * df_rst["낙찰하한률"]
-        
-        # 결과2: 예정금액*낙찰하한율이 낙찰하한가보다 작으면 "낙찰하한선미달",
-        # 낙찰하한가 이상이고 낙찰금액 미만이면 "낙찰", 아니면 "-"
-        def calculate_result2(row):
-            predicted_amount = row["예정금액*낙찰하한율"]
-            min_bid = row["낙찰하한가"]
-            actual_amount = row["낙찰금액"]
-            
-            if predicted_amount < min_bid:
-                return "낙찰하한선미달"
-            elif predicted_amount >= min_bid and predicted_amount < actual_amount:
-                return "낙찰"
-            else:
-                return "-"
-        
-        df_rst["결과2"] = df_rst.apply(calculate_result2, axis=1)
+        # 결과1/결과2/A값여부는 행마다 apply하지 않고 배열 비교(np.select)로 한 번에 계산 (result_table.py)
+        df_rst = build_result_dataframe(df_test, self.result_columns, result1, result2, result3)
         
         print("예측결과테이블 작성완료")
          
@@ -764,7 +719,8 @@ class BidLowerMarginRateTrain():
         model3 = LinearRegression()  # 선형 회귀 모델
         '''
         
-        return [model1, model2, model3]
+        # res/best_params.json에 탐색 결과가 있으면 적용 (hyperparameter_search.py)
+        return apply_best_params([model1, model2, model3], 'rf', getattr(self, 'save_dir', None))
     
     def trainnng(self, model, x_trainset, y_trainset):
         """
@@ -807,6 +763,7 @@ class BidLowerMarginRateTrain():
         - joblib을 사용하여 Python 객체를 효율적으로 저장
         """
         joblib.dump(model, self.save_dir+filename)  # 모델을 파일로 저장 (예: 'rf.model1.v0.0.1.npz')
+        export_if_supported(model, self.save_dir+filename)  # 평탄화 트리 (예: 'rf.model1.v0.0.1.npz.flat')
         
         print("-"*80)
         print("RandomForestRegressor 모델을 저장하였습니다. ")        
@@ -884,8 +841,9 @@ class BidLowerMarginRateTrain():
             
         설명:
         - 예측 결과를 엑셀 파일로 저장하여 분석할 수 있도록 함
-        - openpyxl이 없으면 CSV 파일로 저장
-        - 결과1, 결과2 통계를 마지막에 추가
+        - xlsxwriter가 있으면 결과 행과 결과1, 결과2 통계를 한 번에 기록 (constant_memory)
+        - 결과가 result_workbook.EXCEL_ROW_LIMIT행을 넘으면 CSV 파일로 저장
+        - xlsxwriter가 없으면 to_excel로 저장 후 통계 추가 (openpyxl도 없으면 CSV 파일로 저장)
         """
         print("="*80)
         print("예측 결과를 엑셀 파일로 저장 중...")
@@ -894,6 +852,16 @@ class BidLowerMarginRateTrain():
         print(f"데이터 열 수: {len(df_result.columns)}")
         
         try:
+            if XLSXWRITER_AVAILABLE:
+                # 결과 행 → 통계 순서로 한 번에 기록 (파일을 다시 열지 않음)
+                saved_dir = write_result_workbook(df_result, xls_dir, getattr(self, 'bid_type_name', None))
+                print("="*80)
+                print("✅ 예측데이타를 저장하였습니다.")
+                print(f"📁 저장된 파일: {saved_dir}")
+                print(f"📊 데이터 크기: {len(df_result)}행 x {len(df_result.columns)}열")
+                print("="*80)
+                return
+            
             # 엑셀 파일로 저장 시도
             df_result.to_excel(
                            xls_dir,  # 저장할 파일 경로
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+투찰금액 최적화 모듈
+
+낙찰하한가 ~ 기초금액 사이의 투찰금액 후보(grid)마다 낙찰 확률을 계산해 기대값이 가장 큰 금액을 찾는다.
+예측 서버(bid.ml.predict.py)의 /api/optimize, /api/optimize/batch와 배치 실행에서 사용한다.
+
+낙찰 확률 (기초금액 대비 비율, ReservePriceSimulator와 같은 예정금액 추첨 모델):
+- 낙찰하한가 f: 시뮬레이터의 추첨 표본 분포 (f <= p 확률은 표본 분위수 표로 계산)
+- 경쟁 업체 k = 참여업체수예측 - 1 개사, 업체별 투찰률은 업체투찰률예측 중심, AVG_DIFF_RT 표준편차의 정규분포 (F)
+- 투찰금액 p는 p >= f 이고 [f, p) 구간에 투찰한 경쟁 업체가 없으면 낙찰
+  P(낙찰) = 평균_f [ 1(f <= p) × (1 - F(p) + F(f))^k ]
+  f 분포를 nodes개 등확률 구간으로 나누고, 구간마다 f <= p인 확률 × 구간 대표값(중앙 분위수)의 경쟁 항을 합산
+- 기대값 = P(낙찰) × (p - 원가),  원가 = 원가율 × 기초금액 (원가율 0이면 기대 낙찰금액)
+
+(입찰 수, grid 수, nodes 수) float32 배열을 입찰 묶음(chunk) 단위로 한 번에 계산하고, refine=True면 1차 최적
+금액 양쪽 grid 한 칸 사이를 REFINE_POINTS개로 다시 나눠 한 번 더 찾는다.
+
+ex)
+optimizer = BidPriceOptimizer(ReservePriceSimulator(), grid=1000, nodes=32)
+result = optimizer.optimize(300000000, 0.87745, comlowrt=0.8812, planlowrt=0.8770, company_count=120, diffrt=0.003)
+df = optimizer.optimize_batch(bids['기초금액'], bids['낙찰하한률'], bids['업체투찰률예측'], bids['예가투찰률예측'],
+                              bids['참여업체수예측'], diffrt=0.003)
+
+배치 실행 (CSV 입력 → CSV 출력):
+python bid_price_optimizer.py res/result-2501011230-1-8020.csv -o res/optimize.csv --diffrt 0.003
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from reserve_price_simulator import ReservePriceSimulator, INPUT_COLUMNS, _pick_column
+
+
+# 기본 설정 (예측 서버는 config.csv의 OPT_* 값으로 바꿀 수 있음)
+GRID_POINTS = 1000
+FLOOR_NODES = 16
+REFINE_POINTS = 64
+
+# 낙찰하한가 분포(f <= p 확률) 분위수 표 크기
+CDF_POINTS = 4097
+
+# 한 번에 계산하는 (입찰 × grid × nodes) 원소 수 (임시 배열 메모리 제한)
+CHUNK_ELEMENTS = 4000000
+
+# 배치 입력 컬럼 (시뮬레이터 입력 + 참여업체수예측)
+OPTIMIZE_COLUMNS = dict(INPUT_COLUMNS, company_count=['참여업체수예측', '참여업체수_예측', 'companycnt'])
+
+
+class BidPriceOptimizer:
+    """투찰금액 grid의 낙찰 확률/기대값을 배열 연산으로 계산하는 클래스"""
+
+    def __init__(self, simulator, grid=GRID_POINTS, nodes=FLOOR_NODES, refine=True):
+        """
+        Args:
+            simulator (ReservePriceSimulator): 예정금액 추첨 표본을 가진 시뮬레이터
+            grid (int): 입찰마다 평가할 투찰금액 후보 수
+            nodes (int): 낙찰하한가 분포를 나타낼 대표값 수
+            refine (bool): 1차 최적 금액 주변을 한 번 더 탐색
+        """
+        self.simulator = simulator
+        self.grid = int(grid)
+        self.nodes = int(nodes)
+        self.refine = refine
+        # 등확률 구간 중앙 분위수와 분포 표 (정렬된 표본에서 바로 선택)
+        positions = ((np.arange(self.nodes) + 0.5) / self.nodes * simulator.draws).astype(np.int64)
+        self.floor_z = simulator.reserve_z[positions]
+        self.cdf_levels = np.linspace(0.0, 1.0, CDF_POINTS)
+        self.cdf_z = simulator.reserve_z[np.minimum((self.cdf_levels * simulator.draws).astype(np.int64),
+                                                    simulator.draws - 1)]
+        self.node_offsets = np.arange(self.nodes, dtype=np.float32)
+
+    def _competitor_cdf(self, price, bssamt, comlowrt, diffrt):
+        """경쟁 업체 1개사의 투찰금액이 price 이하일 확률 (price는 bssamt 등과 브로드캐스트)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap = price / bssamt - comlowrt
+            return np.where(diffrt > 0, ndtr(gap / diffrt), (gap >= 0).astype(np.float64))
+
+    def _floor_cdf(self, prices, floor_base, floor_scale):
+        """낙찰하한가가 투찰금액 이하일 확률 (prices: (입찰, grid))"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (prices - floor_base[:, None]) / floor_scale[:, None]
+        cdf = np.interp(z, self.cdf_z, self.cdf_levels)
+        return np.where(floor_scale[:, None] > 0, cdf, (prices >= floor_base[:, None]).astype(np.float64))
+
+    def _win_probability(self, prices, floor_base, floor_scale, bssamt, comlowrt, diffrt, rivals):
+        """
+        투찰금액 후보별 낙찰 확률
+
+        Args:
+            prices: (입찰, grid) 투찰금액
+            floor_base, floor_scale: (입찰,) 낙찰하한가 = floor_base + floor_scale × Z
+            bssamt, comlowrt, diffrt, rivals: (입찰,) 배열
+        """
+        col = (slice(None), None)
+        floors = floor_base[col] + floor_scale[col] * self.floor_z[None, :]
+        cdf_price = self._competitor_cdf(prices, bssamt[col], comlowrt[col], diffrt[col]).astype(np.float32)
+        cdf_floor = self._competitor_cdf(floors, bssamt[col], comlowrt[col], diffrt[col]).astype(np.float32)
+
+        # [f, p) 구간에 경쟁 업체가 없을 확률: (1 - (F(p) - F(f)))^k = exp(k × log1p(F(f) - F(p)))
+        # (입찰마다 지수가 다른 np.power보다 log1p/exp가 빠름, -1은 k = 0일 때 0 × -inf를 피하도록 살짝 올림)
+        survive = cdf_floor[:, None, :] - cdf_price[:, :, None]
+        np.clip(survive, -1.0 + 1e-7, 0.0, out=survive)
+        np.log1p(survive, out=survive)
+        survive *= rivals.astype(np.float32)[:, None, None]
+        np.exp(survive, out=survive)
+
+        # 구간별 f <= p 비율 (0 ~ 1): 낙찰하한가 분포 누적확률 × nodes - 구간 번호
+        weight = (self._floor_cdf(prices, floor_base, floor_scale) * self.nodes).astype(np.float32)
+        covered = weight[:, :, None] - self.node_offsets[None, None, :]
+        np.clip(covered, 0.0, 1.0, out=covered)
+        survive *= covered
+        return survive.sum(axis=2, dtype=np.float64) / self.nodes
+
+    def _search(self, low, high, points, floor_base, floor_scale, bssamt, comlowrt, diffrt, rivals, cost):
+        """low ~ high 사이 points개 grid에서 기대값 최대 금액 (grid, 낙찰 확률, 기대값, 최대 인덱스)"""
+        steps = np.linspace(0.0, 1.0, points)
+        prices = np.round(low[:, None] + (high - low)[:, None] * steps[None, :])
+        win = self._win_probability(prices, floor_base, floor_scale, bssamt, comlowrt, diffrt, rivals)
+        value = win * (prices - cost[:, None])
+        best = np.argmax(value, axis=1)
+        return prices, win, value, best
+
+    def optimize_arrays(self, bssamt, lowerrt, comlowrt, planlowrt=None, company_count=None, diffrt=0.0,
+                        cost_rate=0.0, a_amount=0.0, prelim_range=None, curve=False):
+        """
+        여러 입찰의 기대값 최대 투찰금액을 배열 연산으로 계산
+
+        Args:
+            bssamt: 기초금액 배열
+            lowerrt: 낙찰하한률 배열
+            comlowrt: 업체투찰률예측 배열 (경쟁 업체 투찰률 중심)
+            planlowrt: 예가투찰률예측 배열 (None/NaN이면 예정금액 중심 = 기초금액)
+            company_count: 참여업체수예측 배열 (경쟁 업체 수 = 참여업체수 - 1, None이면 1개사)
+            diffrt: 경쟁 업체 투찰률 표준편차 (AVG_DIFF_RT)
+            cost_rate: 기초금액 대비 원가율 (기대값 = P(낙찰) × (투찰금액 - 원가))
+            a_amount: A값 금액
+            prelim_range: 예비가격 범위 (None이면 시뮬레이터 값)
+            curve (bool): 1차 grid의 금액/낙찰 확률/기대값도 반환
+
+        Returns:
+            dict: best_price, best_rate, win_probability, expected_value, floor_min, floor_max (입찰 수 길이)
+                  curve=True면 grid_prices, grid_win_probability, grid_expected_value ((입찰, grid) 배열)
+        """
+        bssamt = np.asarray(bssamt, dtype=np.float64).ravel()
+        n = len(bssamt)
+
+        def column(values, default):
+            if values is None:
+                return np.full(n, default, dtype=np.float64)
+            values = np.asarray(values, dtype=np.float64).ravel()
+            return np.full(n, values[0]) if values.size == 1 else values
+
+        lowerrt = column(lowerrt, np.nan)
+        comlowrt = column(comlowrt, np.nan)
+        planlowrt = column(planlowrt, np.nan)
+        counts = column(company_count, 2.0)
+        rivals = np.maximum(np.round(np.nan_to_num(counts, nan=2.0)) - 1.0, 0.0)
+        diffrt = np.abs(column(diffrt, 0.0))
+        cost = np.nan_to_num(column(cost_rate, 0.0)) * bssamt
+        a_amount = np.nan_to_num(column(a_amount, 0.0))
+        width = self.simulator.prelim_range if prelim_range is None else float(prelim_range)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            center = np.where(np.isfinite(planlowrt) & (planlowrt > 0), planlowrt / lowerrt, 1.0)
+        floor_base = lowerrt * bssamt * center + a_amount * (1.0 - lowerrt)
+        floor_scale = lowerrt * bssamt * width
+        floor_min = floor_base + floor_scale * self.simulator.reserve_z[0]
+        floor_max = floor_base + floor_scale * self.simulator.reserve_z[-1]
+        low = np.ceil(floor_min)
+        high = np.maximum(bssamt, low)
+
+        best_price = np.full(n, np.nan)
+        best_win = np.full(n, np.nan)
+        best_value = np.full(n, np.nan)
+        if curve:
+            grid_prices = np.full((n, self.grid), np.nan)
+            grid_win = np.full((n, self.grid), np.nan)
+            grid_value = np.full((n, self.grid), np.nan)
+
+        valid = np.flatnonzero((bssamt > 0) & np.isfinite(lowerrt) & np.isfinite(comlowrt) & np.isfinite(low))
+        chunk = max(1, CHUNK_ELEMENTS // (self.grid * self.nodes))
+        for start in range(0, len(valid), chunk):
+            idx = valid[start:start + chunk]
+            args = (floor_base[idx], floor_scale[idx], bssamt[idx], comlowrt[idx], diffrt[idx], rivals[idx], cost[idx])
+            prices, win, value, best = self._search(low[idx], high[idx], self.grid, *args)
+            rows = np.arange(len(idx))
+            if curve:
+                grid_prices[idx], grid_win[idx], grid_value[idx] = prices, win, value
+            price, p_win, ev = prices[rows, best], win[rows, best], value[rows, best]
+
+            if self.refine and self.grid > 2:
+                # 1차 최적 금액 양쪽 한 칸 사이를 다시 탐색
+                left = prices[rows, np.maximum(best - 1, 0)]
+                right = prices[rows, np.minimum(best + 1, self.grid - 1)]
+                prices2, win2, value2, best2 = self._search(left, right, REFINE_POINTS, *args)
+                better = value2[rows, best2] > ev
+                price = np.where(better, prices2[rows, best2], price)
+                p_win = np.where(better, win2[rows, best2], p_win)
+                ev = np.where(better, value2[rows, best2], ev)
+
+            best_price[idx], best_win[idx], best_value[idx] = price, p_win, ev
+
+        result = {
+            'best_price': best_price,
+            'best_rate': best_price / np.where(bssamt > 0, bssamt, np.nan),
+            'win_probability': best_win,
+            'expected_value': best_value,
+            'floor_min': floor_min,
+            'floor_max': floor_max,
+        }
+        if curve:
+            result.update(grid_prices=grid_prices, grid_win_probability=grid_win, grid_expected_value=grid_value)
+        return result
+
+    def optimize(self, bssamt, lowerrt, comlowrt, planlowrt=None, company_count=None, diffrt=0.0,
+                 cost_rate=0.0, a_amount=0.0, prelim_range=None, curve_points=0):
+        """
+        입찰 1건 최적화 (인자는 optimize_arrays와 같고 스칼라)
+
+        Args:
+            curve_points (int): 0보다 크면 grid를 이 개수로 줄인 금액별 낙찰 확률/기대값 곡선 포함
+
+        Returns:
+            dict: 최적 투찰금액/투찰률, 낙찰 확률, 기대값 (API 응답 형식)
+        """
+        started = time.perf_counter()
+        r = self.optimize_arrays([bssamt], lowerrt, comlowrt, planlowrt, company_count, diffrt, cost_rate,
+                                 a_amount, prelim_range, curve=curve_points > 0)
+        response = self.responses(r)[0]
+        if curve_points > 0:
+            pick = np.unique(np.linspace(0, self.grid - 1, min(int(curve_points), self.grid)).astype(np.int64))
+            response['curve'] = [
+                {'price': float(p), 'winProbability': float(w), 'expectedValue': float(v)}
+                for p, w, v in zip(r['grid_prices'][0, pick], r['grid_win_probability'][0, pick],
+                                   r['grid_expected_value'][0, pick])
+                if np.isfinite(p)
+            ]
+        response['elapsedMs'] = round((time.perf_counter() - started) * 1000, 3)
+        return response
+
+    def responses(self, r):
+        """optimize_arrays 결과를 입찰별 API 응답 dict 목록으로 변환"""
+        def number(value, digits=None):
+            value = float(value)
+            if not np.isfinite(value):
+                return None
+            return value if digits is None else round(value, digits)
+
+        return [{
+            'optimalAmount': number(r['best_price'][i], 0),
+            'optimalRatio': number(r['best_rate'][i]),
+            'winProbability': number(r['win_probability'][i]),
+            'expectedValue': number(r['expected_value'][i], 0),
+            'lowerLimitPriceRange': [number(r['floor_min'][i], 0), number(r['floor_max'][i], 0)],
+            'gridPoints': self.grid,
+        } for i in range(len(r['best_price']))]
+
+    def optimize_batch(self, bssamt, lowerrt, comlowrt, planlowrt=None, company_count=None, diffrt=0.0,
+                       cost_rate=0.0, a_amount=0.0, prelim_range=None, index=None):
+        """
+        여러 입찰 최적화 결과를 DataFrame으로 반환 (인자는 optimize_arrays와 같음)
+
+        Returns:
+            pd.DataFrame: 최적투찰금액, 최적투찰률, 최적낙찰확률, 최적기대값, 낙찰하한가_최소, 낙찰하한가_최대
+        """
+        r = self.optimize_arrays(bssamt, lowerrt, comlowrt, planlowrt, company_count, diffrt, cost_rate,
+                                 a_amount, prelim_range)
+        return pd.DataFrame({
+            '최적투찰금액': r['best_price'],
+            '최적투찰률': r['best_rate'],
+            '최적낙찰확률': r['win_probability'],
+            '최적기대값': r['expected_value'],
+            '낙찰하한가_최소': r['floor_min'],
+            '낙찰하한가_최대': r['floor_max'],
+        }, index=index)
+
+
+def optimize_frame(optimizer, frame, diffrt=0.0, cost_rate=0.0, prelim_range=None):
+    """
+    입찰 DataFrame(예측 결과 테이블/ML_C 내보내기)에 최적 투찰금액 컬럼을 붙여 반환
+
+    필요한 컬럼: 기초금액, 낙찰하한률, 업체투찰률예측(또는 업체투찰률_예측)
+    선택 컬럼: 예가투찰률예측, 참여업체수예측, A값
+    """
+    values = {key: _pick_column(frame, names) for key, names in OPTIMIZE_COLUMNS.items()}
+    missing = [OPTIMIZE_COLUMNS[key][0] for key in ('bssamt', 'lowerrt', 'comlowrt') if values[key] is None]
+    if missing:
+        raise KeyError(f"최적화에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+
+    def numeric(series):
+        return None if series is None else pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+
+    result = optimizer.optimize_batch(
+        numeric(values['bssamt']), numeric(values['lowerrt']), numeric(values['comlowrt']),
+        numeric(values['planlowrt']), numeric(values['company_count']), diffrt, cost_rate,
+        0.0 if values['a_amount'] is None else np.nan_to_num(numeric(values['a_amount'])),
+        prelim_range, index=frame.index)
+    return pd.concat([frame, result], axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='기대값 최대 투찰금액 배치 계산')
+    parser.add_argument('input', help='입력 CSV/parquet (기초금액, 낙찰하한률, 업체투찰률예측 컬럼)')
+    parser.add_argument('-o', '--output', default=None, help='출력 파일 (기본: 입력파일명.optimize.csv)')
+    parser.add_argument('--grid', type=int, default=GRID_POINTS, help='입찰별 투찰금액 후보 수')
+    parser.add_argument('--nodes', type=int, default=FLOOR_NODES, help='낙찰하한가 분포 대표값 수')
+    parser.add_argument('--draws', type=int, default=1000000, help='예정금액 추첨 표본 수')
+    parser.add_argument('--range', type=float, default=0.02, dest='prelim_range', help='예비가격 범위 (±)')
+    parser.add_argument('--diffrt', type=float, default=0.0, help='경쟁 업체 투찰률 표준편차 (AVG_DIFF_RT)')
+    parser.add_argument('--cost-rate', type=float, default=0.0, help='기초금액 대비 원가율')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args(argv)
+
+    if args.input.endswith('.parquet'):
+        frame = pd.read_parquet(args.input)
+    else:
+        frame = pd.read_csv(args.input, encoding='utf-8-sig')
+    output = args.output or os.path.splitext(args.input)[0] + '.optimize.csv'
+
+    simulator = ReservePriceSimulator(draws=args.draws, prelim_range=args.prelim_range, seed=args.seed)
+    optimizer = BidPriceOptimizer(simulator, grid=args.grid, nodes=args.nodes)
+    started = time.perf_counter()
+    result = optimize_frame(optimizer, frame, args.diffrt, args.cost_rate)
+    elapsed = time.perf_counter() - started
+
+    if output.endswith('.parquet'):
+        result.to_parquet(output, index=False)
+    else:
+        result.to_csv(output, index=False, encoding='utf-8-sig')
+    print(f"🎯 입찰 {len(frame):,}건 × 후보 {optimizer.grid:,}개 최적화 {elapsed:.3f}초 "
+          f"({len(frame) * optimizer.grid / max(elapsed, 1e-9):,.0f} 후보/초)")
+    print(f"💾 저장: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
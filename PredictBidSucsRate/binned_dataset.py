@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+부스팅 모델 학습용 binned(양자화) 데이터셋 캐시
+
+bid.ml.train.gb.py / bid.ml.train.cb.py는 같은 입력 X로 대상 3개를 학습하는데, fit마다 라이브러리가
+특성 값을 다시 양자화(bin 경계 계산 + 값 → bin 번호 변환)한다. BinnedDatasetCache는 라이브러리별
+binned 표현을 한 번만 만들고 라벨만 바꿔 대상 3개에 같이 쓰며, 파일로 남겨 다음 실행에서도 재사용한다.
+
+- XGBoost  : 처음 실행은 xgb.QuantileDMatrix로 학습하고 res/cache/binned/xgb_<키>.dmatrix (DMatrix save_binary) 저장,
+             다음 실행은 저장된 DMatrix로 학습 (QuantileDMatrix는 파일 저장을 지원하지 않음)
+- LightGBM : lgb.Dataset(free_raw_data=True) → res/cache/binned/lgb_<키>.bin (save_binary)
+- CatBoost : 양자화된 Pool → res/cache/binned/cb_<키>.qpool, 경계는 cb_borders_<원본 지문>_*.tsv로 저장해
+             같은 원본 데이터면 X가 달라도 경계 계산 없이 재사용
+- 그 밖의 모델(HistGradientBoostingRegressor 등)은 그대로 fit
+
+키는 학습에 실제로 쓰는 X 바이트 해시와 X 형태, bin 수로 만든다. 저장된 binned 데이터가 이번 실행의 X와
+다르면 쓰이지 않는다. 재실행에서 같은 X가 나오려면:
+- 학습/테스트 분할 seed: split_seed()가 원본 지문별로 split_seeds.json에 저장해 두고 다음 실행에 같은 값을 돌려줌
+- 면허제한코드/공고기관코드: 학습 스크립트가 hash(문자열)로 변환하므로 PYTHONHASHSEED를 고정해야 함
+  (고정하지 않으면 실행마다 X가 달라 캐시를 새로 만든다)
+캐시 폴더는 최근에 쓴 max_files개 파일만 남기고 오래된 파일부터 지운다 (split_seeds.json은 남김).
+단계별 생성 시간과 최대 메모리는 TrainingProfiler로 기록한다 (print_summary / save).
+
+XGBoost/LightGBM은 네이티브 train API로 학습하므로 BoosterRegressor(predict(x))로 감싸서 반환한다.
+joblib 저장/예측 서버 로드는 기존 모델과 같다.
+
+ex)
+cache = BinnedDatasetCache('res/cache/binned', source=source_fingerprint('data/bid.csv'))
+trainer.rnd_num = cache.split_seed(trainer.rnd_num)   # 데이터를 나누기 전에 호출
+for i, model in enumerate(models):
+    models[i] = cache.fit(model, x_train, y_train[i], f'model{i + 1}')
+cache.profiler.print_summary()
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+
+from training_profiler import TrainingProfiler
+
+try:
+    import xgboost as xgb
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+try:
+    import lightgbm as lgb
+    LIGHTGBM_AVAILABLE = True
+except ImportError:
+    LIGHTGBM_AVAILABLE = False
+
+try:
+    from catboost import Pool
+    CATBOOST_AVAILABLE = True
+except ImportError:
+    CATBOOST_AVAILABLE = False
+
+
+# 라이브러리 기본 bin 수 (sklearn API로 학습할 때와 같은 결과가 나오도록 기본값 유지)
+DEFAULT_MAX_BIN = {'xgboost': 256, 'lightgbm': 255, 'catboost': 254}
+
+# 캐시 폴더에 남길 최대 파일 수 (.bin / .qpool / 경계 .tsv, 오래 안 쓴 파일부터 삭제)
+MAX_CACHE_FILES = 12
+
+# 원본 지문별 학습/테스트 분할 seed 파일 (prune 대상에서 제외)
+SPLIT_SEED_FILE = 'split_seeds.json'
+
+# LGBMRegressor.get_params() 중 lgb.train에 넘기지 않는 항목
+LGBM_SKLEARN_ONLY = ('n_estimators', 'class_weight', 'importance_type', 'silent')
+
+
+def model_library(model):
+    """모델 클래스의 최상위 패키지 이름 (xgboost, lightgbm, catboost, sklearn ...)"""
+    return type(model).__module__.split('.')[0]
+
+
+def source_fingerprint(*paths):
+    """원본 데이터 파일 지문 (경로/크기/수정시각 해시 - 파일이 바뀌면 달라짐)"""
+    sources = [[os.path.abspath(p), os.path.getsize(p), int(os.path.getmtime(p))] for p in paths]
+    return hashlib.sha1(json.dumps(sources).encode()).hexdigest()[:12]
+
+
+class BoosterRegressor:
+    """XGBoost/LightGBM 네이티브 Booster를 sklearn 모델처럼 predict(x)로 쓰는 래퍼"""
+
+    def __init__(self, booster, library, params, num_boost_round, n_features):
+        self.booster = booster
+        self.library = library
+        self.params = params
+        self.num_boost_round = num_boost_round
+        self.n_features_in_ = n_features
+
+    def predict(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self.library == 'xgboost':
+            return np.asarray(self.booster.inplace_predict(x), dtype=np.float64)
+        return np.asarray(self.booster.predict(x), dtype=np.float64)
+
+    def continue_training(self, x, y, rounds):
+        """기존 트리에 rounds개를 더 학습 (증분 재학습)"""
+        if self.library == 'xgboost':
+            self.booster = xgb.train(self.params, xgb.DMatrix(x, label=y), num_boost_round=rounds,
+                                     xgb_model=self.booster)
+        else:
+            self.booster = lgb.train(self.params, lgb.Dataset(x, label=y), num_boost_round=rounds,
+                                     init_model=self.booster)
+        self.num_boost_round += rounds
+        return self
+
+
+class BinnedDatasetCache:
+    """라이브러리별 binned 데이터셋을 한 번 만들어 대상/재실행 간에 공유하는 캐시"""
+
+    def __init__(self, directory, max_bin=None, profiler=None, source=None, max_files=MAX_CACHE_FILES):
+        """
+        Args:
+            directory (str): 캐시 파일 폴더 (res/cache/binned)
+            max_bin (int): bin 수 (None이면 라이브러리 기본값)
+            profiler (TrainingProfiler): 생성 시간/메모리 기록 (None이면 새로 만듦)
+            source (str): 원본 데이터 지문 (source_fingerprint, 분할 seed 저장과 CatBoost 경계 파일에 사용)
+            max_files (int): 캐시 폴더에 남길 최대 파일 수
+        """
+        self.directory = directory
+        self.max_bin = max_bin
+        self.profiler = profiler or TrainingProfiler()
+        self.source = source
+        self.max_files = max_files
+        self._memo = {}
+        self._digest = (None, None)
+        os.makedirs(directory, exist_ok=True)
+
+    def bins(self, library):
+        return self.max_bin or DEFAULT_MAX_BIN[library]
+
+    def split_seed(self, seed):
+        """
+        원본 데이터별 학습/테스트 분할 seed
+
+        같은 원본(source)으로 전에 실행한 적이 있으면 그때의 seed를 돌려주고, 없으면 seed를 저장하고 그대로 돌려준다.
+        """
+        if self.source is None:
+            return seed
+        path = self.path(SPLIT_SEED_FILE)
+        seeds = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                seeds = json.load(f)
+        if self.source in seeds:
+            print(f"♻️  이전 실행의 분할 seed 사용: {seeds[self.source]} (원본 {self.source})")
+            return seeds[self.source]
+        seeds[self.source] = seed
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(seeds, f, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+        return seed
+
+    def data_key(self, x):
+        """X 바이트 해시 (대상 3개가 같은 X를 쓰므로 마지막 X의 해시를 보관)"""
+        if self._digest[0] is not x:
+            self._digest = (x, hashlib.sha1(memoryview(x).cast('B')).hexdigest()[:16])
+        return self._digest[1]
+
+    def key(self, x, library):
+        text = f"{library}:{self.bins(library)}:{x.shape}:{x.dtype.str}:{self.data_key(x)}"
+        return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def touch(self, path):
+        """재사용한 캐시 파일의 수정시각 갱신 (prune은 오래 안 쓴 파일부터 삭제)"""
+        os.utime(path, None)
+
+    def prune(self):
+        """캐시 폴더에 최근에 쓴 max_files개 파일만 남기고 나머지 삭제"""
+        files = [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f != SPLIT_SEED_FILE]
+        files = sorted((f for f in files if os.path.isfile(f)), key=os.path.getmtime, reverse=True)
+        for path in files[self.max_files:]:
+            try:
+                os.remove(path)
+                print(f"🗑️  오래된 양자화 캐시 삭제: {path}")
+            except OSError as e:
+                print(f"⚠️  캐시 파일 삭제 실패: {path} ({e})")
+
+    def xgboost(self, x, y):
+        """DMatrix 파일이 있으면 불러오고, 없으면 QuantileDMatrix를 만들고 DMatrix 파일 저장 (라벨만 교체)"""
+        key = self.key(x, 'xgboost')
+        if key not in self._memo:
+            path = self.path(f'xgb_{key}.dmatrix')
+            with self.profiler.stage('bin_xgboost', len(x)):
+                if os.path.exists(path):
+                    self._memo[key] = xgb.DMatrix(path)
+                    self.touch(path)
+                    print(f"♻️  XGBoost DMatrix 재사용: {path}")
+                else:
+                    self._memo[key] = xgb.QuantileDMatrix(x, label=y, max_bin=self.bins('xgboost'))
+                    xgb.DMatrix(x, label=y).save_binary(path)
+                    print(f"💾 XGBoost QuantileDMatrix 생성 ({len(x):,}행), DMatrix 저장: {path}")
+                    self.prune()
+        dataset = self._memo[key]
+        dataset.set_label(y)
+        return dataset
+
+    def lightgbm(self, x, y):
+        """lgb.Dataset (binary 파일이 있으면 불러오고, 없으면 만들어 저장)"""
+        key = self.key(x, 'lightgbm')
+        if key not in self._memo:
+            path = self.path(f'lgb_{key}.bin')
+            # feature_pre_filter=False: 대상마다 min_child_samples가 달라도 같은 Dataset 사용
+            params = {'max_bin': self.bins('lightgbm'), 'feature_pre_filter': False, 'verbose': -1}
+            with self.profiler.stage('bin_lightgbm', len(x)):
+                if os.path.exists(path):
+                    dataset = lgb.Dataset(path, params=params, free_raw_data=True).construct()
+                    self.touch(path)
+                    print(f"♻️  LightGBM Dataset 재사용: {path}")
+                else:
+                    dataset = lgb.Dataset(x, label=y, params=params, free_raw_data=True).construct()
+                    dataset.save_binary(path)
+                    print(f"💾 LightGBM Dataset 저장: {path}")
+                    self.prune()
+            self._memo[key] = dataset
+        dataset = self._memo[key]
+        dataset.set_label(y)
+        return dataset
+
+    def catboost(self, x, y, border_count=None):
+        """양자화된 Pool (pool 파일 → 재사용, 없으면 저장된 경계로 양자화 후 저장)"""
+        border_count = border_count or self.bins('catboost')
+        key = self.key(x, 'catboost') + f'_{border_count}'
+        if key not in self._memo:
+            pool_path = self.path(f'cb_{key}.qpool')
+            # 경계는 원본 데이터 기준 (X가 달라도 같은 원본이면 재사용, 원본을 모르면 X 기준)
+            borders_path = self.path(f'cb_borders_{self.source or self.data_key(x)}_{x.shape[1]}_{border_count}.tsv')
+            with self.profiler.stage('bin_catboost', len(x)):
+                if os.path.exists(pool_path):
+                    pool = Pool('quantized://' + pool_path)
+                    self.touch(pool_path)
+                    print(f"♻️  CatBoost Pool 재사용: {pool_path}")
+                else:
+                    pool = Pool(x, label=y)
+                    if os.path.exists(borders_path):
+                        pool.quantize(input_borders=borders_path)
+                        self.touch(borders_path)
+                        print(f"♻️  CatBoost 양자화 경계 재사용: {borders_path}")
+                    else:
+                        pool.quantize(border_count=border_count)
+                        pool.save_quantization_borders(borders_path)
+                    pool.save(pool_path)
+                    print(f"💾 CatBoost Pool 저장: {pool_path}")
+                    self.prune()
+            self._memo[key] = pool
+        pool = self._memo[key]
+        pool.set_label(y)
+        return pool
+
+    def fit(self, model, x, y, name='model'):
+        """
+        binned 데이터셋으로 모델 학습
+
+        Args:
+            model: setupModels()의 모델 (XGBRegressor, LGBMRegressor, CatBoostRegressor, sklearn 모델)
+            x, y: 학습 입력과 대상 (대상 1개)
+            name (str): 프로파일 단계 이름
+
+        Returns:
+            학습된 모델 (XGBoost/LightGBM은 BoosterRegressor, 나머지는 model 그대로)
+        """
+        x = np.ascontiguousarray(np.asarray(x, dtype=np.float64))
+        y = np.asarray(y, dtype=np.float64).ravel()
+        library = model_library(model)
+
+        if library == 'xgboost' and XGBOOST_AVAILABLE:
+            dataset = self.xgboost(x, y)
+            params = dict(model.get_xgb_params(), max_bin=self.bins('xgboost'))
+            rounds = model.n_estimators or 100
+            with self.profiler.stage(f'fit_{name}', len(x)):
+                booster = xgb.train(params, dataset, num_boost_round=rounds)
+            return BoosterRegressor(booster, library, params, rounds, x.shape[1])
+
+        if library == 'lightgbm' and LIGHTGBM_AVAILABLE:
+            dataset = self.lightgbm(x, y)
+            params = {k: v for k, v in model.get_params().items() if v is not None and k not in LGBM_SKLEARN_ONLY}
+            params['boosting'] = params.pop('boosting_type', 'gbdt')
+            params['objective'] = params.get('objective') or 'regression'
+            params['max_bin'] = self.bins('lightgbm')
+            rounds = model.n_estimators
+            with self.profiler.stage(f'fit_{name}', len(x)):
+                booster = lgb.train(params, dataset, num_boost_round=rounds)
+            return BoosterRegressor(booster, library, params, rounds, x.shape[1])
+
+        if library == 'catboost' and CATBOOST_AVAILABLE:
+            pool = self.catboost(x, y, model.get_params().get('border_count'))
+            with self.profiler.stage(f'fit_{name}', len(x)):
+                model.fit(pool)
+            return model
+
+        with self.profiler.stage(f'fit_{name}', len(x)):
+            model.fit(x, y)
+        return model
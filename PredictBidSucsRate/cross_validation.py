@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+모델 계열별 K-fold 교차 검증 (프로세스 병렬, 공유 메모리)
+
+학습 스크립트는 실행마다 무작위인 random_state=self.rnd_num으로 train_test_split을 한 번만 하므로
+점수가 실행마다 흔들리고 서로 비교하기 어렵다. 이 모듈은 같은 seed의 K개 fold × 대상 3개 × 모델 계열을
+프로세스 풀에서 병렬로 학습/평가한다.
+
+- 특성은 hyperparameter_search의 특성 캐시(x.npy, y.npy)를 한 번 만들어 재사용
+- 부모 프로세스가 특성 행렬을 공유 메모리(multiprocessing.shared_memory)에 한 번 올리고, 작업자는 복사 없이 붙는다
+- 작업자 메모리 제한: 작업자 수(--jobs)와 작업자별 주소 공간 상한(--worker-memory-mb, POSIX).
+  fold 작업은 모델을 반환하지 않고 지표만 돌려주므로 작업이 끝나면 모델 메모리는 해제된다
+- fold마다 학습 행으로 StandardScaler를 다시 맞춘다 (검증 fold 정보가 정규화에 섞이지 않음)
+- 결과: fold별 MSE, MAE, R2, 학습/예측 시간, 작업자 RSS와 계열/대상별 평균/표준편차 (JSON, 표)
+
+ex)
+python cross_validation.py data/result_data_cst.csv --families mlp rf gb --folds 5 --jobs 4
+python cross_validation.py data/result_data_cst.csv --params res/best_params.json --output res/cv_cst.json
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from hyperparameter_search import build_feature_cache, build_model, base_models, SEARCH_SPACES, TARGET_NAMES
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+# 지표 (요약 표 순서)
+METRICS = ['R2', 'MSE', 'MAE']
+
+
+class SharedMatrix:
+    """numpy 배열을 공유 메모리에 올리고, 다른 프로세스에서 이름으로 붙는 래퍼"""
+
+    def __init__(self, array=None, spec=None):
+        """
+        Args:
+            array (np.ndarray): 공유 메모리에 복사할 배열 (부모 프로세스)
+            spec (dict): spec() 결과 (작업자 프로세스에서 붙을 때)
+        """
+        if array is not None:
+            array = np.ascontiguousarray(array)
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)
+            self.array[...] = array
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=spec['name'])
+            self.array = np.ndarray(tuple(spec['shape']), dtype=spec['dtype'], buffer=self.shm.buf)
+            self.array.flags.writeable = False
+            self.owner = False
+
+    def spec(self):
+        return {'name': self.shm.name, 'shape': list(self.array.shape), 'dtype': self.array.dtype.str}
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ===== 작업자 프로세스 =====
+
+_WORKER = {}
+
+
+def _init_worker(x_spec, y_spec, memory_mb):
+    """작업자 시작: 공유 메모리의 특성/대상 행렬에 붙고, 주소 공간 상한 설정"""
+    if memory_mb and RESOURCE_AVAILABLE:
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    _WORKER['x'] = SharedMatrix(spec=x_spec)
+    _WORKER['y'] = SharedMatrix(spec=y_spec)
+
+
+def worker_rss_mb():
+    """현재 작업자 메모리 (psutil이 없으면 최대 RSS)"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
+    if RESOURCE_AVAILABLE:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+    return None
+
+
+def run_fold(task):
+    """fold 하나: 학습 행으로 정규화 → 학습 → 검증 fold 예측/평가"""
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+
+    x, y = _WORKER['x'].array, _WORKER['y'].array
+    train_idx, test_idx = task['train'], task['test']
+    result = {'fit_sec': None, 'predict_sec': None, 'R2': None, 'MSE': None, 'MAE': None,
+              'worker_rss_mb': None, 'error': None}
+    try:
+        scaler = StandardScaler().fit(x[train_idx])
+        model, result['params'] = build_model(task['family'], task['target'], task['config'])
+        started = time.perf_counter()
+        model.fit(scaler.transform(x[train_idx]), y[train_idx, task['target']])
+        result['fit_sec'] = round(time.perf_counter() - started, 4)
+
+        x_test = scaler.transform(x[test_idx])
+        started = time.perf_counter()
+        predicted = np.asarray(model.predict(x_test), dtype=np.float64).ravel()
+        result['predict_sec'] = round(time.perf_counter() - started, 4)
+
+        actual = y[test_idx, task['target']]
+        result['R2'] = float(r2_score(actual, predicted))
+        result['MSE'] = float(mean_squared_error(actual, predicted))
+        result['MAE'] = float(mean_absolute_error(actual, predicted))
+    except Exception as e:  # MemoryError(주소 공간 상한) 등은 fold 실패로 기록
+        result['error'] = f"{type(e).__name__}: {e}"
+    rss = worker_rss_mb()
+    result['worker_rss_mb'] = None if rss is None else round(rss, 1)
+    return result
+
+
+# ===== 교차 검증 =====
+
+def fold_indices(n_rows, folds, seed):
+    """같은 seed면 항상 같은 fold (KFold shuffle)"""
+    from sklearn.model_selection import KFold
+
+    splitter = KFold(n_splits=folds, shuffle=True, random_state=seed)
+    return [(train.astype(np.int64), test.astype(np.int64)) for train, test in splitter.split(np.zeros(n_rows))]
+
+
+def load_params(path, family):
+    """best_params.json에서 계열의 대상별 설정 ({대상 번호: 설정})"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        entry = json.load(f).get(family, {}).get('models', {})
+    return {i: entry.get(f'model{i + 1}', {}).get('params', {}) for i in range(len(TARGET_NAMES))}
+
+
+def cross_validate(cache_dir, families, targets=(0, 1, 2), folds=5, seed=1, jobs=None,
+                   worker_memory_mb=None, params_path=None):
+    """
+    K-fold × 대상 × 계열 교차 검증
+
+    Args:
+        cache_dir (str): build_feature_cache() 결과 폴더
+        families (list): 모델 계열 (mlp, rf, gb, cb)
+        targets (tuple): 대상 번호 (0: 업체투찰률, 1: 예가투찰률, 2: 참여업체수)
+        folds (int): fold 수
+        jobs (int): 작업자 프로세스 수 (None이면 CPU 수)
+        worker_memory_mb (int): 작업자 주소 공간 상한 (MB, POSIX)
+        params_path (str): best_params.json (None이면 setupModels 기본 설정)
+
+    Returns:
+        list: fold별 결과 dict
+    """
+    x = np.load(os.path.join(cache_dir, 'x.npy'))
+    y = np.load(os.path.join(cache_dir, 'y.npy'))
+    splits = fold_indices(len(x), folds, seed)
+    tasks = []
+    for family in families:
+        configs = load_params(params_path, family)
+        for target in targets:
+            for fold, (train, test) in enumerate(splits):
+                tasks.append({'family': family, 'target': target, 'fold': fold, 'train': train, 'test': test,
+                              'config': configs.get(target, {})})
+
+    jobs = jobs or os.cpu_count() or 1
+    print(f"🔁 교차 검증: {', '.join(families)} × 대상 {len(targets)}개 × {folds} fold = {len(tasks)}건, "
+          f"작업자 {jobs}개, 공유 행렬 {(x.nbytes + y.nbytes) / 1024 / 1024:.1f}MB")
+
+    shared_x, shared_y = SharedMatrix(x), SharedMatrix(y)
+    del x, y
+    results = []
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(shared_x.spec(), shared_y.spec(), worker_memory_mb)) as pool:
+            futures = {pool.submit(run_fold, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                result = dict(family=task['family'], target=task['target'], target_name=TARGET_NAMES[task['target']],
+                              fold=task['fold'], train_rows=len(task['train']), test_rows=len(task['test']),
+                              **future.result())
+                results.append(result)
+                if result['error']:
+                    print(f"⚠️  {task['family']} {result['target_name']} fold {task['fold']}: {result['error']}")
+    finally:
+        shared_x.close()
+        shared_y.close()
+    print(f"✅ 교차 검증 완료 ({time.perf_counter() - started:.1f}초)")
+    return sorted(results, key=lambda r: (r['family'], r['target'], r['fold']))
+
+
+def summarize(results):
+    """계열/대상별 지표 평균/표준편차와 fold당 학습/예측 시간"""
+    frame = pd.DataFrame(results)
+    summary = []
+    for (family, target), group in frame.groupby(['family', 'target'], sort=True):
+        ok = group[group['error'].isna()]
+        entry = {'family': family, 'target': int(target), 'target_name': TARGET_NAMES[int(target)],
+                 'folds': int(len(ok)), 'failed': int(len(group) - len(ok))}
+        for name in METRICS + ['fit_sec', 'predict_sec']:
+            values = ok[name].astype(float)
+            entry[f'{name}_mean'] = float(values.mean()) if len(values) else None
+            entry[f'{name}_std'] = float(values.std(ddof=1)) if len(values) > 1 else None
+        entry['worker_rss_mb_max'] = float(ok['worker_rss_mb'].max()) if ok['worker_rss_mb'].notna().any() else None
+        summary.append(entry)
+    return summary
+
+
+def print_summary(summary):
+    """요약 표 (평균 ± 표준편차)"""
+    def fmt(mean, std, digits):
+        if mean is None:
+            return '-'
+        return f"{mean:.{digits}f}" + (f" ±{std:.{digits}f}" if std is not None else '')
+
+    rows = []
+    for entry in summary:
+        rows.append({
+            '계열': entry['family'],
+            '대상': entry['target_name'],
+            'fold': entry['folds'] if not entry['failed'] else f"{entry['folds']} (실패 {entry['failed']})",
+            'R2': fmt(entry['R2_mean'], entry['R2_std'], 4),
+            'MSE': fmt(entry['MSE_mean'], entry['MSE_std'], 6),
+            'MAE': fmt(entry['MAE_mean'], entry['MAE_std'], 6),
+            '학습(초)': fmt(entry['fit_sec_mean'], entry['fit_sec_std'], 2),
+            '예측(초)': fmt(entry['predict_sec_mean'], entry['predict_sec_std'], 3),
+            '작업자(MB)': '-' if entry['worker_rss_mb_max'] is None else round(entry['worker_rss_mb_max']),
+        })
+    print("="*80)
+    print(pd.DataFrame(rows).set_index(['계열', '대상']).to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 계열별 K-fold 교차 검증")
+    parser.add_argument('input', nargs='+', help="학습 CSV")
+    parser.add_argument('--families', nargs='+', default=['mlp', 'rf', 'gb', 'cb'], choices=sorted(SEARCH_SPACES))
+    parser.add_argument('--targets', nargs='+', type=int, default=[1, 2, 3], help="모델 번호 (1, 2, 3)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--bid-type', default='cst', help="입찰 유형 (cst면 특성 9개, mtrl/gdns는 7개)")
+    parser.add_argument('--bundle', default=None, help="텍스트 점수를 계산할 모델 묶음 (없으면 점수 컬럼 사용)")
+    parser.add_argument('--params', default=None, help="best_params.json (없으면 setupModels 기본 설정)")
+    parser.add_argument('--jobs', type=int, default=None, help="작업자 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--worker-memory-mb', type=int, default=None, help="작업자 주소 공간 상한 (MB, POSIX)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cache-dir', default=os.path.join('res', 'cache'), help="특성 캐시 상위 폴더")
+    parser.add_argument('--output', default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    families = []
+    for family in args.families:
+        try:
+            base_models(family, {})
+            families.append(family)
+        except Exception as e:
+            print(f"⚠️  {family}: 학습 스크립트를 불러올 수 없어 제외합니다 ({type(e).__name__}: {e})")
+    if not families:
+        return
+
+    cache_dir = build_feature_cache(args.input, args.cache_dir, args.bid_type, args.bundle, 0.0, args.seed)
+    results = cross_validate(cache_dir, families, [t - 1 for t in args.targets], args.folds, args.seed, args.jobs,
+                             args.worker_memory_mb, args.params)
+    summary = summarize(results)
+    print_summary(summary)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'inputs': args.input,
+                       'cache': cache_dir, 'settings': vars(args), 'summary': summary, 'folds': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+예측 결과 비동기 저장 클래스
+
+API 요청 스레드는 예측 결과를 제한된 크기의 큐에 넣기만 하고,
+백그라운드 쓰기 스레드가 큐를 모아 배치 단위로 ML_C 테이블에 저장한다.
+요청 처리 시간에는 DB I/O가 포함되지 않는다.
+
+ex)
+writer = AsyncPredictionWriter(lambda: PredictionResultManager(), model_version='rf.v0.1.1')
+writer.start()
+writer.submit({'입찰번호': '20240101-00', '입찰차수': '0', ...})
+writer.close()
+"""
+
+import queue
+import threading
+import time
+import pandas as pd
+
+
+class AsyncPredictionWriter:
+    """예측 결과를 큐에 모아 백그라운드 스레드에서 배치 저장하는 클래스"""
+
+    __STOP = object()
+
+    def __init__(self, sink_factory, insert_mode="REPLACE", max_queue_size=10000,
+                 batch_size=500, flush_interval=2.0, put_timeout=0.0, model_version="v0.1.1"):
+        """
+        Args:
+            sink_factory (callable): 저장 매니저(PredictionResultManager/SqlServerPredictionManager) 생성 함수.
+                                     SQLite 연결은 만든 스레드에서만 쓸 수 있으므로 쓰기 스레드 안에서 호출한다.
+            insert_mode (str): 저장 모드 (REPLACE, IGNORE, INSERT)
+            max_queue_size (int): 큐 최대 크기 (초과 시 버림 또는 대기)
+            batch_size (int): 이 건수가 모이면 즉시 저장
+            flush_interval (float): 이 시간(초)이 지나면 모인 건수와 관계없이 저장
+            put_timeout (float): 큐가 가득 찼을 때 요청 스레드가 기다릴 최대 시간(초). 0이면 기다리지 않고 버림
+            model_version (str): 저장 행의 모델버전 (예측 서버가 불러온 모델의 계열/버전)
+        """
+        self.sink_factory = sink_factory
+        self.insert_mode = insert_mode
+        self.model_version = model_version
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self.__queue = queue.Queue(maxsize=max_queue_size)
+        self.__thread = None
+        self.__sink = None
+        self.__lock = threading.Lock()
+        self.__counters = {
+            'submitted': 0,     # 큐에 들어간 건수
+            'dropped': 0,       # 큐가 가득 차서 버린 건수
+            'written': 0,       # 저장 완료 건수
+            'failed': 0,        # 저장 실패 건수
+            'flushes': 0,       # 배치 저장 횟수
+            'max_depth': 0,     # 관측된 최대 큐 길이
+        }
+
+    def start(self):
+        """쓰기 스레드 시작"""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self._run, name="AsyncPredictionWriter", daemon=True)
+            self.__thread.start()
+        return self
+
+    def submit(self, record):
+        """
+        예측 결과 1건을 큐에 넣음 (요청 스레드에서 호출)
+
+        Returns:
+            bool: 큐에 들어갔으면 True, 큐가 가득 차서 버렸으면 False
+        """
+        try:
+            if self.put_timeout > 0:
+                self.__queue.put(record, timeout=self.put_timeout)
+            else:
+                self.__queue.put_nowait(record)
+        except queue.Full:
+            self._count('dropped', 1)
+            return False
+
+        depth = self.__queue.qsize()
+        with self.__lock:
+            self.__counters['submitted'] += 1
+            if depth > self.__counters['max_depth']:
+                self.__counters['max_depth'] = depth
+        return True
+
+    def close(self, timeout=30.0):
+        """큐에 남은 결과를 모두 저장한 뒤 쓰기 스레드 종료"""
+        if self.__thread is None:
+            return
+
+        # 종료 신호는 큐가 가득 차 있어도 반드시 전달
+        self.__queue.put(self.__STOP)
+        self.__thread.join(timeout)
+        self.__thread = None
+        print(f"✅ 예측 결과 비동기 저장 종료: {self.stats()}")
+
+    def stats(self):
+        """카운터와 현재 큐 길이 반환"""
+        with self.__lock:
+            result = dict(self.__counters)
+        result['queued'] = self.__queue.qsize()
+        return result
+
+    def _count(self, name, n):
+        with self.__lock:
+            self.__counters[name] += n
+
+    def _run(self):
+        """쓰기 스레드: batch_size 또는 flush_interval 기준으로 모아서 저장"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self.__queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self.__STOP:
+                self._flush(batch)
+                return
+
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        """모인 결과를 한 번에 저장"""
+        if not batch:
+            return
+
+        try:
+            if self.__sink is None:
+                self.__sink = self.sink_factory()
+
+            result_df = pd.DataFrame(batch)
+            if hasattr(self.__sink, 'save_prediction_with_options'):
+                # SQLite용 메서드
+                self.__sink.save_prediction_with_options(result_df, model_version=self.model_version,
+                                                         insert_mode=self.insert_mode)
+            else:
+                # SQL Server용 메서드
+                self.__sink.save_prediction_results(result_df, model_version=self.model_version,
+                                                    insert_mode=self.insert_mode)
+
+            self._count('written', len(batch))
+        except Exception as e:
+            print(f"❌ 예측 결과 비동기 저장 실패 ({len(batch)}건): {e}")
+            self._count('failed', len(batch))
+        finally:
+            self._count('flushes', 1)
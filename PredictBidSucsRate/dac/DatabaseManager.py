@@ -12,11 +12,78 @@ db.select(query, param) //배열
 db.update(query, param)
 db.insert(query, param)
 db.delete(query, param)
+
+연결 프로파일 (연결 시 PRAGMA 적용)
+attr = ConnectionAttribute.build(name, dbname, path, setup_sql, profile="default")  # WAL, synchronous=NORMAL ...
+attr = ConnectionAttribute.build(name, dbname, path, setup_sql, profile="legacy")   # 롤백 저널, synchronous=FULL
 """
 import os
 import sqlite3
 
 
+# SQLite 연결 프로파일 (연결 직후 적용)
+#   journal_mode  : WAL이면 읽기가 쓰기를 기다리지 않음
+#   synchronous   : WAL에서 NORMAL은 커밋마다 fsync하지 않음 (체크포인트 시점에만)
+#   mmap_size     : 읽기를 메모리 맵으로 처리할 최대 크기 (바이트)
+#   cache_size    : 페이지 캐시 크기 (음수는 KiB 단위)
+#   busy_timeout  : 잠금 대기 시간 (밀리초)
+#   cached_statements : 연결별 준비된 문장(prepared statement) 캐시 크기
+#   legacy는 sqlite3 기본값을 명시한다. journal_mode는 DB 파일에 남으므로 비워 두면
+#   이전에 default로 연 ml_c.db의 WAL을 그대로 이어받는다.
+SQLITE_PROFILES = {
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+    },
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+        'cached_statements': 256,
+    },
+}
+
+# 연결 인자로 전달하는 항목 (나머지는 PRAGMA)
+SQLITE_CONNECT_OPTIONS = ('cached_statements',)
+
+
+def resolveProfile(profile):
+    """프로파일 이름 또는 dict를 PRAGMA 설정 dict로 변환"""
+    if profile is None:
+        return {}
+    if isinstance(profile, dict):
+        return dict(profile)
+    if profile in SQLITE_PROFILES:
+        return dict(SQLITE_PROFILES[profile])
+    raise Exception('존재하지 않은 연결 프로파일입니다: ' + str(profile))
+
+
+def connectSqlite(dbfile, profile='default', **kwargs):
+    """
+    sqlite3 연결을 열고 프로파일의 PRAGMA를 적용
+
+    journal_mode 변경은 다른 연결이 쓰는 중이면 실패할 수 있으므로 경고만 출력하고 계속 진행한다.
+    """
+    settings = resolveProfile(profile)
+    options = dict(kwargs)
+    for name in SQLITE_CONNECT_OPTIONS:
+        if name in settings:
+            options[name] = settings.pop(name)
+    if 'busy_timeout' in settings:
+        options.setdefault('timeout', settings['busy_timeout'] / 1000.0)
+
+    conn = sqlite3.connect(dbfile, **options)
+    for name, value in settings.items():
+        try:
+            conn.execute(f"PRAGMA {name}={value}").fetchall()
+        except sqlite3.OperationalError as e:
+            print(f'connectSqlite: PRAGMA {name}={value} 적용 실패 ({e})')
+    return conn
+
+
 class ConnectionAttribute:
 
     def __init__(self):
@@ -24,7 +91,8 @@ class ConnectionAttribute:
         self.__dbName = ""
         self.__dbPath = ""
         self.__connectionString = ""
-        self.__setup_sql = ""        
+        self.__setup_sql = ""
+        self.__profile = 'default'
     
     def setName(self, v):
         self.__name = v;
@@ -58,15 +126,23 @@ class ConnectionAttribute:
     
     def getSetupSql(self):
         return self.__setup_sql
+    
+    def setProfile(self, profile):
+        resolveProfile(profile)
+        self.__profile = profile
+    
+    def getProfile(self):
+        return self.__profile
         
     
     @classmethod
-    def build(cls, name, dbname, path, setup_sql):
+    def build(cls, name, dbname, path, setup_sql, profile='default'):
         attr = ConnectionAttribute()
         attr.setName(name)
         attr.setDbName(dbname)
         attr.setDbPath(path)
         attr.setSetupSql(setup_sql)
+        attr.setProfile(profile)
         return attr
     
 
@@ -82,9 +158,15 @@ class SqlCommand:
     def getConnection(self):
         return self.__conn.getConnection()
     
+    def getCursor(self):
+        # 명령 객체마다 커서 하나를 재사용 (문장 준비는 연결의 statement cache가 담당)
+        # 결과를 바로 다 읽는 select/selectOne/getValue/executeMany 전용 - 다음 호출이 결과를 덮어씀
+        if self.cursor is None:
+            self.cursor = self.getConnection().cursor()
+        return self.cursor
+    
     def select(self, query, param):
-        print('select')
-        c = self.getConnection().cursor().execute(query, param)
+        c = self.getCursor().execute(query, param)
         rows = c.fetchall()
         if rows != None and len(rows) > 0:
             return rows
@@ -92,8 +174,7 @@ class SqlCommand:
             return None
 
     def selectOne(self, query, param):
-        print('select')
-        c = self.getConnection().cursor().execute(query, param)
+        c = self.getCursor().execute(query, param)
         row = c.fetchone()
         if row != None and len(row) > 0:
             return row
@@ -102,29 +183,25 @@ class SqlCommand:
         
         
     def update(self, query, param):
-        print('update')
         self.executeNoResult(query, param)
         
         
     def delete(self, query, param):
-        print('delete')
         self.executeNoResult(query, param)
 
         
     def insert(self, query, param):
-        print('insert')        
         self.executeNoResult(query, param)      
 
     def getValue(self, query, param):
-        print('getValue')
-        val, = self.getConnection().cursor().execute(query, param)
+        val, = self.getCursor().execute(query, param)
         if val != None and len(val) > 0:
             return val
         else:
             return None        
     
     def execute(self, query, param):
-        print('execute ' + query)
+        # 결과를 나중에 읽을 수 있도록 공유 커서 대신 새 커서 사용 (문장 준비는 연결의 statement cache가 담당)
         result = self.getConnection().cursor().execute(query, param)
         if result != None:
             return result
@@ -132,14 +209,21 @@ class SqlCommand:
             return None
         
     def executeNoResult(self, query, param):
-        print('execute')
-        self.getConnection().cursor().execute(query, param)
+        self.getCursor().execute(query, param)
         self.getConnection().commit()             
         
+    def executeMany(self, query, params):
+        # 커밋하지 않음: 호출측에서 배치 단위로 comit() 호출
+        c = self.getCursor()
+        c.executemany(query, params)
+        return c.rowcount
+        
     def comit(self):
-        print('commit')
         self.getConnection().commit()        
     
+    def rollback(self):
+        self.getConnection().rollback()
+    
     def tableInfo(self, tablename):
         sql = "PRAGMA table_info('"+tablename+"')"
         param = ()
@@ -153,10 +237,11 @@ class SqlCommand:
 class Connection:
    
     def __init__(self):
-        print('Connection::__init__')
         self.__attr = ConnectionAttribute()
         self.__conn = None
-        self.__dbfile= None       
+        self.__dbfile= None
+        self.__command = None
+        self.__is_open = False
     
     @classmethod
     def of(cls, attr):
@@ -171,7 +256,7 @@ class Connection:
         self.__dbfile= self.__attr.getConnectionString()
         
         if(os.path.exists(self.__dbfile)):
-            self.__conn = sqlite3.connect(self.__dbfile)
+            self.__conn = connectSqlite(self.__dbfile, self.__attr.getProfile())
             self.__is_open = True
         else:
             self.__is_open = False
@@ -180,6 +265,7 @@ class Connection:
         if self.isValidConnection():
             self.__conn.close()
             self.__conn = None
+            self.__command = None
             self.__is_open = False
             
     def isOpen(self):
@@ -205,7 +291,10 @@ class Connection:
     
     def command(self):
         if self.isValidConnection():
-            return SqlCommand(self)
+            # 연결마다 명령 객체(커서)를 하나만 만들어 재사용
+            if self.__command is None:
+                self.__command = SqlCommand(self)
+            return self.__command
         else:
             raise Exception('Connection::command() 유효한 DB컨넥션이 아닙니다. ')
             
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+예측 결과 스트리밍 내보내기 클래스
+
+PredictionResultManager / SqlServerPredictionManager의 iter_prediction_results(fetchmany)로
+chunk 단위로 읽어 바로 파일에 쓴다. 전체 결과를 DataFrame이나 워크북으로 메모리에 올리지 않는다.
+
+- xlsx: xlsxwriter constant_memory 모드 (행을 쓰는 즉시 디스크로 내보냄, 시트당 최대 행 초과 시 다음 시트)
+- csv: 행 단위 기록 (.gz 확장자면 gzip 압축)
+- parquet: chunk마다 row group 하나 (pyarrow 필요)
+
+ex)
+exporter = PredictionResultExporter(PredictionResultManager())
+exporter.export('res/predict_result/export.xlsx')
+exporter.export('res/predict_result/export.csv.gz', chunk_size=50000)
+"""
+
+import os
+import csv
+import gzip
+import time
+from datetime import datetime, date
+
+
+# 숫자로 기록할 컬럼 (나머지는 문자열)
+NUMERIC_COLUMNS = {
+    '기초금액률': 'float', '낙찰하한률': 'float', '기초금액': 'float', '순공사원가': 'float', '간접비': 'float',
+    '공고기관점수': 'float', '공사지역점수': 'float', '키워드점수': 'float',
+    '업체투찰률_예측': 'float', '예가투찰률_예측': 'float', '참여업체수_예측': 'int',
+}
+
+# xlsx 시트당 최대 데이터 행 수 (헤더 1행 제외)
+EXCEL_MAX_ROWS = 1048575
+
+
+# 변환 없이 그대로 기록할 수 있는 타입
+NATIVE_TYPES = {type(None), int, float, str}
+
+
+def _normalize_columns(rows):
+    """
+    chunk를 컬럼 단위로 바꾸고, 드라이버 고유 타입(datetime, Decimal 등)이 있는 컬럼만 변환
+
+    SQLite 결과는 대부분 변환이 필요 없으므로 값마다 함수를 호출하지 않는다.
+    """
+    columns = [list(col) for col in zip(*rows)]
+    for i, col in enumerate(columns):
+        if not set(map(type, col)) <= NATIVE_TYPES:
+            columns[i] = [_cell(v) for v in col]
+    return columns
+
+
+def _normalize_rows(rows):
+    """_normalize_columns 결과를 다시 행 단위로 반환"""
+    return list(zip(*_normalize_columns(rows))) if rows else []
+
+
+def _cell(value):
+    """날짜/Decimal 등 드라이버 고유 타입을 파일에 쓸 수 있는 값으로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, (int, float, str)):
+        return value
+    try:
+        # SQL Server DECIMAL → decimal.Decimal
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class _ExcelChunkWriter:
+    """xlsxwriter constant_memory 모드 writer"""
+
+    def __init__(self, path, columns, sheet_name='예측결과'):
+        import xlsxwriter
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        self.header_format = self.workbook.add_format({'bold': True})
+        self.number_format = self.workbook.add_format({'num_format': '0.000000'})
+        self.columns = columns
+        self.sheet_name = sheet_name
+        self.sheet_no = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheet_no += 1
+        name = self.sheet_name if self.sheet_no == 1 else f"{self.sheet_name}_{self.sheet_no}"
+        self.sheet = self.workbook.add_worksheet(name)
+        self.sheet.freeze_panes(1, 0)
+        self.sheet.write_row(0, 0, self.columns, self.header_format)
+        for i, name in enumerate(self.columns):
+            if NUMERIC_COLUMNS.get(name) == 'float':
+                self.sheet.set_column(i, i, None, self.number_format)
+        self.row = 1
+
+    def write(self, rows):
+        for row in _normalize_rows(rows):
+            if self.row > EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.write_row(self.row, 0, row)
+            self.row += 1
+
+    def close(self):
+        self.workbook.close()
+
+
+class _CsvChunkWriter:
+    """CSV writer (엑셀에서 한글이 깨지지 않도록 utf-8-sig, .gz면 gzip)"""
+
+    def __init__(self, path, columns):
+        if path.endswith('.gz'):
+            self.file = gzip.open(path, 'wt', encoding='utf-8-sig', newline='')
+        else:
+            self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(_normalize_rows(rows))
+
+    def flush(self):
+        """기록한 행을 디스크까지 내보냄 (gzip은 압축 블록을 닫아 그때까지의 행을 읽을 수 있게 함)"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetChunkWriter:
+    """pyarrow ParquetWriter (chunk 하나 = row group 하나)"""
+
+    def __init__(self, path, columns, compression='zstd'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        types = {'float': pa.float64(), 'int': pa.int64()}
+        self.schema = pa.schema([(name, types.get(NUMERIC_COLUMNS.get(name), pa.string())) for name in columns])
+        self.columns = columns
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, rows):
+        if not rows:
+            return
+        arrays = []
+        for field, values in zip(self.schema, _normalize_columns(rows)):
+            if field.type == self.pa.string():
+                values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+            elif field.type == self.pa.int64():
+                values = [None if v is None else int(v) for v in values]
+            else:
+                values = [None if v is None else float(v) for v in values]
+            arrays.append(self.pa.array(values, type=field.type))
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class PredictionResultExporter:
+    """예측 결과를 chunk 단위로 읽어 xlsx/csv/parquet 파일로 내보내는 클래스"""
+
+    WRITERS = {
+        'xlsx': _ExcelChunkWriter,
+        'csv': _CsvChunkWriter,
+        'parquet': _ParquetChunkWriter,
+    }
+
+    def __init__(self, manager):
+        """
+        Args:
+            manager: iter_prediction_results(chunk_size, limit)를 제공하는 예측 결과 관리 객체
+        """
+        self.manager = manager
+
+    @staticmethod
+    def detect_format(path):
+        """확장자로 형식 결정 (.csv.gz는 csv)"""
+        name = path.lower()
+        if name.endswith('.gz'):
+            name = name[:-3]
+        ext = os.path.splitext(name)[1].lstrip('.')
+        return 'xlsx' if ext in ('xlsx', 'xls', '') else ext
+
+    def export(self, output_path, fmt=None, chunk_size=10000, limit=None, progress=True):
+        """
+        예측 결과를 파일로 내보내기
+
+        Args:
+            output_path (str): 출력 파일 경로
+            fmt (str): xlsx, csv, parquet (None이면 확장자로 결정)
+            chunk_size (int): fetchmany 단위 행 수
+            limit (int): 최대 행 수 (None이면 전체)
+            progress (bool): chunk마다 진행률 출력
+
+        Returns:
+            int: 내보낸 행 수
+        """
+        fmt = fmt or self.detect_format(output_path)
+        if fmt not in self.WRITERS:
+            raise ValueError(f"지원하지 않는 내보내기 형식: {fmt} (xlsx, csv, parquet)")
+
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        total = self._expected_rows(limit)
+        started = time.time()
+        written = 0
+        writer = None
+        try:
+            for columns, rows in self.manager.iter_prediction_results(chunk_size=chunk_size, limit=limit):
+                if writer is None:
+                    writer = self.WRITERS[fmt](output_path, columns)
+                writer.write(rows)
+                written += len(rows)
+
+                if progress and rows:
+                    elapsed = max(time.time() - started, 1e-9)
+                    pct = f" ({written / total * 100:.1f}%)" if total else ""
+                    print(f"진행: {written:,}건{pct} - {written / elapsed:,.0f}건/초")
+        finally:
+            if writer is not None:
+                writer.close()
+
+        print(f"✅ 내보내기 완료: {output_path} ({written:,}건, {time.time() - started:.1f}초)")
+        return written
+
+    def _expected_rows(self, limit):
+        """진행률 표시용 전체 건수 (요약 테이블에서 읽으므로 테이블 스캔 없음)"""
+        try:
+            summary = self.manager.get_prediction_summary()
+            total = int(summary[0]) if summary and summary[0] else 0
+        except Exception:
+            total = 0
+        return min(total, limit) if limit and total else total
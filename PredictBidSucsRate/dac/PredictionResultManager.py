@@ -4,17 +4,90 @@
 """
 
 import os
+import time
+import sqlite3
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from DatabaseManager import DatabaseManager, ConnectionAttribute
+from PredictionSummary import (SUMMARY_TABLE, SUMMARY_METRICS, aggregate_summary, summary_from_rows,
+                               merge_deltas, summary_statements, summary_totals_query)
+
+
+# ML_C 저장 컬럼 정의 (컬럼명, 변환 타입, 누락 시 기본값) - 예측일시 제외
+ML_C_INSERT_COLUMNS = [
+    ('입찰번호', 'str', ''),
+    ('입찰차수', 'str', ''),
+    ('기초금액률', 'float', 0.0),
+    ('낙찰하한률', 'float', 0.0),
+    ('기초금액', 'float', 0.0),
+    ('순공사원가', 'float', 0.0),
+    ('간접비', 'float', 0.0),
+    ('A계산여부', 'str', '0'),
+    ('순공사원가적용여부', 'str', '0'),
+    ('면허제한코드', 'str', ''),
+    ('공고기관코드', 'str', ''),
+    ('주공종명', 'str', ''),
+    ('공고기관명', 'str', ''),
+    ('공고기관점수', 'float', 0.0),
+    ('공사지역', 'str', ''),
+    ('공사지역점수', 'float', 0.0),
+    ('키워드', 'str', ''),
+    ('키워드점수', 'float', 0.0),
+    ('공고일자', 'raw', None),
+    ('개찰일시', 'raw', None),
+    ('예측_URL', 'str', ''),
+    ('업체투찰률_예측', 'float', 0.0),
+    ('예가투찰률_예측', 'float', 0.0),
+    ('참여업체수_예측', 'int', 0),
+]
+
+# ML_C 조회 결과 컬럼 순서 (SELECT *)
+ML_C_COLUMNS = [name for name, _, _ in ML_C_INSERT_COLUMNS] + ['등록일시', '예측일시', '모델버전']
+
+# 키셋 페이지 정렬 키 (예측일시, 입찰번호, 입찰차수) - 모두 역순
+ML_C_PAGE_ORDER = "ORDER BY 예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC"
+
+# 접두어 검색 상한 (UTF-8 바이트 비교에서 어떤 문자열보다 큰 문자)
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+# 요약 테이블 집계 컬럼 (모델버전, 예측일자, 건수, 합계/건수..., 최초/최근 예측일시)
+SUMMARY_GROUP_SELECT = (
+    "COALESCE(모델버전, ''), COALESCE(date(예측일시), '1900-01-01'), COUNT(*), "
+    + ", ".join(f"COALESCE(SUM({m}), 0), COUNT({m})" for m in SUMMARY_METRICS)
+    + ", MIN(예측일시), MAX(예측일시)"
+)
 
 
 class PredictionResultManager:
     """예측 결과를 데이터베이스에 저장하고 관리하는 클래스"""
     
-    def __init__(self):
-        self.db_manager = DatabaseManager.getInstance()
+    # 배치 커밋 단위 (행 수)
+    BULK_BATCH_SIZE = 5000
+    
+    # 보관 기간 삭제 배치 단위 (행 수) - 한 트랜잭션이 쓰기 잠금을 오래 잡지 않도록 제한
+    RETENTION_BATCH_SIZE = 5000
+    
+    # 대량 적재 시 적용할 SQLite PRAGMA
+    BULK_PRAGMAS = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",
+    ]
+    
+    def __init__(self, dedicated=False, db_dir=None):
+        """
+        Args:
+            dedicated (bool): True면 DatabaseManager의 공유 연결 대신 전용 연결 사용
+                              (sqlite3 연결은 만든 스레드에서만 쓸 수 있으므로 백그라운드 스레드용)
+            db_dir (str): ml_c.db가 있는 폴더 (None이면 dac 폴더, 지정하면 전용 연결 사용)
+        """
         self.db_name = "ml_c"
+        self.db_dir = db_dir
+        self.dedicated = dedicated or db_dir is not None
+        # 전용 연결은 공유 연결 맵을 쓰지 않으므로 DatabaseManager(기본 DB 연결들)를 초기화하지 않음
+        self.db_manager = None if self.dedicated else DatabaseManager.getInstance()
         self.setup_database()
     
     def setup_database(self):
@@ -27,125 +100,275 @@ class PredictionResultManager:
             db_attr = ConnectionAttribute.build(
                 self.db_name,
                 'ml_c.db',
-                current_dir,
+                self.db_dir or current_dir,
                 "file://" + os.path.join(current_dir, "setup", "prediction_result.sql")
             )
             
             # 데이터베이스 연결
-            self.connection = self.db_manager.use(self.db_name) if self.db_name in self.db_manager._DatabaseManager__map else None
+            self.connection = None
+            if not self.dedicated and self.db_name in self.db_manager._DatabaseManager__map:
+                self.connection = self.db_manager.use(self.db_name)
             
-            if not self.connection:
+            if self.dedicated:
+                from DatabaseManager import Connection
+                self.connection = Connection.of(db_attr)
+            elif not self.connection:
                 # 새로운 연결 생성
                 from DatabaseManager import Connection
                 self.connection = Connection.of(db_attr)
                 self.db_manager._DatabaseManager__map[self.db_name] = self.connection
             
+            # 스키마 마이그레이션 (테이블/인덱스가 없으면 생성)
+            if self.connection.isValidConnection():
+                self.connection.createIfNotExists()
+                self._migrate_schema()
+            
             print(f"✅ 예측 결과 데이터베이스 연결 완료: {self.db_name}")
             
         except Exception as e:
             print(f"❌ 데이터베이스 설정 실패: {e}")
             raise e
     
-    def save_prediction_results(self, result_df, model_version="v0.1.1", remarks=""):
+    def _migrate_schema(self):
+        """이전 버전 ml_c.db 보정: 모델버전 컬럼 추가, 비어 있는 요약 테이블 재구축"""
+        conn = self.connection.getConnection()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info('ML_C')").fetchall()]
+        if '모델버전' not in columns:
+            conn.execute("ALTER TABLE ML_C ADD COLUMN 모델버전 VARCHAR(50)")
+            conn.commit()
+        
+        has_summary = conn.execute(f"SELECT EXISTS (SELECT 1 FROM {SUMMARY_TABLE})").fetchone()[0]
+        has_rows = conn.execute("SELECT EXISTS (SELECT 1 FROM ML_C)").fetchone()[0]
+        if has_rows and not has_summary:
+            self.rebuild_prediction_summary()
+    
+    def close(self):
+        """전용 연결이면 해제 (DatabaseManager의 공유 연결은 그대로 둠)"""
+        if self.dedicated and self.connection is not None:
+            self.connection.disconnect()
+            self.connection = None
+    
+    def save_prediction_results(self, result_df, model_version="v0.1.1", remarks="", batch_size=None):
         """
-        예측 결과를 데이터베이스에 저장
+        예측 결과를 데이터베이스에 저장 (INSERT OR REPLACE)
         
         Args:
             result_df (pd.DataFrame): 예측 결과 데이터프레임
             model_version (str): 모델 버전
             remarks (str): 비고
+            batch_size (int): 한 번에 커밋할 행 수 (기본 BULK_BATCH_SIZE)
         """
         try:
             print("="*80)
             print("💾 예측 결과를 데이터베이스에 저장 중...")
             print("="*80)
             
-            # 데이터베이스 명령 객체 가져오기
-            db_cmd = self.connection.command()
-            
-            # 저장할 데이터 개수
-            total_rows = len(result_df)
-            saved_count = 0
-            
-            # 각 행을 데이터베이스에 저장
-            for index, row in result_df.iterrows():
-                try:
-                    # 데이터 준비
-                    data = self._prepare_row_data(row, model_version, remarks)
-                    
-                    # UPSERT 쿼리 실행 (INSERT OR REPLACE)
-                    upsert_query = """
-                        INSERT OR REPLACE INTO ML_C (
-                            입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액,
-                            순공사원가, 간접비, A계산여부, 순공사원가적용여부,
-                            면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                            공사지역, 공사지역점수, 키워드, 키워드점수,
-                            공고일자, 개찰일시, 예측_URL, 업체투찰률_예측, 예가투찰률_예측,
-                            참여업체수_예측, 예측일시
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """
-                    
-                    db_cmd.insert(upsert_query, data)
-                    saved_count += 1
-                    
-                    if saved_count % 100 == 0:
-                        print(f"진행률: {saved_count}/{total_rows} ({saved_count/total_rows*100:.1f}%)")
-                
-                except Exception as e:
-                    print(f"⚠️  행 {index} 저장 실패: {e}")
-                    continue
+            saved_count, updated_count, ignored_count = self._bulk_save(
+                result_df, model_version, remarks, "REPLACE", batch_size)
             
-            print(f"✅ 데이터베이스 저장 완료: {saved_count}/{total_rows} 건")
+            print(f"✅ 데이터베이스 저장 완료: {saved_count + updated_count}/{len(result_df)} 건")
             print("="*80)
             
-            return saved_count
+            return saved_count + updated_count
             
         except Exception as e:
             print(f"❌ 데이터베이스 저장 실패: {e}")
             raise e
     
-    def _prepare_row_data(self, row, model_version, remarks):
-        """행 데이터를 데이터베이스 저장 형식으로 준비"""
-        from datetime import datetime
+    def _bulk_save(self, result_df, model_version, remarks, insert_mode, batch_size=None):
+        """
+        데이터프레임 전체를 executemany로 배치 저장
+        
+        행마다 커밋하던 방식 대신 batch_size 행씩 하나의 트랜잭션으로 묶어 저장한다.
+        
+        Returns:
+            tuple: (새로 저장, 업데이트, 무시된) 건수
+        """
+        batch_size = batch_size or self.BULK_BATCH_SIZE
+        db_cmd = self.connection.command()
+        self._apply_bulk_pragmas()
+        
+        rows = self._prepare_bulk_data(result_df, model_version, remarks)
+        query = self._insert_query(insert_mode)
+        total_rows = len(rows)
+        
+        saved_count = 0
+        updated_count = 0
+        ignored_count = 0
+        
+        for start in range(0, total_rows, batch_size):
+            batch = rows[start:start + batch_size]
+            
+            # 쓰기 잠금을 먼저 잡음: 읽기 후 쓰기로 올리다 다른 쓰기(보관 기간 삭제 등)와 겹치면
+            # busy timeout 대기 없이 바로 'database is locked'가 나므로
+            self._begin_immediate(db_cmd)
+            try:
+                # 배치 키를 임시 테이블에 올려 기존 행(교체 대상)을 한 번에 확인
+                existing_rows = self._load_batch_keys(db_cmd, batch, insert_mode)
+                existing = len(existing_rows)
+                
+                try:
+                    affected = db_cmd.executeMany(query, batch)
+                except sqlite3.IntegrityError as e:
+                    # INSERT 모드에서 중복 키가 있으면 배치를 되돌리고 행 단위로 재시도
+                    db_cmd.rollback()
+                    print(f"⚠️  배치 {start}~{start + len(batch) - 1} 중복 데이터 발견, 행 단위로 재시도: {e}")
+                    self._begin_immediate(db_cmd)
+                    self._load_batch_keys(db_cmd, batch, insert_mode)
+                    affected = self._insert_rows_individually(db_cmd, query, batch)
+                
+                # 요약 테이블 갱신 (교체된 행은 빼고 저장된 행은 더함) - 저장과 같은 트랜잭션
+                # 교체된 행이 있던 (모델버전, 예측일자)는 최초/최근 예측일시를 다시 계산
+                replaced = aggregate_summary(existing_rows) if insert_mode == "REPLACE" else {}
+                saved = aggregate_summary(self._select_batch_rows(db_cmd))
+                self._apply_summary(db_cmd.getConnection(), merge_deltas(replaced, saved))
+                self._refresh_summary_bounds(db_cmd.getConnection(), replaced.keys())
+                db_cmd.comit()
+            except BaseException:
+                # 배치 일부만 저장되고 요약이 빠진 채 다음 커밋에 섞이지 않도록 되돌림
+                db_cmd.rollback()
+                raise
+            
+            if insert_mode == "REPLACE":
+                updated_count += existing
+                saved_count += len(batch) - existing
+            else:
+                saved_count += affected
+                ignored_count += len(batch) - affected
+            
+            done = start + len(batch)
+            print(f"진행률: {done}/{total_rows} ({done/total_rows*100:.1f}%)")
+        
+        return saved_count, updated_count, ignored_count
+    
+    def _apply_bulk_pragmas(self):
+        """대량 적재용 SQLite PRAGMA 설정 (트랜잭션 밖에서만 적용 가능)"""
+        conn = self.connection.getConnection()
+        if conn.in_transaction:
+            conn.rollback()  # 실패한 이전 작업이 남긴 트랜잭션은 커밋하지 않고 버림
+        
+        for pragma in self.BULK_PRAGMAS:
+            conn.execute(pragma)
+    
+    def _begin_immediate(self, db_cmd):
+        """쓰기 트랜잭션 시작 (쓰기 잠금을 얻을 때까지 busy timeout 동안 대기)"""
+        conn = db_cmd.getConnection()
+        if conn.in_transaction:
+            conn.rollback()  # 실패한 이전 작업이 남긴 트랜잭션은 커밋하지 않고 버림
+        conn.execute("BEGIN IMMEDIATE")
+    
+    def _insert_query(self, insert_mode):
+        """삽입 모드에 맞는 INSERT 문 생성"""
+        verb = {
+            "REPLACE": "INSERT OR REPLACE",
+            "IGNORE": "INSERT OR IGNORE",
+        }.get(insert_mode, "INSERT")
+        
+        columns = [name for name, _, _ in ML_C_INSERT_COLUMNS] + ['예측일시', '모델버전']
+        placeholders = ", ".join(["?"] * len(columns))
+        
+        return f"{verb} INTO ML_C ({', '.join(columns)}) VALUES ({placeholders})"
+    
+    def _load_batch_keys(self, db_cmd, batch, insert_mode):
+        """
+        배치 내 (입찰번호, 입찰차수)를 임시 키 테이블에 적재하고 이미 저장된 행을 반환
+        
+        REPLACE가 아니면 기존 키는 바뀌지 않으므로 키 테이블에서 제외해
+        저장 후 키 테이블에는 실제로 새로 쓰인 행의 키만 남는다.
+        
+        Returns:
+            pd.DataFrame: 배치 키와 겹치는 기존 행
+        """
+        conn = db_cmd.getConnection()
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS ML_C_BULK_KEYS (입찰번호 TEXT, 입찰차수 TEXT, PRIMARY KEY (입찰번호, 입찰차수))")
+        conn.execute("DELETE FROM ML_C_BULK_KEYS")
+        conn.executemany("INSERT OR IGNORE INTO ML_C_BULK_KEYS VALUES (?, ?)", (row[:2] for row in batch))
         
-        # 현재 시간
+        existing = self._select_batch_rows(db_cmd)
+        if insert_mode != "REPLACE":
+            conn.execute("""
+                DELETE FROM ML_C_BULK_KEYS
+                WHERE EXISTS (SELECT 1 FROM ML_C m WHERE m.입찰번호 = ML_C_BULK_KEYS.입찰번호 AND m.입찰차수 = ML_C_BULK_KEYS.입찰차수)
+            """)
+        
+        return existing
+    
+    def _select_batch_rows(self, db_cmd):
+        """임시 키 테이블에 있는 키의 ML_C 행 (요약 집계용 컬럼만)"""
+        columns = ['모델버전', '예측일시'] + SUMMARY_METRICS
+        rows = db_cmd.getConnection().execute(f"""
+            SELECT {', '.join('m.' + c for c in columns)}
+            FROM ML_C_BULK_KEYS k
+            JOIN ML_C m ON m.입찰번호 = k.입찰번호 AND m.입찰차수 = k.입찰차수
+        """).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+    
+    def _apply_summary(self, conn, deltas):
+        """요약 테이블에 변경분 반영 (커밋은 호출측)"""
+        for query, params in summary_statements(deltas):
+            conn.execute(query, params or ())
+    
+    def _insert_rows_individually(self, db_cmd, query, batch):
+        """중복 행만 건너뛰며 한 트랜잭션 안에서 행 단위로 저장"""
+        cursor = db_cmd.getConnection().cursor()
+        affected = 0
+        for data in batch:
+            try:
+                cursor.execute(query, data)
+                affected += 1
+            except sqlite3.IntegrityError as e:
+                print(f"⚠️  입찰번호 {data[0]}-{data[1]} 저장 실패 (중복 데이터): {e}")
+        
+        return affected
+    
+    def _prepare_bulk_data(self, result_df, model_version, remarks):
+        """
+        데이터프레임을 컬럼 단위로 변환하여 executemany용 파라미터 튜플 리스트로 준비
+        
+        ML_C_INSERT_COLUMNS 순서로 컬럼마다 한 번에 변환한다.
+        - 데이터프레임에 없는 컬럼: 기본값 (문자열 '' 또는 '0', 숫자 0.0)
+        - str: str(값) (None/NaN도 'None'/'nan' 문자열)
+        - float: 숫자로 변환, 변환할 수 없는 값은 NaN
+        - int: 숫자로 변환한 뒤 정수, 변환할 수 없는 값과 NaN은 0
+        - 날짜: datetime 컬럼은 'YYYY-MM-DD HH:MM:SS' 문자열, 비어 있으면 None
+        - 행마다 예측일시(현재 시각)와 모델버전을 붙임
+        """
         now = datetime.now()
+        n = len(result_df)
+        
+        columns = []
+        for name, kind, default in ML_C_INSERT_COLUMNS:
+            if name not in result_df.columns:
+                columns.append([default] * n)
+                continue
+            
+            col = result_df[name]
+            if kind == 'str':
+                values = np.asarray(col, dtype=object).astype(str).tolist()
+            elif kind == 'float':
+                values = pd.to_numeric(col, errors='coerce').astype('float64').tolist()
+            elif kind == 'int':
+                values = pd.to_numeric(col, errors='coerce').fillna(0).astype('int64').tolist()
+            else:
+                # 날짜 컬럼: sqlite3가 바인딩할 수 있는 문자열/None으로 변환
+                if pd.api.types.is_datetime64_any_dtype(col):
+                    col = col.dt.strftime('%Y-%m-%d %H:%M:%S')
+                values = col.astype(object).where(col.notna(), None).tolist()
+            columns.append(values)
         
-        return (
-            str(row.get('입찰번호', '')),
-            str(row.get('입찰차수', '')),
-            float(row.get('기초금액률', 0)),  # 새로 추가된 컬럼
-            float(row.get('낙찰하한률', 0)),
-            float(row.get('기초금액', 0)),
-            float(row.get('순공사원가', 0)),
-            float(row.get('간접비', 0)),
-            str(row.get('A계산여부', '0')),  # A값여부 -> A계산여부
-            str(row.get('순공사원가적용여부', '0')),  # 새로 추가된 컬럼
-            str(row.get('면허제한코드', '')),
-            str(row.get('공고기관코드', '')),
-            str(row.get('주공종명', '')),  # 새로 추가된 컬럼
-            str(row.get('공고기관명', '')),
-            float(row.get('공고기관점수', 0)),
-            str(row.get('공사지역', '')),
-            float(row.get('공사지역점수', 0)),
-            str(row.get('키워드', '')),
-            float(row.get('키워드점수', 0)),
-            row.get('공고일자', None),  # 새로 추가된 컬럼
-            row.get('개찰일시', None),  # 새로 추가된 컬럼
-            str(row.get('예측_URL', '')),  # 새로 추가된 컬럼
-            float(row.get('업체투찰률_예측', 0)),  # 컬럼명 변경
-            float(row.get('예가투찰률_예측', 0)),  # 컬럼명 변경
-            int(row.get('참여업체수_예측', 0)),  # 컬럼명 변경
-            now  # 예측일시
-        )
+        return list(zip(*columns, [now] * n, [model_version] * n))
     
     def get_prediction_results(self, limit=100, offset=0):
-        """저장된 예측 결과 조회"""
+        """
+        저장된 예측 결과 조회
+        
+        OFFSET은 건너뛴 행을 모두 읽으므로 깊은 페이지는 get_prediction_page를 사용
+        """
         try:
             db_cmd = self.connection.command()
-            query = """
+            query = f"""
                 SELECT * FROM ML_C 
-                ORDER BY 예측일시 DESC 
+                {ML_C_PAGE_ORDER}
                 LIMIT ? OFFSET ?
             """
             results = db_cmd.select(query, (limit, offset))
@@ -154,6 +377,89 @@ class PredictionResultManager:
             print(f"❌ 데이터 조회 실패: {e}")
             return None
     
+    def get_prediction_page(self, limit=100, after=None):
+        """
+        키셋 페이지 조회 (예측일시, 입찰번호, 입찰차수 역순)
+        
+        Args:
+            limit (int): 페이지 크기
+            after (tuple): 이전 페이지의 next_cursor (None이면 첫 페이지)
+        
+        Returns:
+            tuple: (결과 행 리스트 또는 None, 다음 페이지 커서 또는 None)
+        """
+        try:
+            db_cmd = self.connection.command()
+            if after is None:
+                query = f"SELECT * FROM ML_C {ML_C_PAGE_ORDER} LIMIT ?"
+                params = (limit,)
+            else:
+                query = f"""
+                    SELECT * FROM ML_C 
+                    WHERE (예측일시, 입찰번호, 입찰차수) < (?, ?, ?)
+                    {ML_C_PAGE_ORDER}
+                    LIMIT ?
+                """
+                params = tuple(after) + (limit,)
+            results = db_cmd.select(query, params)
+            return results, self.next_cursor(results, limit)
+        except Exception as e:
+            print(f"❌ 데이터 조회 실패: {e}")
+            return None, None
+    
+    def iter_prediction_results(self, chunk_size=10000, limit=None):
+        """
+        예측 결과를 예측일시 역순으로 chunk_size 행씩 읽는 제너레이터 (fetchmany)
+        
+        Yields:
+            tuple: (컬럼명 리스트, 행 리스트) - 결과가 없어도 한 번은 반환
+        """
+        query = f"SELECT * FROM ML_C {ML_C_PAGE_ORDER}"
+        params = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        
+        cursor = self.connection.getConnection().cursor()
+        try:
+            cursor.execute(query, params)
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchmany(chunk_size)
+            yield columns, rows
+            while rows:
+                rows = cursor.fetchmany(chunk_size)
+                if rows:
+                    yield columns, rows
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def next_cursor(results, limit):
+        """페이지 마지막 행의 (예측일시, 입찰번호, 입찰차수) - 마지막 페이지면 None"""
+        if not results or len(results) < limit:
+            return None
+        last = results[-1]
+        return (last[ML_C_COLUMNS.index('예측일시')], last[0], last[1])
+    
+    def search_by_bid_number(self, bid_number, limit=1000):
+        """
+        입찰번호 접두어 검색
+        
+        LIKE '%x%'는 전체 스캔이므로 기본키 (입찰번호, 입찰차수) 인덱스를 타는 범위 조건으로 검색
+        """
+        try:
+            db_cmd = self.connection.command()
+            query = """
+                SELECT * FROM ML_C 
+                WHERE 입찰번호 >= ? AND 입찰번호 < ?
+                ORDER BY 입찰번호, 입찰차수
+                LIMIT ?
+            """
+            return db_cmd.select(query, (bid_number, bid_number + PREFIX_UPPER_BOUND, limit))
+        except Exception as e:
+            print(f"❌ 검색 실패: {e}")
+            return None
+    
     def get_prediction_count(self):
         """저장된 예측 결과 개수 조회"""
         try:
@@ -165,41 +471,142 @@ class PredictionResultManager:
             print(f"❌ 데이터 개수 조회 실패: {e}")
             return 0
     
-    def delete_old_predictions(self, days=30):
-        """오래된 예측 결과 삭제 (기본 30일)"""
+    def delete_old_predictions(self, days=30, batch_size=None):
+        """
+        오래된 예측 결과 삭제 (기본 30일)
+        
+        한 번의 DELETE 대신 batch_size건씩 짧은 트랜잭션으로 나눠 삭제하므로
+        삭제 중에도 배치 저장이 오래 기다리지 않는다. 아카이브/스케줄은 PredictionRetentionJob 사용.
+        
+        Returns:
+            int: 삭제 건수
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+        deleted = 0
         try:
-            db_cmd = self.connection.command()
-            query = """
-                DELETE FROM ML_C 
-                WHERE 예측일시 < datetime('now', '-{} days')
-            """.format(days)
-            db_cmd.delete(query, ())
-            print(f"✅ {days}일 이전 예측 결과 삭제 완료")
+            while True:
+                result = self.delete_prediction_batch(cutoff, batch_size)
+                deleted += result['deleted']
+                if result['deleted'] == 0:
+                    break
+            print(f"✅ {days}일 이전 예측 결과 {deleted}건 삭제 완료")
         except Exception as e:
             print(f"❌ 오래된 데이터 삭제 실패: {e}")
+        return deleted
+    
+    def delete_prediction_batch(self, cutoff, batch_size=None, fetch_rows=False, before_commit=None):
+        """
+        cutoff 이전 예측 결과 중 가장 오래된 batch_size건을 키 범위로 삭제 (트랜잭션 1회)
+        
+        (예측일시, 입찰번호, 입찰차수) 순으로 batch_size번째 키까지를 범위 조건으로 삭제하고
+        요약 테이블도 같은 트랜잭션에서 차감한다.
+        
+        Args:
+            cutoff (datetime): 이 시각 이전 예측 결과 삭제
+            batch_size (int): 배치 행 수 (기본 RETENTION_BATCH_SIZE)
+            fetch_rows (bool): 삭제한 행 전체를 반환할지 여부
+            before_commit (callable): 삭제한 행이 있으면 커밋 직전에 호출되는 함수 (columns, rows).
+                                      예외를 던지면 삭제를 롤백한다 (아카이브를 먼저 기록할 때 사용)
+        
+        Returns:
+            dict: deleted(삭제 건수), columns/rows(fetch_rows일 때 삭제한 행),
+                  lock_wait(쓰기 잠금 대기 초), delete_sec(잠금 대기를 포함한 삭제 트랜잭션 초)
+        """
+        batch_size = batch_size or self.RETENTION_BATCH_SIZE
+        keep_rows = fetch_rows or before_commit is not None
+        conn = self.connection.getConnection()
+        if conn.in_transaction:
+            conn.rollback()  # 실패한 이전 작업이 남긴 트랜잭션은 커밋하지 않고 버림
+        
+        # 쓰기 잠금을 먼저 잡아 대기 시간을 측정 (busy timeout까지 대기)
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        lock_wait = time.perf_counter() - started
+        
+        try:
+            cursor = conn.execute(f"""
+                SELECT {'*' if keep_rows else '예측일시, 입찰번호, 입찰차수'} FROM ML_C
+                WHERE 예측일시 < ?
+                ORDER BY 예측일시, 입찰번호, 입찰차수
+                LIMIT ?
+            """, (cutoff, batch_size))
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+            if not rows:
+                conn.rollback()
+                return {'deleted': 0, 'columns': columns, 'rows': [], 'lock_wait': lock_wait,
+                        'delete_sec': time.perf_counter() - started}
+            
+            last = rows[-1]
+            if keep_rows:
+                last = (last[columns.index('예측일시')], last[0], last[1])
+            key_range = "WHERE 예측일시 < ? AND (예측일시, 입찰번호, 입찰차수) <= (?, ?, ?)"
+            params = (cutoff,) + tuple(last)
+            
+            removed = summary_from_rows(conn.execute(
+                f"SELECT {SUMMARY_GROUP_SELECT} FROM ML_C {key_range} GROUP BY 1, 2", params).fetchall())
+            deleted = conn.execute(f"DELETE FROM ML_C {key_range}", params).rowcount
+            self._apply_summary(conn, merge_deltas(removed, {}))
+            self._refresh_summary_bounds(conn, removed.keys())
+            if before_commit is not None:
+                before_commit(columns, rows)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        
+        return {'deleted': deleted, 'columns': columns, 'rows': rows if fetch_rows else None,
+                'lock_wait': lock_wait, 'delete_sec': time.perf_counter() - started}
+    
+    def _refresh_summary_bounds(self, conn, keys):
+        """행이 빠진 (모델버전, 예측일자)의 최초/최근 예측일시를 해당 일자 범위만 읽어 다시 계산"""
+        for version, day in keys:
+            conn.execute(f"""
+                UPDATE {SUMMARY_TABLE} SET
+                    최초예측일시 = (SELECT MIN(예측일시) FROM ML_C WHERE COALESCE(모델버전, '') = ?
+                                   AND 예측일시 >= ? AND 예측일시 < date(?, '+1 day')),
+                    최근예측일시 = (SELECT MAX(예측일시) FROM ML_C WHERE COALESCE(모델버전, '') = ?
+                                   AND 예측일시 >= ? AND 예측일시 < date(?, '+1 day'))
+                WHERE 모델버전 = ? AND 예측일자 = ?
+            """, (version, day, day, version, day, day, version, day))
+    
+    def rebuild_prediction_summary(self):
+        """ML_C 전체를 다시 집계하여 요약 테이블 재구축 (불일치 보정용)"""
+        try:
+            db_cmd = self.connection.command()
+            conn = db_cmd.getConnection()
+            conn.execute(f"DELETE FROM {SUMMARY_TABLE}")
+            conn.execute(f"INSERT INTO {SUMMARY_TABLE} SELECT {SUMMARY_GROUP_SELECT} FROM ML_C GROUP BY 1, 2")
+            db_cmd.comit()
+            count = conn.execute(f"SELECT COUNT(*) FROM {SUMMARY_TABLE}").fetchone()[0]
+            print(f"✅ 요약 테이블 재구축 완료: {count}개 (모델버전, 예측일자)")
+            return count
+        except Exception as e:
+            self.connection.getConnection().rollback()
+            print(f"❌ 요약 테이블 재구축 실패: {e}")
+            return None
     
     def get_prediction_summary(self):
-        """예측 결과 요약 통계 조회"""
+        """예측 결과 요약 통계 조회 (요약 테이블만 읽음)"""
         try:
             db_cmd = self.connection.command()
-            query = """
-                SELECT 
-                    COUNT(*) as 총건수,
-                    AVG(업체투찰률_예측) as 평균업체투찰률,
-                    AVG(예가투찰률_예측) as 평균예가투찰률,
-                    AVG(참여업체수_예측) as 평균참여업체수,
-                    MIN(예측일시) as 최초예측일시,
-                    MAX(예측일시) as 최근예측일시
-                FROM ML_C
-            """
-            result = db_cmd.selectOne(query, ())
+            result = db_cmd.selectOne(summary_totals_query(), ())
             return result
         except Exception as e:
             print(f"❌ 요약 통계 조회 실패: {e}")
             return None
     
+    def get_prediction_summary_by_model(self):
+        """모델버전별 요약 통계 조회 (모델버전, 총건수, 평균..., 최초/최근 예측일시)"""
+        try:
+            db_cmd = self.connection.command()
+            return db_cmd.select(summary_totals_query(group_by_model=True), ())
+        except Exception as e:
+            print(f"❌ 요약 통계 조회 실패: {e}")
+            return None
+    
     def save_prediction_with_options(self, result_df, model_version="v0.1.1", remarks="", 
-                                   insert_mode="REPLACE"):
+                                   insert_mode="REPLACE", batch_size=None):
         """
         예측 결과를 다양한 옵션으로 저장
         
@@ -210,87 +617,16 @@ class PredictionResultManager:
             insert_mode (str): 삽입 모드
                 - "REPLACE": 기존 데이터가 있으면 교체 (UPSERT)
                 - "IGNORE": 기존 데이터가 있으면 무시
-                - "INSERT": 기존 데이터가 있으면 오류 발생
+                - "INSERT": 기존 데이터가 있으면 오류 발생 (해당 행은 무시로 집계)
+            batch_size (int): 한 번에 커밋할 행 수 (기본 BULK_BATCH_SIZE)
         """
         try:
             print("="*80)
             print(f"💾 예측 결과 저장 중... (모드: {insert_mode})")
             print("="*80)
             
-            # 데이터베이스 명령 객체 가져오기
-            db_cmd = self.connection.command()
-            
-            # 저장할 데이터 개수
-            total_rows = len(result_df)
-            saved_count = 0
-            updated_count = 0
-            ignored_count = 0
-            
-            # 각 행을 데이터베이스에 저장
-            for index, row in result_df.iterrows():
-                try:
-                    # 데이터 준비
-                    data = self._prepare_row_data(row, model_version, remarks)
-                    
-                    # 삽입 모드에 따른 쿼리 선택
-                    if insert_mode == "REPLACE":
-                        query = """
-                            INSERT OR REPLACE INTO ML_C (
-                                입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액,
-                                순공사원가, 간접비, A계산여부, 순공사원가적용여부,
-                                면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                공사지역, 공사지역점수, 키워드, 키워드점수,
-                                공고일자, 개찰일시, 예측_URL, 업체투찰률_예측, 예가투찰률_예측,
-                                참여업체수_예측, 예측일시
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                    elif insert_mode == "IGNORE":
-                        query = """
-                            INSERT OR IGNORE INTO ML_C (
-                                입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액,
-                                순공사원가, 간접비, A계산여부, 순공사원가적용여부,
-                                면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                공사지역, 공사지역점수, 키워드, 키워드점수,
-                                공고일자, 개찰일시, 예측_URL, 업체투찰률_예측, 예가투찰률_예측,
-                                참여업체수_예측, 예측일시
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                    else:  # INSERT
-                        query = """
-                            INSERT INTO ML_C (
-                                입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액,
-                                순공사원가, 간접비, A계산여부, 순공사원가적용여부,
-                                면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                공사지역, 공사지역점수, 키워드, 키워드점수,
-                                공고일자, 개찰일시, 예측_URL, 업체투찰률_예측, 예가투찰률_예측,
-                                참여업체수_예측, 예측일시
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                    
-                    # 기존 데이터 존재 여부 확인 (REPLACE 모드에서만)
-                    if insert_mode == "REPLACE":
-                        check_query = "SELECT COUNT(*) FROM ML_C WHERE 입찰번호 = ? AND 입찰차수 = ?"
-                        existing = db_cmd.getValue(check_query, (str(row.get('입찰번호', '')), str(row.get('입찰차수', ''))))
-                        if existing and existing[0] > 0:
-                            updated_count += 1
-                        else:
-                            saved_count += 1
-                    else:
-                        saved_count += 1
-                    
-                    # 쿼리 실행
-                    db_cmd.insert(query, data)
-                    
-                    if (saved_count + updated_count + ignored_count) % 100 == 0:
-                        print(f"진행률: {saved_count + updated_count + ignored_count}/{total_rows} ({(saved_count + updated_count + ignored_count)/total_rows*100:.1f}%)")
-                
-                except Exception as e:
-                    if insert_mode == "INSERT":
-                        print(f"⚠️  행 {index} 저장 실패 (중복 데이터): {e}")
-                        ignored_count += 1
-                    else:
-                        print(f"⚠️  행 {index} 저장 실패: {e}")
-                        continue
+            saved_count, updated_count, ignored_count = self._bulk_save(
+                result_df, model_version, remarks, insert_mode, batch_size)
             
             print(f"✅ 데이터베이스 저장 완료:")
             print(f"   - 새로 저장: {saved_count}건")
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+예측 결과 보관 기간 정리 작업
+
+보관 기간(days)이 지난 예측 결과를 manager.delete_prediction_batch로 batch_size건씩
+짧은 트랜잭션으로 나눠 삭제한다. 배치 사이에 pause_sec만큼 쉬어 배치 저장이 잠금을 얻을 수 있게 하고,
+archive_dir을 지정하면 삭제한 행을 커밋 전에 gzip CSV로 기록하고 디스크로 내보내므로, 아카이브 기록이
+실패하면 그 배치의 삭제는 롤백된다. 처리량과 삭제 트랜잭션 시간(SQLite는 쓰기 잠금 대기 포함)을 보고한다.
+
+ex)
+job = PredictionRetentionJob(lambda: PredictionResultManager(dedicated=True), days=90,
+                             archive_dir='res/archive')
+job.run()                       # 즉시 실행
+job.schedule(interval_sec=86400) # lib.BackgroundSchedulers로 하루 한 번 실행
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+from PredictionResultExporter import PredictionResultExporter
+
+
+class PredictionRetentionJob:
+    """오래된 예측 결과를 배치 단위로 삭제(및 아카이브)하는 작업 클래스"""
+
+    def __init__(self, manager_factory, days=30, batch_size=5000, archive_dir=None,
+                 pause_sec=0.05, max_batches=None):
+        """
+        Args:
+            manager_factory (callable): PredictionResultManager/SqlServerPredictionManager 생성 함수.
+                                        스케줄 실행 시 작업 스레드 안에서 호출된다 (SQLite는 dedicated=True 사용)
+            days (int): 보관 기간 (일)
+            batch_size (int): 트랜잭션 하나에서 삭제할 최대 행 수
+            archive_dir (str): 삭제한 행을 저장할 폴더 (None이면 아카이브 안함)
+            pause_sec (float): 배치 사이 대기 시간 (초)
+            max_batches (int): 한 번 실행에서 처리할 최대 배치 수 (None이면 끝까지)
+        """
+        self.manager_factory = manager_factory
+        self.days = days
+        self.batch_size = batch_size
+        self.archive_dir = archive_dir
+        self.pause_sec = pause_sec
+        self.max_batches = max_batches
+        self.last_report = None
+        self.__lock = threading.Lock()
+
+    def run(self):
+        """
+        보관 기간 정리 1회 실행 (이전 실행이 끝나지 않았으면 건너뜀)
+
+        Returns:
+            dict: 삭제 건수, 배치 수, 소요 시간, 초당 삭제 건수, 삭제 트랜잭션 합계/최대,
+                  쓰기 잠금 대기 합계/최대 (측정하지 않는 매니저는 None), 아카이브 파일
+        """
+        if not self.__lock.acquire(blocking=False):
+            print("⚠️  이전 보관 기간 정리 작업이 실행 중이므로 건너뜁니다.")
+            return None
+
+        try:
+            return self._run()
+        finally:
+            self.__lock.release()
+
+    def _run(self):
+        manager = self.manager_factory()
+        try:
+            return self._purge(manager)
+        finally:
+            # 실행마다 새로 만든 매니저의 전용 연결 해제
+            if hasattr(manager, 'close'):
+                manager.close()
+
+    def _purge(self, manager):
+        cutoff = datetime.now() - timedelta(days=self.days)
+        archive = {'path': None, 'writer': None}
+        report = {
+            'cutoff': cutoff.strftime('%Y-%m-%d %H:%M:%S'),
+            'deleted': 0,
+            'batches': 0,
+            'elapsed_sec': 0.0,
+            'rows_per_sec': 0.0,
+            'delete_sec': 0.0,
+            'max_delete_sec': 0.0,
+            'lock_wait_sec': None,
+            'max_lock_wait_sec': None,
+            'archive': None,
+        }
+
+        def write_archive(columns, rows):
+            # 삭제 커밋 전에 기록하고 디스크까지 내보냄 (실패하면 삭제가 롤백됨)
+            if archive['writer'] is None:
+                archive['path'] = self._archive_path()
+                archive['writer'] = PredictionResultExporter.WRITERS['csv'](archive['path'], columns)
+            archive['writer'].write(rows)
+            archive['writer'].flush()
+
+        print("="*80)
+        print(f"🗑️  보관 기간 정리 시작: {report['cutoff']} 이전 예측 결과 (배치 {self.batch_size}건)")
+        print("="*80)
+
+        started = time.perf_counter()
+        try:
+            while self.max_batches is None or report['batches'] < self.max_batches:
+                result = manager.delete_prediction_batch(
+                    cutoff, self.batch_size,
+                    before_commit=write_archive if self.archive_dir is not None else None)
+                if result['deleted'] == 0:
+                    break
+
+                report['batches'] += 1
+                report['deleted'] += result['deleted']
+                report['delete_sec'] += result['delete_sec']
+                report['max_delete_sec'] = max(report['max_delete_sec'], result['delete_sec'])
+                # 쓰기 잠금 대기는 측정할 수 있는 매니저(SQLite)만 보고
+                if 'lock_wait' in result:
+                    report['lock_wait_sec'] = (report['lock_wait_sec'] or 0.0) + result['lock_wait']
+                    report['max_lock_wait_sec'] = max(report['max_lock_wait_sec'] or 0.0, result['lock_wait'])
+
+                elapsed = time.perf_counter() - started
+                print(f"배치 {report['batches']}: {result['deleted']}건 삭제 (누적 {report['deleted']:,}건, "
+                      f"{report['deleted'] / max(elapsed, 1e-9):,.0f}건/초, 삭제 {result['delete_sec'] * 1000:.1f}ms)")
+
+                if self.pause_sec:
+                    time.sleep(self.pause_sec)
+        finally:
+            if archive['writer'] is not None:
+                archive['writer'].close()
+
+        report['elapsed_sec'] = time.perf_counter() - started
+        report['rows_per_sec'] = report['deleted'] / max(report['elapsed_sec'], 1e-9)
+        report['archive'] = archive['path']
+        self.last_report = report
+
+        print(f"✅ 보관 기간 정리 완료: {report['deleted']:,}건 / {report['batches']}배치, "
+              f"{report['elapsed_sec']:.1f}초 ({report['rows_per_sec']:,.0f}건/초), "
+              f"삭제 트랜잭션 합계 {report['delete_sec']:.3f}초 / 최대 {report['max_delete_sec'] * 1000:.1f}ms")
+        if report['lock_wait_sec'] is not None:
+            print(f"   쓰기 잠금 대기 합계 {report['lock_wait_sec']:.3f}초 / "
+                  f"최대 {report['max_lock_wait_sec'] * 1000:.1f}ms")
+        if archive['path']:
+            print(f"📦 아카이브: {archive['path']}")
+        print("="*80)
+        return report
+
+    def _archive_path(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        return os.path.join(self.archive_dir, f"ML_C_archive_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv.gz")
+
+    def schedule(self, interval_sec=86400, job_id='prediction_retention'):
+        """lib.BackgroundSchedulers에 주기 작업으로 등록"""
+        from lib.BackgroundSchedulers import BackgroundSchedulers, BackgroundJob
+        BackgroundSchedulers.getInstance().addJob(BackgroundJob.build(job_id, interval_sec, self.run))
+        print(f"보관 기간 정리 작업 등록: {job_id} ({interval_sec}초 간격, {self.days}일 보관)")
+        return job_id
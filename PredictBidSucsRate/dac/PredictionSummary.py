@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+예측 결과 요약(롤업) 테이블 유지 함수
+
+ML_C 전체를 매번 COUNT/AVG/MIN/MAX로 집계하지 않도록 (모델버전, 예측일자) 단위의
+건수/합계를 ML_C_SUMMARY에 누적한다. 저장/삭제 시 바뀐 행만 더하고 빼므로
+요약 조회는 롤업 테이블만 읽는다. SQLite와 SQL Server에서 같은 문장을 사용한다.
+
+ex)
+old = aggregate_summary(existing_rows_df)
+new = aggregate_summary(saved_rows_df)
+for query, params in summary_statements(merge_deltas(old, new)):
+    cursor.execute(query, params)
+"""
+
+import pandas as pd
+
+
+SUMMARY_TABLE = "ML_C_SUMMARY"
+
+# 평균을 구할 예측값 컬럼 (합계/건수를 각각 누적, NULL은 AVG와 같이 제외)
+SUMMARY_METRICS = ['업체투찰률_예측', '예가투찰률_예측', '참여업체수_예측']
+
+# 요약 테이블 값 컬럼 순서
+SUMMARY_VALUE_COLUMNS = [
+    '건수',
+    '업체투찰률_합계', '업체투찰률_건수',
+    '예가투찰률_합계', '예가투찰률_건수',
+    '참여업체수_합계', '참여업체수_건수',
+]
+
+# 예측일시가 없는 행의 예측일자
+UNKNOWN_DAY = '1900-01-01'
+
+
+def aggregate_summary(frame):
+    """
+    ML_C 행을 (모델버전, 예측일자) 단위로 집계
+
+    Args:
+        frame (pd.DataFrame): 모델버전, 예측일시, SUMMARY_METRICS 컬럼을 가진 데이터프레임
+
+    Returns:
+        dict: {(모델버전, 'YYYY-MM-DD'): [건수, 합계, 건수, ..., 최초예측일시, 최근예측일시]}
+    """
+    if frame is None or len(frame) == 0:
+        return {}
+
+    ts = pd.to_datetime(frame['예측일시'], errors='coerce')
+    work = pd.DataFrame({
+        '모델버전': frame['모델버전'].fillna('').astype(str).to_numpy(),
+        '예측일자': ts.dt.strftime('%Y-%m-%d').fillna(UNKNOWN_DAY).to_numpy(),
+        '예측일시': ts.to_numpy(),
+    })
+    for name in SUMMARY_METRICS:
+        work[name] = pd.to_numeric(frame[name], errors='coerce').to_numpy()
+
+    grouped = work.groupby(['모델버전', '예측일자'], sort=False)
+    agg = grouped.agg(
+        건수=('예측일시', 'size'),
+        최초예측일시=('예측일시', 'min'),
+        최근예측일시=('예측일시', 'max'),
+        **{f'{name}_합계': (name, 'sum') for name in SUMMARY_METRICS},
+        **{f'{name}_건수': (name, 'count') for name in SUMMARY_METRICS},
+    )
+
+    deltas = {}
+    for key, row in agg.iterrows():
+        values = [int(row['건수'])]
+        for name in SUMMARY_METRICS:
+            values += [float(row[f'{name}_합계']), int(row[f'{name}_건수'])]
+        values += [_to_datetime(row['최초예측일시']), _to_datetime(row['최근예측일시'])]
+        deltas[key] = values
+
+    return deltas
+
+
+def summary_from_rows(rows):
+    """
+    SQL로 미리 집계한 행을 aggregate_summary와 같은 형태로 변환
+
+    Args:
+        rows: (모델버전, 예측일자, 건수, 합계, 건수, 합계, 건수, 합계, 건수, 최초예측일시, 최근예측일시) 행 목록
+    """
+    deltas = {}
+    for row in rows or []:
+        row = list(row)
+        day = row[1] if row[1] is not None else UNKNOWN_DAY
+        deltas[(row[0] or '', str(day)[:10])] = [
+            int(row[2]),
+            float(row[3] or 0), int(row[4] or 0),
+            float(row[5] or 0), int(row[6] or 0),
+            float(row[7] or 0), int(row[8] or 0),
+            row[9], row[10],
+        ]
+    return deltas
+
+
+def merge_deltas(removed, added):
+    """
+    빠진 행(removed)은 빼고 들어온 행(added)은 더한 변경분 계산
+
+    최초/최근 예측일시는 들어온 행 기준으로만 넓힌다. 빠진 행이 있던 (모델버전, 예측일자)의 경계값은
+    호출측이 같은 트랜잭션에서 ML_C의 해당 일자 범위를 읽어 다시 계산한다
+    (PredictionResultManager._refresh_summary_bounds, SqlServerPredictionManager._summary_bound_statements).
+    """
+    deltas = {}
+    for key, values in removed.items():
+        deltas[key] = [-v for v in values[:-2]] + [None, None]
+
+    for key, values in added.items():
+        if key not in deltas:
+            deltas[key] = list(values)
+            continue
+        merged = deltas[key]
+        for i, v in enumerate(values[:-2]):
+            merged[i] += v
+        merged[-2], merged[-1] = values[-2], values[-1]
+
+    return deltas
+
+
+def summary_statements(deltas, table=SUMMARY_TABLE):
+    """
+    변경분을 요약 테이블에 반영하는 (쿼리, 파라미터) 목록
+
+    UPDATE 후 없으면 INSERT하는 이식 가능한 문장이므로 저장과 같은 트랜잭션에서 실행한다.
+    건수가 0이 된 (모델버전, 예측일자) 행은 삭제한다.
+    """
+    statements = []
+    value_set = ', '.join(f"{c} = {c} + ?" for c in SUMMARY_VALUE_COLUMNS)
+    insert_columns = ['모델버전', '예측일자'] + SUMMARY_VALUE_COLUMNS + ['최초예측일시', '최근예측일시']
+    key_match = "모델버전 = ? AND 예측일자 = ?"
+
+    for (version, day), values in deltas.items():
+        counts, first, last = values[:-2], values[-2], values[-1]
+        if not any(counts) and first is None:
+            continue
+
+        update_sql = f"UPDATE {table} SET {value_set}"
+        update_params = list(counts)
+        if first is not None:
+            update_sql += (", 최초예측일시 = CASE WHEN 최초예측일시 IS NULL OR 최초예측일시 > ? THEN ? ELSE 최초예측일시 END"
+                           ", 최근예측일시 = CASE WHEN 최근예측일시 IS NULL OR 최근예측일시 < ? THEN ? ELSE 최근예측일시 END")
+            update_params += [first, first, last, last]
+        update_sql += f" WHERE {key_match}"
+        statements.append((update_sql, tuple(update_params + [version, day])))
+
+        insert_sql = (f"INSERT INTO {table} ({', '.join(insert_columns)}) "
+                      f"SELECT {', '.join(['?'] * len(insert_columns))} "
+                      f"WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {key_match})")
+        statements.append((insert_sql, tuple([version, day] + list(counts) + [first, last, version, day])))
+
+    if statements:
+        statements.append((f"DELETE FROM {table} WHERE 건수 <= 0", None))
+
+    return statements
+
+
+def summary_totals_query(table=SUMMARY_TABLE, group_by_model=False):
+    """
+    요약 테이블에서 총건수/평균/최초·최근 예측일시를 읽는 쿼리
+
+    get_prediction_summary의 (총건수, 평균업체투찰률, 평균예가투찰률, 평균참여업체수,
+    최초예측일시, 최근예측일시) 순서를 유지한다. group_by_model이면 앞에 모델버전 컬럼이 붙는다.
+    """
+    select = """
+            COALESCE(SUM(건수), 0) as 총건수,
+            SUM(업체투찰률_합계) / NULLIF(SUM(업체투찰률_건수), 0) as 평균업체투찰률,
+            SUM(예가투찰률_합계) / NULLIF(SUM(예가투찰률_건수), 0) as 평균예가투찰률,
+            SUM(참여업체수_합계) / NULLIF(SUM(참여업체수_건수), 0) as 평균참여업체수,
+            MIN(최초예측일시) as 최초예측일시,
+            MAX(최근예측일시) as 최근예측일시"""
+    if group_by_model:
+        return f"SELECT 모델버전, {select} FROM {table} GROUP BY 모델버전 ORDER BY 모델버전"
+    return f"SELECT {select} FROM {table}"
+
+
+def _to_datetime(value):
+    """pandas Timestamp를 DB 드라이버가 바인딩할 수 있는 datetime으로 변환 (NaT는 None)"""
+    if pd.isna(value):
+        return None
+    return pd.Timestamp(value).to_pydatetime()
@@ -6,12 +6,14 @@ Created on Fri Mar 12 14:56:59 2021
 """
 
 import os
-import sqlite3
+from DatabaseManager import connectSqlite
 
 
 class PreferenceConfiguration:
     __dbname = "preference.db"
     __dbpath = os.path.dirname( os.path.abspath( __file__ ) )
+    __profile = "default"
+    __con = None
 
     @classmethod
     def dbPath(cls):
@@ -24,6 +26,13 @@ class PreferenceConfiguration:
     @classmethod
     def connectionString(cls):
         return cls.__dbpath+'\\'+cls.__dbname
+
+    @classmethod
+    def connection(cls):
+        # 모든 PreferenceTable이 연결 하나를 공유
+        if cls.__con == None:
+            cls.__con = connectSqlite(cls.connectionString(), cls.__profile)
+        return cls.__con
     
 
 class PreferenceTable:
@@ -33,7 +42,7 @@ class PreferenceTable:
     
     def __init__(self, tableName):
         self.__table = tableName
-        self.__con = sqlite3.connect(PreferenceConfiguration.connectionString()) 
+        self.__con = PreferenceConfiguration.connection()
         self.__cur = self.__con.cursor()
 
     def getValue(self, key):
@@ -1,16 +1,31 @@
 # -*- coding: utf-8 -*-
 """
 SQL Server 데이터베이스 연결 관리 클래스
+
+pyodbc/sqlalchemy는 connect()에서 불러온다 (ODBC 드라이버가 없는 환경에서도
+SqliteStandInConnection을 쓰는 매니저와 테스트는 이 모듈을 import할 수 있다).
 """
 
 import os
-import pyodbc
+import threading
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
 import urllib.parse
 
 
+def build_connection_string(host, port, database, username, password):
+    """pyodbc 연결 문자열 생성"""
+    return (
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={host},{port};"
+        f"DATABASE={database};"
+        f"UID={username};"
+        f"PWD={password};"
+        f"Encrypt=no;"
+        f"TrustServerCertificate=yes;"
+    )
+
+
 class SqlServerConnection:
     """SQL Server 연결 클래스"""
     
@@ -27,16 +42,13 @@ class SqlServerConnection:
     def connect(self):
         """SQL Server에 연결"""
         try:
+            import pyodbc
+            from sqlalchemy import create_engine
+            from sqlalchemy.orm import sessionmaker
+
             # pyodbc 연결 문자열
-            connection_string = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={self.host},{self.port};"
-                f"DATABASE={self.database};"
-                f"UID={self.username};"
-                f"PWD={self.password};"
-                f"Encrypt=no;"
-                f"TrustServerCertificate=yes;"
-            )
+            connection_string = build_connection_string(
+                self.host, self.port, self.database, self.username, self.password)
             
             # pyodbc 연결
             self.connection = pyodbc.connect(connection_string)
@@ -78,6 +90,30 @@ class SqlServerConnection:
             print(f"❌ 쿼리 실행 실패: {e}")
             return None
     
+    def iter_query(self, query, params=None, chunk_size=10000):
+        """
+        쿼리 결과를 chunk_size 행씩 읽어 (컬럼명 리스트, 행 리스트)로 반환하는 제너레이터
+        
+        전체 결과를 메모리에 올리지 않으므로 대량 내보내기에 사용한다.
+        결과가 없어도 (컬럼명, [])을 한 번 반환한다. 실패 시 예외를 그대로 전달한다.
+        """
+        cursor = self.connection.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            columns = [d[0] for d in cursor.description]
+            
+            rows = cursor.fetchmany(chunk_size)
+            yield columns, [tuple(row) for row in rows]
+            while rows:
+                rows = cursor.fetchmany(chunk_size)
+                if rows:
+                    yield columns, [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+    
     def execute_non_query(self, query, params=None):
         """쿼리 실행 (INSERT, UPDATE, DELETE)"""
         try:
@@ -93,10 +129,11 @@ class SqlServerConnection:
             self.connection.rollback()
             return 0
     
-    def execute_many(self, query, params_list):
-        """여러 개의 파라미터로 쿼리 실행"""
+    def execute_many(self, query, params_list, fast=False):
+        """여러 개의 파라미터로 쿼리 실행 (fast=True면 pyodbc fast_executemany 사용)"""
         try:
             cursor = self.connection.cursor()
+            cursor.fast_executemany = fast
             cursor.executemany(query, params_list)
             self.connection.commit()
             return cursor.rowcount
@@ -105,6 +142,92 @@ class SqlServerConnection:
             self.connection.rollback()
             return 0
     
+    def execute_transaction(self, statements, before_commit=None):
+        """
+        여러 쿼리를 하나의 트랜잭션으로 실행
+        
+        Args:
+            statements (list): [(query, params), ...] - params가 None이면 파라미터 없이 실행
+            before_commit (callable): 모든 쿼리 실행 후 커밋 직전에 같은 커서로 호출되는 함수 (cursor).
+                                      예외를 던지면 트랜잭션 전체를 롤백한다.
+            
+        Returns:
+            list: 각 쿼리의 영향받은 행 수 (실패 시 롤백 후 None)
+        """
+        try:
+            cursor = self.connection.cursor()
+            counts = []
+            for query, params in statements:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                counts.append(cursor.rowcount)
+            if before_commit is not None:
+                before_commit(cursor)
+            self.connection.commit()
+            return counts
+        except Exception as e:
+            print(f"❌ 트랜잭션 실행 실패: {e}")
+            self.connection.rollback()
+            return None
+    
+    def create_staging_table(self, table_name, columns):
+        """
+        대상 테이블과 같은 컬럼 구조의 세션 임시 테이블(#)을 만들고 이름을 반환
+        
+        임시 테이블은 이 연결(세션)에서만 보이며 연결이 끊기면 자동으로 삭제된다.
+        """
+        staging = f"#{table_name}_STAGE"
+        self.execute_non_query(f"""
+            IF OBJECT_ID('tempdb..{staging}') IS NOT NULL DROP TABLE {staging};
+            SELECT TOP 0 {', '.join(columns)} INTO {staging} FROM {table_name}
+        """)
+        return staging
+    
+    def create_changes_table(self, table_name, columns):
+        """
+        변경 행을 모으는 세션 임시 테이블(#)을 만들고 이름을 반환
+        
+        대상 테이블의 columns 앞에 부호 컬럼(-1: 빠진 행, +1: 새로 쓰인 행)이 붙는다.
+        """
+        changes = f"#{table_name}_CHANGES"
+        self.execute_non_query(f"""
+            IF OBJECT_ID('tempdb..{changes}') IS NOT NULL DROP TABLE {changes};
+            SELECT TOP 0 CAST(0 AS INT) AS 부호, {', '.join(columns)} INTO {changes} FROM {table_name}
+        """)
+        return changes
+    
+    def change_capture(self, changes, columns, sign, source, affected, params=None):
+        """
+        UPDATE/INSERT/DELETE 문이 바꾼 행을 changes 테이블에 남기는 방법
+        
+        SQL Server는 문장 자체에 OUTPUT {source}.* INTO 절을 넣으므로 문장이 실제로 바꾼 행만 남는다.
+        
+        Args:
+            changes (str): create_changes_table로 만든 테이블
+            columns (list): 남길 컬럼
+            sign (int): 부호 컬럼 값
+            source (str): 'deleted'(바뀌기 전 값) 또는 'inserted'(새로 쓰인 값)
+            affected (str): 문장이 바꿀 행을 고르는 FROM ... WHERE 절 (SqliteStandInConnection용)
+            params (tuple): affected의 파라미터
+        
+        Returns:
+            tuple: (문장에 넣을 OUTPUT 절, 문장 앞에 실행할 (쿼리, 파라미터) 목록)
+        """
+        output = (f"OUTPUT {int(sign)}, {', '.join(f'{source}.{c}' for c in columns)} "
+                  f"INTO {changes} (부호, {', '.join(columns)})")
+        return output, []
+    
+    def paging_clause(self, offset, limit):
+        """ORDER BY 뒤에 붙일 페이지 절과 파라미터 (OFFSET ... FETCH)"""
+        return "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY", (int(offset), int(limit))
+    
+    @contextmanager
+    def hold(self):
+        """단일 연결이므로 자기 자신을 그대로 사용 (SqlServerConnectionPool.hold와 같은 인터페이스)"""
+        yield self
+    
     def test_connection(self):
         """연결 테스트"""
         try:
@@ -120,6 +243,148 @@ class SqlServerConnection:
             return False
 
 
+class SqlServerConnectionPool:
+    """
+    SQL Server 연결 풀
+    
+    하나의 SQLAlchemy 엔진(QueuePool)을 공유하고, 스레드마다 별도의 pyodbc 연결을 체크아웃한다.
+    SqlServerConnection과 같은 메서드를 제공하므로 기존 코드에서 그대로 사용할 수 있다.
+    
+    - 각 메서드 호출은 풀에서 연결을 꺼내 실행하고 곧바로 반납한다.
+    - 임시 테이블처럼 세션 상태가 필요한 작업은 `with pool.hold():` 블록 안에서 실행하면
+      블록이 끝날 때까지 현재 스레드가 같은 연결을 사용한다.
+    - pool_pre_ping으로 체크아웃 시 연결 상태를 확인하고 끊긴 연결은 자동으로 다시 연결한다.
+    """
+    
+    def __init__(self, host, port, database, username, password,
+                 pool_size=5, max_overflow=5, pool_timeout=30, pool_recycle=1800, pre_ping=True):
+        self.host = host
+        self.port = port
+        self.database = database
+        self.username = username
+        self.password = password
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pre_ping = pre_ping
+        self.engine = None
+        self._local = threading.local()
+    
+    def connect(self):
+        """풀 엔진 생성 및 접속 확인"""
+        try:
+            from sqlalchemy import create_engine
+
+            connection_string = build_connection_string(
+                self.host, self.port, self.database, self.username, self.password)
+            params = urllib.parse.quote_plus(connection_string)
+            self.engine = create_engine(
+                f"mssql+pyodbc:///?odbc_connect={params}",
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_timeout=self.pool_timeout,
+                pool_recycle=self.pool_recycle,
+                pool_pre_ping=self.pre_ping,
+            )
+            
+            # 첫 연결로 접속 확인
+            with self.hold():
+                pass
+            
+            print(f"✅ SQL Server 연결 풀 생성: {self.host}:{self.port}/{self.database} "
+                  f"(pool_size={self.pool_size}, max_overflow={self.max_overflow})")
+            return True
+            
+        except Exception as e:
+            print(f"❌ SQL Server 연결 풀 생성 실패: {e}")
+            return False
+    
+    def disconnect(self):
+        """풀의 모든 연결 해제"""
+        try:
+            if self.engine:
+                self.engine.dispose()
+                self.engine = None
+            print("✅ SQL Server 연결 풀 해제 완료")
+        except Exception as e:
+            print(f"❌ 연결 풀 해제 실패: {e}")
+    
+    def _checkout(self):
+        """풀에서 연결을 꺼내 SqlServerConnection으로 감싸서 반환"""
+        con = SqlServerConnection(self.host, self.port, self.database, self.username, self.password)
+        con.connection = self.engine.raw_connection()
+        con.engine = self.engine
+        return con
+    
+    @contextmanager
+    def hold(self):
+        """블록이 끝날 때까지 현재 스레드에 같은 연결을 고정"""
+        con = getattr(self._local, 'connection', None)
+        if con is not None:
+            # 이미 고정된 연결이 있으면 재사용 (중첩 호출)
+            yield con
+            return
+        
+        con = self._checkout()
+        self._local.connection = con
+        try:
+            yield con
+        finally:
+            self._local.connection = None
+            # 풀 연결의 close()는 실제로 끊지 않고 풀에 반납
+            con.connection.close()
+    
+    def _run(self, method, *args, **kwargs):
+        with self.hold() as con:
+            return getattr(con, method)(*args, **kwargs)
+    
+    def execute_query(self, query, params=None):
+        """쿼리 실행 (SELECT)"""
+        return self._run('execute_query', query, params)
+    
+    def iter_query(self, query, params=None, chunk_size=10000):
+        """쿼리 결과를 chunk_size 행씩 반환 (반복이 끝날 때까지 같은 연결을 사용)"""
+        with self.hold() as con:
+            yield from con.iter_query(query, params, chunk_size)
+    
+    def execute_non_query(self, query, params=None):
+        """쿼리 실행 (INSERT, UPDATE, DELETE)"""
+        return self._run('execute_non_query', query, params)
+    
+    def execute_many(self, query, params_list, fast=False):
+        """여러 개의 파라미터로 쿼리 실행"""
+        return self._run('execute_many', query, params_list, fast=fast)
+    
+    def execute_transaction(self, statements, before_commit=None):
+        """여러 쿼리를 하나의 트랜잭션으로 실행"""
+        return self._run('execute_transaction', statements, before_commit=before_commit)
+    
+    def create_staging_table(self, table_name, columns):
+        """세션 임시 테이블 생성 (hold() 블록 안에서 사용해야 이후 쿼리와 같은 세션을 공유)"""
+        return self._run('create_staging_table', table_name, columns)
+    
+    def create_changes_table(self, table_name, columns):
+        """변경 행 임시 테이블 생성 (hold() 블록 안에서 사용)"""
+        return self._run('create_changes_table', table_name, columns)
+    
+    def change_capture(self, changes, columns, sign, source, affected, params=None):
+        """변경 행을 남기는 OUTPUT 절 (SqlServerConnection.change_capture)"""
+        return SqlServerConnection.change_capture(self, changes, columns, sign, source, affected, params)
+    
+    def paging_clause(self, offset, limit):
+        """ORDER BY 뒤에 붙일 페이지 절 (SqlServerConnection.paging_clause)"""
+        return SqlServerConnection.paging_clause(self, offset, limit)
+    
+    def test_connection(self):
+        """연결 테스트"""
+        return self._run('test_connection')
+    
+    def status(self):
+        """풀 상태 문자열 (체크아웃/대기 연결 수)"""
+        return self.engine.pool.status() if self.engine else "disconnected"
+
+
 class SqlServerManager:
     """SQL Server 데이터베이스 관리 클래스"""
     
@@ -130,6 +395,8 @@ class SqlServerManager:
             raise Exception("This class is a singleton!")
         else:
             self.connection = None
+            self.pools = {}
+            self.__pool_lock = threading.Lock()
             SqlServerManager.__instance = self
     
     def connect(self, host, port, database, username, password):
@@ -144,15 +411,37 @@ class SqlServerManager:
             print(f"❌ SQL Server 연결 실패: {e}")
             return None
     
+    def get_pool(self, host, port, database, username, password, **pool_options):
+        """
+        연결 풀 반환 (같은 서버/DB/사용자의 풀이 있으면 엔진을 재사용)
+        
+        Args:
+            pool_options: SqlServerConnectionPool 옵션 (pool_size, max_overflow, pool_timeout,
+                          pool_recycle, pre_ping)
+        """
+        key = (host, port, database, username)
+        with self.__pool_lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = SqlServerConnectionPool(host, port, database, username, password, **pool_options)
+                if not pool.connect():
+                    return None
+                self.pools[key] = pool
+            return pool
+    
     def get_connection(self):
         """연결 객체 반환"""
         return self.connection
     
     def disconnect(self):
-        """연결 해제"""
+        """연결 해제 (풀 포함)"""
         if self.connection:
             self.connection.disconnect()
             self.connection = None
+        with self.__pool_lock:
+            for pool in self.pools.values():
+                pool.disconnect()
+            self.pools = {}
     
     @classmethod
     def get_instance(cls):
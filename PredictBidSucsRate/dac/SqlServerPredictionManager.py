@@ -4,24 +4,78 @@ SQL Server용 예측 결과 저장 관리 클래스
 """
 
 import os
+import time
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from SqlServerManager import SqlServerManager
+from PredictionSummary import (SUMMARY_TABLE, SUMMARY_METRICS, aggregate_summary,
+                               merge_deltas, summary_statements, summary_totals_query)
+
+
+# 저장 컬럼 정의 (컬럼명, 변환 타입, str은 누락 시 기본값 / decimal은 (전체자릿수, 소수자릿수)) - 예측일시 제외
+SQLSERVER_INSERT_COLUMNS = [
+    ('입찰번호', 'str', ''),
+    ('입찰차수', 'str', ''),
+    ('기초금액률', 'decimal', (18, 9)),
+    ('낙찰하한률', 'decimal', (10, 7)),
+    ('기초금액', 'decimal', (20, 2)),
+    ('순공사원가', 'decimal', (20, 2)),
+    ('간접비', 'decimal', (20, 2)),
+    ('A계산여부', 'str', '0'),
+    ('순공사원가적용여부', 'str', '0'),
+    ('면허제한코드', 'str', ''),
+    ('공고기관코드', 'str', ''),
+    ('주공종명', 'str', ''),
+    ('공고기관명', 'str', ''),
+    ('공고기관점수', 'decimal', (15, 15)),
+    ('공사지역', 'str', ''),
+    ('공사지역점수', 'decimal', (15, 15)),
+    ('키워드', 'str', ''),
+    ('키워드점수', 'decimal', (15, 15)),
+    ('공고일자', 'raw', None),
+    ('개찰일시', 'raw', None),
+    ('예측_URL', 'str', ''),
+    ('업체투찰률_예측', 'decimal', (18, 9)),
+    ('예가투찰률_예측', 'decimal', (18, 9)),
+    ('참여업체수_예측', 'int', None),
+]
+
+# 테이블 컬럼 순서 (SELECT *)
+SQLSERVER_COLUMNS = [name for name, _, _ in SQLSERVER_INSERT_COLUMNS] + ['등록일시', '예측일시', '모델버전']
 
 
 class SqlServerPredictionManager:
     """SQL Server용 예측 결과 저장 및 관리 클래스"""
     
-    def __init__(self, host, port, database, username, password, table_name='ML_C'):
+    # 배치(스테이징 → 병합) 단위 행 수
+    BULK_BATCH_SIZE = 10000
+    
+    # 보관 기간 삭제 배치 단위 (행 수) - 한 트랜잭션이 잠금을 오래 잡지 않도록 제한
+    RETENTION_BATCH_SIZE = 5000
+    
+    # 요약 갱신용으로 병합/삭제가 바꾼 행에서 남기는 컬럼
+    SUMMARY_CHANGE_COLUMNS = ['모델버전', '예측일시'] + SUMMARY_METRICS
+    
+    def __init__(self, host, port, database, username, password, table_name='ML_C', connection=None,
+                 pool_size=5):
         self.db_manager = SqlServerManager.get_instance()
-        self.connection = self.db_manager.connect(host, port, database, username, password)
+        if connection is not None:
+            # 외부에서 만든 연결 사용 (예: SqliteStandInConnection으로 로컬 검증)
+            self.connection = connection
+        else:
+            # 연결 풀 사용: 동시에 실행되는 저장/조회가 하나의 연결을 두고 대기하지 않도록 스레드별 연결 사용
+            self.connection = self.db_manager.get_pool(host, port, database, username, password,
+                                                       pool_size=pool_size)
         self.table_name = table_name
+        self.last_batch_stats = []
         
         if not self.connection:
             raise Exception("SQL Server 연결에 실패했습니다.")
         
-        # 테이블 생성 확인
-        self.create_table_if_not_exists()
+        # 테이블 생성 확인 (외부 연결은 호출측에서 스키마를 준비)
+        if connection is None:
+            self.create_table_if_not_exists()
     
     def create_table_if_not_exists(self):
         """테이블이 없으면 생성"""
@@ -55,151 +109,140 @@ class SqlServerPredictionManager:
                 참여업체수_예측 INT,
                 등록일시 DATETIME NOT NULL DEFAULT GETDATE(),
                 예측일시 DATETIME,
+                모델버전 VARCHAR(50),
                 PRIMARY KEY (입찰번호, 입찰차수)
             )
             """
             
             self.connection.execute_non_query(create_table_sql)
+            
+            # 이전 버전 테이블 보정: 모델버전 컬럼 추가
+            self.connection.execute_non_query(f"""
+            IF COL_LENGTH('{self.table_name}', '모델버전') IS NULL
+            ALTER TABLE {self.table_name} ADD 모델버전 VARCHAR(50)
+            """)
+            
+            # 키셋 페이지 조회용 인덱스 (예측일시, 입찰번호, 입찰차수)
+            create_index_sql = f"""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_{self.table_name}_예측일시'
+                           AND object_id=OBJECT_ID('{self.table_name}'))
+            CREATE INDEX IX_{self.table_name}_예측일시 ON {self.table_name} (예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC)
+            """
+            self.connection.execute_non_query(create_index_sql)
+            
+            # 모델버전/예측일자별 요약 테이블 (저장/삭제와 같은 트랜잭션에서 갱신)
+            create_summary_sql = f"""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='{SUMMARY_TABLE}' AND xtype='U')
+            CREATE TABLE {SUMMARY_TABLE} (
+                모델버전 VARCHAR(50) NOT NULL,
+                예측일자 DATE NOT NULL,
+                건수 INT NOT NULL DEFAULT 0,
+                업체투찰률_합계 FLOAT NOT NULL DEFAULT 0,
+                업체투찰률_건수 INT NOT NULL DEFAULT 0,
+                예가투찰률_합계 FLOAT NOT NULL DEFAULT 0,
+                예가투찰률_건수 INT NOT NULL DEFAULT 0,
+                참여업체수_합계 FLOAT NOT NULL DEFAULT 0,
+                참여업체수_건수 INT NOT NULL DEFAULT 0,
+                최초예측일시 DATETIME,
+                최근예측일시 DATETIME,
+                PRIMARY KEY (모델버전, 예측일자)
+            )
+            """
+            self.connection.execute_non_query(create_summary_sql)
+            
+            # 요약 테이블이 비어 있고 데이터가 있으면 한 번 재구축
+            check = self.connection.execute_query(
+                f"SELECT (SELECT COUNT(*) FROM {SUMMARY_TABLE}) AS s, "
+                f"(SELECT COUNT(*) FROM (SELECT TOP 1 1 AS x FROM {self.table_name}) t) AS r")
+            if check is not None and len(check) > 0 and check.iloc[0, 0] == 0 and check.iloc[0, 1] > 0:
+                self.rebuild_prediction_summary()
             print(f"✅ {self.table_name} 테이블 생성/확인 완료")
             
         except Exception as e:
             print(f"❌ 테이블 생성 실패: {e}")
             raise e
     
-    def save_prediction_results(self, result_df, model_version="v0.1.1", remarks="", insert_mode="REPLACE"):
+    def save_prediction_results(self, result_df, model_version="v0.1.1", remarks="", insert_mode="REPLACE",
+                                batch_size=None):
         """
         예측 결과를 SQL Server에 저장
         
+        행마다 MERGE를 보내는 대신 batch_size 행씩 세션 임시 테이블에 fast_executemany로 적재한 뒤
+        배치당 한 번의 집합 연산(UPDATE ... FROM / INSERT ... WHERE NOT EXISTS)으로 병합한다.
+        배치별 영향/업데이트/무시 건수는 self.last_batch_stats에 기록된다.
+        
         Args:
             result_df (pd.DataFrame): 예측 결과 데이터프레임
             model_version (str): 모델 버전
             remarks (str): 비고
             insert_mode (str): 삽입 모드 (REPLACE, IGNORE, INSERT)
+            batch_size (int): 배치 행 수 (기본 BULK_BATCH_SIZE)
         """
         try:
             print("="*80)
             print(f"💾 SQL Server에 예측 결과 저장 중... (모드: {insert_mode})")
             print("="*80)
             
-            # 저장할 데이터 개수
-            total_rows = len(result_df)
-            saved_count = 0
-            updated_count = 0
-            ignored_count = 0
+            batch_size = batch_size or self.BULK_BATCH_SIZE
+            columns = [name for name, _, _ in SQLSERVER_INSERT_COLUMNS] + ['예측일시', '모델버전']
+            rows, duplicated_count = self._dedupe_rows(
+                self._prepare_bulk_data(result_df, model_version, remarks), insert_mode)
+            total_rows = len(rows)
             
-            # 각 행을 데이터베이스에 저장
-            for index, row in result_df.iterrows():
-                try:
-                    # 데이터 검증 및 준비
-                    data = self._prepare_row_data(row, model_version, remarks)
-                    
-                    # 데이터 검증 로그 (디버깅용)
-                    if index < 5:  # 처음 5개 행만 로그 출력
-                        print(f"행 {index} 데이터 검증:")
-                        print(f"  입찰번호: {data[0]}")
-                        print(f"  기초금액률: {data[2]} (범위: -999999999.999999999 ~ 999999999.999999999)")
-                        print(f"  낙찰하한률: {data[3]} (범위: -999.9999999 ~ 999.9999999)")
-                        print(f"  공고기관점수: {data[13]} (TF-IDF, 범위: 0 ~ 0.999999999999999)")
-                        print(f"  공사지역점수: {data[15]} (TF-IDF, 범위: 0 ~ 0.999999999999999)")
-                        print(f"  키워드점수: {data[17]} (TF-IDF, 범위: 0 ~ 0.999999999999999)")
-                        print(f"  업체투찰률_예측: {data[21]} (범위: -999999999.999999999 ~ 999999999.999999999)")
-                        print(f"  예가투찰률_예측: {data[22]} (범위: -999999999.999999999 ~ 999999999.999999999)")
-                        print(f"  참여업체수_예측: {data[23]} (범위: -2147483648 ~ 2147483647)")
-                        print("---")
-                    
+            # 임시 테이블은 세션 단위이므로 저장이 끝날 때까지 같은 연결을 고정
+            with self.connection.hold() as con:
+                staging = con.create_staging_table(self.table_name, columns)
+                stage_query = (f"INSERT INTO {staging} ({', '.join(columns)}) "
+                               f"VALUES ({', '.join(['?'] * len(columns))})")
+                changes = con.create_changes_table(self.table_name, self.SUMMARY_CHANGE_COLUMNS)
+                merge_statements = self._merge_statements(con, staging, changes, columns, insert_mode)
+
+                saved_count = 0
+                updated_count = 0
+                ignored_count = duplicated_count
+                self.last_batch_stats = []
+
+                for batch_no, start in enumerate(range(0, total_rows, batch_size), 1):
+                    batch = rows[start:start + batch_size]
+
+                    # 1. 스테이징 테이블 적재 (배치당 1회 왕복)
+                    con.execute_non_query(f"DELETE FROM {staging}")
+                    if con.execute_many(stage_query, batch, fast=True) == 0:
+                        raise Exception(f"배치 {batch_no} 스테이징 적재 실패")
+
+                    # 2. 집합 연산으로 대상 테이블에 병합 + 바뀐 행으로 요약 갱신 (하나의 트랜잭션)
+                    added = pd.DataFrame(batch, columns=columns) if insert_mode == "REPLACE" else None
+                    counts = con.execute_transaction(
+                        merge_statements, before_commit=self._summary_updater(changes, added))
+                    if counts is None:
+                        raise Exception(f"배치 {batch_no} 병합 실패")
+
+                    # 변경 행 기록 쿼리가 앞에 붙을 수 있으므로 병합 문장 건수는 뒤에서 읽음
                     if insert_mode == "REPLACE":
-                        # MERGE 문 사용 (UPSERT)
-                        query = f"""
-                        MERGE {self.table_name} AS target
-                        USING (VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)) 
-                        AS source (입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액, 순공사원가, 간접비, A계산여부, 
-                                  순공사원가적용여부, 면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                  공사지역, 공사지역점수, 키워드, 키워드점수, 공고일자, 개찰일시, 예측_URL,
-                                  업체투찰률_예측, 예가투찰률_예측, 참여업체수_예측, 예측일시)
-                        ON target.입찰번호 = source.입찰번호 AND target.입찰차수 = source.입찰차수
-                        WHEN MATCHED THEN
-                            UPDATE SET 
-                                기초금액률 = source.기초금액률,
-                                낙찰하한률 = source.낙찰하한률,
-                                기초금액 = source.기초금액,
-                                순공사원가 = source.순공사원가,
-                                간접비 = source.간접비,
-                                A계산여부 = source.A계산여부,
-                                순공사원가적용여부 = source.순공사원가적용여부,
-                                면허제한코드 = source.면허제한코드,
-                                공고기관코드 = source.공고기관코드,
-                                주공종명 = source.주공종명,
-                                공고기관명 = source.공고기관명,
-                                공고기관점수 = source.공고기관점수,
-                                공사지역 = source.공사지역,
-                                공사지역점수 = source.공사지역점수,
-                                키워드 = source.키워드,
-                                키워드점수 = source.키워드점수,
-                                공고일자 = source.공고일자,
-                                개찰일시 = source.개찰일시,
-                                예측_URL = source.예측_URL,
-                                업체투찰률_예측 = source.업체투찰률_예측,
-                                예가투찰률_예측 = source.예가투찰률_예측,
-                                참여업체수_예측 = source.참여업체수_예측,
-                                예측일시 = source.예측일시
-                        WHEN NOT MATCHED THEN
-                            INSERT (입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액, 순공사원가, 간접비, A계산여부,
-                                   순공사원가적용여부, 면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                   공사지역, 공사지역점수, 키워드, 키워드점수, 공고일자, 개찰일시, 예측_URL,
-                                   업체투찰률_예측, 예가투찰률_예측, 참여업체수_예측, 예측일시)
-                            VALUES (source.입찰번호, source.입찰차수, source.기초금액률, source.낙찰하한률, 
-                                   source.기초금액, source.순공사원가, source.간접비, source.A계산여부,
-                                   source.순공사원가적용여부, source.면허제한코드, source.공고기관코드, 
-                                   source.주공종명, source.공고기관명, source.공고기관점수,
-                                   source.공사지역, source.공사지역점수, source.키워드, source.키워드점수,
-                                   source.공고일자, source.개찰일시, source.예측_URL,
-                                   source.업체투찰률_예측, source.예가투찰률_예측, source.참여업체수_예측, source.예측일시);
-                        """
-                        
-                        # 기존 데이터 존재 여부 확인
-                        check_query = f"SELECT COUNT(*) FROM {self.table_name} WHERE 입찰번호 = ? AND 입찰차수 = ?"
-                        existing = self.connection.execute_query(check_query, (str(row.get('입찰번호', '')), str(row.get('입찰차수', ''))))
-                        if existing is not None and len(existing) > 0 and existing.iloc[0, 0] > 0:
-                            updated_count += 1
-                        else:
-                            saved_count += 1
-                    
-                    elif insert_mode == "IGNORE":
-                        # INSERT 시 중복 무시
-                        query = f"""
-                        IF NOT EXISTS (SELECT 1 FROM {self.table_name} WHERE 입찰번호 = ? AND 입찰차수 = ?)
-                        INSERT INTO {self.table_name} (입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액, 순공사원가, 간접비, A계산여부,
-                                        순공사원가적용여부, 면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                        공사지역, 공사지역점수, 키워드, 키워드점수, 공고일자, 개찰일시, 예측_URL,
-                                        업체투찰률_예측, 예가투찰률_예측, 참여업체수_예측, 예측일시)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                        data = (str(row.get('입찰번호', '')), str(row.get('입찰차수', ''))) + data
-                        saved_count += 1
-                    
-                    else:  # INSERT
-                        query = f"""
-                        INSERT INTO {self.table_name} (입찰번호, 입찰차수, 기초금액률, 낙찰하한률, 기초금액, 순공사원가, 간접비, A계산여부,
-                                        순공사원가적용여부, 면허제한코드, 공고기관코드, 주공종명, 공고기관명, 공고기관점수,
-                                        공사지역, 공사지역점수, 키워드, 키워드점수, 공고일자, 개찰일시, 예측_URL,
-                                        업체투찰률_예측, 예가투찰률_예측, 참여업체수_예측, 예측일시)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                        saved_count += 1
-                    
-                    # 쿼리 실행
-                    affected_rows = self.connection.execute_non_query(query, data)
-                    
-                    if (saved_count + updated_count + ignored_count) % 100 == 0:
-                        print(f"진행률: {saved_count + updated_count + ignored_count}/{total_rows} ({(saved_count + updated_count + ignored_count)/total_rows*100:.1f}%)")
-                
-                except Exception as e:
-                    if insert_mode == "INSERT":
-                        print(f"⚠️  행 {index} 저장 실패 (중복 데이터): {e}")
-                        ignored_count += 1
+                        updated, inserted = counts[-2], counts[-1]
+                        ignored = len(batch) - updated - inserted
                     else:
-                        print(f"⚠️  행 {index} 저장 실패: {e}")
-                        continue
+                        updated, inserted = 0, counts[-1]
+                        ignored = len(batch) - inserted
+                        if insert_mode == "INSERT" and ignored > 0:
+                            print(f"⚠️  배치 {batch_no}: 중복 데이터 {ignored}건 저장 실패")
+
+                    saved_count += inserted
+                    updated_count += updated
+                    ignored_count += ignored
+                    self.last_batch_stats.append({
+                        'batch': batch_no,
+                        'rows': len(batch),
+                        'affected': inserted + updated,
+                        'inserted': inserted,
+                        'updated': updated,
+                        'ignored': ignored,
+                    })
+                    print(f"배치 {batch_no}: 영향 {inserted + updated}건 "
+                          f"(신규 {inserted}, 업데이트 {updated}, 무시 {ignored}) - "
+                          f"진행률 {start + len(batch)}/{total_rows}")
+
+                con.execute_non_query(f"DELETE FROM {staging}")
             
             print(f"✅ SQL Server 저장 완료 ({self.table_name}):")
             print(f"   - 새로 저장: {saved_count}건")
@@ -214,83 +257,159 @@ class SqlServerPredictionManager:
             print(f"❌ SQL Server 저장 실패: {e}")
             raise e
     
-    def _prepare_row_data(self, row, model_version, remarks):
-        """행 데이터를 데이터베이스 저장 형식으로 준비"""
-        import math
+    def _merge_statements(self, con, staging, changes, columns, insert_mode):
+        """
+        스테이징 테이블을 대상 테이블에 반영하는 집합 연산 쿼리 목록
+        
+        요약 갱신용으로 REPLACE는 덮어쓴 기존 행(deleted, 부호 -1)을, IGNORE/INSERT는 삽입된 행
+        (inserted, 부호 +1)을 changes 테이블에 남긴다. 남기는 방법은 연결이 정한다
+        (SQL Server는 OUTPUT 절, SqliteStandInConnection은 같은 트랜잭션 안의 앞선 INSERT ... SELECT).
+        """
+        keys = ['입찰번호', '입찰차수']
+        key_match = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+        
+        insert_output, statements = "", []
+        if insert_mode != "REPLACE":
+            insert_output, statements = con.change_capture(
+                changes, self.SUMMARY_CHANGE_COLUMNS, 1, 'inserted',
+                f"FROM {staging} AS s WHERE NOT EXISTS (SELECT 1 FROM {self.table_name} AS t WHERE {key_match})")
+        
+        insert_sql = f"""
+            INSERT INTO {self.table_name} ({', '.join(columns)})
+            {insert_output}
+            SELECT {', '.join('s.' + c for c in columns)}
+            FROM {staging} AS s
+            WHERE NOT EXISTS (SELECT 1 FROM {self.table_name} AS t WHERE {key_match})
+        """
+        
+        if insert_mode != "REPLACE":
+            return statements + [(insert_sql, None)]
+        
+        target_match = ' AND '.join(f'{self.table_name}.{k} = s.{k}' for k in keys)
+        update_output, statements = con.change_capture(
+            changes, self.SUMMARY_CHANGE_COLUMNS, -1, 'deleted',
+            f"FROM {self.table_name} WHERE EXISTS (SELECT 1 FROM {staging} AS s WHERE {target_match})")
+        update_sql = f"""
+            UPDATE {self.table_name}
+            SET {', '.join(f'{c} = s.{c}' for c in columns if c not in keys)}
+            {update_output}
+            FROM {staging} AS s
+            WHERE {target_match}
+        """
+        
+        # 업데이트를 먼저 수행해야 방금 삽입한 행이 업데이트 건수에 섞이지 않음
+        return statements + [(update_sql, None), (insert_sql, None)]
+    
+    def _summary_updater(self, changes, added=None):
+        """
+        병합 트랜잭션의 커밋 직전에 요약 테이블을 갱신하는 함수 (execute_transaction의 before_commit)
+        
+        병합 문장이 changes에 남긴 행만 읽어 (모델버전, 예측일자)로 집계하므로 병합 전에 기존 행을
+        따로 읽지 않는다. 부호 -1 행은 빼고 +1 행은 더하며, added(REPLACE의 배치 전체)가 있으면 그것을 더한다.
+        행이 빠진 (모델버전, 예측일자)는 최초/최근 예측일시를 다시 계산한다.
+        """
+        def apply(cursor):
+            columns, rows = self._fetch_rows(cursor, f"SELECT * FROM {changes}")
+            captured = pd.DataFrame(rows, columns=columns)
+            removed = aggregate_summary(captured[captured['부호'] < 0])
+            inserted = aggregate_summary(added if added is not None else captured[captured['부호'] > 0])
+            self._execute_statements(cursor, summary_statements(merge_deltas(removed, inserted))
+                                     + self._summary_bound_statements(removed.keys()))
+            cursor.execute(f"DELETE FROM {changes}")
+        return apply
+    
+    @staticmethod
+    def _fetch_rows(cursor, query, params=None):
+        """커서로 쿼리를 실행해 (컬럼명 리스트, 행 리스트)로 반환 (트랜잭션 안에서 읽기용)"""
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        columns = [d[0] for d in cursor.description]
+        return columns, [tuple(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _execute_statements(cursor, statements):
+        """(쿼리, 파라미터) 목록을 커서로 실행"""
+        for query, params in statements:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+    
+    def _dedupe_rows(self, rows, insert_mode):
+        """
+        배치 내 중복 키 정리 (REPLACE는 마지막 행, IGNORE/INSERT는 첫 행 유지)
         
-        # 현재 시간
+        Returns:
+            tuple: (정리된 행 리스트, 제거된 중복 행 수)
+        """
+        unique = {}
+        for row in rows:
+            if insert_mode == "REPLACE":
+                unique[row[:2]] = row
+            else:
+                unique.setdefault(row[:2], row)
+        
+        return list(unique.values()), len(rows) - len(unique)
+    
+    def _prepare_bulk_data(self, result_df, model_version, remarks):
+        """
+        데이터프레임을 컬럼 단위로 변환하여 파라미터 튜플 리스트로 준비
+        
+        SQLSERVER_INSERT_COLUMNS 순서로 컬럼마다 numpy 연산으로 한 번에 변환한다.
+        - 데이터프레임에 없는 컬럼: 기본값 (문자열은 정의된 값, 숫자 0)
+        - str: str(값)
+        - decimal (DECIMAL(p, s)): NaN/무한대/변환 불가 값은 0, ±(10^(p-s) - 1) 범위로 자름.
+          p == s인 TF-IDF 점수(DECIMAL(15,15))는 0 ~ 0.999999999999999로 자름
+        - int: 소수점 이하 버림, NaN/변환 불가 값은 0, INT 범위(-2147483648 ~ 2147483647)로 자름
+        - 날짜: 그대로 (비어 있으면 None)
+        - 행마다 예측일시(현재 시각)와 모델버전을 붙임
+        """
         now = datetime.now()
+        n = len(result_df)
         
-        def safe_decimal(value, max_digits, decimal_places, is_tfidf=False):
-            """DECIMAL 타입에 안전한 값으로 변환"""
-            try:
-                val = float(value) if value is not None else 0.0
-                
-                # NaN이나 무한대 값 처리
-                if math.isnan(val) or math.isinf(val):
-                    return 0.0
-                
-                # TF-IDF 점수 특별 처리 (DECIMAL(15,15) 사용)
-                if is_tfidf:
-                    # DECIMAL(15,15)는 0.000000000000001 ~ 0.999999999999999 범위
-                    # TF-IDF 점수는 보통 0~1 사이이므로 그대로 사용 가능
-                    if val < 0:
-                        val = 0.0
-                    elif val > 0.999999999999999:  # DECIMAL(15,15) 최대값
-                        val = 0.999999999999999
+        columns = []
+        for name, kind, spec in SQLSERVER_INSERT_COLUMNS:
+            if name not in result_df.columns:
+                default = {'str': spec, 'decimal': 0.0, 'int': 0}.get(kind)
+                columns.append([default] * n)
+                continue
+            
+            col = result_df[name]
+            if kind == 'str':
+                values = np.asarray(col, dtype=object).astype(str).tolist()
+            elif kind == 'decimal':
+                val = pd.to_numeric(col, errors='coerce').to_numpy(dtype='float64')
+                val = np.where(np.isfinite(val), val, 0.0)
+                max_digits, decimal_places = spec
+                if decimal_places == max_digits:
+                    # DECIMAL(15,15) TF-IDF 점수: 0 ~ 0.999999999999999
+                    val = np.clip(val, 0.0, 0.999999999999999)
                 else:
-                    # 일반 DECIMAL 값 처리
                     max_value = 10 ** (max_digits - decimal_places) - 1
-                    min_value = -max_value
-                    val = max(min_value, min(max_value, val))
-                
-                return val
-            except (ValueError, TypeError):
-                return 0.0
-        
-        def safe_int(value):
-            """INT 타입에 안전한 값으로 변환"""
-            try:
-                val = int(float(value)) if value is not None else 0
-                # INT 범위 제한 (-2,147,483,648 ~ 2,147,483,647)
-                return max(-2147483648, min(2147483647, val))
-            except (ValueError, TypeError):
-                return 0
+                    val = np.clip(val, -max_value, max_value)
+                values = val.tolist()
+            elif kind == 'int':
+                val = pd.to_numeric(col, errors='coerce').to_numpy(dtype='float64')
+                val = np.where(np.isfinite(val), np.trunc(val), 0.0)
+                values = np.clip(val, -2147483648, 2147483647).astype('int64').tolist()
+            else:
+                values = col.astype(object).where(col.notna(), None).tolist()
+            columns.append(values)
         
-        return (
-            str(row.get('입찰번호', '')),
-            str(row.get('입찰차수', '')),
-            safe_decimal(row.get('기초금액률', 0), 18, 9),  # DECIMAL(18, 9)
-            safe_decimal(row.get('낙찰하한률', 0), 10, 7),  # DECIMAL(10, 7)
-            safe_decimal(row.get('기초금액', 0), 20, 2),     # DECIMAL(20, 2)
-            safe_decimal(row.get('순공사원가', 0), 20, 2),    # DECIMAL(20, 2)
-            safe_decimal(row.get('간접비', 0), 20, 2),        # DECIMAL(20, 2)
-            str(row.get('A계산여부', '0')),
-            str(row.get('순공사원가적용여부', '0')),
-            str(row.get('면허제한코드', '')),
-            str(row.get('공고기관코드', '')),
-            str(row.get('주공종명', '')),
-            str(row.get('공고기관명', '')),
-            safe_decimal(row.get('공고기관점수', 0), 15, 15, is_tfidf=True),  # DECIMAL(15, 15) - TF-IDF
-            str(row.get('공사지역', '')),
-            safe_decimal(row.get('공사지역점수', 0), 15, 15, is_tfidf=True),  # DECIMAL(15, 15) - TF-IDF
-            str(row.get('키워드', '')),
-            safe_decimal(row.get('키워드점수', 0), 15, 15, is_tfidf=True),    # DECIMAL(15, 15) - TF-IDF
-            row.get('공고일자', None),
-            row.get('개찰일시', None),
-            str(row.get('예측_URL', '')),
-            safe_decimal(row.get('업체투찰률_예측', 0), 18, 9), # DECIMAL(18, 9)
-            safe_decimal(row.get('예가투찰률_예측', 0), 18, 9), # DECIMAL(18, 9)
-            safe_int(row.get('참여업체수_예측', 0)),           # INT
-            now
-        )
+        return list(zip(*columns, [now] * n, [model_version] * n))
     
     def get_prediction_results(self, limit=100, offset=0):
-        """저장된 예측 결과 조회"""
+        """
+        저장된 예측 결과 조회
+        
+        OFFSET은 건너뛴 행을 모두 읽으므로 깊은 페이지는 get_prediction_page를 사용
+        """
         try:
             query = f"""
                 SELECT * FROM {self.table_name} 
-                ORDER BY 예측일시 DESC 
+                ORDER BY 예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
             """
             results = self.connection.execute_query(query, (offset, limit))
@@ -299,6 +418,63 @@ class SqlServerPredictionManager:
             print(f"❌ 데이터 조회 실패: {e}")
             return None
     
+    def get_prediction_page(self, limit=100, after=None):
+        """
+        키셋 페이지 조회 (예측일시, 입찰번호, 입찰차수 역순)
+        
+        Args:
+            limit (int): 페이지 크기
+            after (tuple): 이전 페이지의 next_cursor (None이면 첫 페이지)
+        
+        Returns:
+            tuple: (결과 DataFrame 또는 None, 다음 페이지 커서 또는 None)
+        """
+        try:
+            if after is None:
+                where = ""
+                params = (limit,)
+            else:
+                # SQL Server는 행 값 비교를 지원하지 않으므로 풀어서 작성
+                where = """
+                WHERE 예측일시 < ?
+                   OR (예측일시 = ? AND (입찰번호 < ? OR (입찰번호 = ? AND 입찰차수 < ?)))
+                """
+                ts, bid_no, bid_seq = after
+                params = (ts, ts, bid_no, bid_no, bid_seq, limit)
+            query = f"""
+                SELECT * FROM {self.table_name} 
+                {where}
+                ORDER BY 예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC
+                OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+            """
+            results = self.connection.execute_query(query, params)
+            return results, self.next_cursor(results, limit)
+        except Exception as e:
+            print(f"❌ 데이터 조회 실패: {e}")
+            return None, None
+    
+    def iter_prediction_results(self, chunk_size=10000, limit=None):
+        """
+        예측 결과를 예측일시 역순으로 chunk_size 행씩 읽는 제너레이터 (fetchmany)
+        
+        Yields:
+            tuple: (컬럼명 리스트, 행 리스트) - 결과가 없어도 한 번은 반환
+        """
+        top = f"TOP ({int(limit)}) " if limit else ""
+        query = f"""
+            SELECT {top}* FROM {self.table_name} 
+            ORDER BY 예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC
+        """
+        yield from self.connection.iter_query(query, None, chunk_size)
+    
+    @staticmethod
+    def next_cursor(results, limit):
+        """페이지 마지막 행의 (예측일시, 입찰번호, 입찰차수) - 마지막 페이지면 None"""
+        if results is None or len(results) < limit:
+            return None
+        last = results.iloc[-1]
+        return (last['예측일시'], last['입찰번호'], last['입찰차수'])
+    
     def get_prediction_count(self):
         """저장된 예측 결과 개수 조회"""
         try:
@@ -310,19 +486,9 @@ class SqlServerPredictionManager:
             return 0
     
     def get_prediction_summary(self):
-        """예측 결과 요약 통계 조회"""
+        """예측 결과 요약 통계 조회 (요약 테이블만 읽음)"""
         try:
-            query = f"""
-                SELECT 
-                    COUNT(*) as 총건수,
-                    AVG(업체투찰률_예측) as 평균업체투찰률,
-                    AVG(예가투찰률_예측) as 평균예가투찰률,
-                    AVG(참여업체수_예측) as 평균참여업체수,
-                    MIN(예측일시) as 최초예측일시,
-                    MAX(예측일시) as 최근예측일시
-                FROM {self.table_name}
-            """
-            result = self.connection.execute_query(query)
+            result = self.connection.execute_query(summary_totals_query())
             if result is not None and len(result) > 0:
                 return result.iloc[0].tolist()
             return None
@@ -330,30 +496,161 @@ class SqlServerPredictionManager:
             print(f"❌ 요약 통계 조회 실패: {e}")
             return None
     
-    def search_by_bid_number(self, bid_number):
-        """입찰번호로 검색"""
+    def get_prediction_summary_by_model(self):
+        """모델버전별 요약 통계 조회 (모델버전, 총건수, 평균..., 최초/최근 예측일시)"""
+        try:
+            result = self.connection.execute_query(summary_totals_query(group_by_model=True))
+            if result is not None and len(result) > 0:
+                return result.values.tolist()
+            return None
+        except Exception as e:
+            print(f"❌ 요약 통계 조회 실패: {e}")
+            return None
+    
+    def rebuild_prediction_summary(self):
+        """예측 결과 테이블 전체를 다시 집계하여 요약 테이블 재구축 (불일치 보정용)"""
+        metrics = ", ".join(f"COALESCE(SUM(CAST({m} AS FLOAT)), 0), COUNT({m})" for m in SUMMARY_METRICS)
+        statements = [
+            (f"DELETE FROM {SUMMARY_TABLE}", None),
+            (f"""
+            INSERT INTO {SUMMARY_TABLE}
+            SELECT 모델버전, 예측일자, COUNT(*), {metrics}, MIN(예측일시), MAX(예측일시)
+            FROM (
+                SELECT COALESCE(모델버전, '') AS 모델버전,
+                       COALESCE(CONVERT(DATE, 예측일시), '1900-01-01') AS 예측일자,
+                       예측일시, {', '.join(SUMMARY_METRICS)}
+                FROM {self.table_name}
+            ) AS g
+            GROUP BY 모델버전, 예측일자
+            """, None),
+        ]
+        counts = self.connection.execute_transaction(statements)
+        if counts is None:
+            print("❌ 요약 테이블 재구축 실패")
+            return None
+        print(f"✅ 요약 테이블 재구축 완료: {counts[1]}개 (모델버전, 예측일자)")
+        return counts[1]
+    
+    def search_by_bid_number(self, bid_number, limit=1000):
+        """
+        입찰번호 접두어 검색
+        
+        LIKE '%x%'는 전체 스캔이므로 기본키 (입찰번호, 입찰차수) 인덱스를 타는 접두어 LIKE로 검색
+        """
         try:
+            # LIKE 와일드카드 문자는 그대로 검색되도록 이스케이프
+            pattern = bid_number.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]') + '%'
             query = f"""
                 SELECT * FROM {self.table_name} 
                 WHERE 입찰번호 LIKE ? 
-                ORDER BY 예측일시 DESC
+                ORDER BY 입찰번호, 입찰차수
+                OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
             """
-            results = self.connection.execute_query(query, (f'%{bid_number}%',))
+            results = self.connection.execute_query(query, (pattern, limit))
             return results
         except Exception as e:
             print(f"❌ 검색 실패: {e}")
             return None
     
-    def delete_old_predictions(self, days=30):
-        """오래된 예측 결과 삭제"""
+    def delete_old_predictions(self, days=30, batch_size=None):
+        """
+        오래된 예측 결과 삭제
+        
+        한 번의 DELETE 대신 batch_size건씩 짧은 트랜잭션으로 나눠 삭제하므로
+        삭제 중에도 배치 저장이 오래 기다리지 않는다. 아카이브/스케줄은 PredictionRetentionJob 사용.
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+        affected_rows = 0
         try:
-            query = f"""
-                DELETE FROM {self.table_name} 
-                WHERE 예측일시 < DATEADD(day, -?, GETDATE())
-            """
-            affected_rows = self.connection.execute_non_query(query, (days,))
+            while True:
+                result = self.delete_prediction_batch(cutoff, batch_size)
+                affected_rows += result['deleted']
+                if result['deleted'] == 0:
+                    break
             print(f"✅ {days}일 이전 예측 결과 {affected_rows}건 삭제 완료")
-            return affected_rows
         except Exception as e:
             print(f"❌ 오래된 데이터 삭제 실패: {e}")
-            return 0
+        return affected_rows
+    
+    def delete_prediction_batch(self, cutoff, batch_size=None, fetch_rows=False, before_commit=None):
+        """
+        cutoff 이전 예측 결과 중 가장 오래된 batch_size건을 키 범위로 삭제 (트랜잭션 1회)
+        
+        (예측일시, 입찰번호, 입찰차수) 순으로 batch_size번째 키까지를 범위 조건으로 삭제한다.
+        DELETE가 실제로 지운 행을 changes 테이블에 남기고 같은 트랜잭션에서 그 행만큼 요약 테이블을
+        차감하므로, 범위를 정한 뒤 다른 저장이 바꾼 행이 있어도 요약이 어긋나지 않는다.
+        
+        Args:
+            cutoff (datetime): 이 시각 이전 예측 결과 삭제
+            batch_size (int): 배치 행 수 (기본 RETENTION_BATCH_SIZE)
+            fetch_rows (bool): 삭제한 행 전체를 반환할지 여부
+            before_commit (callable): 삭제한 행이 있으면 커밋 직전에 호출되는 함수 (columns, rows).
+                                      예외를 던지면 삭제를 롤백한다 (아카이브를 먼저 기록할 때 사용)
+        
+        Returns:
+            dict: deleted(삭제 건수), columns/rows(fetch_rows일 때 삭제한 행),
+                  delete_sec(삭제 트랜잭션 실행 초 - 잠금 대기 포함)
+        """
+        batch_size = batch_size or self.RETENTION_BATCH_SIZE
+        capture_columns = (SQLSERVER_COLUMNS if fetch_rows or before_commit is not None
+                           else self.SUMMARY_CHANGE_COLUMNS)
+        
+        with self.connection.hold() as con:
+            # 범위의 끝 = batch_size번째 키 (없으면 남은 행이 batch_size건 이하이므로 cutoff 이전 전체)
+            paging, paging_params = con.paging_clause(batch_size - 1, 1)
+            boundary = con.execute_query(f"""
+                SELECT 예측일시, 입찰번호, 입찰차수 FROM {self.table_name}
+                WHERE 예측일시 < ?
+                ORDER BY 예측일시, 입찰번호, 입찰차수
+                {paging}
+            """, (cutoff,) + paging_params)
+            if boundary is None:
+                raise Exception("삭제 범위 조회 실패")
+            
+            key_range = "WHERE 예측일시 < ?"
+            params = (cutoff,)
+            if len(boundary) > 0:
+                ts, bid_no, bid_seq = boundary.iloc[0].tolist()
+                key_range += " AND (예측일시 < ? OR (예측일시 = ? AND (입찰번호 < ? OR (입찰번호 = ? AND 입찰차수 <= ?))))"
+                params += (ts, ts, bid_no, bid_no, bid_seq)
+            
+            changes = con.create_changes_table(self.table_name, capture_columns)
+            output, statements = con.change_capture(changes, capture_columns, -1, 'deleted',
+                                                    f"FROM {self.table_name} {key_range}", params)
+            statements.append((f"DELETE FROM {self.table_name} {output} {key_range}", params))
+            
+            removed_rows = {}
+            
+            def apply(cursor):
+                columns, rows = self._fetch_rows(cursor, f"SELECT {', '.join(capture_columns)} FROM {changes}")
+                removed = aggregate_summary(pd.DataFrame(rows, columns=columns))
+                self._execute_statements(cursor, summary_statements(merge_deltas(removed, {}))
+                                         + self._summary_bound_statements(removed.keys()))
+                if before_commit is not None and rows:
+                    before_commit(columns, rows)
+                removed_rows.update(columns=columns, rows=rows)
+            
+            started = time.perf_counter()
+            counts = con.execute_transaction(statements, before_commit=apply)
+            delete_sec = time.perf_counter() - started
+            if counts is None:
+                raise Exception("삭제 트랜잭션 실패")
+        
+        return {'deleted': counts[-1], 'columns': removed_rows['columns'],
+                'rows': removed_rows['rows'] if fetch_rows else None, 'delete_sec': delete_sec}
+    
+    def _summary_bound_statements(self, keys):
+        """행이 빠진 (모델버전, 예측일자)의 최초/최근 예측일시를 해당 일자 범위만 읽어 다시 계산하는 쿼리"""
+        statements = []
+        for version, day in keys:
+            # 날짜 문자열의 해석은 서버 언어 설정에 따라 달라지므로 datetime으로 바인딩
+            day_start = datetime.strptime(day, '%Y-%m-%d')
+            day_end = day_start + timedelta(days=1)
+            bounds = f"FROM {self.table_name} WHERE COALESCE(모델버전, '') = ? AND 예측일시 >= ? AND 예측일시 < ?"
+            statements.append((f"""
+                UPDATE {SUMMARY_TABLE} SET
+                    최초예측일시 = (SELECT MIN(예측일시) {bounds}),
+                    최근예측일시 = (SELECT MAX(예측일시) {bounds})
+                WHERE 모델버전 = ? AND 예측일자 = ?
+            """, (version, day_start, day_end, version, day_start, day_end, version, day)))
+        return statements
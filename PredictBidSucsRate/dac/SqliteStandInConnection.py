@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+SqlServerConnection 대용 SQLite 연결 클래스
+
+SQL Server 없이 SqlServerPredictionManager 등의 벌크 저장/조회 흐름을
+로컬에서 검증할 때 사용한다. SqlServerConnection과 같은 메서드를 제공한다.
+
+ex)
+con = SqliteStandInConnection(':memory:')
+con.connect()
+manager = SqlServerPredictionManager(None, None, None, None, None, connection=con)
+"""
+
+import sqlite3
+import pandas as pd
+from contextlib import contextmanager
+
+
+class SqliteStandInConnection:
+    """SqlServerConnection과 같은 인터페이스를 제공하는 SQLite 연결 클래스"""
+    
+    def __init__(self, db_path=':memory:', setup_sql=None):
+        self.db_path = db_path
+        self.setup_sql = setup_sql
+        self.connection = None
+        self.engine = None
+        self.session = None
+    
+    def connect(self):
+        """SQLite 파일(또는 메모리 DB)에 연결하고 설정 SQL 실행"""
+        try:
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            if self.setup_sql:
+                self.connection.executescript(self.setup_sql)
+            print(f"✅ SQLite 대체 연결 성공: {self.db_path}")
+            return True
+        except Exception as e:
+            print(f"❌ SQLite 대체 연결 실패: {e}")
+            return False
+    
+    def disconnect(self):
+        """연결 해제"""
+        try:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+            print("✅ SQLite 대체 연결 해제 완료")
+        except Exception as e:
+            print(f"❌ 연결 해제 실패: {e}")
+    
+    def execute_query(self, query, params=None):
+        """쿼리 실행 (SELECT)"""
+        try:
+            if params:
+                return pd.read_sql(query, self.connection, params=params)
+            else:
+                return pd.read_sql(query, self.connection)
+        except Exception as e:
+            print(f"❌ 쿼리 실행 실패: {e}")
+            return None
+    
+    def iter_query(self, query, params=None, chunk_size=10000):
+        """쿼리 결과를 chunk_size 행씩 (컬럼명 리스트, 행 리스트)로 반환하는 제너레이터"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params or ())
+            columns = [d[0] for d in cursor.description]
+            
+            rows = cursor.fetchmany(chunk_size)
+            yield columns, rows
+            while rows:
+                rows = cursor.fetchmany(chunk_size)
+                if rows:
+                    yield columns, rows
+        finally:
+            cursor.close()
+    
+    def execute_non_query(self, query, params=None):
+        """쿼리 실행 (INSERT, UPDATE, DELETE)"""
+        try:
+            cursor = self.connection.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            self.connection.commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"❌ 쿼리 실행 실패: {e}")
+            self.connection.rollback()
+            return 0
+    
+    def execute_many(self, query, params_list, fast=False):
+        """여러 개의 파라미터로 쿼리 실행 (fast는 SQLite에서 무시)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany(query, params_list)
+            self.connection.commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"❌ 배치 쿼리 실행 실패: {e}")
+            self.connection.rollback()
+            return 0
+    
+    def execute_transaction(self, statements, before_commit=None):
+        """여러 쿼리를 하나의 트랜잭션으로 실행하고 각 쿼리의 영향받은 행 수 반환 (before_commit은 커밋 직전 호출)"""
+        try:
+            cursor = self.connection.cursor()
+            counts = []
+            for query, params in statements:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                counts.append(cursor.rowcount)
+            if before_commit is not None:
+                before_commit(cursor)
+            self.connection.commit()
+            return counts
+        except Exception as e:
+            print(f"❌ 트랜잭션 실행 실패: {e}")
+            self.connection.rollback()
+            return None
+    
+    def create_staging_table(self, table_name, columns):
+        """대상 테이블과 같은 컬럼 구조의 TEMP 테이블을 만들고 이름을 반환"""
+        staging = f"{table_name}_STAGE"
+        self.connection.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+        self.connection.execute(
+            f"CREATE TEMP TABLE {staging} AS SELECT {', '.join(columns)} FROM {table_name} WHERE 0")
+        self.connection.commit()
+        return staging
+    
+    def create_changes_table(self, table_name, columns):
+        """부호 컬럼 + columns 구조의 변경 행 TEMP 테이블을 만들고 이름을 반환"""
+        changes = f"{table_name}_CHANGES"
+        self.connection.execute(f"DROP TABLE IF EXISTS temp.{changes}")
+        self.connection.execute(
+            f"CREATE TEMP TABLE {changes} AS SELECT 0 AS 부호, {', '.join(columns)} FROM {table_name} WHERE 0")
+        self.connection.commit()
+        return changes
+    
+    def change_capture(self, changes, columns, sign, source, affected, params=None):
+        """
+        OUTPUT 절 대신 문장 앞에서 affected 행을 changes에 복사하는 쿼리를 반환
+        
+        같은 트랜잭션 안에서 실행되므로 그 사이에 다른 연결이 커밋하면 이어지는 쓰기가
+        SQLITE_BUSY로 실패해 롤백된다 (바꾸지 않은 행이 남는 일은 없음).
+        """
+        capture = (f"INSERT INTO {changes} (부호, {', '.join(columns)}) "
+                   f"SELECT {int(sign)}, {', '.join(columns)} {affected}")
+        return "", [(capture, params)]
+    
+    def paging_clause(self, offset, limit):
+        """ORDER BY 뒤에 붙일 페이지 절과 파라미터 (LIMIT ... OFFSET)"""
+        return "LIMIT ? OFFSET ?", (int(limit), int(offset))
+    
+    @contextmanager
+    def hold(self):
+        """단일 연결이므로 자기 자신을 그대로 사용"""
+        yield self
+    
+    def test_connection(self):
+        """연결 테스트"""
+        result = self.execute_query("SELECT 1 as test")
+        return result is not None and len(result) > 0
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+학습 데이터 스트리밍 로더
+
+CSV로 내보낸 뒤 다시 읽는 대신 SQL Server(SqlServerManager의 연결 또는 연결 풀)에서
+학습 데이터 조회 쿼리를 직접 실행한다. 결과는 iter_query(fetchmany)로 chunk 단위로 받아
+바로 타입이 정해진 numpy/categorical 컬럼으로 변환하므로 문자열 파싱을 두 번 하지 않고,
+메모리에는 변환된 컬럼만 남는다. SQL Server 기본 결과 집합은 전진 전용 스트림이므로
+fetchmany로 읽는 동안 서버가 전체 결과를 클라이언트로 한 번에 보내지 않는다.
+
+cache_dir을 지정하면 받은 chunk를 그대로 parquet 파일(chunk 하나 = row group 하나)에 기록하고,
+다음 실행부터는 DB 대신 캐시 스냅샷을 읽는다. 파일 이름에 쿼리와 파라미터의 해시가 들어가므로
+쿼리가 바뀌면 새로 조회한다. 원본에 새 행이 들어온 것은 알 수 없으므로 refresh=True로 다시 조회하거나
+max_age(초)로 스냅샷의 유효 기간을 정한다.
+
+SqlServerConnection, SqlServerConnectionPool, SqliteStandInConnection 모두 iter_query를
+제공하므로 SQL Server 없이도 SQLite 대체 연결로 검증할 수 있다.
+
+ex)
+con = SqlServerManager.get_instance().get_pool(host, port, database, username, password)
+loader = TrainingDataLoader(con, chunk_size=50000, cache_dir='res/cache')
+data = loader.load(read_query_file(), cache_name='cst')   # sql/조달청.학습데이터.sql (T-SQL)
+"""
+
+import os
+import re
+import glob
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# 학습 데이터 컬럼 타입 (float: float64, int: int64 - NULL이 있으면 float64, category: 범주형, str: 문자열)
+TRAINING_COLUMN_TYPES = {
+    '입찰번호': 'str',
+    '입찰차수': 'int',
+    '기초금액': 'float',
+    '기초금액률': 'float',
+    '낙찰하한률': 'float',
+    '참여업체수': 'float',
+    '최종낙찰률': 'float',
+    '업체사정률': 'float',
+    '예가사정률': 'float',
+    '업체투찰률': 'float',
+    '예가투찰률': 'float',
+    '투찰률오차': 'float',
+    '예정금액': 'int',
+    '순공사원가': 'int',
+    '기초예정금액': 'int',
+    '낙찰금액': 'int',
+    '간접비': 'int',
+    'A계산여부': 'int',
+    '순공사원가적용여부': 'int',
+    '낙찰하한가': 'int',
+    '면허제한코드': 'category',
+    '공고기관코드': 'category',
+    '주공종명': 'category',
+    '공고기관명': 'category',
+    '공사지역': 'category',
+    '키워드': 'str',
+}
+
+# 기본 학습 데이터 조회 쿼리 파일(SQL Server용 T-SQL)과 쿼리 블록 표식
+TRAINING_QUERY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'sql', '조달청.학습데이터.sql')
+TRAINING_QUERY_MARKER = 'with basic_bid_info'
+
+# 조회 결과에 반드시 있어야 하는 컬럼 (입력 특성, 대상, TF-IDF 텍스트)
+TRAINING_REQUIRED_COLUMNS = [
+    '기초금액', '낙찰하한률', '참여업체수', '면허제한코드',
+    '업체투찰률', '예가투찰률',
+    '키워드', '공고기관명', '공사지역',
+]
+
+
+def check_training_columns(columns, required=TRAINING_REQUIRED_COLUMNS):
+    """학습에 필요한 컬럼이 조회 결과에 모두 있는지 확인 (없으면 ValueError)"""
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise ValueError(f"학습 데이터 조회 결과에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+
+
+def read_query_file(path=TRAINING_QUERY_FILE, marker=TRAINING_QUERY_MARKER):
+    """
+    여러 쿼리가 모여 있는 .sql 파일에서 marker를 포함한 쿼리 하나를 추출
+
+    쿼리는 '#---', '----' 구분선 또는 빈 줄 3개 이상으로 나뉘어 있다고 본다.
+    '#'로 시작하는 주석(MySQL 형식)은 제거한다 ('--' 주석은 T-SQL에서 그대로 사용).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    blocks = re.split(r'^\s*(?:#-{3,}|-{4,}).*$|(?:\n[ \t]*){4,}', text, flags=re.MULTILINE)
+    for block in blocks:
+        if block and marker.lower() in block.lower():
+            query = re.sub(r'(^|\s)#.*$', r'\1', block, flags=re.MULTILINE)
+            return query.strip()
+
+    raise ValueError(f"쿼리 파일에서 '{marker}' 쿼리를 찾을 수 없습니다: {path}")
+
+
+def _typed_column(values, kind):
+    """chunk의 한 컬럼(파이썬 값 목록)을 타입이 정해진 배열로 변환"""
+    if kind in ('float', 'int'):
+        # Decimal/None 포함 → float64 (None은 NaN)
+        array = np.array(values, dtype=np.float64)
+        if kind == 'int' and not np.isnan(array).any():
+            return array.astype(np.int64)
+        return array
+    if kind == 'category':
+        return pd.Categorical(['' if v is None else str(v) for v in values])
+    return np.array(['' if v is None else str(v) for v in values], dtype=object)
+
+
+class TrainingDataLoader:
+    """학습 데이터 조회 결과를 chunk 단위로 받아 타입이 정해진 데이터프레임으로 만드는 클래스"""
+
+    def __init__(self, connection, chunk_size=50000, cache_dir=None, column_types=None):
+        """
+        Args:
+            connection: iter_query(query, params, chunk_size)를 제공하는 연결
+                        (SqlServerConnection, SqlServerConnectionPool, SqliteStandInConnection)
+            chunk_size (int): fetchmany 단위 행 수
+            cache_dir (str): parquet 캐시 폴더 (None이면 캐시 안함)
+            column_types (dict): TRAINING_COLUMN_TYPES에 더하거나 덮어쓸 컬럼 타입
+        """
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.cache_dir = cache_dir
+        self.column_types = dict(TRAINING_COLUMN_TYPES)
+        if column_types:
+            self.column_types.update(column_types)
+
+    def iter_frames(self, query, params=None):
+        """
+        쿼리 결과를 chunk마다 타입이 정해진 데이터프레임으로 반환하는 제너레이터
+
+        타입 정의에 없는 컬럼은 숫자로 변환되면 float, 아니면 문자열로 둔다.
+        """
+        for columns, rows in self.connection.iter_query(query, params, chunk_size=self.chunk_size):
+            if not rows:
+                continue
+            data = {}
+            for name, values in zip(columns, zip(*rows)):
+                data[name] = _typed_column(values, self._kind(name, values))
+            yield pd.DataFrame(data, columns=columns)
+
+    def load(self, query, params=None, cache_name=None, refresh=False, max_age=None,
+             required_columns=TRAINING_REQUIRED_COLUMNS):
+        """
+        학습 데이터 전체를 데이터프레임으로 반환
+
+        Args:
+            query (str): 학습 데이터 조회 쿼리
+            params: 쿼리 파라미터
+            cache_name (str): 캐시 파일 이름 (cache_dir과 함께 지정하면 parquet 스냅샷 사용)
+            refresh (bool): 캐시가 있어도 DB에서 다시 조회
+            max_age (float): 캐시 유효 기간 (초). 스냅샷이 이보다 오래되면 다시 조회 (None이면 기간 제한 없음)
+            required_columns (list): 조회 결과에 있어야 하는 컬럼 (첫 chunk에서 확인, None이면 확인 안함)
+
+        Returns:
+            pd.DataFrame: 학습 데이터 (범주형 컬럼은 category dtype)
+        """
+        cache_path = self.cache_path(cache_name, query, params)
+        if cache_path and os.path.exists(cache_path) and not refresh:
+            age = time.time() - os.path.getmtime(cache_path)
+            if max_age is not None and age > max_age:
+                print(f"학습 데이터 캐시가 오래되어 다시 조회합니다: {cache_path} ({age / 3600:,.1f}시간 경과)")
+                refresh = True
+        if cache_path and os.path.exists(cache_path) and not refresh:
+            started = time.time()
+            data = pd.read_parquet(cache_path)
+            check_training_columns(data.columns, required_columns or [])
+            data = self._restore_categories(data)
+            print(f"✅ 학습 데이터 캐시 사용: {cache_path} ({len(data):,}건, {time.time() - started:.1f}초)")
+            return data
+
+        started = time.time()
+        frames = []
+        writer = None
+        tmp_path = cache_path + '.tmp' if cache_path else None
+        loaded = 0
+        try:
+            for frame in self.iter_frames(query, params):
+                if not frames:
+                    check_training_columns(frame.columns, required_columns or [])  # 전체를 받기 전에 확인
+                frames.append(frame)
+                if tmp_path:
+                    writer = self._write_cache(writer, tmp_path, frame)
+                loaded += len(frame)
+                print(f"학습 데이터 조회: {loaded:,}건 - {loaded / max(time.time() - started, 1e-9):,.0f}건/초")
+        finally:
+            if writer is not None:
+                writer.close()
+
+        data = self._concat(frames)
+        if tmp_path and writer is not None:
+            os.replace(tmp_path, cache_path)
+            self._prune_cache(cache_name, cache_path)
+            print(f"학습 데이터 캐시 저장: {cache_path}")
+
+        print(f"✅ 학습 데이터 조회 완료: {len(data):,}건, {time.time() - started:.1f}초, "
+              f"{data.memory_usage(deep=True).sum() / 1024 / 1024:,.1f}MB")
+        return data
+
+    def cache_path(self, cache_name, query='', params=None):
+        """캐시 파일 경로 - <cache_name>.<쿼리/파라미터 해시>.parquet (캐시 미사용이면 None)"""
+        if not self.cache_dir or not cache_name:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = hashlib.sha256(f"{query}\n{params!r}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{cache_name}.{key}.parquet")
+
+    def _prune_cache(self, cache_name, keep_path):
+        """같은 cache_name의 이전 스냅샷(다른 쿼리/파라미터) 삭제"""
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), f"{glob.escape(cache_name)}.*.parquet")):
+            if os.path.abspath(path) != os.path.abspath(keep_path):
+                os.remove(path)
+
+    def _kind(self, name, values):
+        kind = self.column_types.get(name)
+        if kind:
+            return kind
+        sample = next((v for v in values if v is not None), None)
+        return 'str' if isinstance(sample, (str, bytes)) else 'float'
+
+    def _concat(self, frames):
+        """chunk 데이터프레임 합치기 (범주형은 chunk별 범주를 합쳐서 유지)"""
+        if not frames:
+            return pd.DataFrame(columns=list(self.column_types))
+
+        data = {}
+        for name in frames[0].columns:
+            parts = [f[name] for f in frames]
+            if isinstance(parts[0].dtype, pd.CategoricalDtype):
+                data[name] = pd.Series(union_categoricals([p.array for p in parts]))
+            else:
+                arrays = [p.to_numpy() for p in parts]
+                dtypes = {a.dtype for a in arrays}
+                if len(dtypes) > 1 and all(d.kind in 'if' for d in dtypes):
+                    # 어떤 chunk에만 NULL이 있으면 int64/float64가 섞임
+                    arrays = [a.astype(np.float64) for a in arrays]
+                data[name] = pd.Series(np.concatenate(arrays))
+        return pd.DataFrame(data, columns=frames[0].columns)
+
+    def _write_cache(self, writer, path, frame):
+        """chunk를 parquet row group으로 기록 (첫 chunk의 스키마 사용)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = writer.schema if writer is not None else None
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            # 범주형은 chunk마다 사전이 다르므로 문자열로 기록하고 읽을 때 다시 범주형으로 변환
+            fields = [pa.field(f.name, pa.string()) if pa.types.is_dictionary(f.type)
+                      else pa.field(f.name, pa.float64()) if pa.types.is_integer(f.type) else f
+                      for f in table.schema]
+            schema = pa.schema(fields)
+            writer = pq.ParquetWriter(path, schema, compression='zstd')
+        writer.write_table(table.cast(schema))
+        return writer
+
+    def _restore_categories(self, data):
+        """캐시에서 읽은 데이터의 컬럼 타입 복원"""
+        for name in data.columns:
+            kind = self.column_types.get(name)
+            if kind == 'category':
+                data[name] = data[name].fillna('').astype(str).astype('category')
+            elif kind == 'int' and not data[name].isna().any():
+                data[name] = data[name].astype(np.int64)
+        return data
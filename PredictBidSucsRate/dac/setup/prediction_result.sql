@@ -26,5 +26,25 @@ CREATE TABLE IF NOT EXISTS ML_C (
     , 참여업체수_예측 INTEGER
     , 등록일시 DATETIME NOT NULL DEFAULT(DATETIME('now', 'localtime'))
     , 예측일시 DATETIME
+    , 모델버전 VARCHAR(50)
     , PRIMARY KEY (입찰번호, 입찰차수)
 );
+
+-- 예측일시 역순 키셋 페이지 조회용 인덱스 (예측일시, 입찰번호, 입찰차수)
+CREATE INDEX IF NOT EXISTS IX_ML_C_예측일시 ON ML_C (예측일시 DESC, 입찰번호 DESC, 입찰차수 DESC);
+
+-- ML_C_SUMMARY 테이블 (모델버전/예측일자별 요약, 저장/삭제와 같은 트랜잭션에서 갱신)
+CREATE TABLE IF NOT EXISTS ML_C_SUMMARY (
+    모델버전 VARCHAR(50) NOT NULL
+    , 예측일자 DATE NOT NULL
+    , 건수 INTEGER NOT NULL DEFAULT 0
+    , 업체투찰률_합계 FLOAT NOT NULL DEFAULT 0
+    , 업체투찰률_건수 INTEGER NOT NULL DEFAULT 0
+    , 예가투찰률_합계 FLOAT NOT NULL DEFAULT 0
+    , 예가투찰률_건수 INTEGER NOT NULL DEFAULT 0
+    , 참여업체수_합계 FLOAT NOT NULL DEFAULT 0
+    , 참여업체수_건수 INTEGER NOT NULL DEFAULT 0
+    , 최초예측일시 DATETIME
+    , 최근예측일시 DATETIME
+    , PRIMARY KEY (모델버전, 예측일자)
+);
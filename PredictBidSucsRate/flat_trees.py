@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+트리 모델 평탄화(flattened array) 내보내기와 numpy 예측
+
+bid.ml.train.rf.py / bid.ml.train.gb.py 모델은 joblib으로 저장되고, 예측은 sklearn이 트리마다 Python
+루프를 돈다. 트리가 많으면 joblib 로드(트리 객체 수백 개 복원)도 느리고 1행 요청도 느리다.
+이 모듈은 학습된 트리 전체를 노드 배열 하나로 이어 붙여 파일 하나(<모델 파일>.flat)로 저장하고,
+모든 트리를 깊이 단위로 한꺼번에 따라 내려가는 numpy 예측기(FlatTreeModel)를 제공한다.
+
+- 지원: RandomForestRegressor/ExtraTreesRegressor/DecisionTreeRegressor, GradientBoostingRegressor
+        (init은 DummyRegressor 또는 'zero'), HistGradientBoostingRegressor (수치형 특성)
+- 노드 배열: feature(int32), threshold(float64), missing_left(uint8), left/right(int32), value(float64)
+  잎 노드는 left/right가 자기 자신을 가리켜 최대 깊이만큼 반복해도 잎에 머문다
+- 파일: 매직 + JSON 헤더 + 64바이트 정렬된 배열들. np.memmap으로 열어 로드 시 복사/역직렬화가 없다
+- 예측 값은 sklearn predict와 같다 (같은 비교 정밀도, 같은 합산 순서)
+  · sklearn 트리(RF/GB)는 입력을 float32로 바꿔 비교하고, HGB는 float64로 비교
+  · GB는 학습률을 잎 값에 미리 곱해 둔다 (sklearn도 learning_rate * 잎 값을 더함)
+
+ex)
+export_flat(model, 'res/rf.model1.v0.1.1.npz.flat')
+model = load_flat('res/rf.model1.v0.1.1.npz')   # .flat이 모델 파일보다 새것이면 FlatTreeModel, 아니면 None
+python flat_trees.py res/model/cst --verify-rows 10000
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+
+# 평탄화 파일 확장자 (모델 파일명 뒤에 붙임)
+FLAT_SUFFIX = '.flat'
+
+# 파일 시작 표시와 배열 정렬 단위
+FLAT_MAGIC = b'FLATTREE'
+FLAT_ALIGN = 64
+
+# 노드 배열 (이름, dtype)
+FLAT_FIELDS = (
+    ('feature', '<i4'),
+    ('threshold', '<f8'),
+    ('missing_left', 'u1'),
+    ('left', '<i4'),
+    ('right', '<i4'),
+    ('value', '<f8'),
+)
+
+# 한 번에 따라 내려가는 (트리 수 × 행 수) 상한 (중간 배열 메모리 제한)
+BLOCK_ELEMENTS = 1 << 22
+
+
+def flat_path(model_path):
+    """모델 파일의 평탄화 파일 경로"""
+    return model_path + FLAT_SUFFIX
+
+
+def _sklearn_tree(tree, scale=1.0):
+    """sklearn Tree(tree_) → 노드 배열 (잎은 자기 자신을 가리킴)"""
+    left = tree.children_left.astype(np.int32)
+    right = tree.children_right.astype(np.int32)
+    leaf = left < 0
+    nodes = np.arange(tree.node_count, dtype=np.int32)
+    missing = getattr(tree, 'missing_go_to_left', None)
+    return {
+        'feature': np.where(leaf, 0, tree.feature).astype(np.int32),
+        'threshold': np.where(leaf, 0.0, tree.threshold).astype(np.float64),
+        'missing_left': np.zeros(tree.node_count, np.uint8) if missing is None else np.asarray(missing, np.uint8),
+        'left': np.where(leaf, nodes, left),
+        'right': np.where(leaf, nodes, right),
+        'value': tree.value[:, 0, 0] * scale,
+    }, int(tree.max_depth)
+
+
+def _hist_tree(predictor):
+    """HistGradientBoosting TreePredictor.nodes → 노드 배열"""
+    nodes = predictor.nodes
+    if nodes['is_categorical'].any():
+        raise TypeError("범주형 특성을 쓰는 HistGradientBoostingRegressor는 평탄화할 수 없습니다.")
+    leaf = nodes['is_leaf'].astype(bool)
+    index = np.arange(len(nodes), dtype=np.int32)
+    return {
+        'feature': np.where(leaf, 0, nodes['feature_idx']).astype(np.int32),
+        'threshold': np.where(leaf, 0.0, nodes['num_threshold']).astype(np.float64),
+        'missing_left': nodes['missing_go_to_left'].astype(np.uint8),
+        'left': np.where(leaf, index, nodes['left']).astype(np.int32),
+        'right': np.where(leaf, index, nodes['right']).astype(np.int32),
+        'value': nodes['value'].astype(np.float64),
+    }, int(nodes['depth'].max())
+
+
+def flatten_model(model):
+    """
+    학습된 트리 모델을 노드 배열로 변환
+
+    Returns:
+        (arrays, meta): FLAT_FIELDS 배열 dict, 예측에 필요한 값 dict
+                        (roots, max_depth, init, divisor, float32_input, link, n_features, source)
+
+    Raises:
+        TypeError: 지원하지 않는 모델
+    """
+    name = type(model).__name__
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise TypeError(f"다중 출력 {name}는 평탄화할 수 없습니다.")
+
+    if hasattr(model, 'tree_'):                    # DecisionTreeRegressor
+        trees, init, divisor, float32_input, link = [_sklearn_tree(model.tree_)], 0.0, 1, True, 'identity'
+    elif hasattr(model, 'estimators_') and hasattr(model, 'init_'):   # GradientBoostingRegressor
+        if model.init_ == 'zero':
+            init = 0.0
+        elif type(model.init_).__name__ == 'DummyRegressor':
+            init = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise TypeError(f"init 모델({type(model.init_).__name__})이 있는 {name}는 평탄화할 수 없습니다.")
+        trees = [_sklearn_tree(e.tree_, model.learning_rate) for e in model.estimators_[:, 0]]
+        divisor, float32_input, link = 1, True, 'identity'
+    elif hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_):   # 랜덤 포레스트
+        trees = [_sklearn_tree(e.tree_) for e in model.estimators_]
+        init, divisor, float32_input, link = 0.0, len(trees), True, 'identity'
+    elif hasattr(model, '_predictors'):            # HistGradientBoostingRegressor
+        if getattr(model, 'n_trees_per_iteration_', 1) != 1:
+            raise TypeError(f"{name}: 반복당 트리가 여러 개인 모델은 평탄화할 수 없습니다.")
+        link = {'IdentityLink': 'identity', 'LogLink': 'log'}.get(type(model._loss.link).__name__)
+        if link is None:
+            raise TypeError(f"{name}: {type(model._loss.link).__name__} 출력 변환은 지원하지 않습니다.")
+        trees = [_hist_tree(predictors[0]) for predictors in model._predictors]
+        init, divisor, float32_input = float(np.ravel(model._baseline_prediction)[0]), 1, False
+    else:
+        raise TypeError(f"{name}는 평탄화할 수 없는 모델입니다.")
+    if not trees:
+        raise TypeError(f"{name}: 트리가 없습니다.")
+
+    # 트리별 노드 번호를 전체 배열 기준으로 옮겨 이어 붙임
+    offsets = np.cumsum([0] + [len(arrays['value']) for arrays, _ in trees[:-1]])
+    arrays = {}
+    for field, dtype in FLAT_FIELDS:
+        parts = [tree[field] + offset if field in ('left', 'right') else tree[field]
+                 for (tree, _), offset in zip(trees, offsets)]
+        arrays[field] = np.ascontiguousarray(np.concatenate(parts), dtype=dtype)
+    meta = {
+        'source': name,
+        'n_features': int(model.n_features_in_),
+        'roots': [int(v) for v in offsets],
+        'max_depth': max(depth for _, depth in trees),
+        'init': init,
+        'divisor': int(divisor),
+        'float32_input': float32_input,
+        'link': link,
+    }
+    return arrays, meta
+
+
+def is_supported(model):
+    try:
+        flatten_model(model)
+        return True
+    except TypeError:
+        return False
+
+
+def _aligned(position):
+    return -(-position // FLAT_ALIGN) * FLAT_ALIGN
+
+
+def export_flat(model, path):
+    """
+    모델을 평탄화 파일로 저장 (임시 파일에 쓴 뒤 교체)
+
+    Returns:
+        str: 저장 경로
+
+    Raises:
+        TypeError: 지원하지 않는 모델
+    """
+    arrays, meta = flatten_model(model)
+
+    # 헤더 길이가 배열 위치에 영향을 주므로 위치를 넣은 헤더가 고정될 때까지 계산
+    layout = {}
+    header = b''
+    while True:
+        position = _aligned(len(FLAT_MAGIC) + 8 + len(header))
+        fields = {}
+        for field, dtype in FLAT_FIELDS:
+            fields[field] = {'dtype': dtype, 'count': int(len(arrays[field])), 'offset': position}
+            position = _aligned(position + arrays[field].nbytes)
+        encoded = json.dumps(dict(meta, fields=fields), ensure_ascii=False).encode('utf-8')
+        if fields == layout and len(encoded) == len(header):
+            break
+        layout, header = fields, encoded
+
+    with open(path + '.tmp', 'wb') as f:
+        f.write(FLAT_MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for field, _ in FLAT_FIELDS:
+            f.write(b'\0' * (layout[field]['offset'] - f.tell()))
+            f.write(arrays[field].tobytes())
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def export_if_supported(model, model_path):
+    """지원하는 트리 모델이면 <모델 파일>.flat 저장 (아니면 None)"""
+    if not is_supported(model):
+        return None
+    path = export_flat(model, flat_path(model_path))
+    print(f"💾 평탄화 트리 저장: {path}")
+    return path
+
+
+class FlatTreeModel:
+    """평탄화 파일을 memmap으로 열어 sklearn 모델처럼 predict(x)하는 예측기"""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        for field, _ in FLAT_FIELDS:
+            setattr(self, field, arrays[field])
+        self.roots = np.asarray(meta['roots'], dtype=np.int32)
+        self.n_features_in_ = meta['n_features']
+        self.n_trees = len(self.roots)
+        self._children = None
+
+    def children(self):
+        """자식 노드 배열 [오른쪽, 왼쪽]을 노드마다 이어 붙인 것 (한 번의 gather로 다음 노드 선택)"""
+        if self._children is None:
+            self._children = np.stack([self.right, self.left], axis=1).ravel()
+        return self._children
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """평탄화 파일 열기 (mmap=False면 메모리로 읽음)"""
+        with open(path, 'rb') as f:
+            if f.read(len(FLAT_MAGIC)) != FLAT_MAGIC:
+                raise ValueError(f"평탄화 트리 파일이 아닙니다: {path}")
+            size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            meta = json.loads(f.read(size).decode('utf-8'))
+        arrays = {}
+        for field, spec in meta['fields'].items():
+            if mmap and spec['count']:
+                arrays[field] = np.memmap(path, dtype=spec['dtype'], mode='r', offset=spec['offset'],
+                                          shape=(spec['count'],))
+            else:
+                arrays[field] = np.fromfile(path, dtype=spec['dtype'], count=spec['count'], offset=spec['offset'])
+        return cls(arrays, meta)
+
+    def _raw_block(self, x, has_nan):
+        """행 묶음 하나의 원시 예측 (모든 트리를 깊이 단위로 동시에 내려감)"""
+        children = self.children()
+        flat_x = x.ravel()
+        base = np.arange(len(x), dtype=np.int64) * x.shape[1]       # 행마다 flat_x 시작 위치
+        node = np.repeat(self.roots[:, None], len(x), axis=1)     # (트리 수, 행 수)
+        for _ in range(self.meta['max_depth']):
+            values = flat_x.take(base + self.feature.take(node))
+            go_left = values <= self.threshold.take(node)
+            if has_nan:
+                go_left |= np.isnan(values) & (self.missing_left.take(node) != 0)
+            following = children.take(node * 2 + go_left)
+            if np.array_equal(following, node):
+                break   # 모두 잎에 도착 (잎이 아닌 노드는 항상 자식으로 이동)
+            node = following
+        leaves = self.value.take(node)
+        # sklearn과 같은 순서로 합산: init + 트리1 + 트리2 ... (sum(axis=0)은 1행일 때 pairwise 합이라
+        # 마지막 비트가 달라지므로 트리 순서대로 누적)
+        leaves[0] += self.meta['init']
+        return np.add.accumulate(leaves, axis=0)[-1]
+
+    def predict(self, x):
+        """
+        예측 (sklearn predict와 같은 값)
+
+        Args:
+            x: (행 수, 특성 수) 배열 또는 리스트 (정규화된 입력)
+
+        Returns:
+            np.ndarray: (행 수,)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if x.shape[1] != self.n_features_in_:
+            raise ValueError(f"입력 특성 수({x.shape[1]})가 모델({self.n_features_in_})과 다릅니다.")
+        if self.meta['float32_input']:
+            x = x.astype(np.float32).astype(np.float64)   # sklearn 트리는 float32로 비교
+        x = np.ascontiguousarray(x)
+
+        rows = max(1, BLOCK_ELEMENTS // self.n_trees)
+        has_nan = bool(np.isnan(x).any())
+        raw = np.concatenate([self._raw_block(x[start:start + rows], has_nan) for start in range(0, len(x), rows)]) \
+            if len(x) else np.zeros(0)
+        if self.meta['divisor'] != 1:
+            raw /= self.meta['divisor']
+        if self.meta['link'] == 'log':
+            raw = np.exp(raw)
+        return raw
+
+
+def load_flat(model_path, mmap=True):
+    """모델 파일 옆의 평탄화 파일이 모델 파일보다 새것이면 FlatTreeModel, 아니면 None"""
+    path = flat_path(model_path)
+    if not os.path.exists(path):
+        return None
+    if os.path.exists(model_path) and os.path.getmtime(path) < os.path.getmtime(model_path):
+        print(f"⚠️  평탄화 트리가 모델 파일보다 오래되어 사용하지 않습니다: {path}")
+        return None
+    return FlatTreeModel.load(path, mmap)
+
+
+def single_row_latency(model, x, repeat):
+    """1행 예측 평균 시간 (ms)"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        model.predict(x[i % len(x):i % len(x) + 1])
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    from model_bundle import FAMILY_FILES, detect_family, load_model_file
+
+    parser = argparse.ArgumentParser(description="RF/GB 트리 모델 평탄화 내보내기와 로드/예측 시간 비교")
+    parser.add_argument('directory', help="모델 묶음 폴더 (rf/gb 학습 결과)")
+    parser.add_argument('--family', default='auto', choices=['auto', 'rf', 'gb'])
+    parser.add_argument('--verify-rows', type=int, default=10000, help="예측 값 비교에 쓰는 무작위 행 수")
+    parser.add_argument('--repeat', type=int, default=200, help="1행 예측 반복 횟수")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    family = detect_family(args.directory) if args.family == 'auto' else args.family
+    rows = []
+    for key in ('model1', 'model2', 'model3'):
+        path = os.path.join(args.directory, FAMILY_FILES[family][key])
+        if not os.path.exists(path):
+            continue
+        start = time.perf_counter()
+        model = load_model_file(path)
+        joblib_sec = time.perf_counter() - start
+        try:
+            export_flat(model, flat_path(path))
+        except TypeError as e:
+            print(f"⚠️  {key}: {e}")
+            continue
+        start = time.perf_counter()
+        flat = FlatTreeModel.load(flat_path(path))
+        flat_sec = time.perf_counter() - start
+
+        # 정규화된 입력과 비슷한 분포의 무작위 행으로 비교 (여러 행 + 1행)
+        # n_jobs != 1 포레스트는 sklearn이 트리 합산 순서를 보장하지 않으므로 허용오차로 비교
+        x = np.random.default_rng(args.seed).normal(size=(args.verify_rows, model.n_features_in_))
+        exact = getattr(model, 'n_jobs', None) in (None, 1)
+        compare = np.array_equal if exact else lambda a, b: np.allclose(a, b, rtol=1e-12, atol=0)
+        same = compare(model.predict(x), flat.predict(x)) and compare(model.predict(x[:1]), flat.predict(x[:1]))
+        rows.append({
+            '모델': key, '원본': type(model).__name__, '트리 수': flat.n_trees, '노드 수': len(flat.value),
+            '파일(MB)': os.path.getsize(flat_path(path)) / 1024 ** 2,
+            'joblib 로드(ms)': joblib_sec * 1000, '평탄화 로드(ms)': flat_sec * 1000,
+            'sklearn 1행(ms)': single_row_latency(model, x, args.repeat),
+            '평탄화 1행(ms)': single_row_latency(flat, x, args.repeat),
+            '예측 일치': ('✅' if exact else '✅ 허용오차') if same else '⚠️ 불일치',
+        })
+        print(f"💾 {key}: {flat_path(path)}")
+
+    if rows:
+        import pandas as pd
+        print("-" * 80)
+        print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f'{v:,.3f}'))
+
+
+if __name__ == "__main__":
+    main()
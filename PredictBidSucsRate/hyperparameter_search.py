@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+"""
+모델 계열별 하이퍼파라미터 탐색 (successive halving / Hyperband, 프로세스 병렬)
+
+setupModels()의 설정(은닉층 (10, 64, 128, 64), CatBoost depth 8, XGBoost 200 trees 등)은 스크립트마다
+손으로 정한 값이다. 이 모듈은 학습 CSV를 한 번만 전처리해 특성 캐시(res/cache/hpsearch_*/x.npy, y.npy)로
+저장하고, 프로세스 풀의 작업자들이 캐시를 메모리 매핑으로 공유하며 후보 설정을 학습/평가한다.
+
+- 자원(resource)은 학습 행 수: 후보를 적은 행으로 학습하고, 상위 1/eta만 eta배 많은 행으로 다시 학습
+- brackets > 1이면 Hyperband (시작 행 수가 다른 successive halving 여러 개)
+- 후보에는 항상 setupModels 기본 설정({})이 포함된다
+- 모든 시도(설정, 점수, 시간)는 trials.jsonl에 기록되고, 다시 실행하면 끝난 시도는 건너뛴다
+- 대상(모델1/2/3)별 최고 설정을 res/best_params.json에 저장하고, 학습 스크립트 setupModels()가 읽어 적용한다
+
+ex)
+python hyperparameter_search.py data/result_data_cst.csv --families mlp rf gb --jobs 4
+python hyperparameter_search.py data/result_data_cst.csv --families gb --configs 81 --brackets 3 --output res/hpsearch_gb.json
+python hyperparameter_search.py data/result_data_cst.csv --families rf --split time   # 최근 입찰 20%를 검증으로 사용
+"""
+
+import os
+import io
+import json
+import math
+import time
+import hashlib
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+# 탐색 결과 파일 (학습 스크립트 res 폴더)
+BEST_PARAMS_FILE = 'best_params.json'
+
+# 시도 기록 파일 (특성 캐시 폴더 안)
+TRIALS_FILE = 'trials.jsonl'
+
+# 예측 대상 (모델 1, 2, 3)
+TARGET_NAMES = ['업체투찰률', '예가투찰률', '참여업체수']
+
+# 계열별 탐색 공간: ('choice', 값 목록) / ('int', 최소, 최대) / ('float', 최소, 최대) / ('log', 최소, 최대)
+# 모델에 없는 파라미터는 적용하지 않는다 (예: XGBoost가 없어 GradientBoostingRegressor면 colsample_bytree 제외)
+SEARCH_SPACES = {
+    'mlp': {
+        'hidden_layer_sizes': ('choice', [(10, 64, 128, 64), (10, 256, 128), (64, 64), (128, 64), (256, 128, 64)]),
+        'alpha': ('log', 1e-6, 1e-2),
+        'learning_rate_init': ('log', 1e-4, 1e-2),
+        'batch_size': ('choice', [64, 200, 512]),
+    },
+    'rf': {
+        'n_estimators': ('int', 100, 400),
+        'max_depth': ('choice', [10, 15, 20, 25, None]),
+        'min_samples_split': ('int', 2, 10),
+        'min_samples_leaf': ('int', 1, 5),
+        'max_features': ('choice', ['sqrt', 'log2', 0.5, 1.0]),
+    },
+    'gb': {
+        'n_estimators': ('int', 100, 500),
+        'max_iter': ('int', 100, 500),  # HistGradientBoostingRegressor (XGBoost/LightGBM 대체 모델)
+        'max_depth': ('int', 3, 10),
+        'learning_rate': ('log', 0.01, 0.3),
+        'subsample': ('float', 0.5, 1.0),
+        'colsample_bytree': ('float', 0.5, 1.0),
+    },
+    'cb': {
+        'iterations': ('int', 500, 3000),
+        'depth': ('int', 4, 10),
+        'learning_rate': ('log', 0.01, 0.3),
+        'l2_leaf_reg': ('log', 1.0, 10.0),
+    },
+}
+
+
+def model_params(config):
+    """JSON 설정 → set_params 인자 (목록은 튜플로: hidden_layer_sizes)"""
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in config.items()}
+
+
+def apply_best_params(models, family, directory=None):
+    """
+    best_params.json의 탐색 결과를 setupModels() 모델에 적용 (파일이나 항목이 없으면 그대로)
+
+    Args:
+        models (list): [model1, model2, model3]
+        family (str): 모델 계열 (mlp, rf, gb, cb)
+        directory (str): best_params.json이 있는 폴더 (학습 스크립트 save_dir, None이면 적용 안함)
+    """
+    path = os.path.join(directory, BEST_PARAMS_FILE) if directory else None
+    if not path or not os.path.exists(path):
+        return models
+    with open(path, encoding='utf-8') as f:
+        entry = json.load(f).get(family, {}).get('models', {})
+    for i, model in enumerate(models):
+        params = model_params(entry.get(f'model{i + 1}', {}).get('params', {}))
+        # build_model과 같이 모델에 없는 파라미터는 제외 (CatBoost get_params는 지정한 값만 반환)
+        if type(model).__module__.split('.')[0] != 'catboost':
+            known = model.get_params()
+            dropped = sorted(k for k in params if k not in known)
+            if dropped:
+                print(f"⚠️  모델{i + 1} ({type(model).__name__})에 없는 탐색 파라미터 제외: {dropped}")
+            params = {k: v for k, v in params.items() if k in known}
+        if params:
+            model.set_params(**params)
+            print(f"✅ 모델{i + 1} 탐색 설정 적용 ({BEST_PARAMS_FILE}): {params}")
+    return models
+
+
+def write_best_params(path, family, best, source):
+    """계열의 대상별 최고 설정을 best_params.json에 저장 (다른 계열 항목은 유지)"""
+    state = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    state[family] = {
+        'updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'models': {f'model{index + 1}': {'target': TARGET_NAMES[index], 'params': trial['applied'],
+                                         'R2': trial['score'], 'rows': trial['rows']}
+                   for index, trial in sorted(best.items())},
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+    print(f"💾 저장: {path} ({family})")
+
+
+def sample_config(space, rng):
+    """탐색 공간에서 설정 하나 뽑기 (JSON으로 저장 가능한 값)"""
+    config = {}
+    for name, (kind, *args) in space.items():
+        if kind == 'choice':
+            value = args[0][int(rng.integers(len(args[0])))]
+            value = list(value) if isinstance(value, tuple) else value
+        elif kind == 'int':
+            value = int(rng.integers(args[0], args[1] + 1))
+        elif kind == 'log':
+            value = float(f"{math.exp(rng.uniform(math.log(args[0]), math.log(args[1]))):.4g}")
+        else:
+            value = float(f"{rng.uniform(args[0], args[1]):.4g}")
+        config[name] = value
+    return config
+
+
+def build_feature_cache(paths, cache_root, bid_type='cst', bundle_dir=None, valid_ratio=0.2, seed=1,
+                        split='random'):
+    """
+    학습 CSV → 정규화된 특성 캐시 (x.npy, y.npy, meta.json). 같은 입력이면 기존 캐시 재사용
+
+    캐시의 앞 n_train행이 학습, 나머지가 검증이다. 학습 행은 seed로 섞여 있어 작업자가 앞에서부터
+    잘라 쓰는 적은 행 수의 학습도 전체 기간에서 고르게 뽑힌다.
+
+    bundle_dir의 텍스트 점수(TF-IDF 단어사전)는 그 묶음을 학습한 행으로 만든 것이다. 묶음이 같은 CSV로
+    학습되었다면 검증 행의 키워드도 단어사전에 들어 있어 검증 점수가 실제보다 좋게 나온다.
+    검증 기간(split='time'의 마지막 행들) 이전 데이터로만 학습한 묶음을 지정해야 한다.
+
+    Args:
+        paths (list): 학습 CSV
+        cache_root (str): 캐시 상위 폴더 (res/cache)
+        bid_type (str): cst면 특성 9개, 아니면 7개
+        bundle_dir (str): 텍스트 점수를 계산할 모델 묶음 (None이면 입력의 점수 컬럼 사용)
+        valid_ratio (float): 검증용 비율
+        seed (int): 행 섞기 seed
+        split (str): 'random'이면 섞은 뒤 무작위 행을 검증으로,
+                     'time'이면 개찰일시(없으면 입찰번호 연월) 순으로 가장 최근 행들을 검증으로 사용
+
+    Returns:
+        str: 캐시 폴더
+    """
+    from sklearn.preprocessing import StandardScaler
+    from model_bundle import ModelBundle, feature_columns, feature_values, BASE_FEATURES, CONSTRUCTION_FEATURES
+
+    if split not in ('random', 'time'):
+        raise ValueError(f"split은 'random' 또는 'time'이어야 합니다: {split}")
+    sources = [[os.path.abspath(p), os.path.getsize(p), int(os.path.getmtime(p))] for p in paths]
+    key = json.dumps([sources, bid_type, bundle_dir and os.path.abspath(bundle_dir), valid_ratio, seed]
+                     + ([split] if split != 'random' else []))
+    directory = os.path.join(cache_root, f"hpsearch_{bid_type}_{hashlib.sha1(key.encode()).hexdigest()[:12]}")
+    if os.path.exists(os.path.join(directory, 'meta.json')):
+        print(f"♻️  특성 캐시 사용: {directory}")
+        return directory
+
+    started = time.perf_counter()
+    frame = pd.concat([pd.read_csv(p, low_memory=False) for p in paths], ignore_index=True)
+    n_features = len(BASE_FEATURES) + (len(CONSTRUCTION_FEATURES) if bid_type == 'cst' else 0)
+    features = feature_columns(n_features)
+    if bundle_dir:
+        print(f"⚠️  텍스트 점수에 {bundle_dir} 묶음을 사용합니다. 검증 행으로 학습한 묶음이면 검증 점수가 높게 나옵니다.")
+    score_text = ModelBundle(bundle_dir).score_text if bundle_dir else None
+    x = feature_values(frame, features, score_text)
+    y = frame[TARGET_NAMES].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    keep = np.isfinite(y).all(axis=1)
+    n_rows = int(keep.sum())
+    n_train = n_rows - int(n_rows * valid_ratio)
+    rng = np.random.default_rng(seed)
+    if split == 'time':
+        # 날짜 순으로 마지막 행들을 검증으로 두고 학습 행만 섞음 (날짜를 모르는 행은 가장 오래된 쪽)
+        from backtest_engine import bid_dates
+        dates = bid_dates(frame[keep].reset_index(drop=True))
+        order = dates.sort_values(kind='stable', na_position='first').index.to_numpy(copy=True)
+        order[:n_train] = order[:n_train][rng.permutation(n_train)]
+    else:
+        order = rng.permutation(n_rows)
+    x, y = x[keep][order], y[keep][order]
+    x = StandardScaler().fit(x[:n_train]).transform(x)
+
+    os.makedirs(directory + '.tmp', exist_ok=True)
+    np.save(os.path.join(directory + '.tmp', 'x.npy'), x)
+    np.save(os.path.join(directory + '.tmp', 'y.npy'), y)
+    meta = {'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'inputs': list(paths), 'bid_type': bid_type,
+            'features': features, 'split': split, 'n_train': int(n_train), 'n_valid': int(len(x) - n_train),
+            'fingerprint': hashlib.sha1(key.encode()).hexdigest()}
+    with open(os.path.join(directory + '.tmp', 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(directory + '.tmp', directory)
+    print(f"💾 특성 캐시 저장: {directory} (학습 {n_train:,}건 / 검증 {meta['n_valid']:,}건, "
+          f"{time.perf_counter() - started:.1f}초)")
+    return directory
+
+
+# ===== 작업자 프로세스 =====
+
+_WORKER = {}
+
+
+def _init_worker(cache_dir):
+    """작업자 시작 시 특성 캐시를 메모리 매핑으로 연다 (프로세스 간 복사 없음)"""
+    with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as f:
+        _WORKER['meta'] = json.load(f)
+    _WORKER['x'] = np.load(os.path.join(cache_dir, 'x.npy'), mmap_mode='r')
+    _WORKER['y'] = np.load(os.path.join(cache_dir, 'y.npy'), mmap_mode='r')
+    _WORKER['base'] = {}
+
+
+def base_models(family, cache=None):
+    """학습 스크립트 setupModels()의 기본 모델 3개 (출력은 숨김)"""
+    cache = _WORKER.setdefault('base', {}) if cache is None else cache
+    if family not in cache:
+        from train_scripts import load_script, setup_models, TRAIN_SCRIPTS
+        with contextlib.redirect_stdout(io.StringIO()):
+            cache[family] = setup_models(load_script(TRAIN_SCRIPTS[family]))
+    return cache[family]
+
+
+def build_model(family, index, config):
+    """기본 모델에 설정 적용 (모델에 없는 파라미터는 제외). (모델, 적용된 설정) 반환"""
+    from sklearn.base import clone
+
+    model = clone(base_models(family)[index])
+    params = model.get_params()
+    library = type(model).__module__.split('.')[0]
+    applied = {k: v for k, v in config.items() if k in params or library == 'catboost'}
+    model.set_params(**model_params(applied))
+
+    # 작업자마다 프로세스 하나를 쓰므로 모델 내부 병렬화와 진행 출력은 끈다
+    if library == 'catboost':
+        model.set_params(thread_count=1, verbose=False)
+    quiet = {'n_jobs': 1, 'verbose': 0, 'verbosity': -1 if library == 'lightgbm' else 0}
+    model.set_params(**{k: v for k, v in quiet.items() if k in params})
+    return model, applied
+
+
+def run_trial(task):
+    """후보 설정 하나를 task['rows']행으로 학습하고 검증 R2/RMSE 계산"""
+    from sklearn.metrics import r2_score, mean_squared_error
+
+    n_train = _WORKER['meta']['n_train']
+    x, y = _WORKER['x'], _WORKER['y']
+    index, rows = task['target'], task['rows']
+    result = {'score': None, 'rmse': None, 'fit_sec': None, 'applied': None, 'error': None}
+    try:
+        model, result['applied'] = build_model(task['family'], index, task['config'])
+        started = time.perf_counter()
+        model.fit(np.asarray(x[:rows]), np.asarray(y[:rows, index]))
+        result['fit_sec'] = round(time.perf_counter() - started, 3)
+        predicted = np.asarray(model.predict(np.asarray(x[n_train:]))).ravel()
+        result['score'] = float(r2_score(y[n_train:, index], predicted))
+        result['rmse'] = float(np.sqrt(mean_squared_error(y[n_train:, index], predicted)))
+    except Exception as e:  # 잘못된 조합 등은 실패로 기록하고 탐색은 계속
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+# ===== 탐색 =====
+
+class TrialCache:
+    """시도 기록 (JSON Lines). 다시 실행하면 같은 키의 시도는 건너뛴다"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.records[record['key']] = record
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def add(self, record):
+        self.records[record['key']] = record
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class HyperparameterSearch:
+    """계열 × 대상별 successive halving (Hyperband) 탐색"""
+
+    def __init__(self, cache_dir, families, targets=(0, 1, 2), n_configs=27, eta=3, min_rows=2000,
+                 brackets=1, jobs=None, seed=1):
+        """
+        Args:
+            cache_dir (str): build_feature_cache() 결과 폴더
+            families (list): 탐색할 모델 계열 (SEARCH_SPACES 키)
+            targets (tuple): 탐색할 대상 번호 (0: 업체투찰률, 1: 예가투찰률, 2: 참여업체수)
+            n_configs (int): 첫 bracket의 후보 수
+            eta (int): 단계마다 남기는 비율의 역수 (3이면 상위 1/3)
+            min_rows (int): 첫 단계 최소 학습 행 수
+            brackets (int): Hyperband bracket 수 (1이면 successive halving)
+            jobs (int): 작업자 프로세스 수 (None이면 CPU 수)
+        """
+        with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.cache_dir = cache_dir
+        self.families = list(families)
+        self.targets = list(targets)
+        self.n_configs = n_configs
+        self.eta = eta
+        self.n_train = self.meta['n_train']
+        self.max_rung = max(0, int(math.floor(math.log(self.n_train / min_rows, eta) + 1e-9)))
+        self.brackets = max(1, min(brackets, self.max_rung + 1))
+        self.jobs = jobs or os.cpu_count() or 1
+        self.seed = seed
+        self.trials = TrialCache(os.path.join(cache_dir, TRIALS_FILE))
+
+    def rows_at(self, rung):
+        """단계별 학습 행 수 (마지막 단계는 전체 학습 행)"""
+        return max(1, int(round(self.n_train / self.eta ** (self.max_rung - rung))))
+
+    def trial_key(self, family, target, config, rows):
+        text = json.dumps([self.meta['fingerprint'], family, target, config, rows], sort_keys=True)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def ladders(self):
+        """bracket마다 후보 목록 (같은 seed면 다시 실행해도 같은 후보)"""
+        ladders = []
+        for family in self.families:
+            for target in self.targets:
+                for bracket in range(self.brackets):
+                    # bracket이 높을수록 후보는 적고 첫 단계 학습 행은 많다
+                    n = max(1, int(math.ceil(self.n_configs / self.eta ** bracket)))
+                    rng = np.random.default_rng([self.seed, target, bracket, sorted(SEARCH_SPACES).index(family)])
+                    configs = [{}] if bracket == 0 else []
+                    configs += [sample_config(SEARCH_SPACES[family], rng) for _ in range(n - len(configs))]
+                    ladders.append({'family': family, 'target': target, 'bracket': bracket, 'rung': bracket,
+                                    'alive': list(range(len(configs))), 'configs': configs, 'scores': {},
+                                    'pending': 0, 'done': False})
+        return ladders
+
+    def run(self):
+        """
+        탐색 실행
+
+        Returns:
+            dict: {(계열, 대상): 최고 시도 기록} (전체 행 수로 학습한 시도 중 최고 R2)
+        """
+        started = time.perf_counter()
+        ladders = self.ladders()
+        futures = {}
+        counts = {'run': 0, 'cached': 0}
+
+        def submit(ladder):
+            rows = self.rows_at(ladder['rung'])
+            ladder['scores'] = {}
+            for cid in ladder['alive']:
+                config = ladder['configs'][cid]
+                key = self.trial_key(ladder['family'], ladder['target'], config, rows)
+                if key in self.trials:
+                    ladder['scores'][cid] = self.trials[key]['score']
+                    counts['cached'] += 1
+                    continue
+                task = {'family': ladder['family'], 'target': ladder['target'], 'config': config, 'rows': rows}
+                futures[pool.submit(run_trial, task)] = (ladder, cid, key, task)
+                ladder['pending'] += 1
+            if ladder['pending'] == 0:
+                advance(ladder)
+
+        def advance(ladder):
+            if ladder['rung'] >= self.max_rung:
+                ladder['done'] = True
+                return
+            keep = max(1, len(ladder['alive']) // self.eta)
+            ranked = sorted(ladder['alive'], key=lambda cid: -np.inf if ladder['scores'][cid] is None
+                            else ladder['scores'][cid], reverse=True)
+            ladder['alive'] = ranked[:keep]
+            if ladder['bracket'] == 0 and 0 not in ladder['alive']:
+                ladder['alive'].append(0)  # 기본 설정은 비교 기준으로 끝까지 남긴다
+            ladder['rung'] += 1
+            submit(ladder)
+
+        print(f"🔍 탐색 시작: {', '.join(self.families)} × 대상 {len(self.targets)}개, bracket {self.brackets}개, "
+              f"단계 {[self.rows_at(r) for r in range(self.max_rung + 1)]}행, 작업자 {self.jobs}개")
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(self.cache_dir,)) as pool:
+            for ladder in ladders:
+                submit(ladder)
+            while futures:
+                finished, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    ladder, cid, key, task = futures.pop(future)
+                    result = future.result()
+                    record = dict(task, key=key, target_name=TARGET_NAMES[task['target']],
+                                  finished=datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **result)
+                    self.trials.add(record)
+                    counts['run'] += 1
+                    ladder['scores'][cid] = result['score']
+                    ladder['pending'] -= 1
+                    if result['error']:
+                        print(f"⚠️  {task['family']} {record['target_name']} {task['config']}: {result['error']}")
+                    if ladder['pending'] == 0:
+                        advance(ladder)
+
+        print(f"✅ 탐색 완료: 실행 {counts['run']}건, 기록 재사용 {counts['cached']}건 "
+              f"({time.perf_counter() - started:.1f}초)")
+        return self.best()
+
+    def best(self):
+        """계열/대상별로 전체 학습 행으로 학습한 시도 중 최고 R2 기록"""
+        best = {}
+        for ladder in self.ladders():
+            for config in ladder['configs']:
+                key = self.trial_key(ladder['family'], ladder['target'], config, self.n_train)
+                record = self.trials.records.get(key)
+                if record is None or record['score'] is None:
+                    continue
+                slot = (ladder['family'], ladder['target'])
+                if slot not in best or record['score'] > best[slot]['score']:
+                    best[slot] = record
+        return best
+
+    def default_score(self, family, target):
+        record = self.trials.records.get(self.trial_key(family, target, {}, self.n_train))
+        return record['score'] if record else None
+
+
+def print_best(search, best):
+    """대상별 최고 설정 표"""
+    rows = []
+    for (family, target), record in sorted(best.items()):
+        attempts = [r for r in search.trials.records.values() if r['family'] == family and r['target'] == target]
+        default = search.default_score(family, target)
+        rows.append({
+            '계열': family,
+            '대상': TARGET_NAMES[target],
+            '시도': len(attempts),
+            '학습(초)': round(sum(r['fit_sec'] or 0 for r in attempts), 1),
+            '기본 R2': None if default is None else round(default, 4),
+            '최고 R2': round(record['score'], 4),
+            '설정': json.dumps(record['applied'], ensure_ascii=False) if record['applied'] else '(기본)',
+        })
+    if rows:
+        print("="*80)
+        print(pd.DataFrame(rows).set_index(['계열', '대상']).to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 계열별 하이퍼파라미터 탐색 (successive halving / Hyperband)")
+    parser.add_argument('input', nargs='+', help="학습 CSV")
+    parser.add_argument('--families', nargs='+', default=['mlp', 'rf', 'gb', 'cb'], choices=sorted(SEARCH_SPACES))
+    parser.add_argument('--targets', nargs='+', type=int, default=[1, 2, 3], help="모델 번호 (1, 2, 3)")
+    parser.add_argument('--bid-type', default='cst', help="입찰 유형 (cst면 특성 9개, mtrl/gdns는 7개)")
+    parser.add_argument('--bundle', default=None,
+                        help="텍스트 점수를 계산할 모델 묶음 (없으면 점수 컬럼 사용). 검증 행 이전 데이터로 학습한 묶음을 지정")
+    parser.add_argument('--configs', type=int, default=27, help="첫 bracket 후보 수")
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--min-rows', type=int, default=2000, help="첫 단계 학습 행 수")
+    parser.add_argument('--brackets', type=int, default=1, help="Hyperband bracket 수 (1이면 successive halving)")
+    parser.add_argument('--valid-ratio', type=float, default=0.2)
+    parser.add_argument('--split', choices=['random', 'time'], default='random',
+                        help="검증 행 선택 (random: 무작위, time: 개찰일시 기준 가장 최근 행)")
+    parser.add_argument('--jobs', type=int, default=None, help="작업자 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cache-dir', default=os.path.join('res', 'cache'), help="특성 캐시 상위 폴더")
+    parser.add_argument('--best-file', default=os.path.join('res', BEST_PARAMS_FILE), help="최고 설정 저장 파일")
+    parser.add_argument('--output', default=None, help="탐색 결과 JSON 경로")
+    args = parser.parse_args()
+
+    families = []
+    for family in args.families:
+        try:
+            base_models(family, {})
+            families.append(family)
+        except Exception as e:
+            print(f"⚠️  {family}: 학습 스크립트를 불러올 수 없어 제외합니다 ({type(e).__name__}: {e})")
+    if not families:
+        return
+
+    cache_dir = build_feature_cache(args.input, args.cache_dir, args.bid_type, args.bundle, args.valid_ratio, args.seed,
+                                    args.split)
+    search = HyperparameterSearch(cache_dir, families, [t - 1 for t in args.targets], args.configs, args.eta,
+                                  args.min_rows, args.brackets, args.jobs, args.seed)
+    best = search.run()
+    print_best(search, best)
+
+    for family in families:
+        entries = {target: record for (f, target), record in best.items() if f == family}
+        if entries and args.best_file:
+            write_best_params(args.best_file, family, entries, cache_dir)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'inputs': args.input,
+                       'cache': cache_dir, 'settings': vars(args),
+                       'best': [dict(record, family=family) for (family, _), record in sorted(best.items())],
+                       'trials': list(search.trials.records.values())}, f, ensure_ascii=False, indent=2)
+        print(f"💾 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+이전 모델 묶음에서 이어서 학습하는 증분 재학습 (warm start)
+
+매월 새로 쌓이는 입찰은 전체 이력의 일부인데, 학습 스크립트는 매번 tokenizer, vectorizer,
+스케일러, 모델 3개를 전체 이력으로 처음부터 다시 학습한다. 증분 재학습은 이전 묶음
+(res/model/<유형>/ 또는 그 아래 가장 최근 버전 폴더)을 불러와
+
+- 단어사전(tokenizer/vectorizer)은 그대로 쓰고
+- 스케일러는 유지하거나 (--scaler-drift) 평균/표준편차 변화를 제한해 갱신하고
+- 모델은 새 데이터 + 이전 이력 재현 표본(replay)으로 이어서 학습한다
+    MLP             : partial_fit (TrainingCheckpointer, --epochs epoch 안에서 조기 종료)
+    XGBoost         : xgb_model=이전 booster, 트리 --extra-trees개 추가
+    LightGBM        : init_model=이전 booster, 트리 추가
+    CatBoost        : init_model=이전 모델, 트리 추가
+    sklearn 앙상블  : warm_start=True, n_estimators/max_iter 증가
+
+결과는 res/model/<유형>/<yyMMddHHmm>/에 같은 파일명으로 저장하고, 이전 묶음/행 수/소요 시간/
+새 데이터 검증 지표(재학습 전후)를 bundle.json에 남긴다.
+
+ex)
+python incremental_retrain.py data/result_data_cst_2510.csv --type cst --history data/result_data_cst.csv
+python incremental_retrain.py new.csv --type gdns --history old.csv --replay-rows 50000 --scaler-drift 0.05
+"""
+
+import os
+import copy
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sklearn.metrics import r2_score, mean_squared_error
+
+from model_bundle import ModelBundle, FAMILY_FILES, save_model_file
+from multi_output_model import TARGET_NAMES
+from training_checkpoint import TrainingCheckpointer
+
+
+# 버전 폴더 이름 형식 (yyMMddHHmm)
+VERSION_FORMAT = '%y%m%d%H%M'
+
+# 묶음 정보 파일
+BUNDLE_INFO_FILE = 'bundle.json'
+
+
+def is_bundle(directory):
+    """모델 계열 중 하나의 스케일러 파일이 있으면 묶음 폴더"""
+    return any(os.path.exists(os.path.join(directory, files['scaler'])) for files in FAMILY_FILES.values())
+
+
+def latest_bundle(directory):
+    """res/model/<유형>/ 아래 가장 최근 버전 폴더 (없으면 directory 자체)"""
+    versions = sorted(name for name in os.listdir(directory)
+                      if name.isdigit() and is_bundle(os.path.join(directory, name)))
+    if versions:
+        return os.path.join(directory, versions[-1])
+    if is_bundle(directory):
+        return directory
+    raise FileNotFoundError(f"이전 모델 묶음을 찾을 수 없습니다: {directory}")
+
+
+def read_frames(paths):
+    return pd.concat([pd.read_csv(path, low_memory=False) for path in paths], ignore_index=True)
+
+
+def replay_sample(paths, rows, seed=1, chunk_rows=200000):
+    """
+    이전 이력 CSV에서 균등 표본 추출 (청크 단위, 행마다 난수 키를 주고 가장 작은 rows개 유지)
+
+    전체 이력을 메모리에 올리지 않고 파일 여러 개에 걸쳐 같은 확률로 뽑는다.
+    """
+    rng = np.random.default_rng(seed)
+    kept = None
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, low_memory=False):
+            chunk = chunk.assign(_replay_key=rng.random(len(chunk)))
+            kept = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+            if len(kept) > rows:
+                kept = kept.nsmallest(rows, '_replay_key')
+    if kept is None:
+        return pd.DataFrame()
+    return kept.drop(columns='_replay_key').reset_index(drop=True)
+
+
+def drift_scaler(scaler, x, drift):
+    """
+    새 데이터로 스케일러 갱신 (변화량 제한)
+
+    partial_fit으로 이전 통계에 새 데이터를 더한 뒤, 평균 이동은 이전 표준편차의 ±drift배,
+    표준편차 비율은 [1/(1+drift), 1+drift] 안으로 자른다. 이어서 학습하는 모델 입력이 크게 바뀌지 않게 한다.
+    """
+    updated = copy.deepcopy(scaler)
+    updated.partial_fit(x)
+    if scaler.with_mean:
+        low, high = scaler.mean_ - drift * scaler.scale_, scaler.mean_ + drift * scaler.scale_
+        updated.mean_ = np.clip(updated.mean_, low, high)
+    if scaler.with_std:
+        updated.scale_ = np.clip(updated.scale_, scaler.scale_ / (1 + drift), scaler.scale_ * (1 + drift))
+        updated.var_ = updated.scale_ ** 2
+    return updated
+
+
+def tree_count(model):
+    """현재 트리(부스팅 단계) 수 (알 수 없으면 0)"""
+    if hasattr(model, 'tree_count_'):
+        return int(model.tree_count_)
+    if hasattr(model, 'num_boost_round'):
+        return int(model.num_boost_round)  # BoosterRegressor (binned_dataset)
+    for name in ('n_estimators', 'max_iter'):
+        value = model.get_params().get(name) if hasattr(model, 'get_params') else None
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+    return 0
+
+
+def warm_fit(model, x, y, checkpointer, name, epochs=200, extra_trees=None):
+    """
+    이전 모델에서 이어서 학습
+
+    Args:
+        model: 이전 묶음의 모델 (MLPRegressor, MultiTargetMLP, XGB/LGBM/CatBoost, sklearn 앙상블)
+        x, y: 정규화된 입력과 대상 (다중 출력 모델은 (행 수, 3))
+        checkpointer (TrainingCheckpointer): MLP epoch 학습/조기 종료
+        name (str): 모델 이름 (체크포인트, 출력용)
+        epochs (int): MLP 최대 epoch
+        extra_trees (int): 트리 모델에 추가할 트리 수 (None이면 현재의 10%, 최소 10)
+
+    Returns:
+        str: 적용한 방식
+    """
+    network = getattr(model, 'network', model)
+    if hasattr(network, 'partial_fit') and hasattr(network, 'coefs_'):
+        max_iter = network.max_iter
+        network.set_params(max_iter=epochs)
+        try:
+            checkpointer.fit(model, x, y, name)
+        finally:
+            network.set_params(max_iter=max_iter)
+        return f'partial_fit {network.n_iter_} epoch'
+
+    extra = extra_trees or max(10, tree_count(model) // 10)
+    if hasattr(model, 'continue_training'):
+        model.continue_training(x, y, extra)  # BoosterRegressor (binned_dataset)
+        return f'{model.library} booster +{extra} trees'
+    module = type(model).__module__.split('.')[0]
+    if module == 'xgboost':
+        booster = model.get_booster()
+        model.set_params(n_estimators=extra)
+        model.fit(x, y, xgb_model=booster)
+        return f'xgb_model +{extra} trees'
+    if module == 'lightgbm':
+        booster = model.booster_
+        model.set_params(n_estimators=extra)
+        model.fit(x, y, init_model=booster)
+        return f'init_model +{extra} trees'
+    if module == 'catboost':
+        previous = model.copy()
+        model.set_params(iterations=extra)
+        model.fit(x, y, init_model=previous, verbose=False)
+        return f'init_model +{extra} trees'
+
+    params = model.get_params() if hasattr(model, 'get_params') else {}
+    if 'warm_start' in params:
+        key = 'n_estimators' if 'n_estimators' in params else 'max_iter'
+        model.set_params(warm_start=True, **{key: params[key] + extra})
+        # 추가 단계가 조기 종료로 바로 끝나지 않게 함
+        if 'early_stopping' in params:
+            model.set_params(early_stopping=False)  # HistGradientBoostingRegressor
+        elif getattr(model, 'n_iter_no_change', None) is not None:
+            model.set_params(n_iter_no_change=None)
+        model.fit(x, y)
+        return f'warm_start {key} {params[key]}→{params[key] + extra}'
+
+    print(f"⚠️  {name}: 이어서 학습을 지원하지 않는 모델이라 새 데이터로 다시 학습합니다 ({type(model).__name__}).")
+    model.fit(x, y)
+    return 'refit'
+
+
+def predict_targets(models, model_mode, x):
+    if model_mode == 'multi':
+        return models[0].predict(x)
+    return np.column_stack([np.asarray(model.predict(x)).ravel() for model in models])
+
+
+def target_metrics(y, predicted):
+    return {target: {'R2': round(float(r2_score(y[:, i], predicted[:, i])), 6),
+                     'RMSE': round(float(np.sqrt(mean_squared_error(y[:, i], predicted[:, i]))), 6)}
+            for i, target in enumerate(TARGET_NAMES)}
+
+
+def targets_of(frame):
+    return frame[TARGET_NAMES].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def incremental_retrain(previous, new_paths, history_paths=(), output_dir=None, replay_rows=None,
+                        holdout=0.2, epochs=200, extra_trees=None, scaler_drift=None, seed=1):
+    """
+    이전 묶음에서 이어서 학습하고 새 버전 묶음 저장
+
+    Args:
+        previous (str): 이전 묶음 폴더
+        new_paths (list): 새 입찰 CSV
+        history_paths (list): 재현 표본을 뽑을 이전 이력 CSV (없으면 새 데이터만 학습)
+        output_dir (str): 저장 폴더 (None이면 previous의 상위 유형 폴더 아래 버전 폴더)
+        replay_rows (int): 재현 표본 행 수 (None이면 새 데이터 행 수)
+        holdout (float): 재학습 전후 비교용으로 남길 새 데이터 비율
+        epochs, extra_trees: warm_fit 인자
+        scaler_drift (float): 스케일러 변화 허용 비율 (None이면 스케일러 유지)
+
+    Returns:
+        dict: bundle.json 내용
+    """
+    started = time.perf_counter()
+    bundle = ModelBundle(previous, family='auto')
+    print(f"♻️  이전 묶음: {previous} ({bundle.family}, {bundle.model_mode})")
+
+    new = read_frames(new_paths)
+    new = new[np.isfinite(targets_of(new)).all(axis=1)].reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    is_holdout = rng.random(len(new)) < holdout
+    fresh, check = new[~is_holdout], new[is_holdout]
+
+    replay = pd.DataFrame()
+    if history_paths:
+        replay = replay_sample(history_paths, replay_rows or len(fresh), seed)
+        if len(replay):
+            replay = replay[np.isfinite(targets_of(replay)).all(axis=1)]
+    train = pd.concat([fresh, replay], ignore_index=True)
+    print(f"📊 새 데이터 학습 {len(fresh):,}건 + 재현 표본 {len(replay):,}건, 검증 {len(check):,}건")
+
+    x_train = bundle.feature_frame(train).to_numpy(dtype=np.float64)
+    y_train = targets_of(train)
+    x_check = bundle.feature_frame(check).to_numpy(dtype=np.float64) if len(check) else None
+    y_check = targets_of(check)
+
+    before = target_metrics(y_check, predict_targets(bundle.models, bundle.model_mode,
+                                                     bundle.scaler.transform(x_check))) if len(check) else None
+
+    scaler = bundle.scaler
+    if scaler_drift is not None:
+        scaler = drift_scaler(scaler, bundle.feature_frame(fresh).to_numpy(dtype=np.float64), scaler_drift)
+    x_scaled = scaler.transform(x_train)
+
+    methods = {}
+    checkpoint_dir = tempfile.mkdtemp(prefix='incremental_')
+    try:
+        checkpointer = TrainingCheckpointer(checkpoint_dir)
+        if bundle.model_mode == 'multi':
+            methods['multi'] = warm_fit(bundle.models[0], x_scaled, y_train, checkpointer, 'multi',
+                                        epochs, extra_trees)
+        else:
+            for i, model in enumerate(bundle.models):
+                methods[TARGET_NAMES[i]] = warm_fit(model, x_scaled, y_train[:, i], checkpointer,
+                                                    TARGET_NAMES[i], epochs, extra_trees)
+    finally:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    after = target_metrics(y_check, predict_targets(bundle.models, bundle.model_mode,
+                                                    scaler.transform(x_check))) if len(check) else None
+
+    if output_dir is None:
+        parent = os.path.dirname(os.path.normpath(previous)) if os.path.basename(
+            os.path.normpath(previous)).isdigit() else previous
+        output_dir = os.path.join(parent, datetime.now().strftime(VERSION_FORMAT))
+    os.makedirs(output_dir, exist_ok=True)
+    for key, model in zip(bundle.model_keys, bundle.models):
+        save_model_file(model, os.path.join(output_dir, bundle.files[key]))
+    joblib.dump(scaler, os.path.join(output_dir, bundle.files['scaler']))
+    for key in ('tokenizer', 'vectorizer'):
+        if os.path.exists(bundle.path(key)):
+            shutil.copy2(bundle.path(key), os.path.join(output_dir, bundle.files[key]))
+
+    info = {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'parent': os.path.abspath(previous),
+        'family': bundle.family,
+        'model_mode': bundle.model_mode,
+        'inputs': list(new_paths),
+        'history': list(history_paths),
+        'rows': {'new': int(len(fresh)), 'replay': int(len(replay)), 'holdout': int(len(check))},
+        'scaler_drift': scaler_drift,
+        'methods': methods,
+        'elapsed_sec': round(time.perf_counter() - started, 3),
+        'holdout_before': before,
+        'holdout_after': after,
+    }
+    with open(os.path.join(output_dir, BUNDLE_INFO_FILE), 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    print(f"💾 저장: {output_dir} ({info['elapsed_sec']}초)")
+    return info
+
+
+def print_report(info):
+    """재학습 전후 새 데이터 검증 지표 표"""
+    if not info['holdout_before']:
+        return
+    rows = [{'대상': target, '이전 R2': info['holdout_before'][target]['R2'],
+             '재학습 R2': info['holdout_after'][target]['R2'],
+             '이전 RMSE': info['holdout_before'][target]['RMSE'],
+             '재학습 RMSE': info['holdout_after'][target]['RMSE'],
+             '방식': info['methods'].get(target, info['methods'].get('multi'))} for target in TARGET_NAMES]
+    print("="*80)
+    print(pd.DataFrame(rows).set_index('대상').to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이전 모델 묶음에서 이어서 학습 (증분 재학습)")
+    parser.add_argument('input', nargs='+', help="새 입찰 CSV")
+    parser.add_argument('--type', required=True, help="입찰 유형 (cst, mtrl, gdns) - res/model/<유형>/")
+    parser.add_argument('--root', default=os.path.join('res', 'model'), help="모델 묶음 상위 폴더")
+    parser.add_argument('--previous', default=None, help="이전 묶음 폴더 (없으면 <root>/<유형>의 최근 버전)")
+    parser.add_argument('--history', nargs='*', default=[], help="재현 표본을 뽑을 이전 이력 CSV")
+    parser.add_argument('--replay-rows', type=int, default=None, help="재현 표본 행 수 (기본: 새 데이터 행 수)")
+    parser.add_argument('--holdout', type=float, default=0.2, help="재학습 전후 비교용 새 데이터 비율")
+    parser.add_argument('--epochs', type=int, default=200, help="MLP 최대 epoch")
+    parser.add_argument('--extra-trees', type=int, default=None, help="트리 모델에 추가할 트리 수")
+    parser.add_argument('--scaler-drift', type=float, default=None, help="스케일러 변화 허용 비율 (예: 0.05)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help="저장 폴더 (기본: <root>/<유형>/<yyMMddHHmm>)")
+    args = parser.parse_args()
+
+    type_dir = os.path.join(args.root, args.type)
+    previous = args.previous or latest_bundle(type_dir)
+    output_dir = args.output or os.path.join(type_dir, datetime.now().strftime(VERSION_FORMAT))
+    info = incremental_retrain(previous, args.input, args.history, output_dir, args.replay_rows,
+                               args.holdout, args.epochs, args.extra_trees, args.scaler_drift, args.seed)
+    print_report(info)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+학습 결과 모델 묶음(bundle) 로더
+
+학습 스크립트(bid.ml.train*.py)가 res 폴더에 저장하는 파일 묶음을 한 디렉토리 단위로 불러와
+입찰 DataFrame 전체를 한 번에 예측한다. res/7.7 처럼 버전별로 복사해 둔 폴더도 그대로 쓸 수 있다.
+
+- mlpregr.model1/2/3.v0.1.1.npz : 업체투찰률, 예가투찰률, 참여업체수 모델
+- mlpregr.multi.v0.1.1.npz      : 세 대상을 한 번에 예측하는 다중 출력 모델 (--multi-output 학습 결과)
+- x_fited_scaler.v2.npz          : 입력 정규화 스케일러
+- mlpregr.tokenizer/vectorizer.v0.1.1.npz : 키워드/공고기관명/공사지역 TF-IDF 점수 계산 (없으면 점수 컬럼 사용)
+- rf/gb/cb 학습 스크립트 결과도 같은 구성 (FAMILY_FILES, CatBoost는 .cbm)
+- <모델 파일>.flat : RF/GB 트리 평탄화 파일 (flat_trees, flat_trees=True면 joblib 대신 memmap으로 사용)
+
+입력 특성은 학습과 같은 순서로 만든다 (스케일러 입력 수로 구분).
+- 9개 (공사입찰): 기초금액, 낙찰하한률, 참여업체수, 간접비, 순공사원가, 면허제한코드, 공고기관점수, 공사지역점수, 키워드점수
+- 7개 (구매/용역): 위에서 간접비, 순공사원가 제외
+
+ex)
+bundle = ModelBundle('res/7.7')
+predictions = bundle.predict(data)   # 업체투찰률예측, 예가투찰률예측, 참여업체수예측
+bundle = ModelBundle('res/model/cst', family='gb')
+bundle = ModelBundle('res/model/cst', family='rf', flat_trees=True)
+"""
+
+import os
+import re
+import joblib
+import numpy as np
+import pandas as pd
+
+from flat_trees import load_flat, export_if_supported
+from train_scripts import load_text_models
+
+
+# 묶음 파일명 (학습 스크립트 저장 이름과 같음)
+BUNDLE_FILES = {
+    'model1': 'mlpregr.model1.v0.1.1.npz',
+    'model2': 'mlpregr.model2.v0.1.1.npz',
+    'model3': 'mlpregr.model3.v0.1.1.npz',
+    'multi': 'mlpregr.multi.v0.1.1.npz',
+    'scaler': 'x_fited_scaler.v2.npz',
+    'tokenizer': 'mlpregr.tokenizer.v0.1.1.npz',
+    'vectorizer': 'mlpregr.vectorizer.v0.1.1.npz',
+}
+
+# 모델 계열별 묶음 파일명 (각 학습 스크립트 저장 이름)
+FAMILY_FILES = {
+    'mlp': BUNDLE_FILES,
+    **{family: {
+        'model1': f'{family}.model1.v0.1.1.{ext}',
+        'model2': f'{family}.model2.v0.1.1.{ext}',
+        'model3': f'{family}.model3.v0.1.1.{ext}',
+        'scaler': f'{family}_scaler.v2.npz',
+        'tokenizer': f'{family}.tokenizer.v0.1.1.npz',
+        'vectorizer': f'{family}.vectorizer.v0.1.1.npz',
+    } for family, ext in (('rf', 'npz'), ('gb', 'npz'), ('cb', 'cbm'))},
+}
+
+# 예측 결과 컬럼 (result_table과 같은 이름)
+PREDICTION_COLUMNS = ['업체투찰률예측', '예가투찰률예측', '참여업체수예측']
+
+# 학습 입력 특성 (bid.ml.train.py _get_selected_column_indices와 같은 순서)
+BASE_FEATURES = ['기초금액', '낙찰하한률', '참여업체수', '면허제한코드', '공고기관점수', '공사지역점수', '키워드점수']
+CONSTRUCTION_FEATURES = ['간접비', '순공사원가']
+
+# 텍스트 컬럼 → 점수 컬럼
+TEXT_SCORE_COLUMNS = {'키워드': '키워드점수', '공고기관명': '공고기관점수', '공사지역': '공사지역점수'}
+
+
+def feature_columns(n_features):
+    """스케일러 입력 수에 맞는 학습 특성 컬럼 목록"""
+    if n_features == len(BASE_FEATURES) + len(CONSTRUCTION_FEATURES):
+        return BASE_FEATURES[:3] + CONSTRUCTION_FEATURES + BASE_FEATURES[3:]
+    if n_features == len(BASE_FEATURES):
+        return list(BASE_FEATURES)
+    raise ValueError(f"스케일러 입력 수({n_features})에 맞는 특성 구성이 없습니다.")
+
+
+def license_code_values(series):
+    """
+    면허제한코드를 학습과 같은 방식의 숫자로 변환
+
+    학습 스크립트는 hash(문자열) % 1000000을 쓰므로 PYTHONHASHSEED가 다르면 값이 달라진다.
+    """
+    text = series.astype(str)
+    codes, uniques = pd.factorize(text)
+    mapped = np.array([0 if v == 'nan' else hash(v) % 1000000 for v in uniques], dtype=np.float64)
+    return mapped[codes] if len(uniques) else np.zeros(len(series))
+
+
+def clean_text(series):
+    """학습 스크립트와 같은 텍스트 정리 (결측/문자열 'nan' 등 → 빈 문자열)"""
+    return series.fillna('').astype(str).replace(['nan', 'NaN', 'None', 'null'], '')
+
+
+def text_score_values(series, tokenizer, vectorizer):
+    """
+    텍스트 컬럼 TF-IDF 점수 (같은 문자열은 한 번만 형태소 분석)
+
+    Args:
+        series (pd.Series): 키워드/공고기관명/공사지역 컬럼
+        tokenizer: KiwiTokenizer (nn_only)
+        vectorizer: 학습된 KiwiVectorizer (scores)
+    """
+    codes, uniques = pd.factorize(clean_text(series))
+    if len(uniques) == 0:
+        return np.zeros(len(series))
+    scores = np.asarray(vectorizer.scores(tokenizer.nn_only(list(uniques))), dtype=np.float64)
+    return scores[codes]
+
+
+def feature_values(frame, features, score_text=None):
+    """
+    학습과 같은 순서의 입력 특성 배열 (행 수, 특성 수)
+
+    Args:
+        frame (pd.DataFrame): 학습 CSV와 같은 컬럼의 입찰 데이터
+        features (list): feature_columns() 결과
+        score_text (callable): 텍스트 Series → 점수 배열 (None이면 입력의 점수 컬럼 사용, 없으면 0)
+    """
+    values = np.zeros((len(frame), len(features)), dtype=np.float64)
+    for i, name in enumerate(features):
+        text_column = next((k for k, v in TEXT_SCORE_COLUMNS.items() if v == name), None)
+        if name == '면허제한코드':
+            if name in frame.columns:
+                values[:, i] = license_code_values(frame[name])
+        elif text_column and score_text is not None and text_column in frame.columns:
+            values[:, i] = score_text(frame[text_column])
+        elif name in frame.columns:
+            values[:, i] = pd.to_numeric(frame[name], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    return values
+
+
+def detect_family(directory):
+    """디렉토리에 있는 묶음 파일로 모델 계열 판단 (mlp, rf, gb, cb)"""
+    for family, files in FAMILY_FILES.items():
+        if os.path.exists(os.path.join(directory, files['scaler'])):
+            return family
+    raise FileNotFoundError(f"모델 묶음({directory})에서 스케일러 파일을 찾을 수 없습니다.")
+
+
+def model_version(family, path):
+    """저장용 모델버전 문자열 (계열 + 모델 파일명의 버전, 예: rf.model1.v0.1.1.npz → rf.v0.1.1)"""
+    name = os.path.basename(path)
+    match = re.search(r'\.(v\d+(?:\.\d+)*)\.', name)
+    return f"{family}.{match.group(1) if match else name}"
+
+
+def load_model_file(path, flat=False):
+    """
+    모델 파일 불러오기 (CatBoost .cbm은 load_model, 나머지는 joblib)
+
+    flat=True이고 모델 파일보다 새 평탄화 파일(<모델 파일>.flat)이 있으면 FlatTreeModel (예측 전용)
+    """
+    if flat:
+        model = load_flat(path)
+        if model is not None:
+            return model
+    if path.endswith('.cbm'):
+        from catboost import CatBoostRegressor
+        model = CatBoostRegressor()
+        model.load_model(path)
+        return model
+    return joblib.load(path)
+
+
+def save_model_file(model, path):
+    """모델 파일 저장 (학습 스크립트 saveModel과 같은 형식, RF/GB 트리는 평탄화 파일도 저장)"""
+    if path.endswith('.cbm'):
+        model.save_model(path)
+    else:
+        joblib.dump(model, path)
+        export_if_supported(model, path)
+
+
+class ModelBundle:
+    """모델 묶음 디렉토리를 불러와 DataFrame 단위로 예측하는 클래스"""
+
+    def __init__(self, directory, text_scores='auto', model_mode='auto', family='auto', flat_trees=False):
+        """
+        Args:
+            directory (str): 묶음 디렉토리 (FAMILY_FILES가 있는 폴더)
+            text_scores (str): 'auto'  - tokenizer/vectorizer가 있으면 텍스트로 점수 계산, 없으면 점수 컬럼 사용
+                               'compute' - 항상 텍스트로 계산
+                               'columns' - 입력의 점수 컬럼 사용 (없으면 0)
+            model_mode (str): 'auto'     - model1/2/3이 모두 있으면 모델 3개, 없으면 다중 출력 모델
+                              'separate' - 모델 3개
+                              'multi'    - 다중 출력 모델 1개
+            family (str): 모델 계열 ('mlp', 'rf', 'gb', 'cb', 'auto'면 파일로 판단)
+            flat_trees (bool): 평탄화 파일이 있으면 사용 (로드/소량 예측이 빠름, 이어서 학습은 불가)
+        """
+        self.directory = directory
+        self.text_scores = text_scores
+        self.family = detect_family(directory) if family == 'auto' else family
+        self.files = FAMILY_FILES[self.family]
+        separate = [f'model{i}' for i in (1, 2, 3)]
+        if model_mode == 'auto':
+            model_mode = 'separate' if all(os.path.exists(self.path(key)) for key in separate) else 'multi'
+        self.model_mode = model_mode
+        self.model_keys = separate if model_mode == 'separate' else ['multi']
+        required = self.model_keys + ['scaler']
+        missing = [self.files.get(key, key) for key in required
+                   if key not in self.files or not os.path.exists(self.path(key))]
+        if missing:
+            raise FileNotFoundError(f"모델 묶음({directory})에 파일이 없습니다: {', '.join(missing)}")
+
+        self.models = [load_model_file(self.path(key), flat_trees) for key in self.model_keys]
+        self.scaler = joblib.load(self.path('scaler'))
+        self.features = feature_columns(int(self.scaler.n_features_in_))
+        self._text = None
+
+    def path(self, key):
+        return os.path.join(self.directory, self.files[key])
+
+    def has_text_models(self):
+        return os.path.exists(self.path('tokenizer')) and os.path.exists(self.path('vectorizer'))
+
+    def _text_models(self):
+        """학습 스크립트의 KiwiTokenizer/KiwiVectorizer를 묶음 파일로 준비"""
+        if self._text is None:
+            self._text = load_text_models(self.path('tokenizer'), self.path('vectorizer'))
+        return self._text
+
+    def score_text(self, series):
+        """텍스트 컬럼 TF-IDF 점수 (같은 문자열은 한 번만 형태소 분석)"""
+        tokenizer, vectorizer = self._text_models()
+        return text_score_values(series, tokenizer, vectorizer)
+
+    def feature_frame(self, frame):
+        """학습과 같은 순서의 입력 특성 DataFrame"""
+        compute = self.text_scores == 'compute' or (self.text_scores == 'auto' and self.has_text_models())
+        values = feature_values(frame, self.features, self.score_text if compute else None)
+        return pd.DataFrame(values, index=frame.index, columns=self.features)
+
+    def predict(self, frame, batch_rows=200000):
+        """
+        입찰 DataFrame 전체 예측
+
+        Args:
+            frame (pd.DataFrame): 학습 CSV와 같은 컬럼의 입찰 데이터
+            batch_rows (int): 한 번에 예측하는 행 수
+
+        Returns:
+            pd.DataFrame: PREDICTION_COLUMNS (frame과 같은 index)
+        """
+        x = self.feature_frame(frame).to_numpy(dtype=np.float64)
+        result = np.empty((len(x), len(PREDICTION_COLUMNS)), dtype=np.float64)
+        for start in range(0, len(x), batch_rows):
+            scaled = self.scaler.transform(x[start:start + batch_rows])
+            if self.model_mode == 'multi':
+                result[start:start + batch_rows] = self.models[0].predict(scaled)
+                continue
+            for i, model in enumerate(self.models):
+                result[start:start + batch_rows, i] = np.asarray(model.predict(scaled)).ravel()
+        return pd.DataFrame(result, index=frame.index, columns=PREDICTION_COLUMNS)
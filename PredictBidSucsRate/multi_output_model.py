@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+세 예측 대상(업체투찰률, 예가투찰률, 참여업체수)을 한 번에 학습하는 다중 출력 신경망
+
+setupModels()의 MLPRegressor 3개는 입력이 같으므로 은닉층(trunk)을 공유하고 출력층에서
+대상 3개를 함께 내도록 묶는다. 대상마다 크기가 달라(투찰률 ~0.9, 업체수 ~수백) 출력은
+대상별 StandardScaler로 정규화해 학습하고 예측 시 원래 단위로 되돌린다.
+
+- 학습 1회, 예측 1회 (forward pass 한 번에 대상 3개)
+- 파일 1개로 저장 (MULTI_MODEL_FILE)
+- model.target(i) 는 기존 model1/2/3 처럼 predict() 결과가 1차원인 대상별 보기
+
+ex)
+python bid.ml.train.py cst --multi-output                   # 다중 출력 모델로 학습/저장
+python multi_output_model.py --rows 50000                   # 합성 데이터로 기존 3모델과 비교
+python multi_output_model.py data/result_data_cst.csv --bid-type cst --output res/multi_compare.json
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sklearn.neural_network import MLPRegressor
+from sklearn.preprocessing import StandardScaler
+
+
+# 저장 파일명 (mlpregr.model1/2/3.v0.1.1.npz 대신 한 파일)
+MULTI_MODEL_FILE = 'mlpregr.multi.v0.1.1.npz'
+
+# 예측 대상 (출력 순서)
+TARGET_NAMES = ['업체투찰률', '예가투찰률', '참여업체수']
+
+
+class MultiTargetMLP:
+    """은닉층을 공유하고 대상별 정규화를 적용한 다중 출력 MLPRegressor"""
+
+    def __init__(self, hidden_layer_sizes=(10, 64, 128, 64), alpha=1e-5, random_state=1,
+                 max_iter=100000, early_stopping=True, activation='relu', solver='adam'):
+        """
+        Args:
+            hidden_layer_sizes (tuple): 공유 은닉층 구조 (기본값은 모델1/2와 같음)
+            나머지 인자: MLPRegressor 설정 (setupModels와 같은 기본값)
+        """
+        self.params = {
+            'solver': solver,
+            'alpha': alpha,
+            'hidden_layer_sizes': hidden_layer_sizes,
+            'random_state': random_state,
+            'max_iter': max_iter,
+            'early_stopping': early_stopping,
+            'activation': activation,
+        }
+        self.network = MLPRegressor(**self.params)
+        self.y_scaler = StandardScaler()
+        self.target_names = list(TARGET_NAMES)
+
+    def fit(self, x, y):
+        """
+        Args:
+            x: (행 수, 특성 수) 정규화된 입력
+            y: (행 수, 3) [업체투찰률, 예가투찰률, 참여업체수]
+        """
+        y = self._targets(y)
+        self.network.fit(x, self.y_scaler.fit_transform(y))
+        return self
+
+    def partial_fit(self, x, y):
+        """
+        청크 단위 학습 (스트리밍 학습용)
+
+        y_scaler는 전체 데이터로 미리 partial_fit 해 두는 것이 좋다. 맞춰져 있지 않으면 첫 청크로 맞춘다.
+        """
+        y = self._targets(y)
+        if not hasattr(self.y_scaler, 'scale_'):
+            self.y_scaler.partial_fit(y)
+        self.network.partial_fit(x, self.y_scaler.transform(y))
+        return self
+
+    def _targets(self, y):
+        y = np.asarray(y, dtype=np.float64)
+        if y.ndim != 2 or y.shape[1] != len(self.target_names):
+            raise ValueError(f"y는 (행 수, {len(self.target_names)}) 배열이어야 합니다: {y.shape}")
+        return y
+
+    def predict(self, x):
+        """(행 수, 3) 원래 단위 예측값"""
+        scaled = np.asarray(self.network.predict(x), dtype=np.float64).reshape(-1, len(self.target_names))
+        return self.y_scaler.inverse_transform(scaled)
+
+    def target(self, index):
+        """대상 하나의 보기 (기존 model1/2/3 자리에 그대로 사용)"""
+        return TargetView(self, index)
+
+    @property
+    def n_iter_(self):
+        return self.network.n_iter_
+
+
+class TargetView:
+    """MultiTargetMLP의 대상 하나만 돌려주는 predict() 래퍼"""
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = index
+
+    def predict(self, x):
+        return self.model.predict(x)[:, self.index]
+
+
+def artifact_size(model):
+    """joblib 저장 크기 (바이트)"""
+    import io
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def compare_setups(x_train, y_train, x_test, y_test, latency_rows=200):
+    """
+    기존 3모델(setupModels)과 다중 출력 모델의 학습 시간, 예측 지연, 정확도, 파일 크기 비교
+
+    Args:
+        x_train, x_test: 정규화된 입력
+        y_train, y_test: (행 수, 3) 대상 배열
+        latency_rows (int): 1건 예측 지연을 잴 반복 횟수
+
+    Returns:
+        dict: {'separate': {...}, 'multi': {...}} 항목별 결과
+    """
+    from sklearn.metrics import r2_score, mean_squared_error
+    from train_scripts import load_script, setup_models, TRAIN_SCRIPTS
+
+    separate = setup_models(load_script(TRAIN_SCRIPTS['mlp']))
+    multi = MultiTargetMLP()
+
+    def fit_separate():
+        for i, model in enumerate(separate):
+            model.fit(x_train, y_train[:, i])
+
+    def predict_separate(x):
+        return np.column_stack([model.predict(x) for model in separate])
+
+    setups = {
+        'separate': (fit_separate, predict_separate, separate),
+        'multi': (lambda: multi.fit(x_train, y_train), multi.predict, multi),
+    }
+
+    report = {}
+    for name, (fit, predict, artifact) in setups.items():
+        print(f"⏱️  {name} 학습 중...")
+        started = time.perf_counter()
+        fit()
+        train_sec = time.perf_counter() - started
+
+        started = time.perf_counter()
+        predicted = predict(x_test)
+        batch_sec = time.perf_counter() - started
+
+        single = x_test[:1]
+        started = time.perf_counter()
+        for _ in range(latency_rows):
+            predict(single)
+        single_ms = (time.perf_counter() - started) / latency_rows * 1000
+
+        targets = {}
+        for i, target in enumerate(TARGET_NAMES):
+            targets[target] = {
+                'R2': float(r2_score(y_test[:, i], predicted[:, i])),
+                'RMSE': float(np.sqrt(mean_squared_error(y_test[:, i], predicted[:, i]))),
+            }
+        report[name] = {
+            'train_sec': round(train_sec, 3),
+            'predict_batch_sec': round(batch_sec, 4),
+            'predict_single_ms': round(single_ms, 4),
+            'artifact_bytes': sum(artifact_size(m) for m in artifact) if isinstance(artifact, list) else artifact_size(artifact),
+            'targets': targets,
+        }
+    return report
+
+
+def print_comparison(report):
+    """비교 결과 표 출력"""
+    rows = []
+    for name, entry in report.items():
+        row = {
+            '구성': name,
+            '학습(초)': entry['train_sec'],
+            '배치예측(초)': entry['predict_batch_sec'],
+            '1건예측(ms)': entry['predict_single_ms'],
+            '파일(KB)': round(entry['artifact_bytes'] / 1024, 1),
+        }
+        for target, metrics in entry['targets'].items():
+            row[f'{target} R2'] = round(metrics['R2'], 4)
+            row[f'{target} RMSE'] = round(metrics['RMSE'], 6)
+        rows.append(row)
+    print(pd.DataFrame(rows).set_index('구성').T.to_string())
+
+
+def _comparison_dataset(args):
+    """비교용 학습/테스트 배열 (입력 CSV 또는 합성 데이터)"""
+    from sklearn.model_selection import train_test_split
+    from model_bundle import feature_columns, feature_values, BASE_FEATURES, CONSTRUCTION_FEATURES
+
+    if args.input:
+        data = pd.read_csv(args.input, low_memory=False)
+    else:
+        from synthetic_bid_data import generate_bid_data
+        data = generate_bid_data(args.rows, args.bid_type, args.seed)
+
+    n_features = len(BASE_FEATURES) + (len(CONSTRUCTION_FEATURES) if args.bid_type == 'cst' else 0)
+    x = feature_values(data, feature_columns(n_features))
+    y = data[TARGET_NAMES].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    keep = np.isfinite(y).all(axis=1)
+    x_train, x_test, y_train, y_test = train_test_split(x[keep], y[keep], test_size=args.test_ratio,
+                                                        random_state=args.seed)
+    scaler = StandardScaler()
+    return scaler.fit_transform(x_train), scaler.transform(x_test), y_train, y_test
+
+
+def main():
+    parser = argparse.ArgumentParser(description="다중 출력 신경망과 기존 3모델 비교")
+    parser.add_argument('input', nargs='?', default=None, help="학습 CSV (없으면 합성 데이터)")
+    parser.add_argument('--rows', type=int, default=50000, help="합성 데이터 행 수")
+    parser.add_argument('--bid-type', default='cst', help="입찰 유형 (cst, mtrl, gdns)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--test-ratio', type=float, default=0.2)
+    parser.add_argument('--output', default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    x_train, x_test, y_train, y_test = _comparison_dataset(args)
+    print(f"📊 학습 {len(x_train):,}건 / 테스트 {len(x_test):,}건, 특성 {x_train.shape[1]}개")
+
+    report = compare_setups(x_train, y_train, x_test, y_test)
+    print("="*80)
+    print_comparison(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                       'input': args.input or f'synthetic:{args.rows}', 'bid_type': args.bid_type,
+                       'report': report}, f, ensure_ascii=False, indent=2)
+        print(f"💾 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,9 @@ from datetime import datetime, timedelta
 
 # 데이터베이스 관련 import
 sys.path.append(os.path.join(os.getcwd(), 'dac'))
-from PredictionResultManager import PredictionResultManager
+from PredictionResultManager import PredictionResultManager, ML_C_COLUMNS
+from PredictionResultExporter import PredictionResultExporter
+from PredictionRetentionJob import PredictionRetentionJob
 
 
 class PredictionResultQuery:
@@ -31,141 +33,121 @@ class PredictionResultQuery:
         print("="*80)
         
         summary = self.db_manager.get_prediction_summary()
-        if summary:
+        if summary and summary[0]:
             print(f"총 저장 건수: {summary[0]:,}건")
             print(f"평균 업체투찰률: {summary[1]:.3f}")
             print(f"평균 예가투찰률: {summary[2]:.3f}")
             print(f"평균 참여업체수: {summary[3]:.1f}")
             print(f"최초 예측일시: {summary[4]}")
             print(f"최근 예측일시: {summary[5]}")
+            
+            by_model = self.db_manager.get_prediction_summary_by_model()
+            if by_model:
+                print("-"*80)
+                df = pd.DataFrame(by_model, columns=['모델버전', '총건수', '평균업체투찰률', '평균예가투찰률',
+                                                     '평균참여업체수', '최초예측일시', '최근예측일시'])
+                print(df.to_string(index=False))
         else:
             print("저장된 데이터가 없습니다.")
         print("="*80)
     
+    def rebuild_summary(self):
+        """요약 테이블 재구축 (ML_C 전체 재집계)"""
+        print("="*80)
+        print("🔧 요약 테이블 재구축 중...")
+        print("="*80)
+        self.db_manager.rebuild_prediction_summary()
+        print("="*80)
+    
     def show_recent_predictions(self, limit=10):
         """최근 예측 결과 조회"""
         print("="*80)
         print(f"📋 최근 {limit}건 예측 결과")
         print("="*80)
         
-        results = self.db_manager.get_prediction_results(limit=limit)
+        results, _ = self.db_manager.get_prediction_page(limit=limit)
         if results:
-            # 컬럼명 정의 (ML_CST 테이블 구조에 맞춤)
-            columns = [
-                '입찰번호', '입찰차수', '기초금액률', '낙찰하한률', '기초금액', '순공사원가',
-                '간접비', 'A계산여부', '순공사원가적용여부', '면허제한코드', '공고기관코드',
-                '주공종명', '공고기관명', '공고기관점수', '공사지역', '공사지역점수',
-                '키워드', '키워드점수', '공고일자', '개찰일시', '예측_URL',
-                '업체투찰률_예측', '예가투찰률_예측', '참여업체수_예측',
-                '등록일시', '예측일시'
-            ]
-            
-            df = pd.DataFrame(results, columns=columns)
-            
-            # 주요 컬럼만 선택하여 출력
-            display_columns = ['입찰번호', '입찰차수', '기초금액', '업체투찰률_예측', 
-                             '예가투찰률_예측', '참여업체수_예측', 'A계산여부', '예측일시']
-            
-            available_columns = [col for col in display_columns if col in df.columns]
-            print(df[available_columns].to_string(index=False))
+            self._print_rows(results)
         else:
             print("저장된 데이터가 없습니다.")
         print("="*80)
     
-    def export_to_excel(self, output_file=None, limit=1000):
+    def browse_predictions(self, page_size=20):
+        """예측 결과 페이지 단위 조회 (키셋 페이지: 깊은 페이지도 첫 페이지와 같은 속도)"""
+        cursor = None
+        page = 1
+        while True:
+            results, cursor = self.db_manager.get_prediction_page(limit=page_size, after=cursor)
+            print("="*80)
+            print(f"📋 예측 결과 {page} 페이지")
+            print("="*80)
+            if not results:
+                print("저장된 데이터가 없습니다.")
+                break
+            self._print_rows(results)
+            if cursor is None:
+                print("마지막 페이지입니다.")
+                break
+            if input("다음 페이지 (Enter) / 종료 (q): ").strip().lower() == 'q':
+                break
+            page += 1
+        print("="*80)
+    
+    def _print_rows(self, results):
+        """주요 컬럼만 선택하여 출력"""
+        df = pd.DataFrame(results, columns=ML_C_COLUMNS)
+        display_columns = ['입찰번호', '입찰차수', '기초금액', '업체투찰률_예측', 
+                         '예가투찰률_예측', '참여업체수_예측', 'A계산여부', '예측일시']
+        print(df[display_columns].to_string(index=False))
+    
+    def export_to_excel(self, output_file=None, limit=None):
         """예측 결과를 엑셀 파일로 내보내기"""
+        self.export_results('xlsx', output_file, limit)
+    
+    def export_results(self, fmt='xlsx', output_file=None, limit=None, chunk_size=10000):
+        """
+        예측 결과를 파일로 내보내기 (xlsx, csv, csv.gz, parquet)
+        
+        fetchmany로 chunk_size 행씩 읽어 바로 기록하므로 전체 테이블도 일정한 메모리로 내보낸다.
+        """
         if not output_file:
-            output_file = f"prediction_results_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            output_file = f"prediction_results_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        output_path = os.path.join('res', 'predict_result', output_file)
         
         print("="*80)
-        print(f"📤 예측 결과 내보내기 중... (최대 {limit}건)")
+        print(f"📤 예측 결과 내보내기 중... ({'전체' if not limit else f'최대 {limit:,}건'}, {fmt})")
         print("="*80)
         
-        results = self.db_manager.get_prediction_results(limit=limit)
-        if results:
-            # 컬럼명 정의 (ML_CST 테이블 구조에 맞춤)
-            columns = [
-                '입찰번호', '입찰차수', '기초금액률', '낙찰하한률', '기초금액', '순공사원가',
-                '간접비', 'A계산여부', '순공사원가적용여부', '면허제한코드', '공고기관코드',
-                '주공종명', '공고기관명', '공고기관점수', '공사지역', '공사지역점수',
-                '키워드', '키워드점수', '공고일자', '개찰일시', '예측_URL',
-                '업체투찰률_예측', '예가투찰률_예측', '참여업체수_예측',
-                '등록일시', '예측일시'
-            ]
-            
-            df = pd.DataFrame(results, columns=columns)
-            
-            # 엑셀 파일로 저장
-            output_path = os.path.join('res', 'predict_result', output_file)
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            df.to_excel(
-                output_path,
-                sheet_name='예측결과',
-                na_rep='NaN',
-                float_format="%.6f",
-                header=True,
-                index=False,
-                freeze_panes=(1, 0)
-            )
-            
-            print(f"✅ 내보내기 완료: {output_path}")
-            print(f"📊 내보낸 데이터: {len(df)}건")
-        else:
-            print("저장된 데이터가 없습니다.")
+        try:
+            exporter = PredictionResultExporter(self.db_manager)
+            exported = exporter.export(output_path, fmt='csv' if fmt == 'csv.gz' else fmt,
+                                       chunk_size=chunk_size, limit=limit)
+            if exported == 0:
+                print("저장된 데이터가 없습니다.")
+        except Exception as e:
+            print(f"❌ 내보내기 실패: {e}")
         print("="*80)
     
-    def delete_old_data(self, days=30):
-        """오래된 데이터 삭제"""
-        print("="*80)
-        print(f"🗑️  {days}일 이전 데이터 삭제 중...")
-        print("="*80)
-        
-        # 삭제 전 현재 데이터 개수 확인
-        before_count = self.db_manager.get_prediction_count()
-        print(f"삭제 전 데이터 개수: {before_count:,}건")
-        
-        # 데이터 삭제
-        self.db_manager.delete_old_predictions(days)
-        
-        # 삭제 후 데이터 개수 확인
-        after_count = self.db_manager.get_prediction_count()
-        deleted_count = before_count - after_count
-        
-        print(f"삭제 후 데이터 개수: {after_count:,}건")
-        print(f"삭제된 데이터: {deleted_count:,}건")
-        print("="*80)
+    def delete_old_data(self, days=30, archive=False):
+        """오래된 데이터 삭제 (배치 단위, archive=True면 삭제한 행을 res/archive에 gzip CSV로 보관)"""
+        job = PredictionRetentionJob(lambda: self.db_manager, days=days,
+                                     archive_dir=os.path.join('res', 'archive') if archive else None)
+        job.run()
     
     def search_by_bid_number(self, bid_number):
-        """입찰번호로 검색"""
+        """입찰번호 접두어로 검색"""
         print("="*80)
-        print(f"🔍 입찰번호 '{bid_number}' 검색 결과")
+        print(f"🔍 입찰번호 '{bid_number}'(으)로 시작하는 검색 결과")
         print("="*80)
         
-        try:
-            db_cmd = self.db_manager.connection.command()
-            query = "SELECT * FROM ML_C WHERE 입찰번호 LIKE ? ORDER BY 예측일시 DESC"
-            results = db_cmd.select(query, (f'%{bid_number}%',))
-            
-            if results:
-                columns = [
-                    '입찰번호', '입찰차수', '기초금액률', '낙찰하한률', '기초금액', '순공사원가',
-                    '간접비', 'A계산여부', '순공사원가적용여부', '면허제한코드', '공고기관코드',
-                    '주공종명', '공고기관명', '공고기관점수', '공사지역', '공사지역점수',
-                    '키워드', '키워드점수', '공고일자', '개찰일시', '예측_URL',
-                    '업체투찰률_예측', '예가투찰률_예측', '참여업체수_예측',
-                    '등록일시', '예측일시'
-                ]
-                
-                df = pd.DataFrame(results, columns=columns)
-                print(df.to_string(index=False))
-            else:
-                print("검색 결과가 없습니다.")
-        except Exception as e:
-            print(f"❌ 검색 실패: {e}")
+        results = self.db_manager.search_by_bid_number(bid_number)
+        if results:
+            df = pd.DataFrame(results, columns=ML_C_COLUMNS)
+            print(df.to_string(index=False))
+        else:
+            print("검색 결과가 없습니다.")
         print("="*80)
 
-
 def main():
     """메인 실행 함수"""
     print("="*80)
@@ -175,13 +157,20 @@ def main():
     try:
         query_manager = PredictionResultQuery()
         
+        # 비대화형 실행: python query_prediction_results.py --rebuild-summary
+        if '--rebuild-summary' in sys.argv[1:]:
+            query_manager.rebuild_summary()
+            return
+        
         while True:
             print("\n📋 메뉴를 선택하세요:")
             print("1. 요약 통계 보기")
             print("2. 최근 예측 결과 보기")
-            print("3. 엑셀 파일로 내보내기")
+            print("3. 파일로 내보내기 (xlsx/csv/parquet)")
             print("4. 입찰번호로 검색")
             print("5. 오래된 데이터 삭제")
+            print("6. 페이지 단위로 보기")
+            print("7. 요약 테이블 재구축")
             print("0. 종료")
             
             choice = input("\n선택: ").strip()
@@ -193,11 +182,12 @@ def main():
                 limit = int(limit) if limit.isdigit() else 10
                 query_manager.show_recent_predictions(limit)
             elif choice == '3':
-                limit = input("내보낼 건수 (기본 1000): ").strip()
-                limit = int(limit) if limit.isdigit() else 1000
-                query_manager.export_to_excel(limit=limit)
+                fmt = input("형식 (xlsx/csv/csv.gz/parquet, 기본 xlsx): ").strip().lower() or 'xlsx'
+                limit = input("내보낼 건수 (기본 전체): ").strip()
+                limit = int(limit) if limit.isdigit() else None
+                query_manager.export_results(fmt, limit=limit)
             elif choice == '4':
-                bid_number = input("검색할 입찰번호: ").strip()
+                bid_number = input("검색할 입찰번호 (앞부분): ").strip()
                 if bid_number:
                     query_manager.search_by_bid_number(bid_number)
             elif choice == '5':
@@ -205,7 +195,14 @@ def main():
                 days = int(days) if days.isdigit() else 30
                 confirm = input(f"{days}일 이전 데이터를 삭제하시겠습니까? (y/N): ").strip().lower()
                 if confirm == 'y':
-                    query_manager.delete_old_data(days)
+                    archive = input("삭제한 데이터를 아카이브 파일로 보관하시겠습니까? (y/N): ").strip().lower() == 'y'
+                    query_manager.delete_old_data(days, archive)
+            elif choice == '6':
+                page_size = input("페이지 크기 (기본 20): ").strip()
+                page_size = int(page_size) if page_size.isdigit() else 20
+                query_manager.browse_predictions(page_size)
+            elif choice == '7':
+                query_manager.rebuild_summary()
             elif choice == '0':
                 print("프로그램을 종료합니다.")
                 break
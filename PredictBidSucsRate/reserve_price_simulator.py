@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+예정금액(복수예비가격 추첨) Monte Carlo 시뮬레이터
+
+예정금액은 기초금액 ±범위(기본 2%) 안에서 만든 복수예비가격 15개 중 4개를 추첨해 평균한 값이고,
+낙찰하한가 = (예정금액 - A값) × 낙찰하한률 + A값 이다. 예측 서버(bid.ml.predict.py)는 투찰률 점추정과
+WinningPriceSamples의 고정 오프셋 5개만 돌려주므로, 추첨 분포를 직접 뽑아 낙찰 확률과 금액 분위수를 계산한다.
+
+모델 (기초금액 대비 비율):
+- 예가 사정률 R = c + 범위 × Z,  Z = 추첨한 예비가격 4개의 [-1, 1] 위치 평균
+  c: 예가투찰률예측 / 낙찰하한률 (예측이 없으면 1.0)
+- 경쟁 업체 최저 유효 투찰률 C = 업체투찰률예측 + 평균 차이 비율(AVG_DIFF_RT) × E,  E ~ N(0, 1)
+- 투찰금액 P는 낙찰하한가 <= P < 경쟁 업체 최저 투찰금액 이면 낙찰
+
+Z와 E는 시뮬레이터를 만들 때 한 번만 draws개씩 뽑아 정렬해 둔다 (모든 입찰에 같은 난수 사용).
+입찰마다의 예정금액/낙찰하한가/경쟁 투찰금액은 이 표본의 1차 변환이므로, 낙찰 확률은 정렬된 표본에서
+np.searchsorted로, 분위수는 미리 계산한 표본 분위수의 변환으로 구한다. 100만 개 표본 분포를 그대로
+쓰면서 입찰 1건 계산은 O(log draws)이고, 여러 입찰은 배열 연산 한 번으로 처리한다.
+
+- 예비가격이 서로 독립인 균등분포(stratified=False)면 15개 중 무작위 4개는 독립 균등분포 4개와 같다
+- stratified=True면 범위를 15구간으로 나눠 구간마다 1개씩 만든 예비가격에서 서로 다른 4구간을 추첨
+
+ex)
+simulator = ReservePriceSimulator(draws=1000000, prelim_range=0.02, seed=42)
+result = simulator.simulate(300000000, 0.87745, comlowrt=0.8812, planlowrt=0.8770, diffrt=0.003)
+df = simulator.simulate_batch(bids['기초금액'], bids['낙찰하한률'], bids['업체투찰률예측'], bids['예가투찰률예측'])
+
+배치 실행 (CSV 입력 → CSV 출력):
+python reserve_price_simulator.py res/result-2501011230-1-8020.csv -o res/simulate.csv --diffrt 0.003
+"""
+
+import os
+import sys
+import time
+import argparse
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+
+# 기본 설정 (예측 서버는 config.csv의 SIM_* 값으로 바꿀 수 있음)
+DEFAULT_DRAWS = 1000000
+PRELIM_COUNT = 15        # 복수예비가격 수
+PICK_COUNT = 4           # 추첨 수
+PRELIM_RANGE = 0.02      # 기초금액 대비 예비가격 범위 (±)
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# 표본 생성 단위 (임시 배열 메모리 제한)
+CHUNK_DRAWS = 250000
+
+# 배치 입력 컬럼 (예측 결과 테이블, ML_C 내보내기, 학습 CSV 컬럼명 순으로 찾음)
+INPUT_COLUMNS = {
+    'bssamt': ['기초금액', 'bssamt'],
+    'lowerrt': ['낙찰하한률', 'lowerrt'],
+    'comlowrt': ['업체투찰률예측', '업체투찰률_예측', 'comlowrt'],
+    'planlowrt': ['예가투찰률예측', '예가투찰률_예측', 'planlowrt'],
+    'bid_amount': ['투찰금액', 'bidamt'],
+    'a_amount': ['A값', 'aamt'],
+}
+
+
+def _quantile_key(q):
+    """분위수 키 (0.05 → 'p05')"""
+    return f"p{int(round(q * 100)):02d}"
+
+
+def _pick_column(frame, names):
+    for name in names:
+        if name in frame.columns:
+            return frame[name]
+    return None
+
+
+class ReservePriceSimulator:
+    """복수예비가격 추첨으로 예정금액/낙찰하한가 분포와 낙찰 확률을 계산하는 클래스"""
+
+    def __init__(self, draws=DEFAULT_DRAWS, prelim_count=PRELIM_COUNT, pick_count=PICK_COUNT,
+                 prelim_range=PRELIM_RANGE, seed=42, stratified=False, quantiles=QUANTILES):
+        """
+        Args:
+            draws (int): 추첨 표본 수
+            prelim_count (int): 복수예비가격 수
+            pick_count (int): 추첨해서 평균하는 예비가격 수
+            prelim_range (float): 기초금액 대비 예비가격 범위 (0.02 = ±2%)
+            seed (int): 난수 seed (같으면 같은 결과)
+            stratified (bool): 범위를 prelim_count 구간으로 나눠 구간마다 예비가격 1개 생성
+            quantiles (tuple): 돌려줄 분위수
+        """
+        if not 0 < pick_count <= prelim_count:
+            raise ValueError(f"추첨 수({pick_count})는 1 이상 예비가격 수({prelim_count}) 이하여야 합니다.")
+        self.draws = int(draws)
+        self.prelim_count = int(prelim_count)
+        self.pick_count = int(pick_count)
+        self.prelim_range = float(prelim_range)
+        self.seed = seed
+        self.stratified = stratified
+        self.quantiles = tuple(quantiles)
+
+        started = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        self.reserve_z = np.sort(self._draw_positions(rng))          # 예비가격 평균 위치 [-1, 1]
+        self.competitor_e = np.sort(rng.standard_normal(self.draws))  # 경쟁 투찰률 오차 (표준정규)
+        self.reserve_zq = np.quantile(self.reserve_z, self.quantiles)
+        self.competitor_eq = np.quantile(self.competitor_e, self.quantiles)
+        self.build_sec = time.perf_counter() - started
+
+    def _draw_positions(self, rng):
+        """추첨한 예비가격 pick_count개의 평균 위치 (기초금액 대비 -1 ~ 1) 표본"""
+        z = np.empty(self.draws, dtype=np.float64)
+        combos = None
+        if self.stratified:
+            combos = np.array(list(combinations(range(self.prelim_count), self.pick_count)), dtype=np.float64)
+        for start in range(0, self.draws, CHUNK_DRAWS):
+            size = min(CHUNK_DRAWS, self.draws - start)
+            u = rng.random((size, self.pick_count))
+            if combos is not None:
+                # 서로 다른 구간 pick_count개를 고르고 구간 안에서 균등분포
+                u = (combos[rng.integers(0, len(combos), size)] + u) / self.prelim_count
+            z[start:start + size] = u.mean(axis=1) * 2.0 - 1.0
+        return z
+
+    def simulate_arrays(self, bssamt, lowerrt, comlowrt, planlowrt=None, diffrt=0.0,
+                        bid_amount=None, a_amount=0.0, prelim_range=None):
+        """
+        여러 입찰을 배열 연산으로 한 번에 시뮬레이션
+
+        Args:
+            bssamt: 기초금액 배열
+            lowerrt: 낙찰하한률 배열 (0.87745 형식)
+            comlowrt: 업체투찰률예측 배열
+            planlowrt: 예가투찰률예측 배열 (None/NaN/0이면 예가 사정률 중심 1.0)
+            diffrt: 경쟁 업체 투찰률 표준편차 (AVG_DIFF_RT, 스칼라 또는 배열)
+            bid_amount: 평가할 투찰금액 배열 (None/NaN이면 업체투찰률예측 × 기초금액)
+            a_amount: A값 금액 (스칼라 또는 배열)
+            prelim_range: 예비가격 범위 (None이면 생성 시 값)
+
+        Returns:
+            dict: 배열 이름별 결과 (입찰 수 길이, 분위수는 (입찰 수, 분위수 수) 배열)
+        """
+        bssamt = np.asarray(bssamt, dtype=np.float64).ravel()
+        n = len(bssamt)
+
+        def column(values, default):
+            if values is None:
+                return np.full(n, default, dtype=np.float64)
+            values = np.asarray(values, dtype=np.float64).ravel()
+            return np.full(n, values[0]) if values.size == 1 else values
+
+        lowerrt = column(lowerrt, np.nan)
+        comlowrt = column(comlowrt, np.nan)
+        planlowrt = column(planlowrt, np.nan)
+        diffrt = np.abs(column(diffrt, 0.0))
+        a_amount = np.nan_to_num(column(a_amount, 0.0))
+        width = self.prelim_range if prelim_range is None else float(prelim_range)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            center = np.where(np.isfinite(planlowrt) & (planlowrt > 0), planlowrt / lowerrt, 1.0)
+        bid = column(bid_amount, np.nan)
+        bid = np.where(np.isfinite(bid), bid, np.round(bssamt * comlowrt))
+
+        # 낙찰하한가 = lowerrt × 기초금액 × (c + 범위 × Z) + A × (1 - lowerrt)
+        floor_base = lowerrt * bssamt * center + a_amount * (1.0 - lowerrt)
+        floor_scale = lowerrt * bssamt * width
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_star = np.where(floor_scale > 0, (bid - floor_base) / floor_scale,
+                              np.where(bid >= floor_base, np.inf, -np.inf))
+            e_star = np.where(diffrt > 0, (bid / bssamt - comlowrt) / diffrt,
+                              np.where(bid / bssamt < comlowrt, -np.inf, np.inf))
+
+        pass_prob = np.searchsorted(self.reserve_z, z_star, side='right') / self.draws
+        beat_prob = 1.0 - np.searchsorted(self.competitor_e, e_star, side='right') / self.draws
+        invalid = ~((bssamt > 0) & np.isfinite(lowerrt) & np.isfinite(comlowrt) & np.isfinite(bid))
+        pass_prob[invalid] = np.nan
+        beat_prob[invalid] = np.nan
+
+        reserve_q = bssamt[:, None] * (center[:, None] + width * self.reserve_zq[None, :])
+        floor_q = lowerrt[:, None] * reserve_q + (a_amount * (1.0 - lowerrt))[:, None]
+        competitor_q = bssamt[:, None] * (comlowrt[:, None] + diffrt[:, None] * self.competitor_eq[None, :])
+
+        return {
+            'bid_amount': bid,
+            'win_probability': pass_prob * beat_prob,   # 낙찰하한가와 경쟁 투찰가는 서로 독립
+            'floor_pass_probability': pass_prob,
+            'beat_competitor_probability': beat_prob,
+            'reserve_mean': bssamt * center,
+            'reserve_quantiles': reserve_q,
+            'floor_quantiles': floor_q,
+            'competitor_quantiles': competitor_q,
+        }
+
+    def simulate(self, bssamt, lowerrt, comlowrt, planlowrt=None, diffrt=0.0, bid_amount=None,
+                 a_amount=0.0, prelim_range=None):
+        """
+        입찰 1건 시뮬레이션 (인자는 simulate_arrays와 같고 스칼라)
+
+        Returns:
+            dict: 낙찰 확률과 예정금액/낙찰하한가/경쟁 투찰금액 분위수 (API 응답 형식)
+        """
+        started = time.perf_counter()
+        r = self.simulate_arrays([bssamt], lowerrt, comlowrt, planlowrt, diffrt, bid_amount, a_amount, prelim_range)
+        response = self.responses(r, prelim_range)[0]
+        response['elapsedMs'] = round((time.perf_counter() - started) * 1000, 3)
+        return response
+
+    def responses(self, r, prelim_range=None):
+        """simulate_arrays 결과를 입찰별 API 응답 dict 목록으로 변환"""
+        keys = [_quantile_key(q) for q in self.quantiles]
+
+        def number(value, digits=None):
+            value = float(value)
+            if not np.isfinite(value):
+                return None
+            return value if digits is None else round(value, digits)
+
+        def quantiles(name, i):
+            return {k: number(v, 0) for k, v in zip(keys, r[name][i])}
+
+        return [{
+            'bidAmount': number(r['bid_amount'][i]),
+            'winProbability': number(r['win_probability'][i]),
+            'floorPassProbability': number(r['floor_pass_probability'][i]),
+            'beatCompetitorProbability': number(r['beat_competitor_probability'][i]),
+            'reservePriceMean': number(r['reserve_mean'][i], 0),
+            'reservePriceQuantiles': quantiles('reserve_quantiles', i),
+            'lowerLimitPriceQuantiles': quantiles('floor_quantiles', i),
+            'competitorPriceQuantiles': quantiles('competitor_quantiles', i),
+            'draws': self.draws,
+            'prelimRange': self.prelim_range if prelim_range is None else float(prelim_range),
+        } for i in range(len(r['bid_amount']))]
+
+    def simulate_batch(self, bssamt, lowerrt, comlowrt, planlowrt=None, diffrt=0.0, bid_amount=None,
+                       a_amount=0.0, prelim_range=None, index=None):
+        """
+        여러 입찰 시뮬레이션 결과를 DataFrame으로 반환 (인자는 simulate_arrays와 같음)
+
+        Returns:
+            pd.DataFrame: 투찰금액, 낙찰확률, 하한통과확률, 경쟁우위확률, 예정금액평균,
+                          예정금액_p05.., 낙찰하한가_p05.., 경쟁투찰금액_p05..
+        """
+        r = self.simulate_arrays(bssamt, lowerrt, comlowrt, planlowrt, diffrt, bid_amount, a_amount, prelim_range)
+        columns = {
+            '투찰금액': r['bid_amount'],
+            '낙찰확률': r['win_probability'],
+            '하한통과확률': r['floor_pass_probability'],
+            '경쟁우위확률': r['beat_competitor_probability'],
+            '예정금액평균': r['reserve_mean'],
+        }
+        for prefix, name in [('예정금액', 'reserve_quantiles'), ('낙찰하한가', 'floor_quantiles'),
+                             ('경쟁투찰금액', 'competitor_quantiles')]:
+            for i, q in enumerate(self.quantiles):
+                columns[f"{prefix}_{_quantile_key(q)}"] = r[name][:, i]
+        return pd.DataFrame(columns, index=index)
+
+    def reserve_prices(self, bssamt, center=1.0, prelim_range=None):
+        """입찰 1건의 예정금액 표본 전체 (정렬된 draws개 배열)"""
+        width = self.prelim_range if prelim_range is None else float(prelim_range)
+        return float(bssamt) * (center + width * self.reserve_z)
+
+
+def simulate_frame(simulator, frame, diffrt=0.0, prelim_range=None):
+    """
+    입찰 DataFrame(예측 결과 테이블/ML_C 내보내기)에 시뮬레이션 컬럼을 붙여 반환
+
+    필요한 컬럼: 기초금액, 낙찰하한률, 업체투찰률예측(또는 업체투찰률_예측)
+    선택 컬럼: 예가투찰률예측, 투찰금액, A값
+    """
+    values = {key: _pick_column(frame, names) for key, names in INPUT_COLUMNS.items()}
+    missing = [INPUT_COLUMNS[key][0] for key in ('bssamt', 'lowerrt', 'comlowrt') if values[key] is None]
+    if missing:
+        raise KeyError(f"시뮬레이션에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+
+    def numeric(series):
+        return None if series is None else pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+
+    result = simulator.simulate_batch(
+        numeric(values['bssamt']), numeric(values['lowerrt']), numeric(values['comlowrt']),
+        numeric(values['planlowrt']), diffrt, numeric(values['bid_amount']),
+        0.0 if values['a_amount'] is None else np.nan_to_num(numeric(values['a_amount'])),
+        prelim_range, index=frame.index)
+    return pd.concat([frame, result], axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='예정금액 추첨 Monte Carlo 배치 시뮬레이션')
+    parser.add_argument('input', help='입력 CSV/parquet (기초금액, 낙찰하한률, 업체투찰률예측 컬럼)')
+    parser.add_argument('-o', '--output', default=None, help='출력 파일 (기본: 입력파일명.simulate.csv)')
+    parser.add_argument('--draws', type=int, default=DEFAULT_DRAWS, help='추첨 표본 수')
+    parser.add_argument('--range', type=float, default=PRELIM_RANGE, dest='prelim_range', help='예비가격 범위 (±)')
+    parser.add_argument('--prelim-count', type=int, default=PRELIM_COUNT, help='복수예비가격 수')
+    parser.add_argument('--pick-count', type=int, default=PICK_COUNT, help='추첨 수')
+    parser.add_argument('--stratified', action='store_true', help='구간별 예비가격 생성')
+    parser.add_argument('--diffrt', type=float, default=0.0, help='경쟁 업체 투찰률 표준편차 (AVG_DIFF_RT)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args(argv)
+
+    if args.input.endswith('.parquet'):
+        frame = pd.read_parquet(args.input)
+    else:
+        frame = pd.read_csv(args.input, encoding='utf-8-sig')
+    output = args.output or os.path.splitext(args.input)[0] + '.simulate.csv'
+
+    simulator = ReservePriceSimulator(args.draws, args.prelim_count, args.pick_count, args.prelim_range,
+                                      args.seed, args.stratified)
+    started = time.perf_counter()
+    result = simulate_frame(simulator, frame, args.diffrt)
+    elapsed = time.perf_counter() - started
+
+    if output.endswith('.parquet'):
+        result.to_parquet(output, index=False)
+    else:
+        result.to_csv(output, index=False, encoding='utf-8-sig')
+    print(f"🎲 표본 {simulator.draws:,}개 생성 {simulator.build_sec:.3f}초, "
+          f"입찰 {len(frame):,}건 시뮬레이션 {elapsed:.3f}초 ({elapsed / max(len(frame), 1) * 1000:.4f}ms/건)")
+    print(f"💾 저장: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
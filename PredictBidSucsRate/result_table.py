@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+예측 결과 테이블 생성 모듈
+
+학습 스크립트(bid.ml.train*.py)와 test_improved_model.py가 함께 쓰는 결과 테이블 계산.
+결과1, 결과2, A값여부를 행마다 apply로 계산하지 않고 numpy 배열 비교(np.select)로
+한 번에 계산하며, 라벨 컬럼은 범주형(category)으로 만든다.
+
+결과1/결과2 판정 (예측금액 기준):
+- 예측금액 < 낙찰하한가                  → "낙찰하한선미달"
+- 낙찰하한가 <= 예측금액 < 낙찰금액       → "낙찰"
+- 그 외 (값이 비어 있는 경우 포함)         → "-"
+
+ex)
+df_rst = build_result_dataframe(df_test, self.result_columns, result1, result2, result3)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# 결과1/결과2 라벨 (범주 순서 = np.select 코드 순서)
+RESULT_LABELS = ['낙찰하한선미달', '낙찰', '-']
+
+# A값여부 라벨 (업체투찰률예측 0.8 이상이면 'O')
+A_VALUE_LABELS = ['O', '']
+A_VALUE_THRESHOLD = 0.8
+
+
+def _float_array(values):
+    """Series/배열을 float64 배열로 변환 (숫자가 아니면 NaN)"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'fiu':
+        return np.array(values, dtype=np.float64).ravel()
+    return pd.to_numeric(pd.Series(np.asarray(values).ravel()), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def classify_bid_result(predicted, min_bid, actual):
+    """
+    예측금액으로 낙찰 여부 판정 (결과1, 결과2)
+
+    Args:
+        predicted: 예측금액 배열
+        min_bid: 낙찰하한가 배열
+        actual: 실제 낙찰금액 배열
+
+    Returns:
+        pd.Categorical: RESULT_LABELS 중 하나
+    """
+    predicted = _float_array(predicted)
+    min_bid = _float_array(min_bid)
+    actual = _float_array(actual)
+
+    codes = np.select(
+        [predicted < min_bid, (predicted >= min_bid) & (predicted < actual)],
+        [0, 1],
+        default=2,
+    ).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=RESULT_LABELS)
+
+
+def build_result_dataframe(df_test, result_columns, result1, result2, result3):
+    """
+    테스트 데이터와 3개 모델 예측값으로 결과 테이블 생성
+
+    Args:
+        df_test (pd.DataFrame): 결과에 그대로 옮길 테스트 데이터 컬럼들
+        result_columns (list): 결과 테이블 컬럼 순서 (없는 컬럼은 빈 값)
+        result1, result2, result3: 업체투찰률, 예가투찰률, 참여업체수 예측값
+
+    Returns:
+        pd.DataFrame: result_columns 순서의 결과 테이블 (result_columns에 없는 컬럼은 뒤에 추가)
+    """
+    index = df_test.index
+    columns = {name: df_test[name] for name in df_test.columns}
+
+    base_amount = _float_array(df_test["기초금액"])
+    lower_rate = _float_array(df_test["낙찰하한률"])
+    company_rate = _float_array(result1)
+    plan_rate = _float_array(result2)
+    min_bid = _float_array(df_test["낙찰하한가"])
+    actual_amount = _float_array(df_test["낙찰금액"])
+
+    columns["업체투찰률예측"] = pd.Series(company_rate, index=index)
+    columns["예가투찰률예측"] = pd.Series(plan_rate, index=index)
+    columns["참여업체수예측"] = pd.Series(np.asarray(result3).ravel(), index=index)
+
+    # 예가투찰률 = (예정금액 / 기초금액) * 낙찰하한률 → 예정금액 = (예가투찰률 * 기초금액) / 낙찰하한률
+    planned_amount = (plan_rate * base_amount) / lower_rate
+    columns["예정금액예측"] = pd.Series(planned_amount, index=index)
+
+    # 낙찰금액(업체투찰률) 예측 = 업체투찰률예측 * 기초금액
+    company_amount = company_rate * base_amount
+    columns["낙찰금액(업체투찰률) 예측"] = pd.Series(company_amount, index=index)
+
+    a_value_codes = np.where(company_rate >= A_VALUE_THRESHOLD, 0, 1).astype(np.int8)
+    columns["A값여부"] = pd.Series(pd.Categorical.from_codes(a_value_codes, categories=A_VALUE_LABELS), index=index)
+
+    columns["결과1"] = pd.Series(
+        classify_bid_result(company_amount, min_bid, actual_amount), index=index)
+
+    # 예정금액(예가투찰률) 예측 = 예가투찰률예측 / 낙찰하한률 * 기초금액
+    planned_by_rate = (plan_rate / lower_rate) * base_amount
+    columns["예정금액(예가투찰률) 예측"] = pd.Series(planned_by_rate, index=index)
+    planned_lower = planned_by_rate * lower_rate
+    columns["예정금액*낙찰하한율"] = pd.Series(planned_lower, index=index)
+
+    columns["결과2"] = pd.Series(classify_bid_result(planned_lower, min_bid, actual_amount), index=index)
+
+    ordered = list(result_columns) + [name for name in columns if name not in result_columns]
+    return pd.DataFrame(columns, index=index, columns=ordered)
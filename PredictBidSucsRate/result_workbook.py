@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+예측 결과 엑셀 파일 저장 모듈
+
+학습 스크립트(bid.ml.train*.py)의 saveResultToXls가 쓰는 결과 파일 writer.
+DataFrame.to_excel로 저장한 뒤 openpyxl로 다시 열어 통계를 붙이고 또 저장하던 과정을
+xlsxwriter constant_memory 모드로 한 번에 처리한다. 결과 행을 쓰는 즉시 디스크로 내보내고,
+이어서 결과1/결과2 통계(COUNTIF 수식)와 요약 정보를 같은 시트 아래쪽에 쓴다.
+
+시트 배치는 기존 to_excel(startrow=1, startcol=1, index_label='id')과 같다.
+- 2행: 헤더 (B열 id, C열부터 결과 컬럼), 3행부터 데이터, 2행까지 틀 고정
+- 데이터 마지막 + 2행: AA열 결과1 통계, AD열 결과2 통계, 그 아래 A열 요약 정보
+- 숫자는 반올림하지 않고 그대로 쓰고, 컬럼 종류별 표시 형식만 지정 (금액 #,##0, 비율 0.000000)
+
+행 수가 row_limit보다 많으면 엑셀 대신 CSV(또는 parquet)로 저장하고 통계는 화면에 출력한다.
+
+ex)
+path = write_result_workbook(df_result, 'res/result-2501011230-1-8020.xlsx', bid_type_name='공사입찰')
+"""
+
+import os
+import math
+import numpy as np
+import pandas as pd
+
+# 엑셀 파일 writer (선택)
+try:
+    import xlsxwriter
+    from xlsxwriter.utility import xl_col_to_name
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+
+# 이 행 수를 넘으면 엑셀 대신 fallback 형식으로 저장
+EXCEL_ROW_LIMIT = 300000
+
+# 셀 값으로 변환하는 행 단위
+CHUNK_ROWS = 10000
+
+# 결측값 표시 (기존 to_excel na_rep과 같음)
+NA_REP = 'NaN'
+
+# 컬럼 종류별 표시 형식
+AMOUNT_COLUMNS = ['기초금액', '간접비', '순공사원가', '예정금액', '낙찰하한가', '낙찰금액', '예정금액예측',
+                  '낙찰금액(업체투찰률) 예측', '예정금액(예가투찰률) 예측', '예정금액*낙찰하한율']
+RATE_COLUMNS = ['낙찰하한률', '업체투찰률', '예가투찰률', '투찰률오차', '업체투찰률예측', '예가투찰률예측']
+COUNT_COLUMNS = ['참여업체수', '참여업체수예측']
+NUMBER_FORMATS = {'amount': '#,##0', 'rate': '0.000000', 'count': '#,##0.0', 'other': '0.0000'}
+
+# 데이터 위치 (0부터 시작: 헤더 2행, id B열)
+HEADER_ROW = 1
+FIRST_COL = 1
+
+
+def _column_kind(name):
+    if name in AMOUNT_COLUMNS:
+        return 'amount'
+    if name in RATE_COLUMNS:
+        return 'rate'
+    if name in COUNT_COLUMNS:
+        return 'count'
+    return 'other'
+
+
+def result_statistics(df_result):
+    """결과1/결과2 '낙찰' 개수와 비율(%)"""
+    total = len(df_result)
+    stats = {}
+    for name in ['결과1', '결과2']:
+        if name in df_result.columns:
+            count = int((df_result[name].astype(str) == '낙찰').sum())
+            stats[name] = (count, count / total * 100 if total else 0)
+    return stats
+
+
+def _cell_columns(df_result):
+    """
+    컬럼마다 (값 목록, 숫자 여부)로 변환
+
+    숫자 컬럼은 NaN/inf만 NA_REP 문자열로 바꾸고, 나머지는 문자열로 쓴다 (범주형 포함).
+    """
+    columns = []
+    for name in df_result.columns:
+        series = df_result[name]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64)
+            finite = np.isfinite(values)
+            cells = values.tolist()
+            if not finite.all():
+                for i in np.flatnonzero(~finite):
+                    cells[i] = NA_REP
+                columns.append((cells, None))
+            else:
+                columns.append((cells, True))
+        else:
+            values = series.astype(object).to_numpy()
+            # 숫자/문자가 섞인 object 컬럼은 값마다 종류에 맞춰 기록
+            cells = [NA_REP if v is None or (isinstance(v, float) and math.isnan(v)) else v for v in values.tolist()]
+            numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in cells)
+            columns.append((cells, True if numeric else None))
+    return columns
+
+
+def _write_excel(df_result, path, bid_type_name):
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    try:
+        sheet = workbook.add_worksheet('Sheet1')
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        formats = {kind: workbook.add_format({'num_format': fmt}) for kind, fmt in NUMBER_FORMATS.items()}
+        bold = {color: workbook.add_format({'bold': True, 'font_color': color})
+                for color in ['#0000FF', '#00AA00', '#FF0000']}
+
+        names = list(df_result.columns)
+        for i, name in enumerate(names):
+            sheet.set_column(FIRST_COL + 1 + i, FIRST_COL + 1 + i, None, formats[_column_kind(name)])
+        sheet.freeze_panes(HEADER_ROW + 1, 0)
+        sheet.write_row(HEADER_ROW, FIRST_COL, ['id'] + [str(n) for n in names], header_format)
+
+        # ===== 결과 행 (constant_memory: 행 순서대로 쓰는 즉시 디스크로) =====
+        # 셀 값 변환도 CHUNK_ROWS 단위로 해서 전체 결과를 파이썬 객체로 한꺼번에 만들지 않음
+        write_number = sheet.write_number
+        write_string = sheet.write_string
+        write = sheet.write
+        first_data_row = HEADER_ROW + 1
+        for start in range(0, len(df_result), CHUNK_ROWS):
+            chunk = df_result.iloc[start:start + CHUNK_ROWS]
+            writers = [(cells, write_number if numeric else write) for cells, numeric in _cell_columns(chunk)]
+            for r, label in enumerate(chunk.index.tolist()):
+                row = first_data_row + start + r
+                write(row, FIRST_COL, label)
+                col = FIRST_COL + 1
+                for cells, writer in writers:
+                    value = cells[r]
+                    if writer is write and isinstance(value, str):
+                        if value:  # 빈 문자열은 to_excel처럼 빈 셀로 둠
+                            write_string(row, col, value)
+                    else:
+                        writer(row, col, value)
+                    col += 1
+
+        # ===== 결과1/결과2 통계 + 요약 정보 (데이터 바로 아래, 행 순서대로) =====
+        data_rows = len(df_result)
+        start_row = first_data_row + 1                     # 엑셀 행 번호 (1부터)
+        end_row = start_row + data_rows - 1
+        stats_row = end_row + 2
+        ranges = {}
+        for name in ['결과1', '결과2']:
+            if name in names:
+                letter = xl_col_to_name(FIRST_COL + 1 + names.index(name))
+                ranges[name] = f"{letter}{start_row}:{letter}{end_row}"
+
+        blocks = [('결과1', 'AA', 'AB', '#0000FF'), ('결과2', 'AD', 'AE', '#00AA00')]
+        for name, label_col, value_col, color in blocks:
+            if name in ranges:
+                sheet.write(f'{label_col}{stats_row}', f"=== {name} 통계 ===", bold[color])
+        for name, label_col, value_col, color in blocks:
+            if name in ranges:
+                sheet.write(f'{label_col}{stats_row + 1}', "낙찰 개수:")
+                sheet.write_formula(f'{value_col}{stats_row + 1}', f'=COUNTIF({ranges[name]},"낙찰")')
+        for name, label_col, value_col, color in blocks:
+            if name in ranges:
+                sheet.write(f'{label_col}{stats_row + 2}', "낙찰 비율:")
+                sheet.write_formula(f'{value_col}{stats_row + 2}',
+                                    f'=IF({value_col}{stats_row + 1}>0,{value_col}{stats_row + 1}/{data_rows}*100,0)')
+
+        sheet.write(f'A{stats_row + 4}', "=== 요약 정보 ===", bold['#FF0000'])
+        sheet.write(f'A{stats_row + 5}', f"총 데이터 개수: {data_rows}개")
+        sheet.write(f'A{stats_row + 6}', f"데이터 범위: {', '.join(ranges.values())}")
+        if bid_type_name:
+            sheet.write(f'A{stats_row + 7}', f"입찰 유형: {bid_type_name}")
+    finally:
+        workbook.close()
+    return path
+
+
+def _write_fallback(df_result, path, fallback):
+    """엑셀 대신 CSV 또는 parquet으로 저장 (기존 CSV 저장과 같은 형식)"""
+    if fallback == 'parquet':
+        out = os.path.splitext(path)[0] + '.parquet'
+        frame = df_result.reset_index(names='id').infer_objects()
+        for name in frame.columns[frame.dtypes == object]:
+            # 테스트셋에서 옮겨 온 object 컬럼: 숫자로 바뀌면 숫자, 아니면 문자열
+            try:
+                frame[name] = pd.to_numeric(frame[name])
+            except (TypeError, ValueError):
+                frame[name] = frame[name].map(lambda v: None if v is None or v != v else str(v))
+        frame.to_parquet(out, index=False, compression='zstd')
+    else:
+        out = os.path.splitext(path)[0] + '.csv'
+        df_result.to_csv(out, na_rep=NA_REP, float_format="%.8f", header=True, index=True,
+                         index_label="id", encoding='utf-8-sig')
+    return out
+
+
+def write_result_workbook(df_result, path, bid_type_name=None, row_limit=EXCEL_ROW_LIMIT, fallback='csv'):
+    """
+    예측 결과를 엑셀 파일(통계 포함)로 저장
+
+    Args:
+        df_result (pd.DataFrame): 결과 테이블 (make_result_dataframe2 결과)
+        path (str): 엑셀 파일 경로
+        bid_type_name (str): 요약 정보에 쓸 입찰 유형 이름
+        row_limit (int): 이 행 수를 넘으면 fallback 형식으로 저장 (None이면 제한 없음)
+        fallback (str): 'csv' 또는 'parquet'
+
+    Returns:
+        str: 실제로 저장한 파일 경로
+    """
+    if not XLSXWRITER_AVAILABLE:
+        raise ImportError("xlsxwriter가 설치되지 않았습니다. 'pip install xlsxwriter'를 실행하세요.")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    stats = result_statistics(df_result)
+    if row_limit is not None and len(df_result) > row_limit:
+        out = _write_fallback(df_result, path, fallback)
+        print(f"⚠️  결과가 {len(df_result):,}행으로 엑셀 저장 기준({row_limit:,}행)을 넘어 {fallback} 파일로 저장합니다.")
+    else:
+        out = _write_excel(df_result, path, bid_type_name)
+
+    for name, (count, rate) in stats.items():
+        print(f"📊 {name} 통계: 낙찰 {count:,}건 ({rate:.2f}%)")
+    return out
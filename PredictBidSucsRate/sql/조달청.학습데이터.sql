@@ -0,0 +1,69 @@
+-- 학습 데이터 조회 쿼리 (SQL Server / T-SQL)
+-- bid.ml.train.py --db, TrainingDataLoader.read_query_file()의 기본 쿼리 (TRAINING_QUERY_FILE)
+-- 학습 CSV와 같은 컬럼: 입력 특성, 대상(업체투찰률, 예가투찰률, 참여업체수), TF-IDF용 텍스트(키워드, 공고기관명, 공사지역)
+-- 점수 컬럼(공고기관점수, 공사지역점수, 키워드점수)은 학습 스크립트가 텍스트로 다시 계산하므로 0
+
+WITH basic_bid_info AS (
+    SELECT
+        a.bid_ntce_no AS 입찰번호,
+        a.bid_ntce_ord AS 입찰차수,
+        ISNULL(c.bssamt, 0) / 100000000.0 AS 기초금액률,
+        ISNULL(a.sucsfbid_lwlt_rate, 0) / 100.0 AS 낙찰하한률,
+        ISNULL(b.prtcpt_cnum, 0) AS 참여업체수,
+        b.sucsfbid_rate AS 최종낙찰률,
+        (b.sucsfbid_amt / NULLIF(c.bssamt, 0)) * (ISNULL(a.sucsfbid_lwlt_rate, 0) / 100.0) AS 업체사정률,
+        (b.sucsfbid_amt / NULLIF(c.bssamt, 0)) AS 업체투찰률,
+        d.plnprc / NULLIF(c.bssamt, 0) AS 예가사정률,
+        ISNULL(c.bssamt, 0) AS 기초금액,
+        ISNULL(d.plnprc, 0) AS 예정금액,
+        ISNULL(c.bss_amt_purcnstcst, 0) AS 순공사원가,
+        ISNULL(d.bsis_plnprc, 0) AS 기초예정금액,
+        b.sucsfbid_amt AS 낙찰금액,
+        (ISNULL(c.sfty_mngcst, 0) + ISNULL(c.rtrfund_non, 0) + ISNULL(c.mrfn_health_insrprm, 0)
+            + ISNULL(c.npn_insrprm, 0) + ISNULL(c.odsn_lngtrmrcpr_insrprm, 0)
+            + ISNULL(c.sftyChck_mngcst, 0) + ISNULL(c.qlty_mngcst, 0)) AS 간접비,
+        CASE WHEN c.bid_prce_calclA_yn = 'Y' THEN 1 ELSE 0 END AS A계산여부,
+        CASE WHEN c.bss_amt_purcnstcst > 0 THEN 1 ELSE 0 END AS 순공사원가적용여부,
+        CAST(ISNULL(area.lic_code, 0) AS VARCHAR(50)) AS 면허제한코드,
+        ISNULL(a.ntce_instt_cd, '0') AS 공고기관코드,
+        CASE WHEN ISNULL(a.main_cnstty_nm, '') = '' THEN '-' ELSE a.main_cnstty_nm END AS 주공종명,
+        ISNULL(a.bid_ntce_nm, '') AS 입찰명,
+        ISNULL(a.area_list, '') AS 공사지역,
+        ISNULL(a.ntce_instt_nm, '') AS 공고기관명
+    FROM bd_cst_main a
+        INNER JOIN ad_cst b
+            ON a.bid_ntce_no = b.bid_ntce_no AND a.bid_ntce_ord = b.bid_ntce_ord
+        INNER JOIN bd_cst_prc c
+            ON a.bid_ntce_no = c.bid_ntce_no AND a.bid_ntce_ord = c.bid_ntce_ord
+        INNER JOIN ad_cst_pprt d
+            ON a.bid_ntce_no = d.bid_ntce_no AND a.bid_ntce_ord = d.bid_ntce_ord
+                AND d.compno_rsrvtn_prce_sno = 1
+        INNER JOIN (
+            SELECT bid_ntce_no, MAX(bid_ntce_ord) AS bid_ntce_ord
+            FROM bd_cst_main
+            GROUP BY bid_ntce_no
+        ) e ON a.bid_ntce_no = e.bid_ntce_no AND a.bid_ntce_ord = e.bid_ntce_ord
+        -- 참가 가능 지역 코드 합계 (조회쿼리.sql과 같은 코드화, 없으면 0)
+        LEFT JOIN (
+            SELECT ca.bid_ntce_no, ca.bid_ntce_ord, SUM(ISNULL(TRY_CAST(cac.area_cl_cd AS BIGINT), 0) * 1000) AS lic_code
+            FROM cm_area ca
+                INNER JOIN cm_area_cd cac ON ca.prtcpt_psbl_rgn_nm = cac.area_cl_nm
+            WHERE ca.bsns_div_nm = '공사'
+            GROUP BY ca.bid_ntce_no, ca.bid_ntce_ord
+        ) area ON area.bid_ntce_no = a.bid_ntce_no AND area.bid_ntce_ord = a.bid_ntce_ord
+    WHERE a.sucsfbid_lwlt_rate IS NOT NULL
+)
+SELECT
+    입찰번호, 입찰차수,
+    기초금액률, 낙찰하한률, 참여업체수, 최종낙찰률, 업체사정률, 예가사정률,
+    업체투찰률,
+    ROUND(((예정금액 - 간접비) * 낙찰하한률) + 간접비, 0) / NULLIF(기초금액, 0) AS 예가투찰률,
+    (업체투찰률 - ROUND(((예정금액 - 간접비) * 낙찰하한률) + 간접비, 0) / NULLIF(기초금액, 0)) * 100 AS 투찰률오차,
+    기초금액, 예정금액, 순공사원가, 기초예정금액, 낙찰금액, 간접비, A계산여부, 순공사원가적용여부,
+    ROUND(((예정금액 - 간접비) * 낙찰하한률) + 간접비, 0) AS 낙찰하한가,
+    면허제한코드, 공고기관코드, 주공종명,
+    공고기관명, 0.0 AS 공고기관점수,
+    공사지역, 0.0 AS 공사지역점수,
+    CONCAT(입찰명, ' ', 주공종명) AS 키워드, 0.0 AS 키워드점수
+FROM basic_bid_info
+WHERE 업체투찰률 IS NOT NULL
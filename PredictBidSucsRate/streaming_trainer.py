@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+대용량 학습 CSV를 청크 단위로 읽어 MLPRegressor를 학습하는 스트리밍(out-of-core) 학습기
+
+bid.ml.train.py는 전체 데이터와 특성, 리스트 복사본을 메모리에 올린 뒤 model.fit을 하므로
+학습 데이터 크기가 메모리에 묶인다. 여기서는 데이터를 청크로만 읽어 메모리 사용량이
+데이터 크기와 관계없이 일정하다.
+
+1. 텍스트 패스   : 텍스트 컬럼만 읽어 reservoir 표본(vocab_rows)으로 TF-IDF 단어사전 학습
+2. 특성 패스     : 청크마다 텍스트 점수 + 학습 특성 계산, 검증 행 분리,
+                   StandardScaler.partial_fit, 특성을 작업 폴더의 이진 파일로 추가
+3. 학습 패스     : 이진 파일을 블록 단위로 읽어 블록 순서를 섞어 가며 MLPRegressor.partial_fit (epoch 반복)
+                   epoch마다 검증 스트림으로 R2/RMSE를 계산해 가장 좋은 모델을 보관, patience만큼 개선이 없으면 중단
+4. 저장          : bid.ml.train.py와 같은 파일명(model1/2/3 또는 multi, scaler, tokenizer, vectorizer)
+
+특성 엔지니어링(AdvancedFeatureEngineering) 결과는 학습 특성으로 선택되지 않으므로 계산하지 않는다.
+
+ex)
+python bid.ml.train.py cst --stream                               # 학습 스크립트 기본 CSV를 스트리밍 학습
+python streaming_trainer.py data/cst_all.csv --bid-type cst --epochs 20 --chunk-rows 100000
+python streaming_trainer.py data/cst_all.csv --multi-output --output res/stream
+"""
+
+import os
+import json
+import time
+import pickle
+import shutil
+import argparse
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime
+from sklearn.preprocessing import StandardScaler
+
+from model_bundle import (BUNDLE_FILES, BASE_FEATURES, CONSTRUCTION_FEATURES, TEXT_SCORE_COLUMNS,
+                          feature_columns, feature_values, clean_text)
+from multi_output_model import MultiTargetMLP, TARGET_NAMES
+from train_scripts import TRAIN_SCRIPTS, load_script, setup_models, text_model_state
+
+
+# 입찰 유형 자동 감지에 쓰는 공사입찰 전용 컬럼 (bid.ml.train.py _detect_bid_type과 같음)
+CONSTRUCTION_DETECT_COLUMNS = ['간접비', '순공사원가', '주공종명']
+
+
+class BlockFile:
+    """특성 이진 파일을 행 블록 단위로 읽기 (memmap과 달리 읽은 페이지가 프로세스 메모리에 쌓이지 않음)"""
+
+    def __init__(self, path, width):
+        self.path = path
+        self.width = width
+        self.rows = os.path.getsize(path) // (width * 8)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, block):
+        return np.fromfile(self.path, dtype=np.float64, count=(block.stop - block.start) * self.width,
+                           offset=block.start * self.width * 8).reshape(-1, self.width)
+
+
+class StreamingMLPTrainer:
+    """청크 단위로 학습 CSV를 읽어 MLPRegressor를 partial_fit으로 학습하는 클래스"""
+
+    def __init__(self, tokenizer, vectorizer, model_factory, bid_type='auto', chunk_rows=100000,
+                 epochs=20, patience=3, validation_ratio=0.05, vocab_rows=200000, token_cache_size=1000000,
+                 seed=1, output_dir='res', work_dir=None, profiler=None):
+        """
+        Args:
+            tokenizer: KiwiTokenizer (nn_only)
+            vectorizer: KiwiVectorizer (fit, scores) - 텍스트 패스에서 학습
+            model_factory (callable): 모델 생성 함수 (setupModels → 모델 3개 리스트, 또는 MultiTargetMLP 1개)
+            bid_type (str): 'cst', 'mtrl', 'gdns', 'auto' (auto면 CSV 헤더로 감지)
+            chunk_rows (int): 한 번에 읽고 학습하는 행 수
+            epochs (int): 최대 epoch 수
+            patience (int): 검증 R2가 개선되지 않아도 계속할 epoch 수
+            validation_ratio (float): 검증 스트림으로 떼어 둘 행 비율
+            vocab_rows (int): TF-IDF 단어사전 학습에 쓸 표본 행 수
+            token_cache_size (int): 형태소 분석 결과를 보관할 최대 문자열 수 (공고기관명/공사지역처럼 반복되는 값)
+            seed (int): 검증 분리 / 블록 순서 seed
+            output_dir (str): 모델 저장 폴더
+            work_dir (str): 특성 이진 파일을 둘 상위 폴더 (None이면 시스템 임시 폴더)
+            profiler: TrainingProfiler (None이면 단계 기록 안함)
+        """
+        self.tokenizer = tokenizer
+        self.vectorizer = vectorizer
+        self.model_factory = model_factory
+        self.bid_type = bid_type
+        self.chunk_rows = int(chunk_rows)
+        self.epochs = int(epochs)
+        self.patience = int(patience)
+        self.validation_ratio = float(validation_ratio)
+        self.vocab_rows = int(vocab_rows)
+        self.token_cache_size = int(token_cache_size)
+        self.tokens = {}
+        self.seed = seed
+        self.output_dir = output_dir
+        self.work_dir = work_dir
+        self.profiler = profiler
+        self.rng = np.random.default_rng(seed)
+
+        self.features = None
+        self.x_scaler = StandardScaler()
+        self.y_scaler = StandardScaler()
+        self.models = None
+        self.history = []
+        self.counts = {'train': 0, 'valid': 0, 'dropped': 0}
+
+    @contextmanager
+    def _stage(self, name, rows=None):
+        if self.profiler is None:
+            yield {}
+        else:
+            with self.profiler.stage(name, rows=rows) as stage:
+                yield stage
+
+    def _read(self, path, usecols=None):
+        return pd.read_csv(path, chunksize=self.chunk_rows, usecols=usecols, low_memory=False)
+
+    def _tokenize(self, texts):
+        """형태소 분석 (보관된 문자열은 재사용, 새 문자열은 token_cache_size까지 보관)"""
+        lines = [self.tokens.get(text) for text in texts]
+        missing = [i for i, line in enumerate(lines) if line is None]
+        if missing:
+            parsed = self.tokenizer.nn_only([texts[i] for i in missing])
+            for i, line in zip(missing, parsed):
+                lines[i] = line
+                if len(self.tokens) < self.token_cache_size:
+                    self.tokens[texts[i]] = line
+        return lines
+
+    def _score_text(self, series):
+        """텍스트 컬럼 TF-IDF 점수 (청크 안의 같은 문자열은 한 번만 계산)"""
+        codes, uniques = pd.factorize(clean_text(series))
+        if len(uniques) == 0:
+            return np.zeros(len(series))
+        return np.asarray(self.vectorizer.scores(self._tokenize(list(uniques))), dtype=np.float64)[codes]
+
+    def _detect_features(self, path):
+        """CSV 헤더로 입찰 유형과 학습 특성 결정"""
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        if self.bid_type == 'auto':
+            found = [c for c in CONSTRUCTION_DETECT_COLUMNS if c in columns]
+            self.bid_type = 'cst' if len(found) >= 2 else 'mtrl'
+            print(f"✅ 감지된 입찰 유형: {self.bid_type}")
+        n_features = len(BASE_FEATURES) + (len(CONSTRUCTION_FEATURES) if self.bid_type == 'cst' else 0)
+        self.features = feature_columns(n_features)
+        missing = [c for c in TARGET_NAMES if c not in columns]
+        if missing:
+            raise KeyError(f"학습 CSV에 예측 대상 컬럼이 없습니다: {', '.join(missing)}")
+        return columns
+
+    def fit_text(self, path, columns):
+        """1단계: 텍스트 컬럼 reservoir 표본으로 TF-IDF 단어사전 학습"""
+        text_columns = [c for c in TEXT_SCORE_COLUMNS if c in columns]
+        sample = {c: np.empty(self.vocab_rows, dtype=object) for c in text_columns}
+        seen = 0
+        with self._stage('vocab_sample') as stage:
+            for chunk in self._read(path, usecols=text_columns or [TARGET_NAMES[0]]):
+                n = len(chunk)
+                texts = {c: clean_text(chunk[c]).to_numpy(dtype=object) for c in text_columns}
+                fill = max(0, min(self.vocab_rows - seen, n))
+                for c in text_columns:
+                    sample[c][seen:seen + fill] = texts[c][:fill]
+                if fill < n:
+                    # Algorithm R: t번째 행을 vocab_rows / (t+1) 확률로 표본의 임의 위치와 교체
+                    slots = self.rng.integers(0, np.arange(seen + fill, seen + n) + 1)
+                    take = slots < self.vocab_rows
+                    for c in text_columns:
+                        sample[c][slots[take]] = texts[c][fill:][take]
+                seen += n
+            stage['rows'] = seen
+
+        size = min(seen, self.vocab_rows)
+        all_text = []
+        with self._stage('tokenize', rows=size * len(text_columns)):
+            for c in text_columns:
+                codes, uniques = pd.factorize(pd.Series(sample[c][:size]))
+                lines = np.asarray(self._tokenize(list(uniques)), dtype=object)
+                all_text.extend(lines[codes].tolist() if len(uniques) else [])
+        non_empty_text = [text for text in all_text if text.strip() != '']
+        with self._stage('vectorize', rows=len(non_empty_text)):
+            self.vectorizer.fit(non_empty_text or ['기본키워드'])
+        print(f"📚 단어사전 학습: 표본 {size:,}행 / 전체 {seen:,}행, 텍스트 {len(non_empty_text):,}건")
+
+    def build_cache(self, path, cache_dir):
+        """2단계: 청크마다 특성 계산, 검증 분리, 정규화 도구 partial_fit, 이진 파일로 저장"""
+        files = {name: open(os.path.join(cache_dir, f"{name}.f64"), 'wb')
+                 for name in ('train_x', 'train_y', 'valid_x', 'valid_y')}
+        try:
+            with self._stage('features') as stage:
+                for chunk in self._read(path):
+                    x = feature_values(chunk, self.features, self._score_text)
+                    y = chunk[TARGET_NAMES].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+                    keep = np.isfinite(y).all(axis=1) & np.isfinite(x).all(axis=1)
+                    self.counts['dropped'] += int((~keep).sum())
+                    x, y = x[keep], y[keep]
+
+                    valid = self.rng.random(len(x)) < self.validation_ratio
+                    if (~valid).any():
+                        self.x_scaler.partial_fit(x[~valid])
+                        self.y_scaler.partial_fit(y[~valid])
+                    for part, mask in (('train', ~valid), ('valid', valid)):
+                        x[mask].tofile(files[f'{part}_x'])
+                        y[mask].tofile(files[f'{part}_y'])
+                        self.counts[part] += int(mask.sum())
+                    print(f"  특성 계산: 학습 {self.counts['train']:,}건 / 검증 {self.counts['valid']:,}건")
+                stage['rows'] = self.counts['train'] + self.counts['valid']
+        finally:
+            for f in files.values():
+                f.close()
+
+        if self.counts['train'] == 0 or self.counts['valid'] == 0:
+            raise ValueError(f"학습/검증 행이 부족합니다: {self.counts}")
+
+        def open_cache(name, width):
+            return BlockFile(os.path.join(cache_dir, f"{name}.f64"), width)
+
+        return {
+            'train_x': open_cache('train_x', len(self.features)), 'train_y': open_cache('train_y', len(TARGET_NAMES)),
+            'valid_x': open_cache('valid_x', len(self.features)), 'valid_y': open_cache('valid_y', len(TARGET_NAMES)),
+        }
+
+    def _blocks(self, rows):
+        return [slice(start, min(start + self.chunk_rows, rows)) for start in range(0, rows, self.chunk_rows)]
+
+    def predict(self, models, x):
+        """(행 수, 3) 예측 (모델 3개 또는 다중 출력 모델)"""
+        if isinstance(models, list):
+            return np.column_stack([np.asarray(m.predict(x)).ravel() for m in models])
+        return models.predict(x)
+
+    def evaluate(self, models, cache):
+        """검증 스트림 대상별 R2 / RMSE (청크 단위 누적)"""
+        n = 0
+        total = np.zeros(len(TARGET_NAMES))
+        total_sq = np.zeros(len(TARGET_NAMES))
+        sse = np.zeros(len(TARGET_NAMES))
+        for block in self._blocks(len(cache['valid_x'])):
+            y = cache['valid_y'][block]
+            predicted = self.predict(models, self.x_scaler.transform(cache['valid_x'][block]))
+            n += len(y)
+            total += y.sum(axis=0)
+            total_sq += (y ** 2).sum(axis=0)
+            sse += ((y - predicted) ** 2).sum(axis=0)
+        sst = total_sq - total ** 2 / n
+        r2 = np.where(sst > 0, 1 - sse / np.where(sst > 0, sst, 1), 0.0)
+        return {name: {'R2': float(r2[i]), 'RMSE': float(np.sqrt(sse[i] / n))} for i, name in enumerate(TARGET_NAMES)}
+
+    def train(self, cache):
+        """3단계: 블록 순서를 섞어 가며 partial_fit, epoch마다 검증해 가장 좋은 모델 보관"""
+        models = self.model_factory()
+        multi = not isinstance(models, list)
+        if multi:
+            models.y_scaler = self.y_scaler  # 전체 학습 스트림으로 맞춘 대상별 정규화
+        units = [models] if multi else list(models)
+        for unit in units:
+            # partial_fit은 내부 early_stopping을 지원하지 않음 (검증은 epoch마다 검증 스트림으로)
+            (unit.network if multi else unit).set_params(early_stopping=False)
+        best = [None] * len(units)
+        best_score = [-np.inf] * len(units)
+        stale = [0] * len(units)
+        blocks = self._blocks(len(cache['train_x']))
+
+        for epoch in range(1, self.epochs + 1):
+            active = [i for i in range(len(units)) if stale[i] < self.patience]
+            if not active:
+                break
+            started = time.perf_counter()
+            with self._stage(f'epoch_{epoch}', rows=self.counts['train']):
+                for b in self.rng.permutation(len(blocks)):
+                    block = blocks[b]
+                    order = self.rng.permutation(block.stop - block.start)
+                    x = self.x_scaler.transform(cache['train_x'][block][order])
+                    y = cache['train_y'][block][order]
+                    for i in active:
+                        if multi:
+                            units[i].partial_fit(x, y)
+                        else:
+                            units[i].partial_fit(x, y[:, i])
+
+            metrics = self.evaluate(units[0] if multi else units, cache)
+            scores = [np.mean([m['R2'] for m in metrics.values()])] if multi else \
+                     [metrics[name]['R2'] for name in TARGET_NAMES]
+            for i in active:
+                if scores[i] > best_score[i]:
+                    best_score[i], best[i], stale[i] = scores[i], pickle.dumps(units[i]), 0
+                else:
+                    stale[i] += 1
+            elapsed = time.perf_counter() - started
+            self.history.append({'epoch': epoch, 'sec': round(elapsed, 3), 'active': len(active), 'metrics': metrics})
+            summary = ', '.join(f"{name} R2={m['R2']:.4f}" for name, m in metrics.items())
+            print(f"🔁 epoch {epoch}/{self.epochs} ({elapsed:.1f}초): {summary}")
+
+        units = [pickle.loads(b) if b is not None else u for b, u in zip(best, units)]
+        self.models = units[0] if multi else units
+        return self.models
+
+    def save(self):
+        """4단계: bid.ml.train.py와 같은 파일명으로 모델과 전처리 도구 저장"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        saved = []
+
+        def dump(obj, key):
+            path = os.path.join(self.output_dir, BUNDLE_FILES[key])
+            joblib.dump(obj, path)
+            saved.append(path)
+
+        if isinstance(self.models, list):
+            for i, model in enumerate(self.models):
+                dump(model, f'model{i + 1}')
+        else:
+            dump(self.models, 'multi')
+        dump(self.x_scaler, 'scaler')
+        user_values, voca = text_model_state(self.tokenizer, self.vectorizer)
+        dump(user_values, 'tokenizer')
+        dump(voca, 'vectorizer')
+
+        history_path = os.path.join(self.output_dir, f"stream_train_{datetime.now().strftime('%y%m%d%H%M')}.json")
+        with open(history_path, 'w', encoding='utf-8') as f:
+            json.dump({'bid_type': self.bid_type, 'features': self.features, 'counts': self.counts,
+                       'chunk_rows': self.chunk_rows, 'history': self.history}, f, ensure_ascii=False, indent=2)
+        saved.append(history_path)
+        for path in saved:
+            print(f"💾 저장: {path}")
+        return saved
+
+    def run(self, path):
+        """CSV 하나를 스트리밍 학습하고 저장. 마지막 epoch 검증 지표 반환"""
+        columns = self._detect_features(path)
+        self.fit_text(path, columns)
+
+        if self.work_dir:
+            os.makedirs(self.work_dir, exist_ok=True)
+        cache_dir = tempfile.mkdtemp(prefix='stream_train_', dir=self.work_dir)
+        try:
+            cache = self.build_cache(path, cache_dir)
+            print(f"📊 학습 {self.counts['train']:,}건 / 검증 {self.counts['valid']:,}건 "
+                  f"(제외 {self.counts['dropped']:,}건), 특성 {len(self.features)}개")
+            self.train(cache)
+            metrics = self.evaluate(self.models, cache)
+            del cache
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        self.save()
+        print("="*80)
+        for name, m in metrics.items():
+            print(f"{name:>12}: R2={m['R2']:.4f}, RMSE={m['RMSE']:.6f}")
+        return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="학습 CSV 스트리밍(out-of-core) 학습")
+    parser.add_argument('input', help="학습 CSV")
+    parser.add_argument('--bid-type', default='auto', help="입찰 유형 (cst, mtrl, gdns, auto)")
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--patience', type=int, default=3)
+    parser.add_argument('--validation', type=float, default=0.05, help="검증 스트림 비율")
+    parser.add_argument('--vocab-rows', type=int, default=200000, help="단어사전 학습 표본 행 수")
+    parser.add_argument('--token-cache', type=int, default=1000000, help="형태소 분석 결과 보관 문자열 수")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--multi-output', action='store_true', help="다중 출력 모델 1개로 학습")
+    parser.add_argument('--script', default=TRAIN_SCRIPTS['mlp'], help="모델 설정(setupModels)을 가져올 학습 스크립트")
+    parser.add_argument('--output', default='res', help="모델 저장 폴더")
+    parser.add_argument('--work-dir', default=None, help="특성 이진 파일 임시 폴더")
+    args = parser.parse_args()
+
+    train = load_script(args.script)
+    if args.multi_output:
+        factory = MultiTargetMLP
+    else:
+        def factory():
+            return setup_models(train)
+
+    trainer = StreamingMLPTrainer(train.KiwiTokenizer(None), train.KiwiVectorizer(), factory,
+                                  bid_type=args.bid_type, chunk_rows=args.chunk_rows, epochs=args.epochs,
+                                  patience=args.patience, validation_ratio=args.validation,
+                                  vocab_rows=args.vocab_rows, token_cache_size=args.token_cache,
+                                  seed=args.seed, output_dir=args.output,
+                                  work_dir=args.work_dir)
+    trainer.run(args.input)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 합성 입찰 데이터 생성 모듈
+
+저장소의 data/*.csv는 LFS 포인터이므로 성능 측정에 쓸 수 있는 실제 데이터가 없다.
+학습 CSV(sql/조달청.자료조회.sql 결과)와 같은 컬럼 구성과 비슷한 분포의 입찰 데이터를
+seed가 같으면 항상 같은 값으로 만들어 준다.
+
+- 기초금액: 로그정규 분포 (중앙값 약 3억, 1천만 ~ 1천억)
+- 낙찰하한률: 실제 사용하는 하한률 값 중 선택 (0.87745 등)
+- 예가/업체 사정률: 1.0 근처 정규 분포 → 예정금액, 낙찰금액, 투찰률 계산
+- 면허제한코드, 공고기관코드/기관명, 공사지역, 키워드: 한국어 어휘 조합
+- 공사입찰(cst) 전용: 간접비, 순공사원가, 주공종명, A계산여부, 순공사원가적용여부
+
+ex)
+data = generate_bid_data(100000, bid_type='cst', seed=42)
+write_bid_csv('res/benchmark/bid_100k.csv', 100000)
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+
+# 광역 지역과 기초 지역
+REGION_DISTRICTS = [
+    ('서울특별시', '강남구'), ('서울특별시', '서초구'), ('서울특별시', '송파구'), ('서울특별시', '마포구'),
+    ('부산광역시', '해운대구'), ('부산광역시', '사하구'), ('대구광역시', '수성구'), ('대구광역시', '달성군'),
+    ('인천광역시', '연수구'), ('인천광역시', '강화군'), ('광주광역시', '북구'), ('대전광역시', '유성구'),
+    ('울산광역시', '울주군'), ('세종특별자치시', '조치원읍'), ('경기도', '수원시'), ('경기도', '성남시'),
+    ('경기도', '고양시'), ('경기도', '용인시'), ('경기도', '화성시'), ('경기도', '평택시'), ('경기도', '가평군'),
+    ('강원특별자치도', '원주시'), ('강원특별자치도', '춘천시'), ('강원특별자치도', '홍천군'),
+    ('충청북도', '청주시'), ('충청북도', '괴산군'), ('충청남도', '천안시'), ('충청남도', '부여군'),
+    ('전북특별자치도', '전주시'), ('전북특별자치도', '고창군'), ('전라남도', '여수시'), ('전라남도', '순천시'),
+    ('전라남도', '해남군'), ('경상북도', '포항시'), ('경상북도', '구미시'), ('경상북도', '경주시'),
+    ('경상북도', '의성군'), ('경상남도', '창원시'), ('경상남도', '김해시'), ('경상남도', '거창군'),
+    ('제주특별자치도', '제주시'), ('제주특별자치도', '서귀포시'),
+]
+
+# 지방자치단체 소속 기관 (기초 지역명 뒤에 붙임)
+AGENCY_TYPES = ['교육지원청', '상수도사업소', '시설관리공단', '보건소', '농업기술센터', '도로관리사업소']
+
+# 공공기관 (뒤에 광역 지역명을 붙임)
+PUBLIC_AGENCIES = [
+    '한국토지주택공사', '한국도로공사', '한국수자원공사', '한국전력공사', '한국농어촌공사',
+    '국가철도공단', '조달청', '국방시설본부', '한국환경공단', '인천국제공항공사',
+]
+
+# 면허(업종)명과 코드
+LICENSES = [
+    ('토목공사업', '0001'), ('건축공사업', '0002'), ('토목건축공사업', '0003'), ('조경공사업', '0004'),
+    ('전기공사업', '0036'), ('정보통신공사업', '0037'), ('소방시설공사업', '0040'),
+    ('실내건축공사업', '4990'), ('철근콘크리트공사업', '4991'), ('상하수도설비공사업', '4993'),
+    ('포장공사업', '4994'), ('기계설비공사업', '4996'), ('지반조성공사업', '4998'),
+]
+
+# 공사명 구성 어휘
+WORKS = [
+    '도로', '교량', '하천', '배수로', '상수도관', '하수관로', '청사', '체육관', '도서관', '어린이집',
+    '경로당', '주차장', '공원', '산책로', '옹벽', '급경사지', '농로', '저수지', '학교', '보건지소',
+]
+ACTIONS = [
+    '신축공사', '증축공사', '보수공사', '정비공사', '확장공사', '개량공사', '포장공사', '정비사업',
+    '환경개선공사', '내진보강공사', '리모델링공사', '정비 및 보수공사', '재해예방사업', '유지보수공사',
+]
+CONTRACT_METHODS = ['일반경쟁', '제한경쟁', '지명경쟁', '수의계약']
+
+# 주공종명 (공사입찰)
+MAIN_WORK_TYPES = ['토목', '건축', '조경', '전기', '통신', '소방', '기계설비', '포장', '상하수도', '실내건축']
+
+# 낙찰하한률 (적격심사 기준 금액 구간별 하한률)
+LOWER_RATES = np.array([0.87745, 0.86745, 0.85495, 0.84245, 0.80495, 0.89745])
+LOWER_RATE_WEIGHTS = np.array([0.45, 0.25, 0.12, 0.08, 0.05, 0.05])
+
+# 학습 CSV 컬럼 순서 (공사입찰 전용 컬럼은 bid_type='cst'일 때만 포함)
+BASE_COLUMNS = [
+    '입찰번호', '입찰차수', '기초금액', '낙찰하한률', '참여업체수', '낙찰금액',
+    '업체투찰률', '예가투찰률', '투찰률오차', '예정금액', '낙찰하한가',
+    'A계산여부', '순공사원가적용여부', '면허제한코드', '공고기관코드',
+    '공고기관명', '공고기관점수', '공사지역', '공사지역점수', '키워드', '키워드점수',
+]
+CONSTRUCTION_COLUMNS = ['간접비', '순공사원가', '주공종명']
+
+
+def _pick(rng, words, size):
+    """어휘 목록에서 size개를 뽑아 object 배열로 반환"""
+    return np.asarray(words, dtype=object)[rng.integers(0, len(words), size)]
+
+
+def generate_bid_data(rows, bid_type='cst', seed=42):
+    """
+    합성 입찰 데이터 생성
+
+    Args:
+        rows (int): 행 수
+        bid_type (str): 'cst'면 공사입찰 전용 컬럼 포함, 그 외(mtrl, gdns)는 기본 컬럼만
+        seed (int): 난수 seed (같으면 같은 데이터)
+
+    Returns:
+        pd.DataFrame: 학습 CSV와 같은 컬럼 구성의 데이터프레임
+    """
+    rng = np.random.default_rng(seed)
+    n = int(rows)
+
+    # ===== 금액/비율 =====
+    base_amount = np.clip(np.round(rng.lognormal(mean=np.log(3e8), sigma=1.2, size=n), -3), 1e7, 1e11)
+    lower_rate = rng.choice(LOWER_RATES, size=n, p=LOWER_RATE_WEIGHTS)
+    plan_ratio = rng.normal(1.0, 0.0075, n)                      # 예가사정률
+    company_ratio = plan_ratio + np.abs(rng.normal(0, 0.004, n))  # 업체사정률 (예정가 이상에서 낙찰)
+    planned_amount = np.round(base_amount * plan_ratio)
+    lower_price = np.round(planned_amount * lower_rate)
+    company_rate = company_ratio * lower_rate                     # 업체투찰률 (기초금액 대비)
+    plan_rate = plan_ratio * lower_rate                           # 예가투찰률 (기초금액 대비)
+    winning_amount = np.round(base_amount * company_rate)
+
+    # 참여업체수: 금액이 작을수록 많이 참여
+    company_count = np.clip(np.round(rng.lognormal(np.log(120) - 0.15 * np.log(base_amount / 3e8), 0.9, n)), 1, 5000)
+
+    # ===== 코드/텍스트 =====
+    license_idx = rng.integers(0, len(LICENSES), n)
+    license_names = np.asarray([name for name, _ in LICENSES], dtype=object)[license_idx]
+    license_codes = np.asarray([code for _, code in LICENSES], dtype=object)[license_idx]
+    second_license = rng.random(n) < 0.2
+    license_codes = np.where(second_license, license_codes + ',' + _pick(rng, [c for _, c in LICENSES], n), license_codes)
+
+    pair_idx = rng.integers(0, len(REGION_DISTRICTS), n)
+    region = np.asarray([r for r, _ in REGION_DISTRICTS], dtype=object)[pair_idx]
+    district = np.asarray([d for _, d in REGION_DISTRICTS], dtype=object)[pair_idx]
+    agency_kind = rng.random(n)
+    agency = np.where(agency_kind < 0.25,
+                      _pick(rng, PUBLIC_AGENCIES, n) + ' ' + region,
+                      np.where(agency_kind < 0.75,
+                               region + ' ' + district + '청',
+                               region + ' ' + district + ' ' + _pick(rng, AGENCY_TYPES, n)))
+    agency_code = np.char.zfill(rng.integers(1, 9999999, n).astype(str), 7).astype(object)
+    area = np.where(rng.random(n) < 0.6, region + ' ' + district, region)
+
+    work_name = district + ' ' + _pick(rng, WORKS, n) + ' ' + _pick(rng, ACTIONS, n)
+    keyword = license_names + ' ' + work_name + ' ' + agency + ' ' + _pick(rng, CONTRACT_METHODS, n)
+
+    # 입찰번호: 공고 연월 + 일련번호 (날짜 특성 추출과 같은 형식)
+    year = rng.integers(2019, 2026, n)
+    month = rng.integers(1, 13, n)
+    bid_no = (np.char.mod('%04d', year).astype(object) + np.char.mod('%02d', month).astype(object)
+              + np.char.mod('%05d', np.arange(n) % 100000).astype(object)
+              + '-' + np.char.mod('%02d', rng.integers(0, 3, n)).astype(object))
+
+    data = pd.DataFrame({
+        '입찰번호': bid_no,
+        '입찰차수': rng.integers(0, 3, n),
+        '기초금액': base_amount,
+        '낙찰하한률': lower_rate,
+        '참여업체수': company_count,
+        '낙찰금액': winning_amount.astype(np.int64),
+        '업체투찰률': company_rate,
+        '예가투찰률': plan_rate,
+        '투찰률오차': company_rate - plan_rate,
+        '예정금액': planned_amount.astype(np.int64),
+        '낙찰하한가': lower_price.astype(np.int64),
+        'A계산여부': (rng.random(n) < 0.3).astype(np.int64),
+        '순공사원가적용여부': (rng.random(n) < 0.4).astype(np.int64),
+        '면허제한코드': license_codes,
+        '공고기관코드': agency_code,
+        '공고기관명': agency,
+        '공고기관점수': 0.0,
+        '공사지역': area,
+        '공사지역점수': 0.0,
+        '키워드': keyword,
+        '키워드점수': 0.0,
+    })
+
+    if bid_type == 'cst':
+        data['간접비'] = np.round(base_amount * rng.uniform(0.02, 0.08, n)).astype(np.int64)
+        data['순공사원가'] = np.where(data['순공사원가적용여부'] == 1,
+                                np.round(base_amount * rng.uniform(0.7, 0.9, n)), 0).astype(np.int64)
+        data['주공종명'] = _pick(rng, MAIN_WORK_TYPES, n)
+        return data[BASE_COLUMNS + CONSTRUCTION_COLUMNS]
+
+    return data[BASE_COLUMNS]
+
+
+def write_bid_csv(path, rows, bid_type='cst', seed=42):
+    """합성 입찰 데이터를 CSV로 저장하고 경로 반환 (학습 스크립트의 data 폴더 CSV와 같은 형식)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    generate_bid_data(rows, bid_type, seed).to_csv(path, index=False, encoding='utf-8-sig')
+    return path
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+BacktestEngine 전략별/기간별/기관별 합계가 입찰을 하나씩 판정한 결과와 같은지 확인하는 테스트
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backtest_engine import BacktestEngine, bid_dates, evaluate_shard, parse_offsets, strategy_grid
+
+
+DIFF_RT = 0.003
+OFFSETS = np.linspace(-1.0, 1.0, 5)
+
+
+def make_bids(rows=300, seed=1):
+    """예측 컬럼이 붙은 과거 입찰 (3개월, 공고기관 4곳)"""
+    rng = np.random.default_rng(seed)
+    bssamt = rng.integers(50, 500, rows) * 1000000.0
+    floor = np.round(bssamt * rng.uniform(0.865, 0.885, rows))
+    winning = np.round(floor + bssamt * rng.uniform(0.0, 0.01, rows))
+    frame = pd.DataFrame({
+        '개찰일시': pd.to_datetime('2025-01-01') + pd.to_timedelta(rng.integers(0, 90, rows), unit='D'),
+        '공고기관명': rng.choice(['조달청', '서울시', '부산시', '국방부'], rows),
+        '기초금액': bssamt,
+        '낙찰하한가': floor,
+        '낙찰금액': winning,
+        '업체투찰률예측': rng.uniform(0.87, 0.885, rows),
+        '예가투찰률예측': rng.uniform(0.87, 0.885, rows),
+    })
+    frame.loc[5, '낙찰금액'] = np.nan    # 유찰 (입찰수에서 제외)
+    return frame
+
+
+def judge(frame, base, offset):
+    """입찰 하나씩 투찰금액을 정해 (입찰수, 낙찰수, 하한미달수, 낙찰금액합계) 계산"""
+    counts = np.zeros(4)
+    for row in frame.itertuples(index=False):
+        rate = getattr(row, '업체투찰률예측' if base == 'com' else '예가투찰률예측') + offset * DIFF_RT
+        bid = round(row.기초금액 * rate)
+        if np.isnan(row.낙찰금액):
+            continue
+        win = row.낙찰하한가 <= bid < row.낙찰금액
+        counts += [1, win, bid < row.낙찰하한가, bid if win else 0]
+    return counts
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return make_bids()
+
+
+@pytest.fixture(scope='module')
+def tables(frame):
+    return BacktestEngine(offsets=OFFSETS, diffrt=DIFF_RT, workers=1).run(frame)
+
+
+def test_summary_matches_bid_by_bid(frame, tables):
+    summary = tables['summary'].set_index('전략')
+    assert len(summary) == 2 * len(OFFSETS)
+    for base in ('com', 'plan'):
+        for offset in OFFSETS:
+            row = summary.loc[f"{base}{offset:+.3f}"]
+            expected = judge(frame, base, offset)
+            assert [row['입찰수'], row['낙찰수'], row['하한미달수'], row['낙찰금액합계']] == list(expected)
+            assert row['낙찰률'] == pytest.approx(expected[1] / expected[0])
+
+
+def test_periods_and_agencies_add_up_to_summary(tables):
+    summary = tables['summary'].set_index('전략')
+    periods = tables['periods']
+    agencies = tables['agencies']
+    assert sorted(periods['기간'].unique()) == ['2025-01', '2025-02', '2025-03']
+    assert set(agencies['공고기관명']) == {'조달청', '서울시', '부산시', '국방부'}
+    for name in ['입찰수', '낙찰수', '하한미달수', '낙찰금액합계']:
+        assert periods.groupby('전략')[name].sum().to_dict() == pytest.approx(summary[name].to_dict())
+        assert agencies.groupby('전략')[name].sum().to_dict() == pytest.approx(summary[name].to_dict())
+
+    # 마지막 기간의 누적 낙찰률 = 전체 낙찰률
+    last = periods[periods['기간'] == '2025-03'].set_index('전략')
+    assert last['누적낙찰률'].to_dict() == pytest.approx(summary['낙찰률'].to_dict())
+
+
+def test_process_pool_matches_single_process(frame, tables):
+    pooled = BacktestEngine(offsets=OFFSETS, diffrt=DIFF_RT, workers=2).run(frame)
+    for name in tables:
+        pd.testing.assert_frame_equal(pooled[name], tables[name])
+
+
+def test_evaluate_shard_judgement():
+    # 입찰 3건 × 전략 1개: 하한미달, 낙찰, 낙찰금액 이상(낙찰 실패)
+    result = evaluate_shard({
+        'period': '2025-01',
+        'bssamt': np.array([100.0, 100.0, 100.0]),
+        'floor': np.array([90.0, 85.0, 80.0]),
+        'winning': np.array([95.0, 95.0, 87.0]),
+        'base_rates': np.array([[0.88, 0.88, 0.88]]),
+        'agency': np.array([0, 1, 1]),
+        'base_index': np.array([0]),
+        'rate_offset': np.array([0.0]),
+    })
+    totals = {name: float(values[0]) for name, values in result['totals'].items()}
+    assert totals == {'입찰수': 3, '낙찰수': 1, '하한미달수': 1, '여유율합계': pytest.approx(0.03),
+                      '낙찰금액합계': 88}
+    assert list(result['agency_codes']) == [0, 1]
+    assert list(result['agencies']['낙찰수'][0]) == [0, 1]
+
+
+def test_bid_dates_from_bid_number():
+    frame = pd.DataFrame({'입찰번호': ['20250112345', '20250298765', 'X']})
+    dates = bid_dates(frame)
+    assert list(dates[:2]) == [pd.Timestamp('2025-01-01'), pd.Timestamp('2025-02-01')]
+    assert pd.isna(dates[2])
+
+
+def test_strategy_options():
+    assert list(parse_offsets('-1:1:5')) == [-1.0, -0.5, 0.0, 0.5, 1.0]
+    assert list(parse_offsets('-1,0,1')) == [-1.0, 0.0, 1.0]
+    grid = strategy_grid(['com'], [-1.0, 1.0], 0.01)
+    assert list(grid['전략']) == ['com-1.000', 'com+1.000']
+    assert list(grid['투찰률오프셋']) == [-0.01, 0.01]
+    with pytest.raises(ValueError):
+        strategy_grid(['avg'], [0.0], 0.01)
+
+
+def test_missing_prediction_columns(frame):
+    engine = BacktestEngine(offsets=OFFSETS, diffrt=DIFF_RT, workers=1)
+    with pytest.raises(KeyError):
+        engine.run(frame.drop(columns=['예가투찰률예측']))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
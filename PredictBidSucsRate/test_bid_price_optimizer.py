@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+BidPriceOptimizer 낙찰 확률/최적 금액이 추첨 표본으로 직접 계산한 값과 맞는지 확인하는 테스트
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+from scipy.special import ndtr
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from reserve_price_simulator import ReservePriceSimulator
+from bid_price_optimizer import BidPriceOptimizer
+
+
+# 기초금액, 낙찰하한률, 업체투찰률예측, 예가투찰률예측, 참여업체수예측, 차이 비율
+BIDS = [
+    (300000000, 0.87745, 0.8812, 0.8770, 12, 0.003),
+    (150000000, 0.87745, 0.8790, np.nan, 40, 0.004),
+    (80000000, 0.86745, 0.8700, 0.8680, 3, 0.002),
+]
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    return ReservePriceSimulator(draws=20000, seed=7)
+
+
+@pytest.fixture(scope='module')
+def optimizer(simulator):
+    return BidPriceOptimizer(simulator, grid=200, nodes=64)
+
+
+def sample_win_probability(simulator, price, bssamt, lowerrt, comlowrt, planlowrt, company_count, diffrt):
+    """P(낙찰) = 평균_f [ 1(f <= p) × (1 - F(p) + F(f))^k ] 를 낙찰하한가 표본 전체로 계산"""
+    center = planlowrt / lowerrt if np.isfinite(planlowrt) else 1.0
+    floors = lowerrt * bssamt * (center + simulator.prelim_range * simulator.reserve_z)
+
+    def cdf(x):
+        return ndtr((x / bssamt - comlowrt) / diffrt)
+
+    return np.mean((floors <= price) * (1 - cdf(price) + cdf(floors)) ** (company_count - 1))
+
+
+@pytest.mark.parametrize('bid', BIDS)
+def test_grid_probability_matches_samples(simulator, optimizer, bid):
+    r = optimizer.optimize_arrays(*bid, curve=True)
+    prices = r['grid_prices'][0]
+    win = r['grid_win_probability'][0]
+    for i in range(0, optimizer.grid, 10):
+        # 낙찰하한가 분포를 nodes개 대표값으로 줄인 근사 오차
+        assert win[i] == pytest.approx(sample_win_probability(simulator, prices[i], *bid), abs=0.005)
+
+
+@pytest.mark.parametrize('bid', BIDS)
+def test_best_price_is_grid_maximum(optimizer, bid):
+    r = optimizer.optimize_arrays(*bid, curve=True)
+    assert np.ceil(r['floor_min'][0]) <= r['best_price'][0] <= bid[0]
+    assert 0.0 < r['win_probability'][0] <= 1.0
+    # refine은 1차 grid 최대값보다 나빠지지 않음
+    assert r['expected_value'][0] >= np.max(r['grid_expected_value'][0])
+    assert r['expected_value'][0] == pytest.approx(r['win_probability'][0] * r['best_price'][0])
+
+
+def test_no_rivals_bids_base_amount(optimizer):
+    # 경쟁 업체가 없고 낙찰하한가 최대값이 기초금액보다 낮으면 기초금액이 확실한 최대 기대값
+    r = optimizer.optimize(300000000, 0.87745, 0.8812, 0.8770, company_count=1, diffrt=0.003)
+    assert r['optimalAmount'] == 300000000
+    assert r['winProbability'] == pytest.approx(1.0)
+
+
+def test_batch_matches_single(optimizer):
+    columns = [list(values) for values in zip(*BIDS)]
+    df = optimizer.optimize_batch(*columns)
+
+    for i, bid in enumerate(BIDS):
+        r = optimizer.optimize(*bid)
+        assert df['최적투찰금액'].iloc[i] == r['optimalAmount']
+        assert df['최적낙찰확률'].iloc[i] == r['winProbability']
+
+
+def test_curve_points(optimizer):
+    r = optimizer.optimize(*BIDS[0], curve_points=11)
+    assert len(r['curve']) == 11
+    prices = [point['price'] for point in r['curve']]
+    assert prices == sorted(prices)
+    assert max(point['expectedValue'] for point in r['curve']) <= r['expectedValue'] + 1
+
+
+def test_invalid_bid_has_no_result(optimizer):
+    r = optimizer.optimize(300000000, np.nan, 0.8812)
+    assert r['optimalAmount'] is None
+    assert r['winProbability'] is None
+
+    # 배치 안의 잘못된 입찰만 NaN
+    r = optimizer.optimize_arrays([300000000, 0], 0.87745, 0.8812, company_count=12, diffrt=0.003)
+    assert np.isfinite(r['best_price'][0])
+    assert np.isnan(r['best_price'][1])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
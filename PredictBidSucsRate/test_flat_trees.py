@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+flat_trees 평탄화 트리 예측이 sklearn predict와 같은 값인지 확인하는 테스트
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flat_trees import FlatTreeModel, export_flat, export_if_supported, flat_path, is_supported, load_flat
+
+
+def make_data(rows=400, features=7, nan_ratio=0.0, seed=1):
+    """정규화된 학습 입력과 비슷한 무작위 데이터 (nan_ratio만큼 NaN)"""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(rows, features))
+    y = x[:, 0] * 2 + np.sin(x[:, 1]) + rng.normal(scale=0.1, size=rows)
+    if nan_ratio:
+        x[rng.random(x.shape) < nan_ratio] = np.nan
+    return x, y
+
+
+MODELS = {
+    'rf': lambda: RandomForestRegressor(n_estimators=20, max_depth=8, random_state=1),
+    'gb': lambda: GradientBoostingRegressor(n_estimators=30, max_depth=3, learning_rate=0.1, random_state=1),
+    'hgb': lambda: HistGradientBoostingRegressor(max_iter=30, random_state=1),
+}
+
+
+def export_and_load(model, tmp_path):
+    path = export_flat(model, str(tmp_path / 'model.flat'))
+    return FlatTreeModel.load(path)
+
+
+@pytest.mark.parametrize('name', sorted(MODELS))
+def test_flat_prediction_matches_sklearn(name, tmp_path):
+    x, y = make_data()
+    model = MODELS[name]().fit(x, y)
+    flat = export_and_load(model, tmp_path)
+
+    x_new, _ = make_data(rows=300, seed=2)
+    assert np.array_equal(flat.predict(x_new), model.predict(x_new))
+    # 1행 (2차원 1행과 1차원 입력)
+    assert np.array_equal(flat.predict(x_new[:1]), model.predict(x_new[:1]))
+    assert np.array_equal(flat.predict(x_new[0]), model.predict(x_new[:1]))
+
+
+@pytest.mark.parametrize('name', sorted(MODELS))
+def test_flat_prediction_matches_sklearn_with_nan(name, tmp_path):
+    x, y = make_data(nan_ratio=0.1)
+    model = MODELS[name]()
+    try:
+        model.fit(x, y)
+    except ValueError:
+        pytest.skip(f"이 sklearn 버전의 {type(model).__name__}는 NaN 입력을 지원하지 않습니다.")
+    flat = export_and_load(model, tmp_path)
+
+    x_new, _ = make_data(rows=300, nan_ratio=0.2, seed=3)
+    assert np.array_equal(flat.predict(x_new), model.predict(x_new))
+    nan_row = np.full((1, x.shape[1]), np.nan)
+    assert np.array_equal(flat.predict(nan_row), model.predict(nan_row))
+
+
+def test_unsupported_model_is_not_exported(tmp_path):
+    from sklearn.linear_model import LinearRegression
+
+    x, y = make_data()
+    model = LinearRegression().fit(x, y)
+    assert not is_supported(model)
+    assert export_if_supported(model, str(tmp_path / 'linear.npz')) is None
+    assert not os.path.exists(flat_path(str(tmp_path / 'linear.npz')))
+
+
+def test_load_flat_ignores_stale_file(tmp_path):
+    x, y = make_data()
+    model_path = str(tmp_path / 'rf.model1.v0.1.1.npz')
+    open(model_path, 'wb').close()
+    export_flat(MODELS['rf']().fit(x, y), flat_path(model_path))
+    assert isinstance(load_flat(model_path), FlatTreeModel)
+
+    # 모델 파일이 더 새것이면 (다시 학습했는데 평탄화 파일을 안 만든 경우) 사용하지 않음
+    stamp = os.path.getmtime(flat_path(model_path)) + 10
+    os.utime(model_path, (stamp, stamp))
+    assert load_flat(model_path) is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+PredictionResultManager (SQLite ml_c.db) 저장/요약/보관 기간 정리 테스트
+"""
+
+import os
+import csv
+import sys
+import gzip
+from datetime import datetime, timedelta
+
+import pytest
+import pandas as pd
+
+# 데이터베이스 관련 import
+DAC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac')
+sys.path.append(DAC_DIR)
+from DatabaseManager import ConnectionAttribute
+from PredictionResultManager import PredictionResultManager
+from PredictionResultExporter import PredictionResultExporter
+from PredictionRetentionJob import PredictionRetentionJob
+from PredictionSummary import SUMMARY_TABLE, SUMMARY_VALUE_COLUMNS, aggregate_summary
+
+
+def make_results(bid_numbers, rate, count):
+    """입찰번호 목록으로 예측 결과 데이터프레임 생성"""
+    return pd.DataFrame({
+        '입찰번호': bid_numbers,
+        '입찰차수': ['0'] * len(bid_numbers),
+        '기초금액': [1000000.0] * len(bid_numbers),
+        '예측_URL': [''] * len(bid_numbers),
+        '업체투찰률_예측': [rate] * len(bid_numbers),
+        '예가투찰률_예측': [rate + 0.5] * len(bid_numbers),
+        '참여업체수_예측': [count] * len(bid_numbers),
+    })
+
+
+def open_manager(tmp_path):
+    """tmp_path에 빈 ml_c.db를 만들고 전용 연결 매니저로 연결"""
+    db_dir = str(tmp_path / 'db')
+    os.makedirs(db_dir, exist_ok=True)
+    # ConnectionAttribute는 경로를 '\\'로 이어 붙이고 파일이 있어야 연결함 (benchmark_sqlite_profile.py 참고)
+    open(ConnectionAttribute.build('ml_c', 'ml_c.db', db_dir, '').getConnectionString(), 'a').close()
+    return PredictionResultManager(db_dir=db_dir)
+
+
+def select_frame(manager, query):
+    cursor = manager.connection.getConnection().execute(query)
+    return pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+
+def assert_summary_consistent(manager):
+    """ML_C_SUMMARY의 건수/합계가 ML_C를 처음부터 다시 집계한 값과 같은지 확인"""
+    expected = aggregate_summary(select_frame(manager, "SELECT * FROM ML_C"))
+    summary = select_frame(manager, f"SELECT * FROM {SUMMARY_TABLE}")
+    actual = {(row['모델버전'], str(row['예측일자'])[:10]): [row[c] for c in SUMMARY_VALUE_COLUMNS]
+              for _, row in summary.iterrows()}
+
+    assert set(actual) == set(expected)
+    for key, values in expected.items():
+        assert actual[key] == pytest.approx(values[:-2])
+
+    # 최초/최근 예측일시도 남아 있는 행 기준이어야 함
+    bounds = {(row['모델버전'], str(row['예측일자'])[:10]): [pd.Timestamp(row['최초예측일시']),
+                                                          pd.Timestamp(row['최근예측일시'])]
+              for _, row in summary.iterrows()}
+    for key, values in expected.items():
+        assert bounds[key] == [pd.Timestamp(values[-2]), pd.Timestamp(values[-1])]
+
+
+def test_bulk_save_modes_keep_summary_consistent(tmp_path):
+    manager = open_manager(tmp_path)
+
+    assert manager.save_prediction_results(make_results(['A1', 'A2', 'A3'], 80.0, 10), model_version='v1',
+                                           batch_size=2) == 3
+    assert_summary_consistent(manager)
+
+    # REPLACE: 두 건 교체 + 한 건 신규 (교체된 행은 v1에서 빠지고 v2에 더해짐)
+    assert manager.save_prediction_with_options(make_results(['A2', 'A3', 'A4'], 85.0, 12), model_version='v2',
+                                                insert_mode='REPLACE') == 3
+    assert_summary_consistent(manager)
+    assert {row[0]: row[1] for row in manager.get_prediction_summary_by_model()} == {'v1': 1, 'v2': 3}
+
+    # IGNORE/INSERT: 기존 키는 그대로 두고 새 키만 저장
+    assert manager.save_prediction_with_options(make_results(['A4', 'A5'], 90.0, 20), model_version='v3',
+                                                insert_mode='IGNORE') == 1
+    assert manager.save_prediction_with_options(make_results(['A5', 'A6'], 90.0, 20), model_version='v3',
+                                                insert_mode='INSERT') == 1
+    assert_summary_consistent(manager)
+    assert manager.get_prediction_count() == 6
+
+
+def test_replace_narrows_summary_bounds_of_old_bucket(tmp_path):
+    manager = open_manager(tmp_path)
+    manager.save_prediction_results(make_results(['N1'], 80.0, 10), model_version='v1')
+    manager.save_prediction_results(make_results(['N2'], 80.0, 10), model_version='v1')
+
+    # v1의 가장 최근 행을 v2로 옮기면 v1의 최근예측일시는 N1의 예측일시로 줄어야 함
+    manager.save_prediction_with_options(make_results(['N2'], 85.0, 12), model_version='v2', insert_mode='REPLACE')
+    assert_summary_consistent(manager)
+
+
+def test_delete_batch_discards_stray_transaction(tmp_path):
+    manager = open_manager(tmp_path)
+    manager.save_prediction_results(make_results(['S1'], 80.0, 10), model_version='v1')
+
+    # 실패한 작업이 커밋하지 않고 남긴 쓰기
+    manager.connection.getConnection().execute("DELETE FROM ML_C")
+    manager.delete_prediction_batch(datetime.now() - timedelta(days=1))
+
+    assert manager.get_prediction_count() == 1
+    assert_summary_consistent(manager)
+
+
+def test_delete_batch_keeps_summary_consistent(tmp_path):
+    manager = open_manager(tmp_path)
+    manager.save_prediction_results(make_results(['D1', 'D2', 'D3', 'D4', 'D5'], 80.0, 10), model_version='v1')
+
+    result = manager.delete_prediction_batch(datetime.now() + timedelta(days=1), batch_size=2)
+    assert result['deleted'] == 2
+    assert manager.get_prediction_count() == 3
+    assert_summary_consistent(manager)
+
+
+def test_retention_job_archives_deleted_rows(tmp_path):
+    manager = open_manager(tmp_path)
+    manager.save_prediction_results(make_results(['R1', 'R2', 'R3', 'R4', 'R5'], 80.0, 10), model_version='v1')
+
+    job = PredictionRetentionJob(lambda: manager, days=-1, batch_size=2,
+                                 archive_dir=str(tmp_path / 'archive'), pause_sec=0)
+    report = job.run()
+
+    assert (report['deleted'], report['batches']) == (5, 3)
+    assert report['lock_wait_sec'] is not None
+    with gzip.open(report['archive'], 'rt', encoding='utf-8-sig', newline='') as f:
+        archived = list(csv.reader(f))
+    assert sorted(row[0] for row in archived[1:]) == ['R1', 'R2', 'R3', 'R4', 'R5']
+
+    # 작업이 끝나면 매니저의 전용 연결을 닫음
+    assert manager.connection is None
+
+
+def test_retention_job_keeps_rows_when_archive_fails(tmp_path, monkeypatch):
+    class FailingWriter:
+        def __init__(self, path, columns):
+            pass
+
+        def write(self, rows):
+            raise OSError("디스크 가득 참")
+
+        def close(self):
+            pass
+
+    monkeypatch.setitem(PredictionResultExporter.WRITERS, 'csv', FailingWriter)
+    manager = open_manager(tmp_path)
+    manager.save_prediction_results(make_results(['F1', 'F2', 'F3'], 80.0, 10), model_version='v1')
+
+    job = PredictionRetentionJob(lambda: manager, days=-1, batch_size=2,
+                                 archive_dir=str(tmp_path / 'archive'), pause_sec=0)
+    with pytest.raises(OSError):
+        job.run()
+
+    # 아카이브에 쓰지 못한 배치는 삭제되지 않아야 함
+    manager = open_manager(tmp_path)
+    assert manager.get_prediction_count() == 3
+    assert_summary_consistent(manager)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+ReservePriceSimulator 낙찰 확률이 추첨 표본을 직접 센 값과 같은지 확인하는 테스트
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from reserve_price_simulator import ReservePriceSimulator
+
+
+DRAWS = 20000
+
+# 기초금액, 낙찰하한률, 업체투찰률예측, 예가투찰률예측, 차이 비율, 투찰금액, A값
+BIDS = [
+    (300000000, 0.87745, 0.8812, 0.8770, 0.003, None, 0.0),
+    (150000000, 0.87745, 0.8790, np.nan, 0.004, 132000000, 5000000),
+    (80000000, 0.86745, 0.8700, 0.8680, 0.002, 69600000, 0.0),
+]
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    return ReservePriceSimulator(draws=DRAWS, seed=7)
+
+
+def count_samples(simulator, bssamt, lowerrt, comlowrt, planlowrt, diffrt, bid_amount, a_amount):
+    """표본으로 낙찰하한가/경쟁 투찰금액을 만들어 직접 센 (투찰금액, 하한통과확률, 경쟁우위확률)"""
+    center = planlowrt / lowerrt if np.isfinite(planlowrt) and planlowrt > 0 else 1.0
+    bid = round(bssamt * comlowrt) if bid_amount is None else bid_amount
+    floor = lowerrt * bssamt * (center + simulator.prelim_range * simulator.reserve_z) + a_amount * (1 - lowerrt)
+    competitor = bssamt * (comlowrt + diffrt * simulator.competitor_e)
+    return bid, np.mean(floor <= bid), np.mean(competitor > bid)
+
+
+@pytest.mark.parametrize('bid', BIDS)
+def test_probability_matches_sample_count(simulator, bid):
+    bid_amount, pass_prob, beat_prob = count_samples(simulator, *bid)
+    r = simulator.simulate(*bid)
+
+    assert r['bidAmount'] == bid_amount
+    # 경계값 비교의 반올림 차이로 표본 1~2개까지는 달라질 수 있음
+    assert r['floorPassProbability'] == pytest.approx(pass_prob, abs=2 / DRAWS)
+    assert r['beatCompetitorProbability'] == pytest.approx(beat_prob, abs=2 / DRAWS)
+    assert r['winProbability'] == pytest.approx(r['floorPassProbability'] * r['beatCompetitorProbability'])
+
+
+def test_batch_matches_single(simulator):
+    columns = [list(values) for values in zip(*BIDS)]
+    columns[5] = [np.nan if v is None else v for v in columns[5]]
+    df = simulator.simulate_batch(*columns)
+
+    for i, bid in enumerate(BIDS):
+        r = simulator.simulate(*bid)
+        assert df['낙찰확률'].iloc[i] == r['winProbability']
+        assert df['투찰금액'].iloc[i] == r['bidAmount']
+        assert round(df['낙찰하한가_p50'].iloc[i]) == r['lowerLimitPriceQuantiles']['p50']
+
+
+def test_quantiles_are_ordered(simulator):
+    r = simulator.simulate(*BIDS[0])
+    for name in ['reservePriceQuantiles', 'lowerLimitPriceQuantiles', 'competitorPriceQuantiles']:
+        values = list(r[name].values())
+        assert values == sorted(values)
+
+
+def test_invalid_bid_has_no_probability(simulator):
+    assert simulator.simulate(300000000, np.nan, 0.8812)['winProbability'] is None
+    assert simulator.simulate(0, 0.87745, 0.8812)['winProbability'] is None
+
+    # 배치 안의 잘못된 입찰만 NaN
+    r = simulator.simulate_arrays([300000000, 300000000], [0.87745, np.nan], [0.8812, 0.8812])
+    assert np.isfinite(r['win_probability'][0])
+    assert np.isnan(r['win_probability'][1])
+
+
+@pytest.mark.parametrize('stratified', [False, True])
+def test_same_seed_gives_same_draws(stratified):
+    a = ReservePriceSimulator(draws=5000, seed=3, stratified=stratified)
+    b = ReservePriceSimulator(draws=5000, seed=3, stratified=stratified)
+    assert np.array_equal(a.reserve_z, b.reserve_z)
+    assert np.array_equal(a.competitor_e, b.competitor_e)
+    # 추첨 위치 평균은 예비가격 범위 [-1, 1] 안
+    assert a.reserve_z[0] >= -1.0 and a.reserve_z[-1] <= 1.0
+
+
+def test_pick_count_must_not_exceed_prelim_count():
+    with pytest.raises(ValueError):
+        ReservePriceSimulator(draws=100, prelim_count=3, pick_count=4)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
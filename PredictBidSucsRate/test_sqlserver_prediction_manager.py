@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+SqlServerPredictionManager 저장/요약 테스트 (SqliteStandInConnection 사용, SQL Server/ODBC 드라이버 불필요)
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+import pandas as pd
+
+# 데이터베이스 관련 import
+DAC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dac')
+sys.path.append(DAC_DIR)
+from SqliteStandInConnection import SqliteStandInConnection
+from SqlServerPredictionManager import SqlServerPredictionManager
+from PredictionSummary import SUMMARY_TABLE, SUMMARY_VALUE_COLUMNS, aggregate_summary
+from PredictionResultExporter import PredictionResultExporter
+from PredictionRetentionJob import PredictionRetentionJob
+
+
+def make_results(bid_numbers, rate, count):
+    """입찰번호 목록으로 예측 결과 데이터프레임 생성"""
+    return pd.DataFrame({
+        '입찰번호': bid_numbers,
+        '입찰차수': ['0'] * len(bid_numbers),
+        '기초금액': [1000000.0] * len(bid_numbers),
+        '예측_URL': [''] * len(bid_numbers),
+        '업체투찰률_예측': [rate] * len(bid_numbers),
+        '예가투찰률_예측': [rate + 0.5] * len(bid_numbers),
+        '참여업체수_예측': [count] * len(bid_numbers),
+    })
+
+
+def open_manager():
+    """prediction_result.sql 스키마로 만든 메모리 DB에 연결한 매니저"""
+    with open(os.path.join(DAC_DIR, 'setup', 'prediction_result.sql'), encoding='utf-8') as f:
+        con = SqliteStandInConnection(':memory:', setup_sql=f.read())
+    assert con.connect()
+    return SqlServerPredictionManager(None, None, None, None, None, connection=con), con
+
+
+def assert_summary_consistent(con):
+    """ML_C_SUMMARY의 건수/합계가 ML_C를 처음부터 다시 집계한 값과 같은지 확인"""
+    expected = aggregate_summary(con.execute_query("SELECT * FROM ML_C"))
+    summary = con.execute_query(f"SELECT * FROM {SUMMARY_TABLE}")
+    actual = {(row['모델버전'], str(row['예측일자'])[:10]): [row[c] for c in SUMMARY_VALUE_COLUMNS]
+              for _, row in summary.iterrows()}
+
+    assert set(actual) == set(expected)
+    for key, values in expected.items():
+        assert actual[key] == pytest.approx(values[:-2])
+
+    # 최초/최근 예측일시도 남아 있는 행 기준이어야 함
+    bounds = {(row['모델버전'], str(row['예측일자'])[:10]): [pd.Timestamp(row['최초예측일시']),
+                                                          pd.Timestamp(row['최근예측일시'])]
+              for _, row in summary.iterrows()}
+    for key, values in expected.items():
+        assert bounds[key] == [pd.Timestamp(values[-2]), pd.Timestamp(values[-1])]
+
+
+def test_replace_save_keeps_summary_consistent():
+    manager, con = open_manager()
+
+    assert manager.save_prediction_results(make_results(['A1', 'A2', 'A3'], 80.0, 10), model_version='v1') == 3
+    assert_summary_consistent(con)
+
+    # 두 건은 덮어쓰고 한 건은 새로 저장 (모델버전이 바뀌므로 v1에서 빠지고 v2에 더해져야 함)
+    assert manager.save_prediction_results(make_results(['A2', 'A3', 'A4'], 85.0, 12), model_version='v2',
+                                           batch_size=2) == 3
+    assert [s['updated'] for s in manager.last_batch_stats] == [2, 0]
+    assert_summary_consistent(con)
+
+    by_model = {row[0]: row[1] for row in manager.get_prediction_summary_by_model()}
+    assert by_model == {'v1': 1, 'v2': 3}
+
+
+def test_replace_narrows_summary_bounds_of_old_bucket():
+    manager, con = open_manager()
+    manager.save_prediction_results(make_results(['N1'], 80.0, 10), model_version='v1')
+    manager.save_prediction_results(make_results(['N2'], 80.0, 10), model_version='v1')
+
+    # v1의 가장 최근 행을 v2로 옮기면 v1의 최근예측일시는 N1의 예측일시로 줄어야 함
+    manager.save_prediction_results(make_results(['N2'], 85.0, 12), model_version='v2')
+    assert_summary_consistent(con)
+
+
+def test_ignore_save_counts_only_inserted_rows():
+    manager, con = open_manager()
+
+    manager.save_prediction_results(make_results(['B1', 'B2'], 80.0, 10), model_version='v1')
+    assert manager.save_prediction_results(make_results(['B2', 'B3'], 90.0, 20), model_version='v2',
+                                           insert_mode='IGNORE') == 1
+    assert_summary_consistent(con)
+    assert manager.get_prediction_summary()[0] == 3
+
+
+def test_delete_batch_subtracts_deleted_rows_from_summary():
+    manager, con = open_manager()
+    manager.save_prediction_results(make_results(['C1', 'C2', 'C3', 'C4', 'C5'], 80.0, 10), model_version='v1')
+    manager.save_prediction_results(make_results(['C4', 'C5'], 85.0, 12), model_version='v2')
+
+    cutoff = datetime.now() + timedelta(days=1)
+    result = manager.delete_prediction_batch(cutoff, batch_size=2, fetch_rows=True)
+    assert result['deleted'] == 2
+    assert sorted(row[0] for row in result['rows']) == ['C1', 'C2']
+    assert 'lock_wait' not in result
+    assert_summary_consistent(con)
+
+    # 남은 행이 batch_size보다 적으면 cutoff 이전 전체를 삭제
+    assert manager.delete_prediction_batch(cutoff, batch_size=10)['deleted'] == 3
+    assert manager.get_prediction_count() == 0
+    assert_summary_consistent(con)
+
+
+def test_retention_job_rolls_back_when_archive_fails(tmp_path, monkeypatch):
+    class FailingWriter:
+        def __init__(self, path, columns):
+            pass
+
+        def write(self, rows):
+            raise OSError("디스크 가득 참")
+
+        def close(self):
+            pass
+
+    monkeypatch.setitem(PredictionResultExporter.WRITERS, 'csv', FailingWriter)
+    manager, con = open_manager()
+    manager.save_prediction_results(make_results(['F1', 'F2', 'F3'], 80.0, 10), model_version='v1')
+
+    job = PredictionRetentionJob(lambda: manager, days=-1, batch_size=2,
+                                 archive_dir=str(tmp_path / 'archive'), pause_sec=0)
+    with pytest.raises(Exception):
+        job.run()
+
+    assert manager.get_prediction_count() == 3
+    assert_summary_consistent(con)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
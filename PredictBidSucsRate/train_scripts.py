@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+학습 스크립트(bid.ml.train*.py) 불러오기와 텍스트 전처리 도구 복원
+
+학습 스크립트는 파일명에 '.'이 들어 있어 import로 불러올 수 없으므로 파일 경로로 모듈을 만든다.
+예측 런타임(model_bundle)과 학습 도구(streaming_trainer, hyperparameter_search, multi_output_model),
+벤치마크(benchmark_suite)가 모두 이 모듈을 통해 학습 스크립트의 클래스와 설정을 가져온다.
+
+- load_script       : 학습 스크립트 모듈 (한 번 불러오면 sys.modules에 보관)
+- setup_models      : 학습 스크립트 setupModels()의 모델 3개
+- load_text_models  : 묶음의 tokenizer/vectorizer 파일로 KiwiTokenizer/KiwiVectorizer 복원
+- text_model_state  : KiwiTokenizer/KiwiVectorizer를 묶음 파일 형식으로 저장할 값
+
+ex)
+train = load_script(TRAIN_SCRIPTS['rf'])
+models = setup_models(train)
+tokenizer, vectorizer = load_text_models('res/mlpregr.tokenizer.v0.1.1.npz', 'res/mlpregr.vectorizer.v0.1.1.npz')
+"""
+
+import os
+import sys
+import types
+import importlib.util
+import joblib
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 모델 계열별 학습 스크립트 (setupModels()로 학습과 같은 설정의 모델 3개를 만든다)
+TRAIN_SCRIPTS = {
+    'mlp': 'bid.ml.train.py',
+    'rf': 'bid.ml.train.rf.py',
+    'gb': 'bid.ml.train.gb.py',
+    'cb': 'bid.ml.train.cb.py',
+}
+
+
+def load_script(filename):
+    """파일명에 '.'이 들어간 학습 스크립트를 모듈로 불러오기"""
+    name = filename.replace('.py', '').replace('.', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[name] = module
+    return module
+
+
+def setup_models(train):
+    """학습 스크립트 모듈의 setupModels()로 만든 모델 3개 (업체투찰률, 예가투찰률, 참여업체수)"""
+    return train.BidLowerMarginRateTrain.setupModels(types.SimpleNamespace())
+
+
+def load_text_models(tokenizer_path, vectorizer_path, script=TRAIN_SCRIPTS['mlp']):
+    """
+    묶음 파일로 학습 때와 같은 KiwiTokenizer/KiwiVectorizer 복원
+
+    Args:
+        tokenizer_path (str): 사용자 단어 파일 (kiwi._user_values)
+        vectorizer_path (str): TF-IDF 단어사전 파일 ({'vocabulary', 'idf'})
+        script (str): 클래스를 가져올 학습 스크립트
+
+    Returns:
+        tuple: (tokenizer, vectorizer)
+    """
+    train = load_script(script)
+    tokenizer = train.KiwiTokenizer(None)
+    tokenizer.kiwi._user_values = joblib.load(tokenizer_path)
+    vectorizer = train.KiwiVectorizer()
+    voca = joblib.load(vectorizer_path)
+    vectorizer.vect.vocabulary_ = voca['vocabulary']
+    vectorizer.vect.idf_ = voca['idf']
+    return tokenizer, vectorizer
+
+
+def text_model_state(tokenizer, vectorizer):
+    """load_text_models가 읽는 형식의 (tokenizer 값, vectorizer 값)"""
+    return (tokenizer.kiwi._user_values,
+            {'vocabulary': vectorizer.vect.vocabulary_, 'idf': vectorizer.vect.idf_})
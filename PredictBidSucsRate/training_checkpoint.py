@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+MLPRegressor 학습 체크포인트 (중단 후 이어서 학습, 시간 예산)
+
+setupModels()의 모델은 max_iter=100000, early_stopping=True로 한 번의 fit이 오래 걸리고, 중간에
+작업이 중단되면 처음부터 다시 학습해야 한다. TrainingCheckpointer.fit은 MLPRegressor.fit과 같은
+조기 종료 규칙(validation_fraction, tol, n_iter_no_change)으로 epoch마다 partial_fit을 호출하면서
+주기적으로 res/checkpoints/<이름>.ckpt에 학습 상태를 저장한다.
+
+저장 내용:
+- 모델 (가중치, Adam 최적화 상태, 셔플용 RandomState 포함)
+- 최고 검증 점수와 그때의 가중치, 개선 없는 epoch 수, 검증 분할 seed
+- run.json: 학습/테스트 분할 seed 등 실행 단위 값 (--resume 시 같은 분할을 다시 만든다)
+
+- resume=True면 체크포인트의 상태에서 이어서 학습 (학습이 끝난 모델은 그대로 불러옴)
+- time_budget(초)을 넘기면 현재 상태를 체크포인트로 남기고, 모델에는 지금까지의 최고 가중치를 넣어 반환
+
+ex)
+checkpointer = TrainingCheckpointer('res/checkpoints', resume=True, time_budget=3600)
+finished = checkpointer.fit(model, x_train, y_train, '업체투찰률')
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import joblib
+import numpy as np
+from datetime import datetime
+from sklearn.model_selection import train_test_split
+
+
+# 실행 단위 값 파일
+RUN_STATE_FILE = 'run.json'
+
+# 체크포인트 파일 확장자
+CHECKPOINT_SUFFIX = '.ckpt'
+
+
+def data_fingerprint(x, y):
+    """학습 데이터 확인값 (형태 + 대상 값 해시). 이어서 학습할 때 데이터가 바뀌었는지 확인"""
+    y = np.ascontiguousarray(np.asarray(y, dtype=np.float64))
+    return f"{np.shape(x)}:{hashlib.sha1(y.tobytes()).hexdigest()}"
+
+
+class TrainingCheckpointer:
+    """epoch 단위 학습, 주기적 체크포인트, 이어서 학습, 시간 예산을 처리하는 클래스"""
+
+    def __init__(self, directory, resume=False, time_budget=None, interval_sec=60):
+        """
+        Args:
+            directory (str): 체크포인트 폴더 (res/checkpoints)
+            resume (bool): 체크포인트가 있으면 이어서 학습
+            time_budget (float): 전체 학습 시간 예산 (초, None이면 제한 없음)
+            interval_sec (float): 체크포인트 저장 주기 (초)
+        """
+        self.directory = directory
+        self.resume = resume
+        self.time_budget = time_budget
+        self.interval_sec = interval_sec
+        self.deadline = time.monotonic() + time_budget if time_budget else None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}{CHECKPOINT_SUFFIX}")
+
+    def run_value(self, key, value):
+        """
+        실행 단위 값 (학습/테스트 분할 seed 등)
+
+        resume이면 이전 실행에 저장된 값을 돌려주고, 아니면 value를 저장하고 그대로 돌려준다.
+        """
+        path = os.path.join(self.directory, RUN_STATE_FILE)
+        state = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        if self.resume and key in state:
+            print(f"♻️  이전 실행 값 사용: {key}={state[key]}")
+            return state[key]
+        state[key] = value
+        state['updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        return value
+
+    def budget_exceeded(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _save(self, name, state):
+        """임시 파일에 쓴 뒤 교체 (저장 중 중단돼도 이전 체크포인트 유지)"""
+        path = self.path(name)
+        joblib.dump(state, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def _load(self, name, fingerprint):
+        path = self.path(name)
+        if not (self.resume and os.path.exists(path)):
+            return None
+        state = joblib.load(path)
+        if state.get('fingerprint') != fingerprint:
+            print(f"⚠️  {name}: 학습 데이터가 체크포인트와 달라 처음부터 학습합니다.")
+            return None
+        return state
+
+    def fit(self, model, x, y, name):
+        """
+        체크포인트를 남기며 모델 학습
+
+        Args:
+            model: MLPRegressor 또는 MultiTargetMLP (network/y_scaler)
+            x, y: 학습 데이터 (model.fit과 같음)
+            name (str): 체크포인트 이름 (예: 업체투찰률)
+
+        Returns:
+            bool: True - 학습 완료, False - 시간 예산 초과로 중단 (모델에는 지금까지의 최고 가중치)
+        """
+        multi = hasattr(model, 'network') and hasattr(model, 'y_scaler')
+        network = model.network if multi else model
+        x = np.asarray(x, dtype=np.float64)
+        fingerprint = data_fingerprint(x, y)
+
+        state = self._load(name, fingerprint)
+        if state is not None and state['done']:
+            model.__dict__.update(state['model'].__dict__)
+            print(f"♻️  {name}: 학습이 끝난 체크포인트를 불러왔습니다 ({state['epoch']} epoch).")
+            return True
+
+        if state is not None:
+            network.__dict__.update(state['network'].__dict__)
+            if multi:
+                model.y_scaler = state['y_scaler']
+            print(f"♻️  {name}: {state['epoch']} epoch부터 이어서 학습합니다 (최고 검증 점수 {state['best_score']:.6f}).")
+        else:
+            if multi and not hasattr(model.y_scaler, 'scale_'):
+                model.y_scaler.fit(model._targets(y))  # 이미 학습된 모델(이어서 학습)은 대상 정규화 유지
+            seed = network.random_state if isinstance(network.random_state, (int, np.integer)) \
+                else int(np.random.randint(0, 2**31 - 1))
+            state = {'fingerprint': fingerprint, 'epoch': 0, 'best_score': -np.inf, 'best_weights': None,
+                     'no_improve': 0, 'scores': [], 'split_seed': int(seed), 'done': False,
+                     'early_stopping': bool(network.early_stopping)}
+
+        target = model.y_scaler.transform(model._targets(y)) if multi else np.asarray(y, dtype=np.float64)
+        early_stopping = state['early_stopping']
+        if early_stopping:
+            # MLPRegressor.fit의 early_stopping과 같은 검증 분할
+            x_train, x_valid, y_train, y_valid = train_test_split(
+                x, target, test_size=network.validation_fraction, random_state=state['split_seed'])
+        else:
+            x_train, y_train = x, target
+        network.set_params(early_stopping=False)  # partial_fit은 내부 early_stopping을 지원하지 않음
+        if hasattr(network, 'coefs_') and getattr(network, 'best_loss_', None) is None:
+            network.best_loss_ = np.inf  # early_stopping=True로 학습된 모델은 best_loss_가 None
+
+        last_save = time.monotonic()
+        stopped = False
+        while state['epoch'] < network.max_iter:
+            network.partial_fit(x_train, y_train)
+            state['epoch'] += 1
+
+            # MLPRegressor와 같은 규칙: 검증 점수(R2) 또는 학습 손실이 tol 이상 개선되지 않은 epoch 수
+            score = network.score(x_valid, y_valid) if early_stopping else -network.loss_
+            state['scores'].append(float(score))
+            if score < state['best_score'] + network.tol:
+                state['no_improve'] += 1
+            else:
+                state['no_improve'] = 0
+            if score > state['best_score']:
+                state['best_score'] = float(score)
+                state['best_weights'] = (copy.deepcopy(network.coefs_), copy.deepcopy(network.intercepts_))
+            if state['no_improve'] > network.n_iter_no_change:
+                break
+
+            if self.budget_exceeded():
+                stopped = True
+                break
+            if time.monotonic() - last_save >= self.interval_sec:
+                self._save(name, dict(state, network=network, y_scaler=model.y_scaler if multi else None))
+                last_save = time.monotonic()
+
+        if stopped:
+            # 이어서 학습할 수 있도록 현재 상태를 남기고, 모델에는 최고 가중치를 넣는다
+            self._save(name, dict(state, network=copy.deepcopy(network), y_scaler=model.y_scaler if multi else None))
+            print(f"⏰ {name}: 시간 예산({self.time_budget}초) 초과로 {state['epoch']} epoch에서 중단했습니다. "
+                  f"--resume으로 이어서 학습할 수 있습니다.")
+
+        if state['best_weights'] is not None:
+            network.coefs_, network.intercepts_ = copy.deepcopy(state['best_weights'])
+        network.set_params(early_stopping=early_stopping)
+        network.n_iter_ = state['epoch']
+        if early_stopping:
+            network.validation_scores_ = list(state['scores'])
+            network.best_validation_score_ = state['best_score']
+        else:
+            network.best_loss_ = -state['best_score']
+
+        if not stopped:
+            self._save(name, dict(state, done=True, model=model))
+            print(f"💾 {name}: {state['epoch']} epoch 학습 완료 (체크포인트 {self.path(name)})")
+        return not stopped
+
+    def clear(self):
+        """전체 학습이 끝난 뒤 체크포인트 삭제"""
+        for filename in os.listdir(self.directory):
+            if filename.endswith(CHECKPOINT_SUFFIX) or filename == RUN_STATE_FILE:
+                os.remove(os.path.join(self.directory, filename))
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+학습 단계별 시간/메모리 프로파일러
+
+BidLowerMarginRateTrain의 단계(데이터 로드, 형태소 분석, TF-IDF, 특성 엔지니어링, 분할, 정규화,
+모델별 학습, 예측, 엑셀 저장)마다 걸린 시간과 최대 메모리를 기록하고, 결과 엑셀 파일 옆에
+같은 이름의 .profile.json / .profile.csv로 저장한다.
+
+- 시간: time.perf_counter (같은 이름의 단계를 여러 번 실행하면 합산, calls에 횟수 기록)
+- 프로세스 메모리(RSS): psutil이 있으면 백그라운드 스레드가 주기적으로 읽어 단계 중 최댓값 기록
+- 파이썬 할당 메모리: trace_memory=True면 tracemalloc으로 단계 중 최대 할당량 기록 (느려짐)
+- cProfile: cprofile=True면 단계마다 프로파일하고 가장 오래 걸린 단계만 .prof 파일로 저장
+
+ex)
+profiler = TrainingProfiler(trace_memory=True, cprofile=True)
+with profiler.stage('load') as stage:
+    data = pd.read_csv(path)
+    stage['rows'] = len(data)
+profiler.save('res/result-2501011230-1-8020.xlsx')
+    # → res/result-2501011230-1-8020.profile.json, .profile.csv, .profile.<단계>.prof
+"""
+
+import os
+import csv
+import json
+import time
+import platform
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# 프로세스 메모리 측정 (선택)
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+MB = 1024 * 1024
+
+# CSV 컬럼 순서
+PROFILE_FIELDS = ['stage', 'calls', 'sec', 'rows', 'rows_per_sec', 'rss_start_mb', 'rss_peak_mb',
+                  'rss_delta_mb', 'py_peak_mb']
+
+
+class _RssSampler(threading.Thread):
+    """일정 간격으로 프로세스 RSS를 읽어 최댓값을 유지하는 스레드"""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self.peak = self.current()
+        self._stop_event = threading.Event()
+
+    def current(self):
+        return self.process.memory_info().rss
+
+    def reset(self):
+        """현재 값부터 다시 최댓값 측정 (단계 시작 시 호출)"""
+        self.peak = self.current()
+        return self.peak
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = self.current()
+            if rss > self.peak:
+                self.peak = rss
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class TrainingProfiler:
+    """학습 단계별 소요 시간과 최대 메모리를 기록하는 클래스"""
+
+    def __init__(self, trace_memory=False, cprofile=False, sample_interval=0.05):
+        """
+        Args:
+            trace_memory (bool): tracemalloc으로 파이썬 할당 메모리 최댓값 측정 (할당이 많은 단계는 느려짐)
+            cprofile (bool): 단계마다 cProfile 실행, 가장 오래 걸린 단계의 통계를 저장
+            sample_interval (float): RSS 측정 간격 (초)
+        """
+        self.trace_memory = trace_memory
+        self.cprofile = cprofile
+        self.sample_interval = sample_interval
+        self.started = time.perf_counter()
+        self.created = datetime.now()
+        self.meta = {}
+        self.stages = {}
+        self.slowest_profile = None  # (단계명, 소요 시간, cProfile.Profile)
+        self._sampler = None
+        self._active = None
+
+    def stage(self, name, rows=None):
+        """
+        단계 측정 context manager (with 블록 안에서 stage['rows']로 처리 건수 지정 가능)
+
+        단계는 중첩하지 않는다 (중첩되면 안쪽 단계는 시간만 기록).
+        """
+        return self._measure(name, rows)
+
+    @contextmanager
+    def _measure(self, name, rows):
+        run = {'rows': rows}
+        if self._active is not None:
+            # 중첩 단계: 바깥 단계의 메모리 측정을 흐트러뜨리지 않도록 시간만 기록
+            started = time.perf_counter()
+            try:
+                yield run
+            finally:
+                self._record(name, time.perf_counter() - started, run['rows'], {})
+            return
+
+        self._active = name
+        memory = self._start_memory()
+        profile = None
+        if self.cprofile:
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+
+        started = time.perf_counter()
+        try:
+            yield run
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+            self._record(name, elapsed, run['rows'], self._stop_memory(memory))
+            if profile is not None and (self.slowest_profile is None or elapsed > self.slowest_profile[1]):
+                self.slowest_profile = (name, elapsed, profile)
+            self._active = None
+
+    def _start_memory(self):
+        memory = {}
+        if PSUTIL_AVAILABLE:
+            if self._sampler is None:
+                self._sampler = _RssSampler(self.sample_interval)
+                self._sampler.start()
+            memory['rss_start'] = self._sampler.reset()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        return memory
+
+    def _stop_memory(self, memory):
+        result = {}
+        if self._sampler is not None:
+            peak = max(self._sampler.peak, self._sampler.current())
+            result['rss_start_mb'] = round(memory['rss_start'] / MB, 1)
+            result['rss_peak_mb'] = round(peak / MB, 1)
+            result['rss_delta_mb'] = round((peak - memory['rss_start']) / MB, 1)
+        if self.trace_memory and tracemalloc.is_tracing():
+            result['py_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+        return result
+
+    def _record(self, name, elapsed, rows, memory):
+        """단계 기록 (같은 이름이면 시간/건수는 합산, 메모리는 최댓값)"""
+        entry = self.stages.setdefault(name, {'stage': name, 'calls': 0, 'sec': 0.0, 'rows': None})
+        entry['calls'] += 1
+        entry['sec'] = round(entry['sec'] + elapsed, 4)
+        if rows is not None:
+            entry['rows'] = (entry['rows'] or 0) + int(rows)
+            entry['rows_per_sec'] = round(entry['rows'] / max(entry['sec'], 1e-9), 1)
+        for key, value in memory.items():
+            if key == 'rss_start_mb':
+                entry.setdefault(key, value)
+            else:
+                entry[key] = max(entry.get(key, value), value)
+
+    def total_sec(self):
+        return round(time.perf_counter() - self.started, 3)
+
+    def save(self, result_path):
+        """
+        결과 파일(result-*.xlsx) 옆에 프로파일 저장
+
+        Returns:
+            list: 저장한 파일 경로 목록
+        """
+        base = os.path.splitext(result_path)[0] + '.profile'
+        stages = list(self.stages.values())
+        report = {
+            'created': self.created.strftime('%Y-%m-%d %H:%M:%S'),
+            'result_file': os.path.basename(result_path),
+            'total_sec': self.total_sec(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'psutil': PSUTIL_AVAILABLE,
+                'tracemalloc': self.trace_memory,
+            },
+            'meta': self.meta,
+            'stages': stages,
+        }
+
+        paths = [base + '.json', base + '.csv']
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        with open(paths[1], 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(stages)
+
+        if self.slowest_profile is not None:
+            name, _, profile = self.slowest_profile
+            paths.append(f"{base}.{name}.prof")
+            profile.dump_stats(paths[-1])
+        return paths
+
+    def print_summary(self):
+        print("-"*80)
+        print(f"{'단계':<24}{'횟수':>6}{'시간(초)':>12}{'비율':>8}{'최대 RSS(MB)':>16}{'py 최대(MB)':>14}")
+        total = max(self.total_sec(), 1e-9)
+        for entry in self.stages.values():
+            print(f"{entry['stage']:<24}{entry['calls']:>6}{entry['sec']:>12.3f}{entry['sec'] / total:>8.1%}"
+                  f"{entry.get('rss_peak_mb', '-'):>16}{entry.get('py_peak_mb', '-'):>14}")
+        if self.slowest_profile is not None:
+            print(f"cProfile 대상 (가장 오래 걸린 단계): {self.slowest_profile[0]}")
+
+    def close(self):
+        """RSS 측정 스레드 종료"""
+        if self._sampler is not None:
+            self._sampler.stop()
+            self._sampler = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def profiled(name, rows_arg=None):
+    """
+    메서드 전체를 하나의 단계로 측정하는 데코레이터 (self.profiler가 없으면 그대로 실행)
+
+    Args:
+        name (str): 단계 이름
+        rows_arg (int): 처리 건수로 쓸 위치 인자 번호 (self 제외, len()으로 계산)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None:
+                return func(self, *args, **kwargs)
+            rows = len(args[rows_arg]) if rows_arg is not None and len(args) > rows_arg else None
+            with profiler.stage(name, rows):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator